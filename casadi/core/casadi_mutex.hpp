@@ -0,0 +1,118 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+#ifndef CASADI_MUTEX_HPP
+#define CASADI_MUTEX_HPP
+
+#include <casadi/core/casadi_export.h>
+
+#ifdef CASADI_WITH_THREADSAFE_SYMBOLICS
+#include <atomic>
+#include <mutex>
+#endif // CASADI_WITH_THREADSAFE_SYMBOLICS
+
+namespace casadi {
+
+  /// \cond INTERNAL
+#ifdef CASADI_WITH_THREADSAFE_SYMBOLICS
+  /// Reference counter of a node, atomic in a thread-safe build
+  typedef std::atomic<unsigned int> RefCount;
+#else // CASADI_WITH_THREADSAFE_SYMBOLICS
+  /// Reference counter of a node, atomic in a thread-safe build
+  typedef unsigned int RefCount;
+#endif // CASADI_WITH_THREADSAFE_SYMBOLICS
+
+  /** \brief Increase a reference counter, unless it has already reached zero
+   *
+   * Used when an owning reference is taken from a cache or a weak reference:
+   * a node whose counter has reached zero is being destroyed by another thread
+   * and must not be revived.
+   */
+  inline bool casadi_count_up_if_alive(RefCount& count) {
+#ifdef CASADI_WITH_THREADSAFE_SYMBOLICS
+    unsigned int c = count.load();
+    while (c!=0) {
+      if (count.compare_exchange_weak(c, c+1)) return true;
+    }
+    return false;
+#else // CASADI_WITH_THREADSAFE_SYMBOLICS
+    if (count==0) return false;
+    count++;
+    return true;
+#endif // CASADI_WITH_THREADSAFE_SYMBOLICS
+  }
+
+  /**
+   * \brief Mutex protecting global symbolic data structures
+   *
+   * A recursive mutex if CasADi was built with WITH_THREADSAFE_SYMBOLICS,
+   * otherwise locking is a no-op.
+   *
+   * This is an internal class.
+   */
+  class CASADI_EXPORT SymbolicMutex {
+  public:
+#ifdef CASADI_WITH_THREADSAFE_SYMBOLICS
+    void lock() { mtx_.lock();}
+    void unlock() { mtx_.unlock();}
+  private:
+    std::recursive_mutex mtx_;
+#else // CASADI_WITH_THREADSAFE_SYMBOLICS
+    void lock() {}
+    void unlock() {}
+#endif // CASADI_WITH_THREADSAFE_SYMBOLICS
+  };
+
+  /** \brief Scoped lock of a SymbolicMutex
+   *
+   * This is an internal class.
+   */
+  class CASADI_EXPORT SymbolicLock {
+  public:
+    explicit SymbolicLock(SymbolicMutex& mtx) : mtx_(mtx) { mtx_.lock();}
+    ~SymbolicLock() { mtx_.unlock();}
+  private:
+    // Not copyable
+    SymbolicLock(const SymbolicLock&);
+    SymbolicLock& operator=(const SymbolicLock&);
+    SymbolicMutex& mtx_;
+  };
+
+  /** \brief Mutex serializing algorithms that use the temporary markers of expression nodes
+   *
+   * Nodes such as cached constants are shared between otherwise independent
+   * expressions, so graph sorting (SXFunction and MXFunction initialization) and
+   * the other users of SXElement::setTemp and MX::setTemp must not run
+   * concurrently, even on disjoint expressions.
+   */
+  CASADI_EXPORT SymbolicMutex& casadi_temp_mutex();
+
+  /// Mutex protecting the link between shared objects and their weak references
+  CASADI_EXPORT SymbolicMutex& casadi_weak_ref_mutex();
+  /// \endcond
+
+} // namespace casadi
+
+#endif // CASADI_MUTEX_HPP
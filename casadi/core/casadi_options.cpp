@@ -25,11 +25,14 @@
 
 #include "casadi_options.hpp"
 #include "casadi_exception.hpp"
+#include "profiling.hpp"
 
 namespace casadi {
 
   bool CasadiOptions::catch_errors_swig = true;
   bool CasadiOptions::simplification_on_the_fly = true;
+  bool CasadiOptions::hash_consing = false;
+  bool CasadiOptions::call_stats = true;
   bool CasadiOptions::profiling = false;
   std::ofstream CasadiOptions::profilingLog;
   bool CasadiOptions::profilingBinary = true;
@@ -39,7 +42,11 @@ namespace casadi {
   std::string CasadiOptions::casadipath = "";
 
   void CasadiOptions::startProfiling(const std::string &filename) {
-    profilingLog.open(filename.c_str(), std::ofstream::out);
+    if (profilingBinary) {
+      profilingLog.open(filename.c_str(), std::ofstream::out | std::ofstream::binary);
+    } else {
+      profilingLog.open(filename.c_str(), std::ofstream::out);
+    }
     if (profilingLog.is_open()) {
       profiling = true;
     } else {
@@ -49,6 +56,7 @@ namespace casadi {
 
   void CasadiOptions::stopProfiling() {
     if (profiling) {
+      ProfilingBuffer::flushAll();
       profilingLog.close();
     }
     profiling = false;
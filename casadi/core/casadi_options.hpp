@@ -67,6 +67,19 @@ namespace casadi {
       */
       static bool simplification_on_the_fly;
 
+      /** \brief Indicates whether identical SX operations should share the same node
+      * (hash-consing). When set, creating an operation which already exists with the same
+      * dependencies returns the existing expression instead of a new node.
+      * Default: false
+      */
+      static bool hash_consing;
+
+      /** \brief Indicates whether every function counts and times its evaluations,
+      * sparsity propagation sweeps and derivative constructions, see Function::getStats.
+      * Default: true
+      */
+      static bool call_stats;
+
       /** \brief Stream on which profiling log should be written */
       static std::ofstream profilingLog;
 
@@ -90,11 +103,22 @@ namespace casadi {
       static void setSimplificationOnTheFly(bool flag) { simplification_on_the_fly = flag; }
       static bool getSimplificationOnTheFly() { return simplification_on_the_fly; }
 
+      // Setter and getter for hash_consing
+      static void setHashConsing(bool flag) { hash_consing = flag; }
+      static bool getHashConsing() { return hash_consing; }
+
+      // Setter and getter for call_stats
+      static void setCallStats(bool flag) { call_stats = flag; }
+      static bool getCallStats() { return call_stats; }
+
       /** \brief Start virtual machine profiling
       *
       *  When profiling is active, each primitive of an MX algorithm is profiling and dumped into the supplied file _filename_
       *  After the profiling is done, convert the supplied file to a viewable webpage with:
       * `casadi-build-dir/bin/profilereport _filename_`
+      *
+      *  A binary log can also be summarized, and converted to flame graph stacks, with:
+      * `python -mcasadi.tools.profileanalyzer _filename_`
       */
       static void startProfiling(const std::string &filename);
       static void stopProfiling();
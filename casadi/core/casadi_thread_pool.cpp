@@ -0,0 +1,165 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+#include "casadi_thread_pool.hpp"
+
+#ifdef USE_CXX11
+#include <atomic>
+#include <exception>
+
+using namespace std;
+
+namespace casadi {
+
+  struct ThreadPool::Batch {
+    Batch(int n, const function<void(int)>& task) : n(n), task(task), next(0), done(0) {}
+
+    // Number of tasks
+    int n;
+
+    // The task
+    const function<void(int)>& task;
+
+    // Index of the next task to be claimed
+    atomic<int> next;
+
+    // Number of finished tasks
+    int done;
+
+    // First exception thrown by a task
+    exception_ptr error;
+
+    // Signals completion of the batch
+    mutex mtx;
+    condition_variable cv;
+  };
+
+  ThreadPool::ThreadPool(int n_workers) : size_(1), stop_(false) {
+    reserve(n_workers+1);
+  }
+
+  void ThreadPool::reserve(int n) {
+    lock_guard<mutex> lock(mtx_);
+    while (size_<n) {
+      workers_.push_back(thread(&ThreadPool::loop, this));
+      size_++;
+    }
+  }
+
+  ThreadPool::~ThreadPool() {
+    {
+      lock_guard<mutex> lock(mtx_);
+      stop_ = true;
+    }
+    cv_.notify_all();
+    for (vector<thread>::iterator it=workers_.begin(); it!=workers_.end(); ++it) {
+      it->join();
+    }
+  }
+
+  ThreadPool& ThreadPool::global() {
+    // The caller is one of the threads
+    static ThreadPool pool(max(static_cast<int>(thread::hardware_concurrency()), 1)-1);
+    return pool;
+  }
+
+  void ThreadPool::work(Batch& b) {
+    int i;
+    while ((i=b.next++) < b.n) {
+      exception_ptr error;
+      try {
+        b.task(i);
+      } catch(...) {
+        error = current_exception();
+      }
+      lock_guard<mutex> lock(b.mtx);
+      if (error && !b.error) b.error = error;
+      if (++b.done==b.n) b.cv.notify_all();
+    }
+  }
+
+  void ThreadPool::loop() {
+    while (true) {
+      shared_ptr<Batch> b;
+      {
+        unique_lock<mutex> lock(mtx_);
+        while (true) {
+          // Drop batches for which all tasks have been claimed
+          while (!queue_.empty() && queue_.front()->next >= queue_.front()->n) {
+            queue_.pop_front();
+          }
+          if (stop_) return;
+          if (!queue_.empty()) break;
+          cv_.wait(lock);
+        }
+        b = queue_.front();
+      }
+      work(*b);
+    }
+  }
+
+  void ThreadPool::run(int n, const function<void(int)>& task) {
+    if (n<=0) return;
+
+    // Nothing to gain from dispatching
+    if (n==1 || size_==1) {
+      for (int i=0; i<n; ++i) task(i);
+      return;
+    }
+
+    // Make the batch available to the workers
+    shared_ptr<Batch> b = make_shared<Batch>(n, task);
+    {
+      lock_guard<mutex> lock(mtx_);
+      queue_.push_back(b);
+    }
+    cv_.notify_all();
+
+    // Participate
+    work(*b);
+
+    // Wait for tasks claimed by workers
+    {
+      unique_lock<mutex> lock(b->mtx);
+      b->cv.wait(lock, [&b]{ return b->done==b->n;});
+    }
+
+    // Make sure that the batch is no longer queued
+    {
+      lock_guard<mutex> lock(mtx_);
+      for (deque<shared_ptr<Batch> >::iterator it=queue_.begin(); it!=queue_.end(); ++it) {
+        if (*it==b) {
+          queue_.erase(it);
+          break;
+        }
+      }
+    }
+
+    if (b->error) rethrow_exception(b->error);
+  }
+
+} // namespace casadi
+
+#endif // USE_CXX11
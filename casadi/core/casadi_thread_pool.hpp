@@ -0,0 +1,102 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+#ifndef CASADI_THREAD_POOL_HPP
+#define CASADI_THREAD_POOL_HPP
+
+#include <casadi/core/casadi_export.h>
+
+#ifdef USE_CXX11
+#include <atomic>
+#include <condition_variable>
+#include <deque>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <vector>
+#endif // USE_CXX11
+
+namespace casadi {
+
+  /// \cond INTERNAL
+#ifdef USE_CXX11
+
+  /**
+   * \brief Persistent pool of worker threads
+   *
+   * Work is submitted as a batch of \a n independent tasks, identified by
+   * an index in [0, n). The calling thread takes part in the execution of
+   * its own batch, so nested calls (e.g. a parallel map inside a parallel map)
+   * cannot deadlock, even if all workers are busy.
+   *
+   * This is an internal class.
+   */
+  class CASADI_EXPORT ThreadPool {
+  public:
+    /// Create a pool with \a n_workers additional threads
+    explicit ThreadPool(int n_workers);
+
+    /// Destructor, joins all workers
+    ~ThreadPool();
+
+    /// Process-wide pool, created on first use
+    static ThreadPool& global();
+
+    /// Number of threads that can work on a batch (workers plus the caller)
+    int size() const { return size_;}
+
+    /// Add workers until at least \a n threads can work on a batch
+    void reserve(int n);
+
+    /** \brief Call task(i) for i=0..n-1 and return when all calls have finished
+     *
+     * The first exception thrown by a task is rethrown in the calling thread.
+     */
+    void run(int n, const std::function<void(int)>& task);
+
+  private:
+    struct Batch;
+
+    /// Execute tasks from a batch until no more are left
+    static void work(Batch& b);
+
+    /// Main loop of a worker thread
+    void loop();
+
+    std::vector<std::thread> workers_;
+    std::atomic<int> size_;
+    std::deque<std::shared_ptr<Batch> > queue_;
+    std::mutex mtx_;
+    std::condition_variable cv_;
+    bool stop_;
+  };
+
+#endif // USE_CXX11
+  /// \endcond
+
+} // namespace casadi
+
+#endif // CASADI_THREAD_POOL_HPP
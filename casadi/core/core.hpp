@@ -28,6 +28,7 @@
 
 // Scalar expressions (why do I need to put it up here?)
 #include "sx/sx_element.hpp"
+#include "sx/sx_node_pool.hpp"
 
 // Generic tools
 #include "polynomial.hpp"
@@ -44,6 +45,8 @@
 
 // Functions
 #include "function/code_generator.hpp"
+#include "function/evaluation_context.hpp"
+#include "function/sparsity_cache.hpp"
 #include "function/sx_function.hpp"
 #include "function/mx_function.hpp"
 #include "function/compiler.hpp"
@@ -0,0 +1,131 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+#include "call_stats.hpp"
+#include <cmath>
+#include <limits>
+
+using namespace std;
+
+namespace casadi {
+
+  // Relaxed atomic operations, the counters do not order any other memory accesses
+#ifdef USE_CXX11
+  template<typename T>
+  inline T loadStat(const atomic<T>& v) { return v.load(memory_order_relaxed);}
+
+  template<typename T>
+  inline void storeStat(atomic<T>& v, T a) { v.store(a, memory_order_relaxed);}
+
+  inline void addStat(atomic<int>& v, int n) { v.fetch_add(n, memory_order_relaxed);}
+
+  inline void addStat(atomic<double>& v, double a) {
+    double v0 = v.load(memory_order_relaxed);
+    while (!v.compare_exchange_weak(v0, v0+a, memory_order_relaxed)) {}
+  }
+
+  inline void minStat(atomic<double>& v, double a) {
+    double v0 = v.load(memory_order_relaxed);
+    while (a<v0 && !v.compare_exchange_weak(v0, a, memory_order_relaxed)) {}
+  }
+
+  inline void maxStat(atomic<double>& v, double a) {
+    double v0 = v.load(memory_order_relaxed);
+    while (a>v0 && !v.compare_exchange_weak(v0, a, memory_order_relaxed)) {}
+  }
+#else // USE_CXX11
+  template<typename T>
+  inline T loadStat(const T& v) { return v;}
+
+  template<typename T>
+  inline void storeStat(T& v, T a) { v = a;}
+
+  inline void addStat(int& v, int n) { v += n;}
+
+  inline void addStat(double& v, double a) { v += a;}
+
+  inline void minStat(double& v, double a) { if (a<v) v = a;}
+
+  inline void maxStat(double& v, double a) { if (a>v) v = a;}
+#endif // USE_CXX11
+
+  CallStats::CallStats() {
+    reset();
+  }
+
+  CallStats::CallStats(const CallStats& s) {
+    *this = s;
+  }
+
+  CallStats& CallStats::operator=(const CallStats& s) {
+    if (this==&s) return *this;
+    storeStat(n_call_, loadStat(s.n_call_));
+    storeStat(t_total_, loadStat(s.t_total_));
+    storeStat(t_min_, loadStat(s.t_min_));
+    storeStat(t_max_, loadStat(s.t_max_));
+    for (int k=0; k<n_bins; ++k) storeStat(histogram_[k], loadStat(s.histogram_[k]));
+    return *this;
+  }
+
+  void CallStats::reset() {
+    storeStat(n_call_, 0);
+    storeStat(t_total_, 0.);
+    storeStat(t_min_, numeric_limits<double>::infinity());
+    storeStat(t_max_, 0.);
+    for (int k=0; k<n_bins; ++k) storeStat(histogram_[k], 0);
+  }
+
+  void CallStats::add(double t, int n) {
+    if (n<=0) return;
+
+    // Histogram bin, from the binary exponent of the average time in nanoseconds
+    double t_call = n==1 ? t : t/n;
+    int bin = 0;
+    if (t_call>=2e-9) {
+      frexp(t_call*1e9, &bin);
+      bin = std::min(bin-1, n_bins-1);
+    }
+
+    addStat(n_call_, n);
+    addStat(t_total_, t);
+    minStat(t_min_, t_call);
+    maxStat(t_max_, t_call);
+    addStat(histogram_[bin], n);
+  }
+
+  Dict CallStats::getStats() const {
+    int n_call = loadStat(n_call_);
+    vector<int> histogram(n_bins);
+    for (int k=0; k<n_bins; ++k) histogram[k] = loadStat(histogram_[k]);
+    Dict ret;
+    ret["n_call"] = n_call;
+    ret["t_total"] = loadStat(t_total_);
+    ret["t_min"] = n_call>0 ? loadStat(t_min_) : 0.;
+    ret["t_max"] = loadStat(t_max_);
+    ret["histogram"] = histogram;
+    return ret;
+  }
+
+} // namespace casadi
@@ -0,0 +1,106 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+#ifndef CASADI_CALL_STATS_HPP
+#define CASADI_CALL_STATS_HPP
+
+#include "../generic_type.hpp"
+#include "../casadi_options.hpp"
+#include "../profiling.hpp"
+#ifdef USE_CXX11
+#include <atomic>
+#endif // USE_CXX11
+
+/// \cond INTERNAL
+namespace casadi {
+
+  /** \brief Number of calls and wall times of one kind of call of a function
+
+      The times are also collected in a histogram with logarithmic bins,
+      bin k counting the calls which took between 2^k and 2^(k+1) nanoseconds.
+
+      Calls are recorded without locking, so concurrent evaluations of a function
+      do not wait for each other. Statistics read while calls are being recorded
+      need not be consistent with each other.
+  */
+  class CASADI_EXPORT CallStats {
+  public:
+    /// Number of bins in the histogram, the last bin also counts all longer calls
+    static const int n_bins = 40;
+
+    /// Constructor
+    CallStats();
+
+    /// Copy constructor, copies the statistics
+    CallStats(const CallStats& s);
+
+    /// Assignment, copies the statistics
+    CallStats& operator=(const CallStats& s);
+
+    /// Clear the statistics
+    void reset();
+
+    /** \brief Record n calls which took t seconds together
+     * The calls are counted in the histogram and in t_min and t_max with their
+     * average time, which saves reading the clock for every call of a batch.
+     */
+    void add(double t, int n=1);
+
+    /// Get the statistics: n_call, t_total, t_min, t_max and histogram
+    Dict getStats() const;
+
+  private:
+#ifdef USE_CXX11
+    std::atomic<int> n_call_;
+    std::atomic<double> t_total_, t_min_, t_max_;
+    std::atomic<int> histogram_[n_bins];
+#else // USE_CXX11
+    int n_call_;
+    double t_total_, t_min_, t_max_;
+    int histogram_[n_bins]; // NOLINT(runtime/arrays) - n_bins is a constant
+#endif // USE_CXX11
+  };
+
+  /** \brief Records the wall time between its construction and destruction in a CallStats
+
+      The time is recorded as n calls. Does nothing unless CasadiOptions::call_stats is set.
+  */
+  class CallTimer {
+  public:
+    explicit CallTimer(CallStats& s, int n=1) : s_(CasadiOptions::call_stats ? &s : 0), n_(n) {
+      if (s_) t_start_ = getRealTime();
+    }
+    ~CallTimer() {
+      if (s_) s_->add(getRealTime()-t_start_, n_);
+    }
+  private:
+    CallStats* s_;
+    int n_;
+    double t_start_;
+  };
+
+} // namespace casadi
+/// \endcond
+
+#endif // CASADI_CALL_STATS_HPP
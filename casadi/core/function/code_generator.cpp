@@ -107,11 +107,12 @@ namespace casadi {
 
   void CodeGenerator::generate(const std::string& name) const {
     // File(s) being generated, header is optional
-    vector<ofstream> s(this->with_header ? 2 : 1);
+    vector<ofstream> f(this->with_header ? 2 : 1);
+    vector<ostream*> s(f.size());
 
     std::string sname = Function::sanitizeName(name);
 
-    for (int i=0; i<s.size(); ++i) {
+    for (int i=0; i<f.size(); ++i) {
       // Create file(s)
       string fname;
       if (this->cpp) {
@@ -119,21 +120,32 @@ namespace casadi {
       } else {
         fname = sname + (i==0 ? ".c" : ".h");
       }
-      s[i].open(fname.c_str());
+      f[i].open(fname.c_str());
+      s[i] = &f[i];
+    }
 
+    // Generate the code
+    generate(sname, s);
+  }
+
+  void CodeGenerator::generate(const std::string& name, const std::vector<std::ostream*>& s) const {
+    casadi_assert(s.size()==(this->with_header ? 2 : 1));
+    std::string sname = Function::sanitizeName(name);
+
+    for (int i=0; i<s.size(); ++i) {
       // Print header
-      s[i] << "/* This function was automatically generated by CasADi */" << endl;
+      *s[i] << "/* This function was automatically generated by CasADi */" << endl;
 
       // C linkage
       if (!this->cpp) {
-        s[i] << "#ifdef __cplusplus" << endl
+        *s[i] << "#ifdef __cplusplus" << endl
           << "extern \"C\" {" << endl
           << "#endif" << endl << endl;
       }
     }
 
     // Prefix internal symbols to avoid symbol collisions
-    s[0] << "#ifdef CODEGEN_PREFIX" << endl
+    *s[0] << "#ifdef CODEGEN_PREFIX" << endl
          << "  #define NAMESPACE_CONCAT(NS, ID) _NAMESPACE_CONCAT(NS, ID)" << endl
          << "  #define _NAMESPACE_CONCAT(NS, ID) NS ## ID" << endl
          << "  #define CASADI_PREFIX(ID) NAMESPACE_CONCAT(CODEGEN_PREFIX, ID)" << endl
@@ -141,12 +153,12 @@ namespace casadi {
          << "  #define CASADI_PREFIX(ID) " << sname << "_ ## ID" << endl
          << "#endif /* CODEGEN_PREFIX */" << endl << endl;
 
-    s[0] << this->includes.str();
-    s[0] << endl;
+    *s[0] << this->includes.str();
+    *s[0] << endl;
 
     // Real type (usually double)
     for (int i=0; i<s.size(); ++i) {
-      s[i]
+      *s[i]
         << "#ifndef real_t" << endl
         << "#define real_t " << this->real_t << endl
         << "#define to_double(x) "
@@ -158,30 +170,30 @@ namespace casadi {
 
     // External function declarations
     if (!added_externals_.empty()) {
-      s[0] << "/* External functions */" << endl;
+      *s[0] << "/* External functions */" << endl;
       for (std::set<std::string>::const_iterator it=added_externals_.begin();
            it!=added_externals_.end(); ++it) {
-        s[0] << *it << endl;
+        *s[0] << *it << endl;
       }
-      s[0] << endl;
+      *s[0] << endl;
     }
 
     // Generate the actual function
-    generate(s[0]);
+    generate(*s[0]);
 
     // Generate header
     if (this->with_header) {
-      s[1] << this->header.str();
+      *s[1] << this->header.str();
     }
 
     // Mex gateway
     if (this->mex) {
       // Begin conditional compilation
-      s[0] << "#ifdef MATLAB_MEX_FILE" << endl;
+      *s[0] << "#ifdef MATLAB_MEX_FILE" << endl;
 
       // Function prototype
-      if (this->cpp) s[0] << "extern \"C\"" << endl; // C linkage
-      s[0] << "void mexFunction(int resc, mxArray *resv[], int argc, const mxArray *argv[]) {"
+      if (this->cpp) *s[0] << "extern \"C\"" << endl; // C linkage
+      *s[0] << "void mexFunction(int resc, mxArray *resv[], int argc, const mxArray *argv[]) {"
            << endl;
 
       // Create a buffer
@@ -189,51 +201,47 @@ namespace casadi {
       for (int i=0; i<exposed_fname.size(); ++i) {
         buf_len = std::max(buf_len, exposed_fname[i].size());
       }
-      s[0] << "  char buf[" << (buf_len+1) << "];" << endl;
+      *s[0] << "  char buf[" << (buf_len+1) << "];" << endl;
 
       // Read string argument
-      s[0] << "  int buf_ok = --argc >= 0 && !mxGetString(*argv++, buf, sizeof(buf));" << endl;
+      *s[0] << "  int buf_ok = --argc >= 0 && !mxGetString(*argv++, buf, sizeof(buf));" << endl;
 
       // Create switch
-      s[0] << "  if (!buf_ok) {" << endl
+      *s[0] << "  if (!buf_ok) {" << endl
            << "    /* name error */" << endl;
       for (int i=0; i<exposed_fname.size(); ++i) {
-        s[0] << "  } else if (strcmp(buf, \"" << exposed_fname[i] << "\")==0) {" << endl
+        *s[0] << "  } else if (strcmp(buf, \"" << exposed_fname[i] << "\")==0) {" << endl
              << "    return mex_" << exposed_fname[i] << "(resc, resv, argc, argv);" << endl;
       }
-      s[0] << "  }" << endl;
+      *s[0] << "  }" << endl;
 
       // Error
-      s[0] << "  mexErrMsgTxt(\"First input should be a command string. Possible values:";
+      *s[0] << "  mexErrMsgTxt(\"First input should be a command string. Possible values:";
       for (int i=0; i<exposed_fname.size(); ++i) {
-        s[0] << " '" << exposed_fname[i] << "'";
+        *s[0] << " '" << exposed_fname[i] << "'";
       }
-      s[0] << "\");" << endl;
+      *s[0] << "\");" << endl;
 
       // End conditional compilation and function
-      s[0] << "}" << endl
+      *s[0] << "}" << endl
            << "#endif" << endl;
     }
 
     // Generate main
     if (this->main) {
-      s[0] << "int main(int argc, char* argv[]) {" << endl
+      *s[0] << "int main(int argc, char* argv[]) {" << endl
            << "  return main_eval(argc, argv);" << endl
            << "}" << endl << endl;
     }
 
     // Finalize file(s)
     for (int i=0; i<s.size(); ++i) {
-
       // C linkage
       if (!this->cpp) {
-        s[i] << "#ifdef __cplusplus" << endl;
-        s[i] << "} /* extern \"C\" */" << endl;
-        s[i] << "#endif" << endl;
+        *s[i] << "#ifdef __cplusplus" << endl;
+        *s[i] << "} /* extern \"C\" */" << endl;
+        *s[i] << "#endif" << endl;
       }
-
-      // Close file(s)
-      s[i].close();
     }
   }
 
@@ -52,6 +52,14 @@ namespace casadi {
     /// Generate a file
     void generate(const std::string& name) const;
 
+#ifndef SWIG
+    /** \brief Generate the code of a file with a given name to streams
+     *
+     * The second stream receives the header, if generated (option with_header)
+     */
+    void generate(const std::string& name, const std::vector<std::ostream*>& s) const;
+#endif // SWIG
+
     /// Generate a file, return code as string
     std::string generate() const;
 
@@ -0,0 +1,93 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+
+#include "evaluation_context.hpp"
+#include "function_internal.hpp"
+#include "../std_vector_tools.hpp"
+
+using namespace std;
+
+namespace casadi {
+
+  EvaluationContext::EvaluationContext() {
+  }
+
+  EvaluationContext::EvaluationContext(const Function& f) : f_(f) {
+    f_.assertInit();
+    casadi_assert_message(f_->isReentrant(), "EvaluationContext: Function \""
+                          << f_.getOption("name") << "\" is not reentrant and cannot be "
+                          "evaluated from different contexts concurrently.");
+    arg_.resize(f_.sz_arg());
+    res_.resize(f_.sz_res());
+    iw_.resize(f_.sz_iw());
+    w_.resize(f_.sz_w());
+    input_.resize(f_.nIn());
+    for (int i=0; i<input_.size(); ++i) input_[i].resize(f_.input(i).nnz());
+    output_.resize(f_.nOut());
+    for (int i=0; i<output_.size(); ++i) output_[i].resize(f_.output(i).nnz());
+  }
+
+  void EvaluationContext::eval(const double* const* arg, double* const* res) {
+    casadi_assert_message(!f_.isNull(), "EvaluationContext::eval: Context is empty.");
+    copy(arg, arg+f_.nIn(), arg_.begin());
+    copy(res, res+f_.nOut(), res_.begin());
+    f_(getPtr(arg_), getPtr(res_), getPtr(iw_), getPtr(w_));
+  }
+
+  vector<DMatrix> EvaluationContext::operator()(const vector<DMatrix>& arg) {
+    casadi_assert_message(!f_.isNull(), "EvaluationContext: Context is empty.");
+    casadi_assert_message(arg.size()==f_.nIn(), "EvaluationContext: Expected "
+                          << f_.nIn() << " inputs, but got " << arg.size() << ".");
+
+    // Project the inputs to the input sparsity
+    vector<const double*> argp(arg.size());
+    for (int i=0; i<arg.size(); ++i) {
+      const Sparsity& sp = f_.input(i).sparsity();
+      if (arg[i].sparsity()==sp) {
+        argp[i] = getPtr(arg[i].data());
+      } else {
+        casadi_assert_message(arg[i].shape()==sp.shape() || arg[i].isscalar(),
+                              "EvaluationContext: Dimension mismatch for input " << i
+                              << ". Expected " << sp.dimString() << ", but got "
+                              << arg[i].dimString() << ".");
+        DMatrix a = arg[i].isscalar() ? DMatrix(sp, arg[i].toScalar()) : project(arg[i], sp);
+        copy(a.data().begin(), a.data().end(), input_[i].begin());
+        argp[i] = getPtr(input_[i]);
+      }
+    }
+
+    // Evaluate
+    vector<double*> resp(f_.nOut());
+    for (int i=0; i<resp.size(); ++i) resp[i] = getPtr(output_[i]);
+    eval(getPtr(argp), getPtr(resp));
+
+    // Collect the outputs
+    vector<DMatrix> res(f_.nOut());
+    for (int i=0; i<res.size(); ++i) res[i] = DMatrix(f_.output(i).sparsity(), output_[i]);
+    return res;
+  }
+
+} // namespace casadi
@@ -0,0 +1,85 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+#ifndef CASADI_EVALUATION_CONTEXT_HPP
+#define CASADI_EVALUATION_CONTEXT_HPP
+
+#include "function.hpp"
+
+namespace casadi {
+
+  /** \brief Memory for numerical evaluation of a Function
+
+      An evaluation context owns the input, output and work vectors needed to
+      evaluate a Function, while the function itself is shared. Different contexts
+      of the same Function can be evaluated concurrently from different threads.
+
+      This requires that the function is reentrant, i.e. evaluated through its work
+      vectors only, which is the case for e.g. SXFunction, MXFunction and Map (as long as
+      all embedded functions are), but not for functions that evaluate through their own
+      input and output buffers, such as solvers and Python callbacks. Creating a context
+      for a function that is not reentrant fails.
+
+      The Function must be initialized and not be modified while contexts are in use.
+  */
+  class CASADI_EXPORT EvaluationContext {
+  public:
+    /// Default constructor
+    EvaluationContext();
+
+    /// Create a context for evaluating a function
+    explicit EvaluationContext(const Function& f);
+
+    /// Access the function
+    const Function& function() const { return f_;}
+
+    /// Evaluate numerically
+    std::vector<DMatrix> operator()(const std::vector<DMatrix>& arg);
+
+#ifndef SWIG
+    /** \brief Evaluate numerically, nonzeros of inputs and outputs given (only C++)
+     *
+     * arg[i] and res[i] point to the nonzeros of input and output i, or are null.
+     */
+    void eval(const double* const* arg, double* const* res);
+#endif // SWIG
+
+  private:
+    /// The function
+    Function f_;
+
+    /// Work vectors
+    std::vector<const double*> arg_;
+    std::vector<double*> res_;
+    std::vector<int> iw_;
+    std::vector<double> w_;
+
+    /// Nonzeros of the inputs and outputs
+    std::vector<std::vector<double> > input_, output_;
+  };
+
+} // namespace casadi
+
+#endif // CASADI_EVALUATION_CONTEXT_HPP
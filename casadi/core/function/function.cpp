@@ -29,6 +29,7 @@
 #include "../std_vector_tools.hpp"
 #include "../function/map.hpp"
 #include "../function/mapaccum.hpp"
+#include "serializer.hpp"
 
 
 using namespace std;
@@ -259,10 +260,14 @@ namespace casadi {
     (*this)->monitors_.erase(mon);
   }
 
-  const Dict & Function::getStats() const {
+  Dict Function::getStats() const {
     return (*this)->getStats();
   }
 
+  void Function::resetStats() {
+    (*this)->resetStats();
+  }
+
   GenericType Function::getStat(const string& name) const {
     return (*this)->getStat(name);
   }
@@ -584,6 +589,29 @@ namespace casadi {
     gen.generate(fname);
   }
 
+  void Function::serialize(std::ostream& stream) const {
+    Serializer s(stream);
+    s.pack(*this);
+  }
+
+  std::string Function::serialize() const {
+    stringstream ss;
+    serialize(ss);
+    return ss.str();
+  }
+
+  Function Function::deserialize(std::istream& stream) {
+    Deserializer s(stream);
+    Function ret;
+    s.unpack(ret);
+    return ret;
+  }
+
+  Function Function::deserialize(const std::string& s) {
+    istringstream ss(s);
+    return deserialize(ss);
+  }
+
   void Function::checkInputs() const {
     return (*this)->checkInputs();
   }
@@ -931,5 +959,14 @@ namespace casadi {
     (*this)->eval(arg, res, iw, w);
   }
 
+  void Function::evalNZ(const std::vector<const double*>& arg, const std::vector<double*>& res) {
+    assertInit();
+    casadi_assert_message(arg.size()==nIn(), "Function::evalNZ: Expected " << nIn()
+                          << " inputs, but got " << arg.size() << ".");
+    casadi_assert_message(res.size()==nOut(), "Function::evalNZ: Expected " << nOut()
+                          << " outputs, but got " << res.size() << ".");
+    (*this)->evalNZ(getPtr(arg), getPtr(res));
+  }
+
 } // namespace casadi
 
@@ -338,6 +338,13 @@ namespace casadi {
     /// Evaluate memory-less
     void operator()(const double** arg, double** res, int* iw, double* w);
     ///@}
+
+    /** \brief Evaluate with caller-owned buffers, without copying (only C++)
+     *
+     * arg[i] and res[i] point to the nonzeros of input and output i, or are null.
+     * The work vectors are allocated once and reused between calls.
+     */
+    void evalNZ(const std::vector<const double*>& arg, const std::vector<double*>& res);
 #endif // SWIG
 
     /** \brief Create call to (cached) derivative function, forward mode  */
@@ -403,19 +410,19 @@ namespace casadi {
     /// \endcond
 
     /** \brief  Evaluate symbolically in parallel (matrix graph)
-        \param parallelization Type of parallelization used: expand|serial|openmp
+        \param parallelization Type of parallelization used: expand|serial|openmp|thread
     */
     std::vector<std::vector<MX> > map(const std::vector<std::vector<MX> > &arg,
                                       const std::string& parallelization="serial");
 
     /** \brief  Evaluate symbolically in parallel (matrix graph)
-        \param parallelization Type of parallelization used: expand|serial|openmp
+        \param parallelization Type of parallelization used: expand|serial|openmp|thread
     */
     std::vector<MX> map(const std::vector<MX > &arg,
                                       const std::string& parallelization="serial");
 
     /** \brief  Evaluate symbolically in parallel and sum (matrix graph)
-        \param parallelization Type of parallelization used: expand|serial|openmp
+        \param parallelization Type of parallelization used: expand|serial|openmp|thread
     */
     std::vector<MX> mapsum(const std::vector<MX > &arg,
                                       const std::string& parallelization="serial");
@@ -570,6 +577,27 @@ namespace casadi {
     /** \brief Export / Generate C code for the function */
     void generate(const Dict& opts=Dict());
 
+    /** \brief Serialize to a binary string
+     *
+     * Supported for SXFunction and MXFunction, including embedded SXFunction and
+     * MXFunction instances. Numbers are stored in the native binary representation.
+     */
+    std::string serialize() const;
+
+    /** \brief Create a function from a string created with Function::serialize
+     *
+     * The loading time is linear in the size of the algorithm.
+     */
+    static Function deserialize(const std::string& s);
+
+#ifndef SWIG
+    /** \brief Serialize to a binary stream (only C++) */
+    void serialize(std::ostream& stream) const;
+
+    /** \brief Create a function from a stream written with Function::serialize (only C++) */
+    static Function deserialize(std::istream& stream);
+#endif // SWIG
+
     /// \cond INTERNAL
     /** \brief  Access functions of the node */
     FunctionInternal* operator->();
@@ -581,8 +609,19 @@ namespace casadi {
     static bool testCast(const SharedObjectNode* ptr);
     /// \endcond
 
-    /// Get all statistics obtained at the end of the last evaluate call
-    const Dict& getStats() const;
+    /** \brief Get all statistics obtained at the end of the last evaluate call
+
+        Every function also counts and times its calls, unless disabled with
+        CasadiOptions::setCallStats. These statistics are found under the keys "evalD"
+        (numerical evaluation), "spFwd" and "spAdj" (sparsity propagation) and "derivative"
+        (construction of derivative functions). Each holds n_call, t_total, t_min, t_max
+        and histogram, where bin k of the histogram counts the calls which took
+        between 2^k and 2^(k+1) nanoseconds.
+    */
+    Dict getStats() const;
+
+    /// Clear the call statistics
+    void resetStats();
 
     /// Get a single statistic obtained at the end of the last evaluate call
     GenericType getStat(const std::string& name) const;
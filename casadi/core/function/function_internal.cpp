@@ -29,6 +29,8 @@
 #include "../std_vector_tools.hpp"
 #include "mx_function.hpp"
 #include "external_function.hpp"
+#include "serializer.hpp"
+#include "sparsity_cache.hpp"
 
 #include "../casadi_options.hpp"
 #include "../profiling.hpp"
@@ -92,6 +94,12 @@ namespace casadi {
     addOption("jit", OT_BOOLEAN, false, "Use just-in-time compiler to speed up the evaluation");
     addOption("compiler", OT_STRING, "clang", "Just-in-time compiler plugin to be used.");
     addOption("jit_options", OT_DICT, GenericType(), "Options to be passed to the jit compiler.");
+    addOption("jac_parallelization", OT_STRING, "serial",
+              "Computational strategy for the Jacobian functions. With \"thread\", the "
+              "Jacobian is formed from calls to directional derivative functions, one for "
+              "each batch of seed directions of the graph coloring, which are evaluated "
+              "concurrently (cf. option \"parallelization\" of MXFunction).",
+              "serial|thread");
 
     verbose_ = false;
     jit_ = false;
@@ -111,11 +119,16 @@ namespace casadi {
   void FunctionInternal::deepCopyMembers(
       std::map<SharedObjectNode*, SharedObject>& already_copied) {
     OptionsFunctionalityNode::deepCopyMembers(already_copied);
+    // Cached derivatives that have not been copied are dropped
     for (vector<WeakRef>::iterator j=derivative_fwd_.begin(); j!=derivative_fwd_.end(); ++j) {
-      if (!j->isNull()) *j = getcopy(j->shared(), already_copied);
+      if (j->isNull()) continue;
+      SharedObject d = getcopy(j->shared(), already_copied);
+      *j = d.isNull() ? WeakRef() : WeakRef(d);
     }
     for (vector<WeakRef>::iterator j=derivative_adj_.begin(); j!=derivative_adj_.end(); ++j) {
-      if (!j->isNull()) *j = getcopy(j->shared(), already_copied);
+      if (j->isNull()) continue;
+      SharedObject d = getcopy(j->shared(), already_copied);
+      *j = d.isNull() ? WeakRef() : WeakRef(d);
     }
 
 
@@ -206,6 +219,11 @@ namespace casadi {
   }
 
   void FunctionInternal::eval(const double** arg, double** res, int* iw, double* w) {
+    CallTimer timer(eval_stats_);
+    evalNoStats(arg, res, iw, w);
+  }
+
+  void FunctionInternal::evalNoStats(const double** arg, double** res, int* iw, double* w) {
     if (evalD_) {
       evalD_(arg, res, iw, w);
     } else {
@@ -213,6 +231,20 @@ namespace casadi {
     }
   }
 
+  void FunctionInternal::evalNZ(const double* const* arg, double* const* res) {
+    // Allocate temporary memory if needed
+    alloc();
+
+    // Pointers to the nonzeros, remaining entries are used by the function
+    arg_tmp_.resize(sz_arg());
+    copy(arg, arg+nIn(), arg_tmp_.begin());
+    res_tmp_.resize(sz_res());
+    copy(res, res+nOut(), res_tmp_.begin());
+
+    // Call memory-less
+    eval(getPtr(arg_tmp_), getPtr(res_tmp_), getPtr(iw_tmp_), getPtr(w_tmp_));
+  }
+
   void FunctionInternal::printDimensions(ostream &stream) const {
     casadi_assert(isInit());
     stream << " Number of inputs: " << nIn() << endl;
@@ -390,16 +422,29 @@ namespace casadi {
     return monitors_.count(mod)>0;
   }
 
-  const Dict & FunctionInternal::getStats() const {
-    return stats_;
+  Dict FunctionInternal::getStats() const {
+    Dict ret = stats_;
+    ret["evalD"] = eval_stats_.getStats();
+    ret["spFwd"] = sp_fwd_stats_.getStats();
+    ret["spAdj"] = sp_adj_stats_.getStats();
+    ret["derivative"] = der_stats_.getStats();
+    return ret;
+  }
+
+  void FunctionInternal::resetStats() {
+    eval_stats_.reset();
+    sp_fwd_stats_.reset();
+    sp_adj_stats_.reset();
+    der_stats_.reset();
   }
 
   GenericType FunctionInternal::getStat(const string & name) const {
     // Locate the statistic
-    Dict::const_iterator it = stats_.find(name);
+    Dict stats = getStats();
+    Dict::const_iterator it = stats.find(name);
 
     // Check if found
-    if (it == stats_.end()) {
+    if (it == stats.end()) {
       casadi_error("Statistic: " << name << " has not been set." << endl <<
                    "Note: statistcs are only set after an evaluate call");
     }
@@ -445,9 +490,11 @@ namespace casadi {
   }
   /// \cond INTERNAL
 
-  void bvec_toggle(bvec_t* s, int begin, int end, int j) {
+  void bvec_toggle(bvec_t* s, int begin, int end, int j, int nw) {
+    bvec_t m = bvec_t(1) << (j % bvec_size);
+    s += j / bvec_size;
     for (int i=begin; i<end; ++i) {
-      s[i] ^= (bvec_t(1) << j);
+      s[i*nw] ^= m;
     }
   }
 
@@ -458,9 +505,18 @@ namespace casadi {
   }
 
 
-  void bvec_or(bvec_t* s, bvec_t & r, int begin, int end) {
-    r = 0;
-    for (int i=begin; i<end; ++i) r |= s[i];
+  void bvec_or(const bvec_t* s, bvec_t* r, int begin, int end, int nw) {
+    fill_n(r, nw, bvec_t(0));
+    for (int i=begin; i<end; ++i) {
+      for (int k=0; k<nw; ++k) r[k] |= s[i*nw+k];
+    }
+  }
+
+  int bvec_width(int ndir, int max_width) {
+    // Smallest power of two number of words that holds ndir directions
+    int nw = 1;
+    while (nw<max_width && nw*bvec_size<ndir) nw *= 2;
+    return nw;
   }
   /// \endcond
 
@@ -606,17 +662,8 @@ namespace casadi {
     // Number of nonzero inputs
     int nz = input(iind).nnz();
 
-    // Clear the forward seeds/adjoint sensitivities
-    for (int ind=0; ind<nIn(); ++ind) {
-      vector<double> &v = ibuf_[ind].data();
-      if (!v.empty()) fill_n(get_bvec_t(v), v.size(), bvec_t(0));
-    }
-
-    // Clear the adjoint seeds/forward sensitivities
-    for (int ind=0; ind<nOut(); ++ind) {
-      vector<double> &v = obuf_[ind].data();
-      if (!v.empty()) fill_n(get_bvec_t(v), v.size(), bvec_t(0));
-    }
+    // Number of nonzero outputs
+    int nz_out = output(oind).nnz();
 
     // Sparsity triplet accumulator
     std::vector<int> jcol, jrow;
@@ -656,15 +703,6 @@ namespace casadi {
       // Reset the virtual machine
       spInit(true);
 
-      // Get seeds and sensitivities
-      bvec_t* input_v = get_bvec_t(ibuf_[iind].data());
-      bvec_t* output_v = get_bvec_t(obuf_[oind].data());
-      bvec_t* seed_v = input_v;
-      bvec_t* sens_v = output_v;
-
-      // Clear the seeds
-      for (int i=0; i<nz; ++i) seed_v[i]=0;
-
       // Subdivide the coarse block
       for (int k=0;k<coarse.size()-1;++k) {
         int diff = coarse[k+1]-coarse[k];
@@ -683,6 +721,20 @@ namespace casadi {
       // Create lookup tables for the fine blocks
       std::vector<int> fine_lookup = lookupvector(fine, nz+1);
 
+      // The maximum number of fine blocks contained in one coarse block
+      int n_fine_blocks_max = fine_lookup[coarse[1]]-fine_lookup[coarse[0]];
+
+      // Propagate as many words per nonzero as needed for the directions of this level
+      int nw = bvec_width(D.size2()*n_fine_blocks_max, spWidth());
+      int nbits = nw*bvec_size;
+      casadi_msg("Propagating " << nw << " bit vector(s) per nonzero");
+
+      // Seeds and sensitivities
+      std::vector<bvec_t> seed_v(nz*nw, 0), sens_v(nz_out*nw, 0);
+
+      // Temporary bit work vector
+      std::vector<bvec_t> spsens(nw);
+
       // Triplet data used as a lookup table
       std::vector<int> lookup_col;
       std::vector<int> lookup_row;
@@ -690,11 +742,8 @@ namespace casadi {
 
       // Loop over all coarse seed directions from the coloring
       for (int csd=0; csd<D.size2(); ++csd) {
-        // The maximum number of fine blocks contained in one coarse block
-        int n_fine_blocks_max = fine_lookup[coarse[1]]-fine_lookup[coarse[0]];
-
         int fci_offset = 0;
-        int fci_cap = bvec_size-bvec_i;
+        int fci_cap = nbits-bvec_i;
 
         // Flag to indicate if all fine blocks have been handled
         bool f_finished = false;
@@ -729,7 +778,8 @@ namespace casadi {
               }
 
               // Toggle on seeds
-              bvec_toggle(seed_v, fine[fci+fci_start], fine[fci+fci_start+1], bvec_i+bvec_i_mod);
+              bvec_toggle(getPtr(seed_v), fine[fci+fci_start], fine[fci+fci_start+1],
+                          bvec_i+bvec_i_mod, nw);
               bvec_i_mod++;
             }
           }
@@ -738,30 +788,29 @@ namespace casadi {
           bvec_i+= min(n_fine_blocks_max, fci_cap);
 
           // Check if bvec buffer is full
-          if (bvec_i==bvec_size || csd==D.size2()-1) {
-            // Calculate sparsity for bvec_size directions at once
+          if (bvec_i==nbits || csd==D.size2()-1) {
+            // Calculate sparsity for nbits directions at once
 
             // Statistics
             nsweeps+=1;
 
             // Construct lookup table
             IMatrix lookup = IMatrix::triplet(lookup_row, lookup_col, lookup_value,
-                                              bvec_size, coarse.size());
+                                              nbits, coarse.size());
 
             std::reverse(lookup_col.begin(), lookup_col.end());
             std::reverse(lookup_row.begin(), lookup_row.end());
             std::reverse(lookup_value.begin(), lookup_value.end());
             IMatrix duplicates =
-                IMatrix::triplet(lookup_row, lookup_col, lookup_value, bvec_size, coarse.size())
+                IMatrix::triplet(lookup_row, lookup_col, lookup_value, nbits, coarse.size())
                 - lookup;
             duplicates.makeSparse();
-            lookup(duplicates.sparsity()) = -bvec_size;
+            lookup(duplicates.sparsity()) = -nbits;
+            const int* lk_colind = lookup.sparsity().colind();
+            const int* lk_row = lookup.sparsity().row();
 
             // Propagate the dependencies
-            spEvaluate(true);
-
-            // Temporary bit work vector
-            bvec_t spsens;
+            spEvaluateWide(true, iind, oind, getPtr(seed_v), getPtr(sens_v), nw);
 
             // Loop over the cols of coarse blocks
             for (int cri=0;cri<coarse.size()-1;++cri) {
@@ -769,14 +818,18 @@ namespace casadi {
               // Loop over the cols of fine blocks within the current coarse block
               for (int fri=fine_lookup[coarse[cri]];fri<fine_lookup[coarse[cri+1]];++fri) {
                 // Lump individual sensitivities together into fine block
-                bvec_or(sens_v, spsens, fine[fri], fine[fri+1]);
+                bvec_or(getPtr(sens_v), getPtr(spsens), fine[fri], fine[fri+1], nw);
+
+                // Position in the lookup table, bits are visited in increasing order
+                int el = lk_colind[cri];
 
                 // Loop over all bvec_bits
-                for (int bvec_i=0;bvec_i<bvec_size;++bvec_i) {
-                  if (spsens & (bvec_t(1) << bvec_i)) {
+                for (int bvec_i=0;bvec_i<nbits;++bvec_i) {
+                  if (spsens[bvec_i/bvec_size] & (bvec_t(1) << (bvec_i%bvec_size))) {
                     // if dependency is found, add it to the new sparsity pattern
-                    int lk = lookup.elem(bvec_i, cri);
-                    if (lk>-bvec_size) {
+                    while (el<lk_colind[cri+1] && lk_row[el]<bvec_i) el++;
+                    int lk = el<lk_colind[cri+1] && lk_row[el]==bvec_i ? lookup.at(el) : 0;
+                    if (lk>-nbits) {
                       jrow.push_back(bvec_i+lk);
                       jcol.push_back(fri);
                       jrow.push_back(fri);
@@ -787,17 +840,9 @@ namespace casadi {
               }
             }
 
-            // Clear the forward seeds/adjoint sensitivities, ready for next bvec sweep
-            for (int ind=0; ind<nIn(); ++ind) {
-              vector<double> &v = ibuf_[ind].data();
-              if (!v.empty()) fill_n(get_bvec_t(v), v.size(), bvec_t(0));
-            }
-
-            // Clear the adjoint seeds/forward sensitivities, ready for next bvec sweep
-            for (int ind=0; ind<nOut(); ++ind) {
-              vector<double> &v = obuf_[ind].data();
-              if (!v.empty()) fill_n(get_bvec_t(v), v.size(), bvec_t(0));
-            }
+            // Clear the seeds and sensitivities, ready for next sweep
+            fill(seed_v.begin(), seed_v.end(), bvec_t(0));
+            fill(sens_v.begin(), sens_v.end(), bvec_t(0));
 
             // Clean lookup table
             lookup_col.clear();
@@ -808,7 +853,7 @@ namespace casadi {
           if (n_fine_blocks_max>fci_cap) {
             fci_offset += min(n_fine_blocks_max, fci_cap);
             bvec_i = 0;
-            fci_cap = bvec_size;
+            fci_cap = nbits;
           } else {
             f_finished = true;
           }
@@ -844,18 +889,6 @@ namespace casadi {
     // Number of nonzero outputs
     int nz_out = output(oind).nnz();
 
-    // Clear the forward seeds/adjoint sensitivities
-    for (int ind=0; ind<nIn(); ++ind) {
-      vector<double> &v = ibuf_[ind].data();
-      if (!v.empty()) fill_n(get_bvec_t(v), v.size(), bvec_t(0));
-    }
-
-    // Clear the adjoint seeds/forward sensitivities
-    for (int ind=0; ind<nOut(); ++ind) {
-      vector<double> &v = obuf_[ind].data();
-      if (!v.empty()) fill_n(get_bvec_t(v), v.size(), bvec_t(0));
-    }
-
     // Sparsity triplet accumulator
     std::vector<int> jcol, jrow;
 
@@ -937,19 +970,10 @@ namespace casadi {
       // Reset the virtual machine
       spInit(use_fwd);
 
-      // Get seeds and sensitivities
-      bvec_t* input_v = get_bvec_t(ibuf_[iind].data());
-      bvec_t* output_v = get_bvec_t(obuf_[oind].data());
-      bvec_t* seed_v = use_fwd ? input_v : output_v;
-      bvec_t* sens_v = use_fwd ? output_v : input_v;
-
       // The number of zeros in the seed and sensitivity directions
       int nz_seed = use_fwd ? nz_in  : nz_out;
       int nz_sens = use_fwd ? nz_out : nz_in;
 
-      // Clear the seeds
-      for (int i=0; i<nz_seed; ++i) seed_v[i]=0;
-
       // Choose the active jacobian coloring scheme
       Sparsity D = use_fwd ? D1 : D2;
 
@@ -989,6 +1013,20 @@ namespace casadi {
       std::vector<int> fine_col_lookup = lookupvector(fine_col, nz_sens+1);
       std::vector<int> fine_row_lookup = lookupvector(fine_row, nz_seed+1);
 
+      // The maximum number of fine blocks contained in one coarse block
+      int n_fine_blocks_max = fine_row_lookup[coarse_row[1]]-fine_row_lookup[coarse_row[0]];
+
+      // Propagate as many words per nonzero as needed for the directions of this level
+      int nw = bvec_width(D.size2()*n_fine_blocks_max, spWidth());
+      int nbits = nw*bvec_size;
+      casadi_msg("Propagating " << nw << " bit vector(s) per nonzero");
+
+      // Seeds and sensitivities
+      std::vector<bvec_t> seed_v(nz_seed*nw, 0), sens_v(nz_sens*nw, 0);
+
+      // Temporary bit work vector
+      std::vector<bvec_t> spsens(nw);
+
       // Triplet data used as a lookup table
       std::vector<int> lookup_col;
       std::vector<int> lookup_row;
@@ -996,12 +1034,8 @@ namespace casadi {
 
       // Loop over all coarse seed directions from the coloring
       for (int csd=0; csd<D.size2(); ++csd) {
-
-        // The maximum number of fine blocks contained in one coarse block
-        int n_fine_blocks_max = fine_row_lookup[coarse_row[1]]-fine_row_lookup[coarse_row[0]];
-
         int fci_offset = 0;
-        int fci_cap = bvec_size-bvec_i;
+        int fci_cap = nbits-bvec_i;
 
         // Flag to indicate if all fine blocks have been handled
         bool f_finished = false;
@@ -1034,8 +1068,8 @@ namespace casadi {
               }
 
               // Toggle on seeds
-              bvec_toggle(seed_v, fine_row[fci+fci_start], fine_row[fci+fci_start+1],
-                          bvec_i+bvec_i_mod);
+              bvec_toggle(getPtr(seed_v), fine_row[fci+fci_start], fine_row[fci+fci_start+1],
+                          bvec_i+bvec_i_mod, nw);
               bvec_i_mod++;
             }
           }
@@ -1044,21 +1078,20 @@ namespace casadi {
           bvec_i+= min(n_fine_blocks_max, fci_cap);
 
           // Check if bvec buffer is full
-          if (bvec_i==bvec_size || csd==D.size2()-1) {
-            // Calculate sparsity for bvec_size directions at once
+          if (bvec_i==nbits || csd==D.size2()-1) {
+            // Calculate sparsity for nbits directions at once
 
             // Statistics
             nsweeps+=1;
 
             // Construct lookup table
-            IMatrix lookup = IMatrix::triplet(lookup_row, lookup_col, lookup_value, bvec_size,
+            IMatrix lookup = IMatrix::triplet(lookup_row, lookup_col, lookup_value, nbits,
                                               coarse_col.size());
+            const int* lk_colind = lookup.sparsity().colind();
+            const int* lk_row = lookup.sparsity().row();
 
             // Propagate the dependencies
-            spEvaluate(use_fwd);
-
-            // Temporary bit work vector
-            bvec_t spsens;
+            spEvaluateWide(use_fwd, iind, oind, getPtr(seed_v), getPtr(sens_v), nw);
 
             // Loop over the cols of coarse blocks
             for (int cri=0;cri<coarse_col.size()-1;++cri) {
@@ -1067,33 +1100,34 @@ namespace casadi {
               for (int fri=fine_col_lookup[coarse_col[cri]];
                    fri<fine_col_lookup[coarse_col[cri+1]];++fri) {
                 // Lump individual sensitivities together into fine block
-                bvec_or(sens_v, spsens, fine_col[fri], fine_col[fri+1]);
-
-                // Next iteration if no sparsity
-                if (!spsens) continue;
-
-                // Loop over all bvec_bits
-                for (int bvec_i=0;bvec_i<bvec_size;++bvec_i) {
-                  if (spsens & bvec_lookup[bvec_i]) {
-                    // if dependency is found, add it to the new sparsity pattern
-                    jrow.push_back(bvec_i+lookup.elem(bvec_i, cri));
-                    jcol.push_back(fri);
+                bvec_or(getPtr(sens_v), getPtr(spsens), fine_col[fri], fine_col[fri+1], nw);
+
+                // Position in the lookup table, bits are visited in increasing order
+                int el = lk_colind[cri];
+
+                // Loop over all words
+                for (int k=0; k<nw; ++k) {
+                  // Next iteration if no sparsity
+                  if (!spsens[k]) continue;
+
+                  // Loop over all bvec_bits
+                  for (int bvec_i=0;bvec_i<bvec_size;++bvec_i) {
+                    if (spsens[k] & bvec_lookup[bvec_i]) {
+                      // if dependency is found, add it to the new sparsity pattern
+                      int bit = k*bvec_size + bvec_i;
+                      while (el<lk_colind[cri+1] && lk_row[el]<bit) el++;
+                      int lk = el<lk_colind[cri+1] && lk_row[el]==bit ? lookup.at(el) : 0;
+                      jrow.push_back(bit+lk);
+                      jcol.push_back(fri);
+                    }
                   }
                 }
               }
             }
 
-            // Clear the forward seeds/adjoint sensitivities, ready for next bvec sweep
-            for (int ind=0; ind<nIn(); ++ind) {
-              vector<double> &v = ibuf_[ind].data();
-              if (!v.empty()) fill_n(get_bvec_t(v), v.size(), bvec_t(0));
-            }
-
-            // Clear the adjoint seeds/forward sensitivities, ready for next bvec sweep
-            for (int ind=0; ind<nOut(); ++ind) {
-              vector<double> &v = obuf_[ind].data();
-              if (!v.empty()) fill_n(get_bvec_t(v), v.size(), bvec_t(0));
-            }
+            // Clear the seeds and sensitivities, ready for next sweep
+            fill(seed_v.begin(), seed_v.end(), bvec_t(0));
+            fill(sens_v.begin(), sens_v.end(), bvec_t(0));
 
             // Clean lookup table
             lookup_col.clear();
@@ -1104,7 +1138,7 @@ namespace casadi {
           if (n_fine_blocks_max>fci_cap) {
             fci_offset += min(n_fine_blocks_max, fci_cap);
             bvec_i = 0;
-            fci_cap = bvec_size;
+            fci_cap = nbits;
           } else {
             f_finished = true;
           }
@@ -1178,8 +1212,16 @@ namespace casadi {
     if (jsp.isNull()) {
       if (compact) {
 
-        // Use internal routine to determine sparsity
-        jsp = getJacSparsity(iind, oind, symmetric);
+        // Look for a function with the same structure in the cache
+        string key = sparsityCacheKey(0, iind, oind, compact, symmetric, adWeightSp());
+        vector<Sparsity> cached;
+        if (!key.empty() && SparsityCache::get(key, cached)) {
+          jsp = cached.front();
+        } else {
+          // Use internal routine to determine sparsity
+          jsp = getJacSparsity(iind, oind, symmetric);
+          if (!key.empty()) SparsityCache::set(key, vector<Sparsity>(1, jsp));
+        }
 
       } else {
 
@@ -1225,10 +1267,40 @@ namespace casadi {
     return jsp_ref;
   }
 
+  std::string FunctionInternal::sparsityCacheKey(int kind, int iind, int oind, bool compact,
+                                                 bool symmetric, double w) const {
+    if (SparsityCache::getMaxSize()==0) return string();
+    try {
+      stringstream ss;
+      Serializer s(ss, true);
+      s.pack(kind);
+      s.pack(iind);
+      s.pack(oind);
+      s.pack(static_cast<int>(compact));
+      s.pack(static_cast<int>(symmetric));
+      s.pack(w);
+      s.pack(shared_from_this<Function>());
+      return ss.str();
+    } catch(exception& ex) {
+      // Not serializable, cannot be cached
+      return string();
+    }
+  }
+
   void FunctionInternal::getPartition(int iind, int oind, Sparsity& D1, Sparsity& D2,
                                       bool compact, bool symmetric) {
     log("FunctionInternal::getPartition begin");
 
+    // Look for a function with the same structure in the cache
+    string key = sparsityCacheKey(1, iind, oind, compact, symmetric, adWeight());
+    vector<Sparsity> cached;
+    if (!key.empty() && SparsityCache::get(key, cached)) {
+      D1 = cached.at(0);
+      D2 = cached.at(1);
+      log("FunctionInternal::getPartition found in cache");
+      return;
+    }
+
     // Sparsity pattern with transpose
     Sparsity &AT = jacSparsity(iind, oind, compact, symmetric);
     Sparsity A = symmetric ? AT : AT.T();
@@ -1303,6 +1375,14 @@ namespace casadi {
       }
 
     }
+
+    // Save to the cache
+    if (!key.empty()) {
+      vector<Sparsity> D(2);
+      D[0] = D1;
+      D[1] = D2;
+      SparsityCache::set(key, D);
+    }
     log("FunctionInternal::getPartition end");
   }
 
@@ -1455,6 +1535,51 @@ namespace casadi {
     }
   }
 
+  void FunctionInternal::spEvaluateWide(bool fwd, int iind, int oind,
+                                        bvec_t* seed, bvec_t* sens, int nw) {
+    if (spWidth()==1) {
+      casadi_assert(nw==1);
+
+      // Clear the seeds and sensitivities
+      for (int ind=0; ind<nIn(); ++ind) {
+        vector<double> &v = ibuf_[ind].data();
+        if (!v.empty()) fill_n(get_bvec_t(v), v.size(), bvec_t(0));
+      }
+      for (int ind=0; ind<nOut(); ++ind) {
+        vector<double> &v = obuf_[ind].data();
+        if (!v.empty()) fill_n(get_bvec_t(v), v.size(), bvec_t(0));
+      }
+
+      // Propagate through the input and output buffers
+      vector<double>& seed_buf = fwd ? ibuf_[iind].data() : obuf_[oind].data();
+      vector<double>& sens_buf = fwd ? obuf_[oind].data() : ibuf_[iind].data();
+      copy(seed, seed+seed_buf.size(), get_bvec_t(seed_buf));
+      spEvaluate(fwd);
+      copy(get_bvec_t(sens_buf), get_bvec_t(sens_buf)+sens_buf.size(), sens);
+      return;
+    }
+
+    casadi_assert_message(nw>=1 && nw<=spWidth(),
+                          "Bit vector width " << nw << " not supported, maximum is " << spWidth());
+
+    // Work vectors, nw bit vectors per element
+    vector<int> iw(sz_iw());
+    vector<bvec_t> w(sz_w()*nw);
+    if (fwd) {
+      vector<const bvec_t*> arg(sz_arg(), 0);
+      vector<bvec_t*> res(sz_res(), 0);
+      arg[iind] = seed;
+      res[oind] = sens;
+      spFwdWide(getPtr(arg), getPtr(res), getPtr(iw), getPtr(w), nw);
+    } else {
+      vector<bvec_t*> arg(sz_arg(), 0);
+      vector<bvec_t*> res(sz_res(), 0);
+      arg[iind] = sens;
+      res[oind] = seed;
+      spAdjWide(getPtr(arg), getPtr(res), getPtr(iw), getPtr(w), nw);
+    }
+  }
+
   void FunctionInternal::spEvaluateViaJacSparsity(bool fwd) {
     if (fwd) {
       // Clear the outputs
@@ -1563,6 +1688,8 @@ namespace casadi {
       return shared_cast<Function>(cached.shared());
 
     } else {
+      CallTimer timer(der_stats_);
+
       // Give it a suitable name
       stringstream ss;
       ss << "jacobian_" << getOption("name") << "_" << iind << "_" << oind;
@@ -1580,7 +1707,14 @@ namespace casadi {
                             "input_scheme", ischeme_, "output_scheme", ionames,
                             "jit", jit_, "compiler", compilerplugin_,
                             "jit_options", jit_options_);
-      Function ret = getJacobian(ss.str(), iind, oind, compact, symmetric, opts);
+      Function ret;
+      if (getOption("jac_parallelization")=="thread") {
+        // Batches of directional derivatives, evaluated in parallel
+        opts["parallelization"] = "thread";
+        ret = getNumericJacobian(ss.str(), iind, oind, compact, symmetric, opts);
+      } else {
+        ret = getJacobian(ss.str(), iind, oind, compact, symmetric, opts);
+      }
 
       // Save in cache
       compact ? jac_compact_.elem(oind, iind) : jac_.elem(oind, iind) = ret;
@@ -1614,6 +1748,7 @@ namespace casadi {
     if (derivative_fwd_[nfwd].alive()) {
       return shared_cast<Function>(derivative_fwd_[nfwd].shared());
     }
+    CallTimer timer(der_stats_);
 
     // Give it a suitable name
     stringstream ss;
@@ -1719,6 +1854,7 @@ namespace casadi {
     if (derivative_adj_[nadj].alive()) {
       return shared_cast<Function>(derivative_adj_[nadj].shared());
     }
+    CallTimer timer(der_stats_);
 
     // Give it a suitable name
     stringstream ss;
@@ -1943,6 +2079,8 @@ namespace casadi {
       // Return cached Jacobian
       return shared_cast<Function>(full_jacobian_.shared());
     } else {
+      CallTimer timer(der_stats_);
+
       // Options
       string name = name_ + "_jac";
       Dict opts;
@@ -2385,6 +2523,12 @@ namespace casadi {
                  << typeid(*this).name());
   }
 
+  void FunctionInternal::serialize(Serializer& s) const {
+    casadi_error("FunctionInternal::serialize: Serialization not supported for class "
+                 << typeid(*this).name() << ". Only SXFunction and MXFunction "
+                 "(with serializable embedded functions) can be serialized.");
+  }
+
   Function FunctionInternal::dynamicCompilation(Function f, std::string fname, std::string fdescr,
                                                 std::string compiler) {
     // Check if f is initialized
@@ -2413,6 +2557,7 @@ namespace casadi {
   void FunctionInternal::spFwdSwitch(const bvec_t** arg, bvec_t** res,
                                      int* iw, bvec_t* w) {
     // TODO(@jaeandersson) Calculate from full-Jacobian sparsity  when necessary or more efficient
+    CallTimer timer(sp_fwd_stats_);
     spFwd(arg, res, iw, w);
   }
 
@@ -2470,6 +2615,7 @@ namespace casadi {
   void FunctionInternal::spAdjSwitch(bvec_t** arg, bvec_t** res,
                                      int* iw, bvec_t* w) {
     // TODO(@jaeandersson) Calculate from full-Jacobian sparsity  when necessary or more efficient
+    CallTimer timer(sp_adj_stats_);
     spAdj(arg, res, iw, w);
   }
 
@@ -2526,6 +2672,20 @@ namespace casadi {
     for (int i=0; i<n_out; ++i) output(i).set(0.);
   }
 
+  void FunctionInternal::spFwdWide(const bvec_t** arg, bvec_t** res,
+                                   int* iw, bvec_t* w, int nw) {
+    casadi_assert_message(nw==1, "Wide sparsity propagation not implemented for function \""
+                          << getOption("name") << "\"");
+    spFwd(arg, res, iw, w);
+  }
+
+  void FunctionInternal::spAdjWide(bvec_t** arg, bvec_t** res,
+                                   int* iw, bvec_t* w, int nw) {
+    casadi_assert_message(nw==1, "Wide sparsity propagation not implemented for function \""
+                          << getOption("name") << "\"");
+    spAdj(arg, res, iw, w);
+  }
+
   void FunctionInternal::sz_work(size_t& sz_arg, size_t& sz_res,
                                  size_t& sz_iw, size_t& sz_w) const {
     sz_arg = sz_arg_;
@@ -32,6 +32,7 @@
 #include <set>
 #include "code_generator.hpp"
 #include "compiler.hpp"
+#include "call_stats.hpp"
 #include "../matrix/sparse_storage.hpp"
 
 // This macro is for documentation purposes
@@ -55,6 +56,8 @@ namespace casadi {
   ///@}
 
   class MXFunction;
+  class Serializer;
+  class Deserializer;
 
   /** \brief Internal class for Function
       \author Joel Andersson
@@ -109,9 +112,27 @@ namespace casadi {
     /** \brief  Reset the sparsity propagation */
     virtual void spInit(bool fwd) {}
 
+    /** \brief  Propagate the sparsity pattern from one input to one output (or vice versa)
+        using \a nw bit vectors per nonzero, stored contiguously for each nonzero */
+    void spEvaluateWide(bool fwd, int iind, int oind, bvec_t* seed, bvec_t* sens, int nw);
+
+    /** \brief  Maximum number of bit vectors per nonzero supported by spFwdWide/spAdjWide */
+    virtual int spWidth() const { return 1;}
+
     /** \brief  Evaluate numerically, possibly using just-in-time compilation */
     void eval(const double** arg, double** res, int* iw, double* w);
 
+    /** \brief  Like eval, but the call is not recorded in eval_stats_
+     * For callers which record a batch of calls at once, see CallStats::add
+     */
+    void evalNoStats(const double** arg, double** res, int* iw, double* w);
+
+    /** \brief  Can eval be called from several threads at once, each with its own work vectors? */
+    virtual bool isReentrant() const { return false;}
+
+    /** \brief  Evaluate numerically, nonzeros of inputs and outputs given, work vectors reused */
+    void evalNZ(const double* const* arg, double* const* res);
+
     /** \brief  Evaluate numerically, work vectors given */
     virtual void evalD(const double** arg, double** res, int* iw, double* w);
 
@@ -287,6 +308,9 @@ namespace casadi {
     /** \brief Generate code for the function body */
     virtual void generateBody(CodeGenerator& g) const;
 
+    /** \brief Serialize, the type name is written first */
+    virtual void serialize(Serializer& s) const;
+
     /** \brief  Print */
     virtual void print(std::ostream &stream) const;
 
@@ -326,8 +350,11 @@ namespace casadi {
     /** \brief  Get total number of elements in all of the matrix-valued outputs */
     int numelOut() const;
 
-    /// Get all statistics obtained at the end of the last evaluate call
-    const Dict & getStats() const;
+    /// Get all statistics obtained at the end of the last evaluate call, and the call statistics
+    Dict getStats() const;
+
+    /// Clear the call statistics
+    void resetStats();
 
     /// Get single statistic obtained at the end of the last evaluate call
     GenericType getStat(const std::string & name) const;
@@ -352,6 +379,11 @@ namespace casadi {
     /// Get, if necessary generate, the sparsity of a Jacobian block
     Sparsity& jacSparsity(int iind, int oind, bool compact, bool symmetric);
 
+    /** \brief Key identifying a Jacobian block of this function in the SparsityCache,
+     * empty if the cache is disabled or the function cannot be serialized */
+    std::string sparsityCacheKey(int kind, int iind, int oind, bool compact, bool symmetric,
+                                 double w) const;
+
     /// Get a vector of symbolic variables with the same dimensions as the inputs
     virtual std::vector<MX> symbolicInput() const;
 
@@ -529,6 +561,12 @@ namespace casadi {
     /** \brief  Propagate sparsity backwards */
     virtual void spAdj(bvec_t** arg, bvec_t** res, int* iw, bvec_t* w);
 
+    /** \brief  Propagate sparsity forward, \a nw bit vectors per nonzero */
+    virtual void spFwdWide(const bvec_t** arg, bvec_t** res, int* iw, bvec_t* w, int nw);
+
+    /** \brief  Propagate sparsity backwards, \a nw bit vectors per nonzero */
+    virtual void spAdjWide(bvec_t** arg, bvec_t** res, int* iw, bvec_t* w, int nw);
+
     /** \brief Get number of temporary variables needed */
     void sz_work(size_t& sz_arg, size_t& sz_res, size_t& sz_iw, size_t& sz_w) const;
 
@@ -610,6 +648,9 @@ namespace casadi {
     /** \brief  Flag to indicate whether statistics must be gathered */
     bool gather_stats_;
 
+    /// Call statistics of numerical evaluation, sparsity propagation and derivative construction
+    CallStats eval_stats_, sp_fwd_stats_, sp_adj_stats_, der_stats_;
+
     /// Cache for functions to evaluate directional derivatives (new)
     std::vector<WeakRef> derivative_fwd_, derivative_adj_;
 
@@ -666,6 +707,10 @@ namespace casadi {
     /** \brief  Temporary vector needed for the evaluation (real) */
     std::vector<double> w_tmp_;
 
+    /** \brief  Temporary vectors of input and output pointers, for evalNZ */
+    std::vector<const double*> arg_tmp_;
+    std::vector<double*> res_tmp_;
+
   private:
     /** \brief Sizes of input and output buffers */
     size_t sz_arg_, sz_res_, sz_iw_, sz_w_;
@@ -25,6 +25,7 @@
 
 #include "map_internal.hpp"
 #include "mx_function.hpp"
+#include "../casadi_thread_pool.hpp"
 
 using namespace std;
 
@@ -36,7 +37,11 @@ namespace casadi {
     : f_(f), n_(n), repeat_in_(repeat_in), repeat_out_(repeat_out) {
 
     addOption("parallelization", OT_STRING, "serial",
-              "Computational strategy for parallelization", "serial|openmp");
+              "Computational strategy for parallelization. \"thread\" falls back to serial "
+              "mode if the function is not reentrant", "serial|openmp|thread");
+    addOption("n_threads", OT_INTEGER, 0,
+              "Number of chunks the evaluations are split into for thread parallelization "
+              "(0: one per thread of the global thread pool)");
 
     casadi_assert_message(repeat_in_.size()==f.nIn(),
       "MapInternal expected repeat_in of size " << f.nIn() <<
@@ -61,6 +66,8 @@ namespace casadi {
       parallelization_ = PARALLELIZATION_SERIAL;
     } else if (parallelization.compare("openmp")==0) {
       parallelization_ = PARALLELIZATION_OMP;
+    } else if (parallelization.compare("thread")==0) {
+      parallelization_ = PARALLELIZATION_THREAD;
     } else {
       casadi_error("cannot happen.");
     }
@@ -73,6 +80,14 @@ namespace casadi {
     }
     #endif // WITH_OPENMP
 
+    #ifndef USE_CXX11
+    if (parallelization_ == PARALLELIZATION_THREAD) {
+      casadi_warning("CasADi was not compiled with C++11 support. " <<
+                     "Falling back to serial mode.");
+      parallelization_ = PARALLELIZATION_SERIAL;
+    }
+    #endif // USE_CXX11
+
     // OpenMP not yet supported for non-repeated outputs
     bool non_repeated_output = false;
     for (int i=0;i<repeat_out_.size();++i) {
@@ -84,6 +99,25 @@ namespace casadi {
                      "Falling back to serial mode.");
       parallelization_ = PARALLELIZATION_SERIAL;
     }
+
+    // Concurrent evaluations of f share its input and output buffers unless it is reentrant
+    if (parallelization_ == PARALLELIZATION_THREAD && !f_->isReentrant()) {
+      casadi_warning("Function \"" << f_.getOption("name") << "\" is not reentrant. "
+                     "Falling back to serial mode.");
+      parallelization_ = PARALLELIZATION_SERIAL;
+    }
+
+    // Number of chunks for thread parallelization
+    n_threads_ = 1;
+    if (parallelization_ == PARALLELIZATION_THREAD) {
+      n_threads_ = getOption("n_threads");
+      casadi_assert_message(n_threads_>=0, "Option \"n_threads\" must be nonnegative.");
+      #ifdef USE_CXX11
+      if (n_threads_==0) n_threads_ = ThreadPool::global().size();
+      #endif // USE_CXX11
+      n_threads_ = std::max(std::min(n_threads_, n_), 1);
+    }
+
     int num_in = f_.nIn(), num_out = f_.nOut();
 
     // Initialize the functions, get input and output sparsities
@@ -145,6 +179,12 @@ namespace casadi {
       alloc_iw(f_.sz_iw()*n_);
       alloc_arg(f_.sz_arg()*(n_+1));
       alloc_res(f_.sz_res()*(n_+1));
+    } else if (parallelization_ == PARALLELIZATION_THREAD) {
+      // Each chunk gets work vectors for the function, temporary results and accumulators
+      alloc_w((f_.sz_w() + 2*nnz_out_)*n_threads_);
+      alloc_iw(f_.sz_iw()*n_threads_);
+      alloc_arg(f_.sz_arg()*(n_threads_+1));
+      alloc_res(f_.sz_res()*(n_threads_+1));
     }
   }
 
@@ -199,10 +239,92 @@ namespace casadi {
     }
   }
 
+  void MapInternal::evalThread(const double** arg, double** res,
+                                int* iw, double* w) {
+    #ifdef USE_CXX11
+    int num_in = f_.nIn(), num_out = f_.nOut();
+    size_t sz_arg, sz_res, sz_iw, sz_w;
+    f_.sz_work(sz_arg, sz_res, sz_iw, sz_w);
+
+    // Work vector size of one chunk
+    size_t sz_w_chunk = sz_w + 2*nnz_out_;
+
+    ThreadPool::global().run(n_threads_, [&](int t) {
+      const double** arg1 = arg + sz_arg*(t+1);
+      double** res1 = res + sz_res*(t+1);
+      int* iw1 = iw + sz_iw*t;
+      double* w1 = w + sz_w_chunk*t;
+      double* temp_res = w1 + sz_w;
+      double* acc = temp_res + nnz_out_;
+
+      // Clear the accumulators
+      std::fill(acc, acc+nnz_out_, 0);
+
+      // Evaluations handled by this chunk, recorded together
+      int i_begin = (n_*t)/n_threads_, i_end = (n_*(t+1))/n_threads_;
+      CallTimer timer(f_->eval_stats_, i_end-i_begin);
+      for (int i=i_begin; i<i_end; ++i) {
+        // Clear the temp_res storage space
+        std::fill(temp_res, temp_res+nnz_out_, 0);
+
+        // Set the function inputs
+        for (int j=0; j<num_in; ++j) {
+          arg1[j] = (arg[j]==0) ? 0: arg[j]+i*step_in_[j];
+        }
+
+        // Set the function outputs
+        double* r = temp_res;
+        for (int j=0; j<num_out; ++j) {
+          if (repeat_out_[j]) {
+            res1[j] = (res[j]==0)? 0: res[j]+i*step_out_[j];
+          } else {
+            res1[j] = (res[j]==0)? 0: r;
+            r += step_out_[j];
+          }
+        }
+
+        // Evaluate the function
+        f_->evalNoStats(arg1, res1, iw1, w1);
+
+        // Sum results from temporary storage to the accumulators of the chunk
+        double* a = acc;
+        for (int j=0; j<num_out; ++j) {
+          if (!repeat_out_[j]) {
+            if (res1[j]) std::transform(res1[j], res1[j]+step_out_[j], a, a,
+                                        std::plus<double>());
+            a += step_out_[j];
+          }
+        }
+      }
+    });
+
+    // Reduce the accumulators of all chunks
+    int offset = 0;
+    for (int j=0; j<num_out; ++j) {
+      if (repeat_out_[j]) continue;
+      if (res[j]) {
+        std::fill(res[j], res[j]+step_out_[j], 0);
+        for (int t=0; t<n_threads_; ++t) {
+          const double* a = w + sz_w_chunk*t + sz_w + nnz_out_ + offset;
+          std::transform(a, a+step_out_[j], res[j], res[j], std::plus<double>());
+        }
+      }
+      offset += step_out_[j];
+    }
+    #else // USE_CXX11
+    casadi_error("the \"impossible\" happened: " <<
+                 "should have fallen back to serial in init.");
+    #endif // USE_CXX11
+  }
+
   void MapInternal::evalD(const double** arg, double** res,
                                 int* iw, double* w) {
     if (parallelization_ == PARALLELIZATION_SERIAL) {
-      evalGen<double>(arg, res, iw, w, &FunctionInternal::eval, std::plus<double>());
+      // The evaluations of f are recorded together, reading the clock once
+      CallTimer timer(f_->eval_stats_, n_);
+      evalGen<double>(arg, res, iw, w, &FunctionInternal::evalNoStats, std::plus<double>());
+    } else if (parallelization_ == PARALLELIZATION_THREAD) {
+      evalThread(arg, res, iw, w);
     } else {
       int n_in_ = f_.nIn(), n_out_ = f_.nOut();
       #ifndef WITH_OPENMP
@@ -300,8 +422,12 @@ namespace casadi {
       switch (parallelization_) {
       case PARALLELIZATION_SERIAL: opts["parallelization"] = "serial"; break;
       case PARALLELIZATION_OMP: opts["parallelization"] = "openmp"; break;
+      case PARALLELIZATION_THREAD: opts["parallelization"] = "thread"; break;
       }
     }
+    if (opts.find("n_threads")==opts.end()) {
+      opts["n_threads"] = getOption("n_threads");
+    }
 
     std::vector<bool> repeat_in;
     repeat_in.insert(repeat_in.end(), repeat_in_.begin(), repeat_in_.end());
@@ -329,8 +455,12 @@ namespace casadi {
       switch (parallelization_) {
       case PARALLELIZATION_SERIAL: opts["parallelization"] = "serial"; break;
       case PARALLELIZATION_OMP: opts["parallelization"] = "openmp"; break;
+      case PARALLELIZATION_THREAD: opts["parallelization"] = "thread"; break;
       }
     }
+    if (opts.find("n_threads")==opts.end()) {
+      opts["n_threads"] = getOption("n_threads");
+    }
 
     std::vector<bool> repeat_in;
     repeat_in.insert(repeat_in.end(), repeat_in_.begin(), repeat_in_.end());
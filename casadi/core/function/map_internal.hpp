@@ -41,7 +41,8 @@ namespace casadi {
     friend class Map;
   public:
 
-    enum ParallelizationType {PARALLELIZATION_SERIAL, PARALLELIZATION_OMP};
+    enum ParallelizationType {PARALLELIZATION_SERIAL, PARALLELIZATION_OMP,
+                              PARALLELIZATION_THREAD};
 
     /** \brief Constructor (generic map) */
     MapInternal(const Function& f, int n,
@@ -65,9 +66,15 @@ namespace casadi {
     /** \brief  Evaluate numerically, work vectors given */
     virtual void evalD(const double** arg, double** res, int* iw, double* w);
 
+    /** \brief  Evaluate numerically in chunks, one chunk per thread of the pool */
+    void evalThread(const double** arg, double** res, int* iw, double* w);
+
     /** \brief Quickfix to avoid segfault, #1552 */
     virtual bool canEvalSX() const {return true;}
 
+    /** \brief  Reentrant if the mapped function is */
+    virtual bool isReentrant() const { return f_->isReentrant();}
+
     /** \brief  Evaluate symbolically, SXElement type, possibly nonmatching sparsity patterns */
     virtual void evalSX(const SXElement** arg, SXElement** res,
                                 int* iw, SXElement* w);
@@ -122,6 +129,9 @@ namespace casadi {
 
     ParallelizationType parallelization_;
 
+    /// Number of chunks the evaluations are split into (thread parallelization)
+    int n_threads_;
+
   };
 
 } // namespace casadi
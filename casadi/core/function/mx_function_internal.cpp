@@ -28,6 +28,10 @@
 #include "../profiling.hpp"
 #include "../casadi_options.hpp"
 #include "../casadi_interrupt.hpp"
+#include "../mx/getnonzeros.hpp"
+#include "../mx/setnonzeros.hpp"
+#include "serializer.hpp"
+#include "../casadi_thread_pool.hpp"
 
 #include <stack>
 #include <typeinfo>
@@ -41,6 +45,17 @@ namespace casadi {
     XFunctionInternal<MXFunction, MXFunctionInternal, MX, MXNode>(inputv, outputv) {
 
     setOption("name", "unnamed_mx_function");
+    addOption("parallelization", OT_STRING, "serial",
+              "Computational strategy for parallelization. With \"thread\", calls to "
+              "embedded functions (including integrators and linear solvers) that do not "
+              "depend on each other are evaluated concurrently on the global thread pool. "
+              "Only calls to reentrant functions (SXFunction, and MXFunction calling only "
+              "reentrant functions) are evaluated concurrently. Calls to other functions, "
+              "which may share state with each other, are evaluated in sequence.",
+              "serial|thread");
+    addOption("n_threads", OT_INTEGER, 0,
+              "Number of threads for \"thread\" parallelization, 0 means the size of the "
+              "global thread pool. The thread pool is enlarged if needed.");
   }
 
 
@@ -54,114 +69,155 @@ namespace casadi {
     // Call the init function of the base class
     XFunctionInternal<MXFunction, MXFunctionInternal, MX, MXNode>::init();
 
-    // Stack used to sort the computational graph
-    stack<MXNode*> s;
+    // Evaluate independent function calls in parallel?
+    parallel_ = getOption("parallelization")=="thread";
+    int n_threads = getOption("n_threads");
+    casadi_assert_message(n_threads>=0, "Option \"n_threads\" must be nonnegative.");
+#ifndef USE_CXX11
+    if (parallel_) {
+      casadi_warning("CasADi was not compiled with C++11 support. "
+                     "Falling back to serial mode.");
+      parallel_ = false;
+    }
+#else // USE_CXX11
+    if (parallel_) {
+      if (n_threads==0) {
+        n_threads = ThreadPool::global().size();
+      } else {
+        ThreadPool::global().reserve(n_threads);
+      }
+    }
+
+    // Nothing to gain with a single thread
+    if (n_threads==1) parallel_ = false;
+#endif // USE_CXX11
+
+    // Use live variables? Not with parallel evaluation, since every result needs its own place
+    bool live_variables = getOption("live_variables") && !parallel_;
 
     // All nodes
     vector<MXNode*> nodes;
 
-    // Add the list of nodes
-    int ind=0;
-    for (vector<MX>::iterator it = outputv_.begin(); it != outputv_.end(); ++it, ++ind) {
-      // Add outputs to the list
-      s.push(static_cast<MXNode*>(it->get()));
-      sort_depth_first(s, nodes);
+    // Input instructions
+    vector<pair<int, MXNode*> > symb_loc;
 
-      // A null pointer means an output instruction
-      nodes.push_back(static_cast<MXNode*>(0));
-    }
-
-    // Set the temporary variables to be the corresponding place in the sorted graph
-    for (int i=0; i<nodes.size(); ++i) {
-      if (nodes[i]) {
-        nodes[i]->temp = i;
-      }
-    }
+    // Number of times each node is used
+    vector<int> refcount;
 
     // Place in the algorithm for each node
     vector<int> place_in_alg;
-    place_in_alg.reserve(nodes.size());
 
-    // Use live variables?
-    bool live_variables = getOption("live_variables");
+    // Sort the graph and build the algorithm. This uses the temporary markers of
+    // (possibly shared) nodes, which are reset before the lock is released
+    {
+      SymbolicLock lock(casadi_temp_mutex());
 
-    // Input instructions
-    vector<pair<int, MXNode*> > symb_loc;
+      // Stack used to sort the computational graph
+      stack<MXNode*> s;
 
-    // Current output and nonzero, start with the first one
-    int curr_oind=0;
+      // Add the list of nodes
+      int ind=0;
+      for (vector<MX>::iterator it = outputv_.begin(); it != outputv_.end(); ++it, ++ind) {
+        // Add outputs to the list
+        s.push(static_cast<MXNode*>(it->get()));
+        sort_depth_first(s, nodes);
+
+        // A null pointer means an output instruction
+        nodes.push_back(static_cast<MXNode*>(0));
+      }
 
-    // Count the number of times each node is used
-    vector<int> refcount(nodes.size(), 0);
+      // Set the temporary variables to be the corresponding place in the sorted graph
+      for (int i=0; i<nodes.size(); ++i) {
+        if (nodes[i]) {
+          nodes[i]->temp = i;
+        }
+      }
 
-    // Get the sequence of instructions for the virtual machine
-    algorithm_.resize(0);
-    algorithm_.reserve(nodes.size());
-    for (vector<MXNode*>::iterator it=nodes.begin(); it!=nodes.end(); ++it) {
-      // Current node
-      MXNode* n = *it;
+      // Current output and nonzero, start with the first one
+      int curr_oind=0;
 
-      // Get the operation
-      int op = n==0 ? OP_OUTPUT : n->getOp();
+      // Count the number of times each node is used
+      refcount.resize(nodes.size(), 0);
 
-      // Store location if parameter (or input)
-      if (op==OP_PARAMETER) {
-        symb_loc.push_back(make_pair(algorithm_.size(), n));
-      }
+      // Place in the algorithm for each node
+      place_in_alg.reserve(nodes.size());
 
-      // If a new element in the algorithm needs to be added
-      if (op>=0) {
-        AlgEl ae;
-        ae.op = op;
-        ae.data.assignNode(n);
-
-        // Add input and output argument
-        if (op==OP_OUTPUT) {
-          ae.arg.resize(1);
-          ae.arg[0] = outputv_.at(curr_oind)->temp;
-          ae.res.resize(1);
-          ae.res[0] = curr_oind++;
-        } else {
-          ae.arg.resize(n->ndep());
-          for (int i=0; i<n->ndep(); ++i) {
-            ae.arg[i] = n->dep(i)->temp;
-          }
-          ae.res.resize(n->nout());
-          if (n->isMultipleOutput()) {
-            fill(ae.res.begin(), ae.res.end(), -1);
+      // Get the sequence of instructions for the virtual machine
+      algorithm_.resize(0);
+      algorithm_.reserve(nodes.size());
+      for (vector<MXNode*>::iterator it=nodes.begin(); it!=nodes.end(); ++it) {
+        // Current node
+        MXNode* n = *it;
+
+        // Get the operation
+        int op = n==0 ? OP_OUTPUT : n->getOp();
+
+        // Store location if parameter (or input)
+        if (op==OP_PARAMETER) {
+          symb_loc.push_back(make_pair(algorithm_.size(), n));
+        }
+
+        // If a new element in the algorithm needs to be added
+        if (op>=0) {
+          AlgEl ae;
+          ae.op = op;
+          ae.data.assignNode(n);
+
+          // Add input and output argument
+          if (op==OP_OUTPUT) {
+            ae.arg.resize(1);
+            ae.arg[0] = outputv_.at(curr_oind)->temp;
+            ae.res.resize(1);
+            ae.res[0] = curr_oind++;
           } else {
-            ae.res[0] = n->temp;
+            ae.arg.resize(n->ndep());
+            for (int i=0; i<n->ndep(); ++i) {
+              ae.arg[i] = n->dep(i)->temp;
+            }
+            ae.res.resize(n->nout());
+            if (n->isMultipleOutput()) {
+              fill(ae.res.begin(), ae.res.end(), -1);
+            } else {
+              ae.res[0] = n->temp;
+            }
           }
-        }
 
-        // Increase the reference count of the dependencies
-        for (int c=0; c<ae.arg.size(); ++c) {
-          if (ae.arg[c]>=0) {
-            refcount[ae.arg[c]]++;
+          // Increase the reference count of the dependencies
+          for (int c=0; c<ae.arg.size(); ++c) {
+            if (ae.arg[c]>=0) {
+              refcount[ae.arg[c]]++;
+            }
           }
-        }
 
-        // Save to algorithm
-        place_in_alg.push_back(algorithm_.size());
-        algorithm_.push_back(ae);
+          // Save to algorithm
+          place_in_alg.push_back(algorithm_.size());
+          algorithm_.push_back(ae);
 
-      } else { // Function output node
-        // Get the output index
-        int oind = n->getFunctionOutput();
+        } else { // Function output node
+          // Get the output index
+          int oind = n->getFunctionOutput();
 
-        // Get the index of the parent node
-        int pind = place_in_alg[n->dep(0)->temp];
+          // Get the index of the parent node
+          int pind = place_in_alg[n->dep(0)->temp];
 
-        // Save location in the algorithm element corresponding to the parent node
-        int& otmp = algorithm_[pind].res.at(oind);
-        if (otmp<0) {
-          otmp = n->temp; // First time this function output is encountered, save to algorithm
-        } else {
-          n->temp = otmp; // Function output is a duplicate, use the node encountered first
+          // Save location in the algorithm element corresponding to the parent node
+          int& otmp = algorithm_[pind].res.at(oind);
+          if (otmp<0) {
+            otmp = n->temp; // First time this function output is encountered, save to algorithm
+          } else {
+            n->temp = otmp; // Function output is a duplicate, use the node encountered first
+          }
+
+          // Not in the algorithm
+          place_in_alg.push_back(-1);
         }
+      }
 
-        // Not in the algorithm
-        place_in_alg.push_back(-1);
+      // Reset the temporary variables
+      for (int i=0; i<nodes.size(); ++i) {
+        if (nodes[i]) {
+          nodes[i]->temp = 0;
+        }
       }
     }
 
@@ -256,18 +312,35 @@ namespace casadi {
       }
     }
 
-    // Allocate work vectors (numeric)
+    // Reentrant if all embedded functions are
+    reentrant_ = true;
+    for (vector<AlgEl>::const_iterator it=algorithm_.begin(); it!=algorithm_.end(); ++it) {
+      if (it->op==OP_OUTPUT || it->data.isNull()) continue;
+      for (int i=0; i<it->data->numFunctions(); ++i) {
+        if (!it->data->getFunction(i)->isReentrant()) reentrant_ = false;
+      }
+    }
+
+    // Schedule for parallel evaluation
+    n_threads_ = 1;
+    stage_.clear();
+    task_.clear();
+    task_el_.clear();
+    if (parallel_) initParallel(worksize, n_threads);
+
+    // Allocate work vectors (numeric), one set for the elements per thread
     workloc_.resize(worksize+1);
     fill(workloc_.begin(), workloc_.end(), -1);
-    size_t wind=0, sz_w=0;
+    size_t wind=0;
+    el_sz_arg_ = el_sz_res_ = el_sz_iw_ = el_sz_w_ = 0;
     for (vector<AlgEl>::iterator it=algorithm_.begin(); it!=algorithm_.end(); ++it) {
       if (it->op!=OP_OUTPUT) {
         for (int c=0; c<it->res.size(); ++c) {
           if (it->res[c]>=0) {
-            alloc_arg(it->data->sz_arg());
-            alloc_res(it->data->sz_res());
-            alloc_iw(it->data->sz_iw());
-            sz_w = max(sz_w, it->data->sz_w());
+            el_sz_arg_ = max(el_sz_arg_, it->data->sz_arg());
+            el_sz_res_ = max(el_sz_res_, it->data->sz_res());
+            el_sz_iw_ = max(el_sz_iw_, it->data->sz_iw());
+            el_sz_w_ = max(el_sz_w_, it->data->sz_w());
             if (workloc_[it->res[c]] < 0) {
               workloc_[it->res[c]] = wind;
               wind += it->data->sparsity(c).nnz();
@@ -276,62 +349,62 @@ namespace casadi {
         }
       }
     }
+    alloc_arg(el_sz_arg_*n_threads_);
+    alloc_res(el_sz_res_*n_threads_);
+    alloc_iw(el_sz_iw_*n_threads_);
     workloc_.back()=wind;
     for (int i=0; i<workloc_.size(); ++i) {
       if (workloc_[i]<0) workloc_[i] = i==0 ? 0 : workloc_[i-1];
-      workloc_[i] += sz_w;
+      workloc_[i] += el_sz_w_*n_threads_;
     }
-    sz_w += wind;
-    alloc_w(sz_w);
+    alloc_w(el_sz_w_*n_threads_ + wind);
+
+    // Mark the inputs and locate the free variables, again using the temporary markers
+    {
+      SymbolicLock lock(casadi_temp_mutex());
 
-    // Reset the temporary variables
-    for (int i=0; i<nodes.size(); ++i) {
-      if (nodes[i]) {
-        nodes[i]->temp = 0;
+      // Now mark each input's place in the algorithm
+      for (vector<pair<int, MXNode*> >::const_iterator it=symb_loc.begin();
+           it!=symb_loc.end(); ++it) {
+        it->second->temp = it->first+1;
       }
-    }
 
-    // Now mark each input's place in the algorithm
-    for (vector<pair<int, MXNode*> >::const_iterator it=symb_loc.begin();
-         it!=symb_loc.end(); ++it) {
-      it->second->temp = it->first+1;
-    }
+      // Add input instructions, loop over inputs
+      for (int ind=0; ind<inputv_.size(); ++ind) {
+        // Loop over symbolic primitives of each input
+        vector<MX> prim = inputv_[ind].getPrimitives();
+        int nz_offset=0;
+        for (int p=0; p<prim.size(); ++p) {
+          int i = prim[p].getTemp()-1;
+          if (i>=0) {
+            // Mark as input
+            algorithm_[i].op = OP_INPUT;
+
+            // Location of the input
+            algorithm_[i].arg.resize(3);
+            algorithm_[i].arg[0] = ind;
+            algorithm_[i].arg[1] = p;
+            algorithm_[i].arg[2] = nz_offset;
+
+            // Mark input as read
+            prim[p].setTemp(0);
+          }
+          nz_offset += prim[p]->nnz();
+        }
+      }
 
-    // Add input instructions, loop over inputs
-    for (int ind=0; ind<inputv_.size(); ++ind) {
-      // Loop over symbolic primitives of each input
-      vector<MX> prim = inputv_[ind].getPrimitives();
-      int nz_offset=0;
-      for (int p=0; p<prim.size(); ++p) {
-        int i = prim[p].getTemp()-1;
+      // Locate free variables
+      free_vars_.clear();
+      for (vector<pair<int, MXNode*> >::const_iterator it=symb_loc.begin();
+           it!=symb_loc.end(); ++it) {
+        int i = it->second->temp-1;
         if (i>=0) {
-          // Mark as input
-          algorithm_[i].op = OP_INPUT;
-
-          // Location of the input
-          algorithm_[i].arg.resize(3);
-          algorithm_[i].arg[0] = ind;
-          algorithm_[i].arg[1] = p;
-          algorithm_[i].arg[2] = nz_offset;
+          // Save to list of free parameters
+          free_vars_.push_back(MX::create(it->second));
 
-          // Mark input as read
-          prim[p].setTemp(0);
+          // Remove marker
+          it->second->temp=0;
         }
-        nz_offset += prim[p]->nnz();
-      }
-    }
-
-    // Locate free variables
-    free_vars_.clear();
-    for (vector<pair<int, MXNode*> >::const_iterator it=symb_loc.begin();
-         it!=symb_loc.end(); ++it) {
-      int i = it->second->temp-1;
-      if (i>=0) {
-        // Save to list of free parameters
-        free_vars_.push_back(MX::create(it->second));
-
-        // Remove marker
-        it->second->temp=0;
       }
     }
 
@@ -387,6 +460,13 @@ namespace casadi {
                    << free_vars_ << " are free.");
     }
 
+    // Independent function calls in parallel (profiling requires serial evaluation)
+    if (parallel_ && !CasadiOptions::profiling) {
+      evalParallel(arg, res, iw, w);
+      casadi_msg("MXFunctionInternal::evalD():end "  << getOption("name"));
+      return;
+    }
+
     // Evaluate all of the nodes of the algorithm:
     // should only evaluate nodes that have not yet been calculated!
     int alg_counter = 0;
@@ -395,32 +475,8 @@ namespace casadi {
         time_start = getRealTime(); // Start timer
       }
 
-      if (it->op==OP_INPUT) {
-        // Pass an input
-        double *w1 = w+workloc_[it->res.front()];
-        int nnz=it->data.nnz();
-        int i=it->arg.at(0);
-        int nz_offset=it->arg.at(2);
-        if (arg[i]==0) {
-          fill(w1, w1+nnz, 0);
-        } else {
-          copy(arg[i]+nz_offset, arg[i]+nz_offset+nnz, w1);
-        }
-      } else if (it->op==OP_OUTPUT) {
-        // Get an output
-        double *w1 = w+workloc_[it->arg.front()];
-        int i=it->res.front();
-        if (res[i]!=0) copy(w1, w1+output(i).nnz(), res[i]);
-      } else {
-        // Point pointers to the data corresponding to the element
-        for (int i=0; i<it->arg.size(); ++i)
-          arg1[i] = it->arg[i]>=0 ? w+workloc_[it->arg[i]] : 0;
-        for (int i=0; i<it->res.size(); ++i)
-          res1[i] = it->res[i]>=0 ? w+workloc_[it->res[i]] : 0;
-
-        // Evaluate
-        it->data->evalD(arg1, res1, iw, w);
-      }
+      // Evaluate the element
+      evalD(*it, arg, res, w, arg1, res1, iw, w);
 
       // Write out profiling information
       if (CasadiOptions::profiling) {
@@ -463,6 +519,171 @@ namespace casadi {
     casadi_msg("MXFunctionInternal::evalD():end "  << getOption("name"));
   }
 
+  void MXFunctionInternal::evalD(AlgEl& el, const double** arg, double** res, double* w,
+                                 const double** arg1, double** res1, int* iw1, double* w1) {
+    if (el.op==OP_INPUT) {
+      // Pass an input
+      double *wr = w+workloc_[el.res.front()];
+      int nnz=el.data.nnz();
+      int i=el.arg.at(0);
+      int nz_offset=el.arg.at(2);
+      if (arg[i]==0) {
+        fill(wr, wr+nnz, 0);
+      } else {
+        copy(arg[i]+nz_offset, arg[i]+nz_offset+nnz, wr);
+      }
+    } else if (el.op==OP_OUTPUT) {
+      // Get an output
+      double *wr = w+workloc_[el.arg.front()];
+      int i=el.res.front();
+      if (res[i]!=0) copy(wr, wr+output(i).nnz(), res[i]);
+    } else {
+      // Point pointers to the data corresponding to the element
+      for (int i=0; i<el.arg.size(); ++i)
+        arg1[i] = el.arg[i]>=0 ? w+workloc_[el.arg[i]] : 0;
+      for (int i=0; i<el.res.size(); ++i)
+        res1[i] = el.res[i]>=0 ? w+workloc_[el.res[i]] : 0;
+
+      // Evaluate
+      el.data->evalD(arg1, res1, iw1, w1);
+    }
+  }
+
+  void MXFunctionInternal::initParallel(int worksize, int n_threads) {
+    // The algorithm element that calculates each entry of the work vector
+    vector<int> source(worksize, -1);
+    for (int k=0; k<algorithm_.size(); ++k) {
+      const AlgEl& el = algorithm_[k];
+      if (el.op==OP_OUTPUT) continue;
+      for (int c=0; c<el.res.size(); ++c) {
+        if (el.res[c]>=0) source[el.res[c]] = k;
+      }
+    }
+
+    // Level of each element: one more than the highest level of the elements it depends on
+    vector<int> level(algorithm_.size(), 0);
+    int n_levels = 0;
+    for (int k=0; k<algorithm_.size(); ++k) {
+      const AlgEl& el = algorithm_[k];
+      if (el.op!=OP_INPUT) {
+        for (int c=0; c<el.arg.size(); ++c) {
+          if (el.arg[c]>=0) level[k] = max(level[k], level[source[el.arg[c]]]+1);
+        }
+      }
+      n_levels = max(n_levels, level[k]+1);
+    }
+
+    // Sort the elements by level, keeping the order within a level
+    vector<int> lev_ind(n_levels+1, 0);
+    for (int k=0; k<algorithm_.size(); ++k) lev_ind[level[k]+1]++;
+    for (int l=0; l<n_levels; ++l) lev_ind[l+1] += lev_ind[l];
+    vector<int> lev_el(algorithm_.size()), lev_pos(lev_ind.begin(), lev_ind.end()-1);
+    for (int k=0; k<algorithm_.size(); ++k) lev_el[lev_pos[level[k]]++] = k;
+
+    // Elements that are cheap to evaluate are evaluated in sequence, elements that call
+    // functions are grouped into tasks. A call to a reentrant function gets a task of its own.
+    // Other functions may share state, also through the functions that they call internally
+    // (e.g. two wrappers of the same integrator), so all calls to them go into a single task
+    stage_.push_back(0);
+    task_.push_back(0);
+    int max_tasks = 1;
+    for (int l=0; l<n_levels; ++l) {
+      // Other elements are added to the current (serial) stage
+      vector<int> calls;
+      for (int i=lev_ind[l]; i<lev_ind[l+1]; ++i) {
+        const AlgEl& el = algorithm_[lev_el[i]];
+        if (el.op!=OP_INPUT && el.op!=OP_OUTPUT && el.data->numFunctions()==1) {
+          calls.push_back(lev_el[i]);
+        } else {
+          task_el_.push_back(lev_el[i]);
+        }
+      }
+      if (calls.empty()) continue;
+
+      // Group the function calls into tasks, starting with the non-reentrant calls
+      vector<vector<int> > tasks(1);
+      for (vector<int>::const_iterator k=calls.begin(); k!=calls.end(); ++k) {
+        if (algorithm_[*k].data->getFunction(0)->isReentrant()) {
+          tasks.push_back(vector<int>(1, *k));
+        } else {
+          tasks.front().push_back(*k);
+        }
+      }
+      if (tasks.front().empty()) tasks.erase(tasks.begin());
+
+      // A single task is added to the current stage
+      if (tasks.size()==1) {
+        task_el_.insert(task_el_.end(), calls.begin(), calls.end());
+        continue;
+      }
+
+      // Close the current stage, if not empty
+      if (static_cast<int>(task_el_.size())>task_.back()) {
+        task_.push_back(task_el_.size());
+        stage_.push_back(task_.size()-1);
+      }
+
+      // New parallel stage
+      for (vector<vector<int> >::const_iterator t=tasks.begin(); t!=tasks.end(); ++t) {
+        task_el_.insert(task_el_.end(), t->begin(), t->end());
+        task_.push_back(task_el_.size());
+      }
+      stage_.push_back(task_.size()-1);
+      max_tasks = max(max_tasks, static_cast<int>(tasks.size()));
+    }
+
+    // Close the last stage, if not empty
+    if (static_cast<int>(task_el_.size())>task_.back()) {
+      task_.push_back(task_el_.size());
+      stage_.push_back(task_.size()-1);
+    }
+
+    // Nothing to parallelize
+    if (max_tasks==1) {
+      parallel_ = false;
+      stage_.clear();
+      task_.clear();
+      task_el_.clear();
+      return;
+    }
+
+    // Number of threads
+    n_threads_ = min(max_tasks, n_threads);
+
+    if (verbose()) {
+      userOut() << "Parallel evaluation: " << stage_.size()-1 << " stages, at most "
+                << max_tasks << " concurrent tasks, " << n_threads_ << " threads" << endl;
+    }
+  }
+
+  void MXFunctionInternal::evalParallel(const double** arg, double** res, int* iw, double* w) {
+#ifdef USE_CXX11
+    for (int s=0; s<stage_.size()-1; ++s) {
+      int t_begin = stage_[s], t_end = stage_[s+1];
+      if (t_end-t_begin==1) {
+        // Serial stage, evaluate in the calling thread
+        for (int i=task_[t_begin]; i<task_[t_end]; ++i) {
+          evalD(algorithm_[task_el_[i]], arg, res, w, arg+nIn(), res+nOut(), iw, w);
+        }
+      } else {
+        // Parallel stage, each thread evaluates every n-th task with its own work vectors
+        int n = min(t_end-t_begin, n_threads_);
+        ThreadPool::global().run(n, [&](int t) {
+          const double** arg1 = arg + nIn() + el_sz_arg_*t;
+          double** res1 = res + nOut() + el_sz_res_*t;
+          int* iw1 = iw + el_sz_iw_*t;
+          double* w1 = w + el_sz_w_*t;
+          for (int k=t_begin+t; k<t_end; k+=n) {
+            for (int i=task_[k]; i<task_[k+1]; ++i) {
+              evalD(algorithm_[task_el_[i]], arg, res, w, arg1, res1, iw1, w1);
+            }
+          }
+        });
+      }
+    }
+#endif // USE_CXX11
+  }
+
   void MXFunctionInternal::print(ostream &stream, const AlgEl& el) const {
     if (el.op==OP_OUTPUT) {
       stream << "output[" << el.res.front() << "] = @" << el.arg.at(0);
@@ -621,10 +842,17 @@ namespace casadi {
 
   Function MXFunctionInternal::getNumericJacobian(const std::string& name, int iind, int oind,
                                                   bool compact, bool symmetric, const Dict& opts) {
+    // One call to a derivative function per thread, if evaluated in parallel
+    int n_split = 1;
+#ifdef USE_CXX11
+    Dict::const_iterator it = opts.find("parallelization");
+    if (it!=opts.end() && it->second=="thread") n_split = ThreadPool::global().size();
+#endif // USE_CXX11
+
     // Create expressions for the Jacobian
     vector<MX> ret_out;
     ret_out.reserve(1+outputv_.size());
-    ret_out.push_back(jac(iind, oind, compact, symmetric, false, true));
+    ret_out.push_back(jac(iind, oind, compact, symmetric, false, true, n_split));
     ret_out.insert(ret_out.end(), outputv_.begin(), outputv_.end());
 
     return MXFunction(name, inputv_, ret_out, opts);
@@ -1110,6 +1338,283 @@ namespace casadi {
     return f;
   }
 
+  void MXFunctionInternal::serialize(Serializer& s) const {
+    casadi_assert_message(free_vars_.empty(),
+                          "MXFunction::serialize: Cannot serialize a function with free variables");
+    s.pack(string("MXFunction"));
+    if (!s.structureOnly()) {
+      s.pack(name_);
+      s.pack(ischeme_);
+      s.pack(oscheme_);
+    }
+
+    // Inputs: the symbolic primitives and, if needed, how they are combined
+    s.pack(nIn());
+    for (int i=0; i<nIn(); ++i) {
+      vector<MX> prim = inputv_[i].getPrimitives();
+      s.pack(static_cast<int>(prim.size()));
+      for (vector<MX>::const_iterator it=prim.begin(); it!=prim.end(); ++it) {
+        if (!s.structureOnly()) s.pack(it->getName());
+        s.pack(it->sparsity());
+      }
+      bool symbolic = inputv_[i].isSymbolic();
+      s.pack(static_cast<int>(symbolic));
+      if (!symbolic) s.pack(MXFunction("input", prim, make_vector(inputv_[i])));
+    }
+    s.pack(nOut());
+
+    // The algorithm
+    s.pack(static_cast<int>(workloc_.size()-1));
+    s.pack(static_cast<int>(algorithm_.size()));
+    for (vector<AlgEl>::const_iterator it=algorithm_.begin(); it!=algorithm_.end(); ++it) {
+      s.pack(it->op);
+      s.pack(it->arg);
+      s.pack(it->res);
+      if (it->op==OP_INPUT || it->op==OP_OUTPUT) continue;
+
+      // Dimensions of arguments that are not calculated
+      for (int i=0; i<it->arg.size(); ++i) {
+        if (it->arg[i]<0) {
+          s.pack(it->data->dep(i).size1());
+          s.pack(it->data->dep(i).size2());
+        }
+      }
+
+      // Data of the node needed to recreate it
+      const MXNode* n = static_cast<const MXNode*>(it->data.get());
+      switch (it->op) {
+      case OP_CONST:
+        s.pack(n->getMatrixValue());
+        break;
+      case OP_CALL:
+        s.pack(n->getFunction(0));
+        break;
+      case OP_GETNONZEROS:
+        s.pack(n->sparsity());
+        s.pack(static_cast<const GetNonzeros*>(n)->getAll());
+        break;
+      case OP_SETNONZEROS:
+        s.pack(static_cast<const SetNonzeros<false>*>(n)->getAll());
+        break;
+      case OP_ADDNONZEROS:
+        s.pack(static_cast<const SetNonzeros<true>*>(n)->getAll());
+        break;
+      case OP_RESHAPE:
+      case OP_PROJECT:
+        s.pack(n->sparsity());
+        break;
+      case OP_HORZSPLIT:
+      case OP_VERTSPLIT:
+      case OP_DIAGSPLIT:
+        {
+          vector<int> offset1(1, 0), offset2(1, 0);
+          for (int i=0; i<n->nout(); ++i) {
+            offset1.push_back(offset1.back() + n->sparsity(i).size1());
+            offset2.push_back(offset2.back() + n->sparsity(i).size2());
+          }
+          s.pack(offset1);
+          s.pack(offset2);
+        }
+        break;
+      case OP_HORZREPMAT:
+        s.pack(n->size2()/n->dep(0).size2());
+        break;
+      case OP_HORZREPSUM:
+        s.pack(n->dep(0).size2()/n->size2());
+        break;
+      case OP_MATMUL:
+      case OP_TRANSPOSE:
+      case OP_DETERMINANT:
+      case OP_INVERSE:
+      case OP_INNER_PROD:
+      case OP_HORZCAT:
+      case OP_VERTCAT:
+      case OP_DIAGCAT:
+      case OP_NORM2:
+      case OP_NORM1:
+      case OP_NORMINF:
+      case OP_NORMF:
+      case OP_FIND:
+        break;
+      default:
+        casadi_assert_message(it->op<OP_CONST || it->op>=OP_ERFINV,
+                              "MXFunction::serialize: Not supported for the expression "
+                              << it->data);
+      }
+    }
+  }
+
+  MXFunction MXFunctionInternal::deserialize(Deserializer& s) {
+    string name;
+    vector<string> ischeme, oscheme;
+    s.unpack(name);
+    s.unpack(ischeme);
+    s.unpack(oscheme);
+
+    // Create the symbolic primitives and the inputs
+    int n_in;
+    s.unpack(n_in);
+    vector<MX> arg(n_in);
+    vector<vector<MX> > prim(n_in);
+    for (int i=0; i<n_in; ++i) {
+      int n_prim;
+      s.unpack(n_prim);
+      prim[i].resize(n_prim);
+      for (int k=0; k<n_prim; ++k) {
+        string prim_name;
+        Sparsity sp;
+        s.unpack(prim_name);
+        s.unpack(sp);
+        prim[i][k] = MX::sym(prim_name, sp);
+      }
+      int symbolic;
+      s.unpack(symbolic);
+      if (symbolic) {
+        casadi_assert_message(n_prim==1, "MXFunction::deserialize: Corrupt stream");
+        arg[i] = prim[i][0];
+      } else {
+        Function f;
+        s.unpack(f);
+        arg[i] = f(prim[i], true).at(0);
+      }
+    }
+    int n_out;
+    s.unpack(n_out);
+    vector<MX> res(n_out);
+
+    // Replay the algorithm
+    int worksize, n_alg;
+    s.unpack(worksize);
+    s.unpack(n_alg);
+    vector<MX> swork(worksize), arg1, res1;
+    vector<int> el_arg, el_res;
+    for (int alg_counter=0; alg_counter<n_alg; ++alg_counter) {
+      int op;
+      s.unpack(op);
+      s.unpack(el_arg);
+      s.unpack(el_res);
+      if (op==OP_INPUT) {
+        swork.at(el_res.at(0)) = prim.at(el_arg.at(0)).at(el_arg.at(1));
+        continue;
+      } else if (op==OP_OUTPUT) {
+        res.at(el_res.at(0)) = swork.at(el_arg.at(0));
+        continue;
+      }
+
+      // Arguments of the operation
+      arg1.resize(el_arg.size());
+      for (int i=0; i<arg1.size(); ++i) {
+        if (el_arg[i]<0) {
+          int nrow, ncol;
+          s.unpack(nrow);
+          s.unpack(ncol);
+          arg1[i] = MX(nrow, ncol);
+        } else {
+          arg1[i] = swork.at(el_arg[i]);
+        }
+      }
+
+      // Create the node
+      res1.resize(el_res.size());
+      switch (op) {
+      case OP_CONST:
+        {
+          DMatrix v;
+          s.unpack(v);
+          res1[0] = v;
+        }
+        break;
+      case OP_CALL:
+        {
+          Function f;
+          s.unpack(f);
+          f.call(arg1, res1, false, true);
+        }
+        break;
+      case OP_GETNONZEROS:
+        {
+          Sparsity sp;
+          vector<int> nz;
+          s.unpack(sp);
+          s.unpack(nz);
+          res1[0] = arg1[0]->getGetNonzeros(sp, nz);
+        }
+        break;
+      case OP_SETNONZEROS:
+      case OP_ADDNONZEROS:
+        {
+          vector<int> nz;
+          s.unpack(nz);
+          res1[0] = op==OP_SETNONZEROS ? arg1[1]->getSetNonzeros(arg1[0], nz) :
+            arg1[1]->getAddNonzeros(arg1[0], nz);
+        }
+        break;
+      case OP_RESHAPE:
+      case OP_PROJECT:
+        {
+          Sparsity sp;
+          s.unpack(sp);
+          res1[0] = op==OP_RESHAPE ? arg1[0]->getReshape(sp) : arg1[0]->getProject(sp);
+        }
+        break;
+      case OP_HORZSPLIT:
+      case OP_VERTSPLIT:
+      case OP_DIAGSPLIT:
+        {
+          vector<int> offset1, offset2;
+          s.unpack(offset1);
+          s.unpack(offset2);
+          if (op==OP_HORZSPLIT) {
+            res1 = arg1[0]->getHorzsplit(offset2);
+          } else if (op==OP_VERTSPLIT) {
+            res1 = arg1[0]->getVertsplit(offset1);
+          } else {
+            res1 = arg1[0]->getDiagsplit(offset1, offset2);
+          }
+        }
+        break;
+      case OP_HORZREPMAT:
+      case OP_HORZREPSUM:
+        {
+          int n;
+          s.unpack(n);
+          res1[0] = op==OP_HORZREPMAT ? arg1[0]->getRepmat(1, n) : arg1[0]->getRepsum(1, n);
+        }
+        break;
+      case OP_MATMUL: res1[0] = arg1[1]->getMultiplication(arg1[2], arg1[0]); break;
+      case OP_TRANSPOSE: res1[0] = arg1[0]->getTranspose(); break;
+      case OP_DETERMINANT: res1[0] = arg1[0]->getDeterminant(); break;
+      case OP_INVERSE: res1[0] = arg1[0]->getInverse(); break;
+      case OP_INNER_PROD: res1[0] = arg1[0]->getInnerProd(arg1[1]); break;
+      case OP_HORZCAT: res1[0] = arg1[0]->getHorzcat(arg1); break;
+      case OP_VERTCAT: res1[0] = arg1[0]->getVertcat(arg1); break;
+      case OP_DIAGCAT: res1[0] = arg1[0]->getDiagcat(arg1); break;
+      case OP_NORM2: res1[0] = arg1[0]->getNorm2(); break;
+      case OP_NORM1: res1[0] = arg1[0]->getNorm1(); break;
+      case OP_NORMINF: res1[0] = arg1[0]->getNormInf(); break;
+      case OP_NORMF: res1[0] = arg1[0]->getNormF(); break;
+      case OP_FIND: res1[0] = arg1[0]->getFind(); break;
+      default:
+        if (casadi_math<double>::ndeps(op)==2) {
+          res1[0] = arg1[0]->getBinarySwitch(op, arg1[1]);
+        } else {
+          res1[0] = arg1[0]->getUnary(op);
+        }
+      }
+
+      // Save the results
+      casadi_assert_message(res1.size()==el_res.size(), "MXFunction::deserialize: Corrupt stream");
+      for (int i=0; i<res1.size(); ++i) {
+        if (el_res[i]>=0) swork.at(el_res[i]) = res1[i];
+      }
+    }
+
+    Dict opts;
+    opts["input_scheme"] = ischeme;
+    opts["output_scheme"] = oscheme;
+    return MXFunction(name, arg, res, opts);
+  }
+
   void MXFunctionInternal::printWork(ostream &stream) {
     for (int k=0; k<workloc_.size()-1; ++k) {
       vector<double>::const_iterator start=w_tmp_.begin() + workloc_[k];
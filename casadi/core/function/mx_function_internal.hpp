@@ -77,6 +77,26 @@ namespace casadi {
     /// Free variables
     std::vector<MX> free_vars_;
 
+    /// Evaluate independent function calls in parallel threads
+    bool parallel_;
+
+    /** \brief Schedule for parallel evaluation
+     * The algorithm is divided into stages that are evaluated in order. Each stage
+     * consists of one or more tasks that can be evaluated concurrently, each task
+     * being a sequence of algorithm elements. stage_ holds offsets into task_,
+     * task_ holds offsets into task_el_, which holds indices into algorithm_.
+     */
+    std::vector<int> stage_, task_, task_el_;
+
+    /// Number of threads, each with its own part of the work vectors
+    int n_threads_;
+
+    /// Are all embedded functions reentrant?
+    bool reentrant_;
+
+    /// Work vector sizes for the evaluation of an algorithm element
+    size_t el_sz_arg_, el_sz_res_, el_sz_iw_, el_sz_w_;
+
     /** \brief  Multiple input, multiple output constructor, only to be accessed from MXFunction,
         therefore protected */
     MXFunctionInternal(const std::vector<MX>& input, const std::vector<MX>& output);
@@ -93,6 +113,22 @@ namespace casadi {
     /** \brief  Evaluate numerically, work vectors given */
     virtual void evalD(const double** arg, double** res, int* iw, double* w);
 
+    /** \brief  Evaluate an element of the algorithm numerically
+     * arg1, res1, iw1 and w1 are the work vectors of the element, w holds the
+     * intermediate results.
+     */
+    void evalD(AlgEl& el, const double** arg, double** res, double* w,
+               const double** arg1, double** res1, int* iw1, double* w1);
+
+    /** \brief  Evaluate numerically, in parallel according to the schedule */
+    void evalParallel(const double** arg, double** res, int* iw, double* w);
+
+    /** \brief  Derive the schedule for parallel evaluation */
+    void initParallel(int worksize, int n_threads);
+
+    /** \brief  Can eval be called from several threads at once, each with its own work vectors? */
+    virtual bool isReentrant() const { return reentrant_;}
+
     /** \brief  Print description */
     virtual void print(std::ostream &stream) const;
 
@@ -105,6 +141,12 @@ namespace casadi {
     /** \brief Generate code for the body of the C function */
     virtual void generateBody(CodeGenerator& g) const;
 
+    /** \brief Serialize the algorithm, including embedded functions */
+    virtual void serialize(Serializer& s) const;
+
+    /** \brief Create a function by replaying a serialized algorithm */
+    static MXFunction deserialize(Deserializer& s);
+
     /** \brief Extract the residual function G and the modified function Z out of an expression
      * (see Albersmeyer2010 paper) */
     void generateLiftingFunctions(MXFunction& vdef_fcn, MXFunction& vinit_fcn);
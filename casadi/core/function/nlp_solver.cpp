@@ -156,4 +156,12 @@ namespace casadi {
     (*this)->setOptionsFromFile(file);
   }
 
+  Dict NlpSolver::getWarmStart() const {
+    return (*this)->getWarmStart();
+  }
+
+  void NlpSolver::setWarmStart(const Dict& state) {
+    (*this)->setWarmStart(state);
+  }
+
 } // namespace casadi
@@ -305,6 +305,26 @@ namespace casadi {
 
     /// Read options from parameter xml
     void setOptionsFromFile(const std::string & file);
+
+    /** \brief Get the solver state after the last solve
+     *
+     * The state is a dictionary with the primal-dual solution ("x", "lam_x", "lam_g")
+     * and, depending on the plugin, solver-specific entries such as the final
+     * barrier parameter. It can be modified (e.g. shifted in time) and passed
+     * to setWarmStart.
+     */
+    Dict getWarmStart() const;
+
+    /** \brief Warm start the next solve from a state obtained with getWarmStart
+     *
+     * The entries "x", "lam_x" and "lam_g" are passed as the initial guess of the next
+     * solve. The other entries are only used by plugins which support them:
+     * - ipopt: "mu", the initial barrier parameter. Any state enables
+     *   warm_start_init_point for the next solve.
+     *
+     * Any other entry results in an error.
+     */
+    void setWarmStart(const Dict& state);
   };
 
 } // namespace casadi
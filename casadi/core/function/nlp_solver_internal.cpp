@@ -26,6 +26,13 @@
 #include "nlp_solver_internal.hpp"
 #include "mx_function.hpp"
 #include "sx_function.hpp"
+#include "external_function.hpp"
+#include "code_generator.hpp"
+#include <cstdio>
+#include <cstdlib>
+#ifdef HAVE_MKSTEMPS
+#include <unistd.h>
+#endif // HAVE_MKSTEMPS
 
 INPUTSCHEME(NlpSolverInput)
 OUTPUTSCHEME(NlpSolverOutput)
@@ -64,6 +71,11 @@ namespace casadi {
               "(sparse row, autogenerated by default)");
     addOption("jac_f_options",     OT_DICT,           GenericType(),
               "Options for the autogenerated Jacobian of the objective.");
+    addOption("compile",            OT_BOOLEAN,  false,
+              "Generate the NLP, together with the derivative functions needed by the "
+              "solver, into one C file, which is compiled just-in-time using the plugin "
+              "given by 'compiler' with options 'jit_options'. "
+              "Can be combined with 'expand'.");
     addOption("iteration_callback", OT_CALLBACK, GenericType(),
               "A function that will be called at each iteration with the solver as input. "
               "Check documentation of Callback.");
@@ -154,6 +166,8 @@ namespace casadi {
       }
     }
 
+    compile_ = getOption("compile");
+
     if (hasSetOption("iteration_callback")) {
       callback_ = getOption("iteration_callback");
     }
@@ -320,6 +334,9 @@ namespace casadi {
       log("Generating/retrieving Lagrangian gradient function");
       gradLag = nlp_.derivative(0, 1);
       log("Gradient function generated");
+
+      // The Hessian of the Lagrangian is formed like the Jacobians of the NLP
+      gradLag.setOption("jac_parallelization", nlp_.getOption("jac_parallelization"));
     }
     gradLag.setOption("name", "grad_lag");
     if (hasSetOption("grad_lag_options")) {
@@ -386,6 +403,67 @@ namespace casadi {
     return spHessLag;
   }
 
+  void NlpSolverInternal::compileCallbacks() {
+    if (!compile_) return;
+
+    // Functions that have been created, with their names in the generated code
+    vector<pair<Function*, string> > fcn;
+    fcn.push_back(make_pair(&nlp_, "nlp"));
+    if (!gradF_.isNull()) fcn.push_back(make_pair(&gradF_, "grad_f"));
+    if (!jacF_.isNull()) fcn.push_back(make_pair(&jacF_, "jac_f"));
+    if (!jacG_.isNull()) fcn.push_back(make_pair(&jacG_, "jac_g"));
+    if (!hessLag_.isNull()) fcn.push_back(make_pair(&hessLag_, "hess_lag"));
+
+    // Generate all functions into the same file, sharing constants and auxiliary functions
+    log("Generating NLP callbacks");
+    CodeGenerator gen;
+    for (int k=0; k<fcn.size(); ++k) gen.add(*fcn[k].first, fcn[k].second);
+
+    // Unique name of the source file, such that solvers can be created concurrently
+#ifdef HAVE_MKSTEMPS
+    // Preferred solution
+    char src_name[] = "nlp_jit_tmp_XXXXXX.c";
+    int src_fd = mkstemps(src_name, 2);
+    if (src_fd == -1) {
+      casadi_error("Failed to create a temporary file name");
+    }
+    close(src_fd);
+    string src = src_name;
+#else
+    // Fallback, may result in deprecation warnings
+    char* src_name = tempnam(0, "nlp_jit_tmp_");
+    string src = string(src_name) + ".c";
+    free(src_name);
+#endif
+
+    // The generated code does not depend on the file name, for compiler caches
+    {
+      ofstream src_file(src.c_str());
+      gen.generate("nlp_jit_tmp", vector<ostream*>(1, &src_file));
+    }
+
+    // Compile
+    log("Compiling NLP callbacks");
+    Compiler compiler;
+    try {
+      compiler = Compiler(src, compilerplugin_, jit_options_);
+    } catch (...) {
+      remove(src.c_str());
+      throw;
+    }
+    remove(src.c_str());
+
+    // Replace the functions
+    for (int k=0; k<fcn.size(); ++k) {
+      Function& f = *fcn[k].first;
+      Dict opts = make_dict("input_scheme", f.inputScheme(),
+                            "output_scheme", f.outputScheme());
+      ExternalFunction f_compiled(fcn[k].second, compiler, opts);
+      f = f_compiled;
+    }
+    log("NLP callbacks compiled");
+  }
+
   void NlpSolverInternal::checkInputs() const {
     for (int i=0;i<input(NLP_SOLVER_LBX).nnz();++i) {
       casadi_assert_message(input(NLP_SOLVER_LBX).at(i)<=input(NLP_SOLVER_UBX).at(i),
@@ -416,6 +494,42 @@ namespace casadi {
                  << typeid(*this).name());
   }
 
+  Dict NlpSolverInternal::getWarmStart() const {
+    Dict state;
+    state["x"] = output(NLP_SOLVER_X).data();
+    state["lam_x"] = output(NLP_SOLVER_LAM_X).data();
+    state["lam_g"] = output(NLP_SOLVER_LAM_G).data();
+    return state;
+  }
+
+  void NlpSolverInternal::setWarmStart(const Dict& state) {
+    vector<string> keys = getWarmStartKeys();
+
+    // Primal and dual guesses are passed via the inputs
+    for (Dict::const_iterator it=state.begin(); it!=state.end(); ++it) {
+      if (it->first=="x") {
+        input(NLP_SOLVER_X0).setNZ(it->second.toDoubleVector());
+      } else if (it->first=="lam_x") {
+        input(NLP_SOLVER_LAM_X0).setNZ(it->second.toDoubleVector());
+      } else if (it->first=="lam_g") {
+        input(NLP_SOLVER_LAM_G0).setNZ(it->second.toDoubleVector());
+      } else if (find(keys.begin(), keys.end(), it->first)==keys.end()) {
+        stringstream ss;
+        ss << "x, lam_x, lam_g";
+        for (vector<string>::const_iterator k=keys.begin(); k!=keys.end(); ++k) ss << ", " << *k;
+        casadi_error("NlpSolver::setWarmStart: Entry \"" << it->first << "\" is not "
+                     "supported by this solver. Supported entries: " << ss.str());
+      }
+    }
+
+    // Remaining entries are interpreted by the plugins
+    if (!keys.empty()) warm_start_ = state;
+  }
+
+  std::vector<std::string> NlpSolverInternal::getWarmStartKeys() const {
+    return std::vector<std::string>();
+  }
+
   double NlpSolverInternal::defaultInput(int ind) const {
     switch (ind) {
     case NLP_SOLVER_LBX:
@@ -105,6 +105,17 @@ namespace casadi {
     /// Get the sparsity pattern of the Hessian of the Lagrangian
     Sparsity& spHessLag();
 
+    /** \brief Generate the NLP and the derivative functions created so far into one
+     * C file, compile it and replace the functions with the compiled versions
+     *
+     * Only has an effect if the option "compile" is set. Plugins call this at the end
+     * of init, when all functions needed by the solver have been created.
+     */
+    void compileCallbacks();
+
+    /// Compile the callbacks into one library
+    bool compile_;
+
     /// Number of variables
     int nx_;
 
@@ -168,6 +179,18 @@ namespace casadi {
     /// Read options from parameter xml
     virtual void setOptionsFromFile(const std::string & file);
 
+    /// Get the solver state after the last solve
+    virtual Dict getWarmStart() const;
+
+    /// Warm start the next solve
+    virtual void setWarmStart(const Dict& state);
+
+    /// Solver-specific entries of the warm start state honoured by the plugin
+    virtual std::vector<std::string> getWarmStartKeys() const;
+
+    /// Warm start state passed to setWarmStart, for use by the next solve
+    Dict warm_start_;
+
     /// WORKAROUND: Add an element to an std::vector stored in a GenericType:
     template<typename Type> static void append_to_vec(GenericType& t, Type el) {
       std::vector<Type> v = t;
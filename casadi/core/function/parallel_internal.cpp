@@ -0,0 +1,288 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+#include "parallel_internal.hpp"
+#include "mx_function.hpp"
+#include "../casadi_thread_pool.hpp"
+
+using namespace std;
+
+namespace casadi {
+
+  ParallelInternal::ParallelInternal(const std::vector<Function>& f) : f_(f) {
+    addOption("parallelization", OT_STRING, "thread",
+              "Computational strategy for parallelization. \"thread\" falls back to serial "
+              "mode unless all functions are reentrant or \"independent\" is set",
+              "serial|thread");
+    addOption("independent", OT_BOOLEAN, false,
+              "The functions do not share any state, also not through the functions that "
+              "they call internally, so that they can be evaluated concurrently even if "
+              "they are not reentrant");
+
+    // Consistency check
+    casadi_assert_message(!f_.empty(), "ParallelInternal: No functions given");
+    for (int k=0; k<f_.size(); ++k) {
+      casadi_assert_message(!f_[k].isNull(), "ParallelInternal: Function " << k << " is null");
+      for (int j=0; j<k; ++j) {
+        casadi_assert_message(f_[j].get()!=f_[k].get(),
+                              "ParallelInternal: Functions " << j << " and " << k
+                              << " are the same object and cannot be evaluated concurrently");
+      }
+    }
+
+    // Give a name
+    setOption("name", "unnamed_parallel");
+  }
+
+  Function ParallelInternal::create(const std::string& name, const std::vector<Function>& f,
+                                    const Dict& opts) {
+    Function ret;
+    ret.assignNode(new ParallelInternal(f));
+    ret.setOption("name", name);
+    ret.setOption(opts);
+    ret.init();
+    return ret;
+  }
+
+  ParallelInternal::~ParallelInternal() {
+  }
+
+  void ParallelInternal::init() {
+    // Parallelization strategy
+    parallel_ = getOption("parallelization")=="thread";
+#ifndef USE_CXX11
+    if (parallel_) {
+      casadi_warning("CasADi was not compiled with C++11 support. "
+                     "Falling back to serial mode.");
+      parallel_ = false;
+    }
+#endif // USE_CXX11
+
+    // Input and output offsets
+    offset_in_.resize(f_.size()+1);
+    offset_out_.resize(f_.size()+1);
+    offset_in_[0] = offset_out_[0] = 0;
+    for (int k=0; k<f_.size(); ++k) {
+      f_[k].init(false);
+      offset_in_[k+1] = offset_in_[k] + f_[k].nIn();
+      offset_out_[k+1] = offset_out_[k] + f_[k].nOut();
+    }
+
+    // Functions that are not reentrant may share state, e.g. two wrappers of the same
+    // integrator, unless the caller guarantees otherwise
+    bool independent = getOption("independent");
+    if (parallel_ && !independent) {
+      for (int k=0; k<f_.size(); ++k) {
+        if (!f_[k]->isReentrant()) {
+          casadi_warning("Function \"" << f_[k].getOption("name") << "\" is not reentrant. "
+                         "Falling back to serial mode.");
+          parallel_ = false;
+          break;
+        }
+      }
+    }
+
+    // Allocate input and output buffers
+    ibuf_.resize(offset_in_.back());
+    obuf_.resize(offset_out_.back());
+    for (int k=0; k<f_.size(); ++k) {
+      for (int i=0; i<f_[k].nIn(); ++i) {
+        input(offset_in_[k]+i) = DMatrix::zeros(f_[k].input(i).sparsity());
+      }
+      for (int i=0; i<f_[k].nOut(); ++i) {
+        output(offset_out_[k]+i) = DMatrix::zeros(f_[k].output(i).sparsity());
+      }
+    }
+
+    // Call the initialization method of the base class
+    FunctionInternal::init();
+
+    // Each function gets its own slice of the work vectors
+    offset_arg_.resize(f_.size()+1);
+    offset_res_.resize(f_.size()+1);
+    offset_iw_.resize(f_.size()+1);
+    offset_w_.resize(f_.size()+1);
+    offset_arg_[0] = offset_res_[0] = offset_iw_[0] = offset_w_[0] = 0;
+    for (int k=0; k<f_.size(); ++k) {
+      size_t sz_arg, sz_res, sz_iw, sz_w;
+      f_[k].sz_work(sz_arg, sz_res, sz_iw, sz_w);
+      offset_arg_[k+1] = offset_arg_[k] + sz_arg;
+      offset_res_[k+1] = offset_res_[k] + sz_res;
+      offset_iw_[k+1] = offset_iw_[k] + sz_iw;
+      offset_w_[k+1] = offset_w_[k] + sz_w;
+    }
+    alloc_arg(offset_arg_.back());
+    alloc_res(offset_res_.back());
+    alloc_iw(offset_iw_.back());
+    alloc_w(offset_w_.back());
+  }
+
+  template<typename ArgT, typename T>
+  void ParallelInternal::evalOne(int k, ArgT** arg, T** res, int* iw, T* w,
+                                 void (FunctionInternal::*ptrEval)(ArgT** arg, T** res,
+                                                                   int* iw, T* w)) {
+    // Pass the arguments in the slice of the work vector belonging to function k
+    ArgT** arg_k = arg + nIn() + offset_arg_[k];
+    copy(arg + offset_in_[k], arg + offset_in_[k+1], arg_k);
+    T** res_k = res + nOut() + offset_res_[k];
+    copy(res + offset_out_[k], res + offset_out_[k+1], res_k);
+
+    // Evaluate
+    (f_[k].operator->()->*ptrEval)(arg_k, res_k, iw + offset_iw_[k], w + offset_w_[k]);
+  }
+
+  template<typename ArgT, typename T>
+  void ParallelInternal::evalGen(ArgT** arg, T** res, int* iw, T* w,
+                                 void (FunctionInternal::*ptrEval)(ArgT** arg, T** res,
+                                                                   int* iw, T* w),
+                                 bool parallel) {
+#ifdef USE_CXX11
+    if (parallel && f_.size()>1) {
+      ThreadPool::global().run(f_.size(), [&](int k) {
+        evalOne(k, arg, res, iw, w, ptrEval);
+      });
+      return;
+    }
+#endif // USE_CXX11
+    for (int k=0; k<f_.size(); ++k) evalOne(k, arg, res, iw, w, ptrEval);
+  }
+
+  bool ParallelInternal::isReentrant() const {
+    for (int k=0; k<f_.size(); ++k) {
+      if (!f_[k]->isReentrant()) return false;
+    }
+    return true;
+  }
+
+  void ParallelInternal::evalD(const double** arg, double** res, int* iw, double* w) {
+    evalGen<const double, double>(arg, res, iw, w, &FunctionInternal::eval, parallel_);
+  }
+
+  void ParallelInternal::spFwd(const bvec_t** arg, bvec_t** res, int* iw, bvec_t* w) {
+    evalGen<const bvec_t, bvec_t>(arg, res, iw, w, &FunctionInternal::spFwdSwitch, false);
+  }
+
+  void ParallelInternal::spAdj(bvec_t** arg, bvec_t** res, int* iw, bvec_t* w) {
+    evalGen<bvec_t, bvec_t>(arg, res, iw, w, &FunctionInternal::spAdjSwitch, false);
+  }
+
+  Function ParallelInternal
+  ::getDerForward(const std::string& name, int nfwd, Dict& opts) {
+    // Derivative of each function, evaluated concurrently in the same way
+    vector<Function> der(f_.size());
+    for (int k=0; k<f_.size(); ++k) der[k] = f_[k].derForward(nfwd);
+    Dict der_opts;
+    der_opts["parallelization"] = getOption("parallelization");
+    der_opts["independent"] = getOption("independent");
+    stringstream ss;
+    ss << "fwd" << nfwd << "_" << name_;
+    Function p = create(ss.str(), der, der_opts);
+
+    // Construct wrapper inputs and arguments for calling p
+    vector<MX> arg = symbolicInput();
+    vector<MX> res = symbolicOutput();
+    vector<vector<MX> > seed = symbolicFwdSeed(nfwd, arg);
+    vector<MX> w_in = arg;
+    w_in.insert(w_in.end(), res.begin(), res.end());
+    for (int d=0; d<nfwd; ++d) w_in.insert(w_in.end(), seed[d].begin(), seed[d].end());
+    vector<MX> v;
+    for (int k=0; k<f_.size(); ++k) {
+      v.insert(v.end(), arg.begin()+offset_in_[k], arg.begin()+offset_in_[k+1]);
+      v.insert(v.end(), res.begin()+offset_out_[k], res.begin()+offset_out_[k+1]);
+      for (int d=0; d<nfwd; ++d) {
+        v.insert(v.end(), seed[d].begin()+offset_in_[k], seed[d].begin()+offset_in_[k+1]);
+      }
+    }
+    casadi_assert(v.size()==p.nIn());
+    v = p(v);
+
+    // Sort the sensitivities by direction
+    vector<MX> w_out;
+    w_out.reserve(nfwd*nOut());
+    for (int d=0; d<nfwd; ++d) {
+      for (int k=0; k<f_.size(); ++k) {
+        vector<MX>::const_iterator it = v.begin() + nfwd*offset_out_[k] + d*f_[k].nOut();
+        w_out.insert(w_out.end(), it, it + f_[k].nOut());
+      }
+    }
+
+    // Create wrapper
+    return MXFunction(name, w_in, w_out, opts);
+  }
+
+  Function ParallelInternal
+  ::getDerReverse(const std::string& name, int nadj, Dict& opts) {
+    // Derivative of each function, evaluated concurrently in the same way
+    vector<Function> der(f_.size());
+    for (int k=0; k<f_.size(); ++k) der[k] = f_[k].derReverse(nadj);
+    Dict der_opts;
+    der_opts["parallelization"] = getOption("parallelization");
+    der_opts["independent"] = getOption("independent");
+    stringstream ss;
+    ss << "adj" << nadj << "_" << name_;
+    Function p = create(ss.str(), der, der_opts);
+
+    // Construct wrapper inputs and arguments for calling p
+    vector<MX> arg = symbolicInput();
+    vector<MX> res = symbolicOutput();
+    vector<vector<MX> > seed = symbolicAdjSeed(nadj, res);
+    vector<MX> w_in = arg;
+    w_in.insert(w_in.end(), res.begin(), res.end());
+    for (int d=0; d<nadj; ++d) w_in.insert(w_in.end(), seed[d].begin(), seed[d].end());
+    vector<MX> v;
+    for (int k=0; k<f_.size(); ++k) {
+      v.insert(v.end(), arg.begin()+offset_in_[k], arg.begin()+offset_in_[k+1]);
+      v.insert(v.end(), res.begin()+offset_out_[k], res.begin()+offset_out_[k+1]);
+      for (int d=0; d<nadj; ++d) {
+        v.insert(v.end(), seed[d].begin()+offset_out_[k], seed[d].begin()+offset_out_[k+1]);
+      }
+    }
+    casadi_assert(v.size()==p.nIn());
+    v = p(v);
+
+    // Sort the sensitivities by direction
+    vector<MX> w_out;
+    w_out.reserve(nadj*nIn());
+    for (int d=0; d<nadj; ++d) {
+      for (int k=0; k<f_.size(); ++k) {
+        vector<MX>::const_iterator it = v.begin() + nadj*offset_in_[k] + d*f_[k].nIn();
+        w_out.insert(w_out.end(), it, it + f_[k].nIn());
+      }
+    }
+
+    // Create wrapper
+    return MXFunction(name, w_in, w_out, opts);
+  }
+
+  void ParallelInternal::print(ostream &stream) const {
+    stream << "Parallel([";
+    for (int k=0; k<f_.size(); ++k) {
+      if (k!=0) stream << ", ";
+      stream << f_[k].getOption("name");
+    }
+    stream << "])";
+  }
+
+} // namespace casadi
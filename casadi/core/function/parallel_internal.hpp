@@ -0,0 +1,123 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+#ifndef CASADI_PARALLEL_INTERNAL_HPP
+#define CASADI_PARALLEL_INTERNAL_HPP
+
+#include "function_internal.hpp"
+
+/// \cond INTERNAL
+
+namespace casadi {
+
+  /** \brief Concurrent evaluation of independent functions
+
+      The inputs of the function are the inputs of all functions, in order,
+      and the outputs are the outputs of all functions, in order. With thread
+      parallelization, the functions are evaluated concurrently by the global
+      thread pool, so they must not share any state that is modified during
+      numerical evaluation (such as the buffers of an integrator). Evaluating
+      the same Function object more than once is therefore not supported.
+      Functions that are not reentrant are evaluated one after the other, unless
+      the option "independent" states that they share no state.
+  */
+  class CASADI_EXPORT ParallelInternal : public FunctionInternal {
+  public:
+
+    /** \brief Constructor */
+    explicit ParallelInternal(const std::vector<Function>& f);
+
+    /** \brief Create a new function object */
+    static Function create(const std::string& name, const std::vector<Function>& f,
+                           const Dict& opts=Dict());
+
+    /** \brief  clone function */
+    virtual ParallelInternal* clone() const { return new ParallelInternal(*this);}
+
+    /** \brief  Destructor */
+    virtual ~ParallelInternal();
+
+    /** \brief  Initialize */
+    virtual void init();
+
+    /** \brief  Evaluate numerically, work vectors given */
+    virtual void evalD(const double** arg, double** res, int* iw, double* w);
+
+    /** \brief  Reentrant if all functions are */
+    virtual bool isReentrant() const;
+
+    /** \brief  Propagate sparsity forward */
+    virtual void spFwd(const bvec_t** arg, bvec_t** res, int* iw, bvec_t* w);
+
+    /** \brief  Propagate sparsity backwards */
+    virtual void spAdj(bvec_t** arg, bvec_t** res, int* iw, bvec_t* w);
+
+    /** \brief  Is the class able to propagate seeds through the algorithm? */
+    virtual bool spCanEvaluate(bool fwd) { return true;}
+
+    ///@{
+    /** \brief Generate a function that calculates \a nfwd forward derivatives */
+    virtual Function getDerForward(const std::string& name, int nfwd, Dict& opts);
+    virtual int numDerForward() const { return 64;}
+    ///@}
+
+    ///@{
+    /** \brief Generate a function that calculates \a nadj adjoint derivatives */
+    virtual Function getDerReverse(const std::string& name, int nadj, Dict& opts);
+    virtual int numDerReverse() const { return 64;}
+    ///@}
+
+    /** \brief  Print description */
+    virtual void print(std::ostream &stream) const;
+
+    /// Functions to be evaluated
+    std::vector<Function> f_;
+
+    /// Offsets of the inputs and outputs of each function
+    std::vector<int> offset_in_, offset_out_;
+
+    /// Offsets of the work vectors of each function
+    std::vector<size_t> offset_arg_, offset_res_, offset_iw_, offset_w_;
+
+    /// Evaluate in parallel threads
+    bool parallel_;
+
+  private:
+    /// Evaluate or propagate sparsity, the functions one by one or concurrently
+    template<typename ArgT, typename T>
+    void evalGen(ArgT** arg, T** res, int* iw, T* w,
+                 void (FunctionInternal::*ptrEval)(ArgT** arg, T** res, int* iw, T* w),
+                 bool parallel);
+
+    /// Evaluate or propagate sparsity through function \a k
+    template<typename ArgT, typename T>
+    void evalOne(int k, ArgT** arg, T** res, int* iw, T* w,
+                 void (FunctionInternal::*ptrEval)(ArgT** arg, T** res, int* iw, T* w));
+  };
+
+} // namespace casadi
+/// \endcond
+
+#endif // CASADI_PARALLEL_INTERNAL_HPP
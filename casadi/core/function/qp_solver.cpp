@@ -54,6 +54,14 @@ namespace casadi {
     (*this)->generateNativeCode(file);
   }
 
+  Dict QpSolver::getWarmStart() const {
+    return (*this)->getWarmStart();
+  }
+
+  void QpSolver::setWarmStart(const Dict& state) {
+    (*this)->setWarmStart(state);
+  }
+
 #ifdef WITH_DEPRECATED_FEATURES
   QpSolver::QpSolver(const std::string& solver, const std::map<std::string, Sparsity>& st) {
     assignNode(QpSolverInternal::instantiatePlugin(solver, st));
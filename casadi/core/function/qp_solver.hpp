@@ -151,6 +151,25 @@ namespace casadi {
 
     /** Generate native code in the interfaced language for debugging */
     void generateNativeCode(std::ostream &file) const;
+
+    /** \brief Get the solver state after the last solve
+     *
+     * The state is a dictionary with the primal-dual solution ("x", "lam_x", "lam_a")
+     * and, depending on the plugin, solver-specific entries such as the active set.
+     * It can be modified (e.g. shifted in time) and passed to setWarmStart.
+     */
+    Dict getWarmStart() const;
+
+    /** \brief Warm start the next solve from a state obtained with getWarmStart
+     *
+     * The entries "x" and "lam_x" are passed as the initial guess of the next solve.
+     * The other entries are only used by plugins which support them:
+     * - qpoases: "lam_a", "bounds_status" and "constraints_status" (the working set,
+     *   with -1 for a lower, 0 for no and 1 for an upper active bound)
+     *
+     * "lam_a" is ignored by the other plugins, any other entry results in an error.
+     */
+    void setWarmStart(const Dict& state);
   };
 
 } // namespace casadi
@@ -131,6 +131,41 @@ namespace casadi {
                  << typeid(*this).name());
   }
 
+  Dict QpSolverInternal::getWarmStart() const {
+    Dict state;
+    state["x"] = output(QP_SOLVER_X).data();
+    state["lam_x"] = output(QP_SOLVER_LAM_X).data();
+    state["lam_a"] = output(QP_SOLVER_LAM_A).data();
+    return state;
+  }
+
+  void QpSolverInternal::setWarmStart(const Dict& state) {
+    vector<string> keys = getWarmStartKeys();
+
+    // Primal and dual guesses are passed via the inputs
+    for (Dict::const_iterator it=state.begin(); it!=state.end(); ++it) {
+      if (it->first=="x") {
+        input(QP_SOLVER_X0).setNZ(it->second.toDoubleVector());
+      } else if (it->first=="lam_x") {
+        input(QP_SOLVER_LAM_X0).setNZ(it->second.toDoubleVector());
+      } else if (it->first!="lam_a" &&
+                 find(keys.begin(), keys.end(), it->first)==keys.end()) {
+        stringstream ss;
+        ss << "x, lam_x, lam_a";
+        for (vector<string>::const_iterator k=keys.begin(); k!=keys.end(); ++k) ss << ", " << *k;
+        casadi_error("QpSolver::setWarmStart: Entry \"" << it->first << "\" is not "
+                     "supported by this solver. Supported entries: " << ss.str());
+      }
+    }
+
+    // Remaining entries are interpreted by the plugins
+    if (!keys.empty()) warm_start_ = state;
+  }
+
+  std::vector<std::string> QpSolverInternal::getWarmStartKeys() const {
+    return std::vector<std::string>();
+  }
+
   std::map<std::string, QpSolverInternal::Plugin> QpSolverInternal::solvers_;
 
   const std::string QpSolverInternal::infix_ = "qpsolver";
@@ -86,8 +86,20 @@ namespace casadi {
     /** \brief Get default input value */
     virtual double defaultInput(int ind) const;
 
+    /// Get the solver state after the last solve
+    virtual Dict getWarmStart() const;
+
+    /// Warm start the next solve
+    virtual void setWarmStart(const Dict& state);
+
+    /// Solver-specific entries of the warm start state honoured by the plugin
+    virtual std::vector<std::string> getWarmStartKeys() const;
+
   protected:
 
+    /// Warm start state passed to setWarmStart, for use by the next solve
+    Dict warm_start_;
+
     /// Problem structure
     std::vector<Sparsity> st_;
 
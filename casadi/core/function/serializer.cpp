@@ -0,0 +1,188 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+#include "serializer.hpp"
+#include "sx_function_internal.hpp"
+#include "mx_function_internal.hpp"
+
+using namespace std;
+
+namespace casadi {
+
+  // Identifies the format, increase the version when the format changes
+  static const char serializer_magic[] = "casadi_function";
+  static const int serializer_version = 1;
+
+  Serializer::Serializer(std::ostream& out, bool structure_only) :
+    out_(out), structure_only_(structure_only) {
+    pack(string(serializer_magic));
+    pack(serializer_version);
+  }
+
+  void Serializer::pack(int e) {
+    out_.write(reinterpret_cast<const char*>(&e), sizeof(int));
+  }
+
+  void Serializer::pack(double e) {
+    out_.write(reinterpret_cast<const char*>(&e), sizeof(double));
+  }
+
+  void Serializer::pack(const std::string& e) {
+    pack(static_cast<int>(e.size()));
+    out_.write(e.data(), e.size());
+  }
+
+  void Serializer::pack(const std::vector<int>& e) {
+    packRaw(e);
+  }
+
+  void Serializer::pack(const std::vector<double>& e) {
+    packRaw(e);
+  }
+
+  void Serializer::pack(const std::vector<std::string>& e) {
+    pack(static_cast<int>(e.size()));
+    for (vector<string>::const_iterator it=e.begin(); it!=e.end(); ++it) pack(*it);
+  }
+
+  void Serializer::pack(const Sparsity& e) {
+    pack(e.size1());
+    pack(e.size2());
+    pack(e.getColind());
+    pack(e.getRow());
+  }
+
+  void Serializer::pack(const Matrix<double>& e) {
+    pack(e.sparsity());
+    if (!structure_only_) pack(e.data());
+  }
+
+  void Serializer::pack(const Function& e) {
+    casadi_assert_message(!e.isNull(), "Serializer: Cannot serialize a null Function");
+
+    // Already written?
+    map<const SharedObjectNode*, int>::const_iterator it=functions_.find(e.get());
+    if (it!=functions_.end()) {
+      pack(it->second);
+      return;
+    }
+
+    // Write the function
+    pack(-1);
+    e->serialize(*this);
+    int ind = functions_.size();
+    functions_[e.get()] = ind;
+  }
+
+  Deserializer::Deserializer(std::istream& in) : in_(in) {
+    string magic;
+    int version;
+    unpack(magic);
+    casadi_assert_message(magic==serializer_magic,
+                          "Deserializer: Not a serialized CasADi Function");
+    unpack(version);
+    casadi_assert_message(version==serializer_version,
+                          "Deserializer: Unsupported format version " << version
+                          << ", expected " << serializer_version);
+  }
+
+  void Deserializer::read(char* s, std::streamsize n) {
+    in_.read(s, n);
+    casadi_assert_message(in_.gcount()==n, "Deserializer: Unexpected end of stream");
+  }
+
+  void Deserializer::unpack(int& e) {
+    read(reinterpret_cast<char*>(&e), sizeof(int));
+  }
+
+  void Deserializer::unpack(double& e) {
+    read(reinterpret_cast<char*>(&e), sizeof(double));
+  }
+
+  void Deserializer::unpack(std::string& e) {
+    int n;
+    unpack(n);
+    e.resize(n);
+    if (n>0) read(&e[0], n);
+  }
+
+  void Deserializer::unpack(std::vector<int>& e) {
+    unpackRaw(e);
+  }
+
+  void Deserializer::unpack(std::vector<double>& e) {
+    unpackRaw(e);
+  }
+
+  void Deserializer::unpack(std::vector<std::string>& e) {
+    int n;
+    unpack(n);
+    e.resize(n);
+    for (vector<string>::iterator it=e.begin(); it!=e.end(); ++it) unpack(*it);
+  }
+
+  void Deserializer::unpack(Sparsity& e) {
+    int nrow, ncol;
+    vector<int> colind, row;
+    unpack(nrow);
+    unpack(ncol);
+    unpack(colind);
+    unpack(row);
+    e = Sparsity(nrow, ncol, colind, row);
+  }
+
+  void Deserializer::unpack(Matrix<double>& e) {
+    Sparsity sp;
+    vector<double> nz;
+    unpack(sp);
+    unpack(nz);
+    e = Matrix<double>(sp, nz);
+  }
+
+  void Deserializer::unpack(Function& e) {
+    int ind;
+    unpack(ind);
+
+    // Read before
+    if (ind>=0) {
+      casadi_assert_message(ind<functions_.size(), "Deserializer: Corrupt stream");
+      e = functions_[ind];
+      return;
+    }
+
+    // Read the function, the type is written first
+    string type;
+    unpack(type);
+    if (type=="SXFunction") {
+      e = SXFunctionInternal::deserialize(*this);
+    } else if (type=="MXFunction") {
+      e = MXFunctionInternal::deserialize(*this);
+    } else {
+      casadi_error("Deserializer: Unknown function type \"" + type + "\"");
+    }
+    functions_.push_back(e);
+  }
+
+} // namespace casadi
@@ -0,0 +1,126 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+#ifndef CASADI_SERIALIZER_HPP
+#define CASADI_SERIALIZER_HPP
+
+#include "function.hpp"
+#include <iostream>
+#include <map>
+
+/// \cond INTERNAL
+namespace casadi {
+
+  /** \brief Binary output stream for Function serialization
+
+      Numbers are written in the native binary representation, so a serialized
+      function can only be read back on a platform with the same byte order.
+      Functions that are embedded more than once are only written once.
+
+      With structure_only set, names and numerical values are left out, so that
+      the output only identifies the structure of the functions. Such output
+      cannot be deserialized.
+  */
+  class CASADI_EXPORT Serializer {
+  public:
+    /// Constructor, writes the header
+    explicit Serializer(std::ostream& out, bool structure_only=false);
+
+    /// Are names and numerical values left out?
+    bool structureOnly() const { return structure_only_;}
+
+    ///@{
+    /// Write an object
+    void pack(int e);
+    void pack(double e);
+    void pack(const std::string& e);
+    void pack(const std::vector<int>& e);
+    void pack(const std::vector<double>& e);
+    void pack(const std::vector<std::string>& e);
+    void pack(const Sparsity& e);
+    void pack(const Matrix<double>& e);
+    void pack(const Function& e);
+    ///@}
+
+    /// Write a vector of plain data structures in one block
+    template<typename T>
+    void packRaw(const std::vector<T>& e) {
+      pack(static_cast<int>(e.size()));
+      if (!e.empty()) out_.write(reinterpret_cast<const char*>(&e.front()), sizeof(T)*e.size());
+    }
+
+  private:
+    std::ostream& out_;
+
+    // Only write the structure
+    bool structure_only_;
+
+    // Functions written so far
+    std::map<const SharedObjectNode*, int> functions_;
+  };
+
+  /** \brief Binary input stream for Function serialization
+   */
+  class CASADI_EXPORT Deserializer {
+  public:
+    /// Constructor, reads and checks the header
+    explicit Deserializer(std::istream& in);
+
+    ///@{
+    /// Read an object
+    void unpack(int& e);
+    void unpack(double& e);
+    void unpack(std::string& e);
+    void unpack(std::vector<int>& e);
+    void unpack(std::vector<double>& e);
+    void unpack(std::vector<std::string>& e);
+    void unpack(Sparsity& e);
+    void unpack(Matrix<double>& e);
+    void unpack(Function& e);
+    ///@}
+
+    /// Read a vector of plain data structures in one block
+    template<typename T>
+    void unpackRaw(std::vector<T>& e) {
+      int n;
+      unpack(n);
+      e.resize(n);
+      if (n>0) read(reinterpret_cast<char*>(&e.front()), sizeof(T)*n);
+    }
+
+  private:
+    /// Read raw data, checking for a premature end of the stream
+    void read(char* s, std::streamsize n);
+
+    std::istream& in_;
+
+    // Functions read so far
+    std::vector<Function> functions_;
+  };
+
+} // namespace casadi
+/// \endcond
+
+#endif // CASADI_SERIALIZER_HPP
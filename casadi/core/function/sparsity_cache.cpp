@@ -0,0 +1,180 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+
+#include "sparsity_cache.hpp"
+#include <list>
+#include <map>
+#ifdef USE_CXX11
+#include <mutex>
+#endif // USE_CXX11
+
+using namespace std;
+
+namespace casadi {
+
+  // Forward declaration
+  struct SparsityCacheEntry;
+  typedef map<string, SparsityCacheEntry> SparsityCacheMap;
+
+  struct SparsityCacheEntry {
+    // Cached sparsity patterns
+    vector<Sparsity> value;
+
+    // Approximate memory use in bytes
+    size_t bytes;
+
+    // Position in the least recently used list
+    list<SparsityCacheMap::iterator>::iterator lru;
+  };
+
+  struct SparsityCacheData {
+    SparsityCacheData() : max_bytes(100e6), bytes(0), hits(0), misses(0) {}
+
+    // Entries and their use, most recently used first
+    SparsityCacheMap entries;
+    list<SparsityCacheMap::iterator> lru;
+
+    // Maximum and current size in bytes
+    double max_bytes;
+    size_t bytes;
+
+    // Statistics
+    int hits, misses;
+
+#ifdef USE_CXX11
+    // Functions can be set up from different threads
+    mutex mtx;
+#endif // USE_CXX11
+
+    // Remove least recently used entries until the size limit is respected
+    void shrink() {
+      while (!lru.empty() && bytes>max_bytes) {
+        bytes -= lru.back()->second.bytes;
+        entries.erase(lru.back());
+        lru.pop_back();
+      }
+    }
+  };
+
+  // Constructed on first use
+  static SparsityCacheData& cache() {
+    static SparsityCacheData c;
+    return c;
+  }
+
+#ifdef USE_CXX11
+#define CASADI_SPARSITY_CACHE_LOCK lock_guard<mutex> lock(c.mtx)
+#else // USE_CXX11
+#define CASADI_SPARSITY_CACHE_LOCK
+#endif // USE_CXX11
+
+  void SparsityCache::setMaxSize(double mb) {
+    casadi_assert_message(mb>=0, "SparsityCache::setMaxSize: Size must be nonnegative");
+    SparsityCacheData& c = cache();
+    CASADI_SPARSITY_CACHE_LOCK;
+    c.max_bytes = mb*1e6;
+    c.shrink();
+  }
+
+  double SparsityCache::getMaxSize() {
+    SparsityCacheData& c = cache();
+    CASADI_SPARSITY_CACHE_LOCK;
+    return c.max_bytes/1e6;
+  }
+
+  int SparsityCache::getNumEntries() {
+    SparsityCacheData& c = cache();
+    CASADI_SPARSITY_CACHE_LOCK;
+    return c.entries.size();
+  }
+
+  int SparsityCache::getHits() {
+    SparsityCacheData& c = cache();
+    CASADI_SPARSITY_CACHE_LOCK;
+    return c.hits;
+  }
+
+  int SparsityCache::getMisses() {
+    SparsityCacheData& c = cache();
+    CASADI_SPARSITY_CACHE_LOCK;
+    return c.misses;
+  }
+
+  void SparsityCache::clear() {
+    SparsityCacheData& c = cache();
+    CASADI_SPARSITY_CACHE_LOCK;
+    c.entries.clear();
+    c.lru.clear();
+    c.bytes = 0;
+    c.hits = c.misses = 0;
+  }
+
+  bool SparsityCache::get(const std::string& key, std::vector<Sparsity>& value) {
+    SparsityCacheData& c = cache();
+    CASADI_SPARSITY_CACHE_LOCK;
+    SparsityCacheMap::iterator it = c.entries.find(key);
+    if (it==c.entries.end()) {
+      c.misses++;
+      return false;
+    }
+    c.hits++;
+    value = it->second.value;
+
+    // Mark as most recently used
+    c.lru.splice(c.lru.begin(), c.lru, it->second.lru);
+    return true;
+  }
+
+  void SparsityCache::set(const std::string& key, const std::vector<Sparsity>& value) {
+    // Approximate memory use
+    size_t bytes = key.size();
+    for (vector<Sparsity>::const_iterator i=value.begin(); i!=value.end(); ++i) {
+      if (!i->isNull()) bytes += sizeof(int)*(i->size2()+1+i->nnz());
+    }
+
+    SparsityCacheData& c = cache();
+    CASADI_SPARSITY_CACHE_LOCK;
+    if (bytes>c.max_bytes) return;
+
+    // Replace an existing entry
+    SparsityCacheMap::iterator it = c.entries.find(key);
+    if (it!=c.entries.end()) {
+      c.bytes -= it->second.bytes;
+      c.lru.erase(it->second.lru);
+      c.entries.erase(it);
+    }
+
+    // Add as the most recently used entry
+    it = c.entries.insert(make_pair(key, SparsityCacheEntry())).first;
+    it->second.value = value;
+    it->second.bytes = bytes;
+    c.lru.push_front(it);
+    it->second.lru = c.lru.begin();
+    c.bytes += bytes;
+    c.shrink();
+  }
+
+} // namespace casadi
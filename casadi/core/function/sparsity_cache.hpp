@@ -0,0 +1,85 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+
+#ifndef CASADI_SPARSITY_CACHE_HPP
+#define CASADI_SPARSITY_CACHE_HPP
+
+#include "../matrix/sparsity.hpp"
+
+namespace casadi {
+
+  /** \brief Process-wide cache of Jacobian sparsity patterns and graph colorings
+
+      Determining the sparsity pattern of a Jacobian or Hessian and coloring it
+      can take a significant part of the set-up time of a large problem. Functions
+      with identical structure, e.g. an NLP which is rebuilt with new data, share these
+      results through this cache.
+
+      Functions are identified by their serialization without names and numerical
+      values, which is compared in full. Only SXFunction and MXFunction (embedding only
+      such functions) take part. The least recently used entries are removed when the
+      cache grows beyond its maximum size.
+
+      This class must never be instantiated. Access its static members directly.
+  */
+  class CASADI_EXPORT SparsityCache {
+  private:
+    /// No instances are allowed
+    SparsityCache();
+
+  public:
+    /// Set the maximum size of the cache in MB, 0 disables the cache (default 100)
+    static void setMaxSize(double mb);
+
+    /// Get the maximum size of the cache in MB
+    static double getMaxSize();
+
+    /// Number of entries in the cache
+    static int getNumEntries();
+
+    /// Number of lookups that were found in the cache
+    static int getHits();
+
+    /// Number of lookups that were not found in the cache
+    static int getMisses();
+
+    /// Remove all entries and reset the counters
+    static void clear();
+
+#ifndef SWIG
+    /// \cond INTERNAL
+    /// Look up an entry, counts as a hit or a miss
+    static bool get(const std::string& key, std::vector<Sparsity>& value);
+
+    /// Add an entry, removing the least recently used entries if needed
+    static void set(const std::string& key, const std::vector<Sparsity>& value);
+    /// \endcond
+#endif // SWIG
+  };
+
+} // namespace casadi
+
+#endif // CASADI_SPARSITY_CACHE_HPP
@@ -166,6 +166,44 @@ namespace casadi {
     return (*this)->algorithm_;
   }
 
+  std::vector<DMatrix> SXFunction::evalBatch(const std::vector<DMatrix>& arg) {
+    assertInit();
+    casadi_assert_message(arg.size()==nIn(),
+                          "SXFunction::evalBatch: Expected " << nIn() << " inputs, but got "
+                          << arg.size() << ".");
+
+    // Number of input sets
+    int K = arg.empty() ? 1 : arg.front().size2();
+
+    // Lane-wise storage: the transpose of the dense arguments
+    vector<DMatrix> arg_t(arg.size());
+    vector<const double*> argp(arg.size());
+    for (int i=0; i<arg.size(); ++i) {
+      casadi_assert_message(arg[i].size1()==input(i).nnz() && arg[i].size2()==K,
+                            "SXFunction::evalBatch: Dimension mismatch for input " << i
+                            << ". Expected " << input(i).nnz() << "-by-" << K << ", but got "
+                            << arg[i].dimString() << ".");
+      arg_t[i] = densify(arg[i]).T();
+      argp[i] = getPtr(arg_t[i].data());
+    }
+
+    vector<DMatrix> res_t(nOut());
+    vector<double*> resp(nOut());
+    for (int i=0; i<nOut(); ++i) {
+      res_t[i] = DMatrix::zeros(K, output(i).nnz());
+      resp[i] = getPtr(res_t[i].data());
+    }
+
+    // Evaluate
+    vector<double> w((*this)->sz_w()*K);
+    (*this)->evalBatch(getPtr(argp), getPtr(resp), getPtr(w), K);
+
+    // Return, one column per set
+    vector<DMatrix> res(nOut());
+    for (int i=0; i<nOut(); ++i) res[i] = res_t[i].T();
+    return res;
+  }
+
   int SXFunction::countNodes() const {
     assertInit();
     return algorithm().size() - nnzOut();
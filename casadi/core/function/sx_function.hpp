@@ -210,6 +210,14 @@ namespace casadi {
 #endif // SWIG
 /// \endcond
 
+    /** \brief Evaluate numerically for several input sets in one sweep of the algorithm
+     *
+     * Input i is a dense matrix with input(i).nnz() rows and K columns, column k holding
+     * the nonzeros of the k-th input set. Output i is returned in the same format,
+     * with output(i).nnz() rows and K columns.
+     */
+    std::vector<DMatrix> evalBatch(const std::vector<DMatrix>& arg);
+
     /** \brief Get the number of atomic operations */
     int getAlgorithmSize() const { return algorithm().size();}
 
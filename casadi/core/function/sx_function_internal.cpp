@@ -32,6 +32,9 @@
 #include <iomanip>
 #include "../std_vector_tools.hpp"
 #include "../sx/sx_node.hpp"
+#include "../sx/unary_sx.hpp"
+#include "../sx/binary_sx.hpp"
+#include "serializer.hpp"
 #include "../casadi_types.hpp"
 #include "../matrix/sparsity_internal.hpp"
 #include "../profiling.hpp"
@@ -51,6 +54,13 @@ namespace casadi {
               "compilation to a CPU or GPU using OpenCL");
     addOption("just_in_time_opencl", OT_BOOLEAN, false,
               "Just-in-time compilation for numeric evaluation using OpenCL (experimental)");
+    addOption("cse", OT_BOOLEAN, false,
+              "Eliminate common subexpressions: operations which are structurally equal "
+              "to an earlier operation in the algorithm are only evaluated once");
+    addOption("optimize_algorithm", OT_BOOLEAN, false,
+              "Optimize the algorithm before evaluation and code generation: fold constants, "
+              "replace operations by cheaper equivalents (e.g. x*x by sq(x), x*1 by x) and "
+              "remove instructions whose result is not used");
 
     casadi_assert(!outputv_.empty()); // NOTE: Remove?
 
@@ -135,6 +145,41 @@ namespace casadi {
   }
 
 
+  void SXFunctionInternal::evalBatch(const double** arg, double** res, double* w, int K) {
+    casadi_msg("SXFunctionInternal::evalBatch():begin  " << getOption("name"));
+
+    if (!free_vars_.empty()) {
+      std::stringstream ss;
+      repr(ss);
+      casadi_error("Cannot evaluate \"" << ss.str() << "\" since variables "
+                   << free_vars_ << " are free.");
+    }
+
+    // Evaluate the algorithm, each operation working on a lane of K elements
+    for (vector<AlgEl>::iterator it=algorithm_.begin(); it!=algorithm_.end(); ++it) {
+      double* w0 = w + it->i0*K;
+      switch (it->op) {
+      case OP_CONST:
+        std::fill(w0, w0+K, it->d);
+        break;
+      case OP_INPUT:
+        if (arg[it->i1]==0) {
+          std::fill(w0, w0+K, 0);
+        } else {
+          std::copy(arg[it->i1]+it->i2*K, arg[it->i1]+(it->i2+1)*K, w0);
+        }
+        break;
+      case OP_OUTPUT:
+        if (res[it->i0]!=0) std::copy(w+it->i1*K, w+(it->i1+1)*K, res[it->i0]+it->i2*K);
+        break;
+      default:
+        casadi_math<double>::fun(it->op, w+it->i1*K, w+it->i2*K, w0, K);
+      }
+    }
+
+    casadi_msg("SXFunctionInternal::evalBatch():end " << getOption("name"));
+  }
+
   SX SXFunctionInternal::hess(int iind, int oind) {
     casadi_assert_message(output(oind).numel() == 1, "Function must be scalar");
     SX g = grad(iind, oind);
@@ -272,122 +317,177 @@ namespace casadi {
     // Call the init function of the base class
     XFunctionInternal<SXFunction, SXFunctionInternal, SX, SXNode>::init();
 
-    // Stack used to sort the computational graph
-    stack<SXNode*> s;
-
     // All nodes
     vector<SXNode*> nodes;
 
-    // Add the list of nodes
-    int ind=0;
-    for (vector<SX >::iterator it = outputv_.begin(); it != outputv_.end(); ++it, ++ind) {
-      int nz=0;
-      for (vector<SXElement>::iterator itc = it->begin(); itc != it->end(); ++itc, ++nz) {
-        // Add outputs to the list
-        s.push(itc->get());
-        sort_depth_first(s, nodes);
-
-        // A null pointer means an output instruction
-        nodes.push_back(static_cast<SXNode*>(0));
-      }
-    }
+    // Input instructions
+    vector<pair<int, SXNode*> > symb_loc;
 
-    // Set the temporary variables to be the corresponding place in the sorted graph
-    for (int i=0; i<nodes.size(); ++i) {
-      if (nodes[i]) {
-        nodes[i]->temp = i;
+    // Sort the graph and build the algorithm. This uses the temporary markers of
+    // (possibly shared) nodes, which are reset before the lock is released
+    {
+      SymbolicLock lock(casadi_temp_mutex());
+
+      // Stack used to sort the computational graph
+      stack<SXNode*> s;
+
+      // Add the list of nodes
+      int ind=0;
+      for (vector<SX >::iterator it = outputv_.begin(); it != outputv_.end(); ++it, ++ind) {
+        int nz=0;
+        for (vector<SXElement>::iterator itc = it->begin(); itc != it->end(); ++itc, ++nz) {
+          // Add outputs to the list
+          s.push(itc->get());
+          sort_depth_first(s, nodes);
+
+          // A null pointer means an output instruction
+          nodes.push_back(static_cast<SXNode*>(0));
+        }
       }
-    }
 
-    // Sort the nodes by type
-    constants_.clear();
-    operations_.clear();
-    for (vector<SXNode*>::iterator it = nodes.begin(); it != nodes.end(); ++it) {
-      SXNode* t = *it;
-      if (t) {
-        if (t->isConstant())
-          constants_.push_back(SXElement::create(t));
-        else if (!t->isSymbolic())
-          operations_.push_back(SXElement::create(t));
+      // Set the temporary variables to be the corresponding place in the sorted graph
+      for (int i=0; i<nodes.size(); ++i) {
+        if (nodes[i]) {
+          nodes[i]->temp = i;
+        }
       }
-    }
-
-    // Use live variables?
-    bool live_variables = getOption("live_variables");
 
-    // Input instructions
-    vector<pair<int, SXNode*> > symb_loc;
+      // Operations which are structurally equal to an earlier operation
+      vector<SXNode*> duplicates;
+
+      // Eliminate common subexpressions
+      if (getOption("cse")) {
+        // Operations in the algorithm, identified by the operation and the place of the
+        // dependencies. Since the dependencies have already been made unique, this is
+        // equivalent to comparing the expressions with isEqual to an unlimited depth
+        map<pair<int, pair<int, int> >, int> ops;
+        vector<SXNode*> unique_nodes;
+        unique_nodes.reserve(nodes.size());
+        for (vector<SXNode*>::iterator it = nodes.begin(); it != nodes.end(); ++it) {
+          SXNode* t = *it;
+          if (t && t->hasDep()) {
+            int i1 = t->dep(0).get()->temp;
+            int i2 = t->ndep()>1 ? t->dep(1).get()->temp : -1;
+            if (operation_checker<CommChecker>(t->getOp()) && i2<i1) swap(i1, i2);
+            pair<map<pair<int, pair<int, int> >, int>::iterator, bool> ins =
+              ops.insert(make_pair(make_pair(t->getOp(), make_pair(i1, i2)),
+                                   unique_nodes.size()));
+            if (!ins.second) {
+              // Refer to the earlier operation instead
+              t->temp = ins.first->second;
+              duplicates.push_back(t);
+              continue;
+            }
+          }
+          if (t) t->temp = unique_nodes.size();
+          unique_nodes.push_back(t);
+        }
+        if (verbose()) {
+          userOut() << "Common subexpression elimination removed " << duplicates.size()
+                    << " operations" << endl;
+        }
+        nodes.swap(unique_nodes);
+      }
 
-    // Current output and nonzero, start with the first one
-    int curr_oind, curr_nz=0;
-    for (curr_oind=0; curr_oind<outputv_.size(); ++curr_oind) {
-      if (outputv_[curr_oind].nnz()!=0) {
-        break;
+      // Sort the nodes by type
+      constants_.clear();
+      operations_.clear();
+      for (vector<SXNode*>::iterator it = nodes.begin(); it != nodes.end(); ++it) {
+        SXNode* t = *it;
+        if (t) {
+          if (t->isConstant())
+            constants_.push_back(SXElement::create(t));
+          else if (!t->isSymbolic())
+            operations_.push_back(SXElement::create(t));
+        }
       }
-    }
 
-    // Count the number of times each node is used
-    vector<int> refcount(nodes.size(), 0);
+      // Current output and nonzero, start with the first one
+      int curr_oind, curr_nz=0;
+      for (curr_oind=0; curr_oind<outputv_.size(); ++curr_oind) {
+        if (outputv_[curr_oind].nnz()!=0) {
+          break;
+        }
+      }
 
-    // Get the sequence of instructions for the virtual machine
-    algorithm_.resize(0);
-    algorithm_.reserve(nodes.size());
-    for (vector<SXNode*>::iterator it=nodes.begin(); it!=nodes.end(); ++it) {
-      // Current node
-      SXNode* n = *it;
+      // Get the sequence of instructions for the virtual machine
+      algorithm_.resize(0);
+      algorithm_.reserve(nodes.size());
+      for (vector<SXNode*>::iterator it=nodes.begin(); it!=nodes.end(); ++it) {
+        // Current node
+        SXNode* n = *it;
 
-      // New element in the algorithm
-      AlgEl ae;
+        // New element in the algorithm
+        AlgEl ae;
 
-      // Get operation
-      ae.op = n==0 ? OP_OUTPUT : n->getOp();
+        // Get operation
+        ae.op = n==0 ? OP_OUTPUT : n->getOp();
 
-      // Get instruction
-      switch (ae.op) {
-      case OP_CONST: // constant
-        ae.d = n->getValue();
-        ae.i0 = n->temp;
-        break;
-      case OP_PARAMETER: // a parameter or input
-        symb_loc.push_back(make_pair(algorithm_.size(), n));
-        ae.i0 = n->temp;
-        break;
-      case OP_OUTPUT: // output instruction
-        ae.i0 = curr_oind;
-        ae.i1 = outputv_[curr_oind].at(curr_nz)->temp;
-        ae.i2 = curr_nz;
-
-        // Go to the next nonzero
-        curr_nz++;
-        if (curr_nz>=outputv_[curr_oind].nnz()) {
-          curr_nz=0;
-          curr_oind++;
-          for (; curr_oind<outputv_.size(); ++curr_oind) {
-            if (outputv_[curr_oind].nnz()!=0) {
-              break;
+        // Get instruction
+        switch (ae.op) {
+        case OP_CONST: // constant
+          ae.d = n->getValue();
+          ae.i0 = n->temp;
+          break;
+        case OP_PARAMETER: // a parameter or input
+          symb_loc.push_back(make_pair(algorithm_.size(), n));
+          ae.i0 = n->temp;
+          break;
+        case OP_OUTPUT: // output instruction
+          ae.i0 = curr_oind;
+          ae.i1 = outputv_[curr_oind].at(curr_nz)->temp;
+          ae.i2 = curr_nz;
+
+          // Go to the next nonzero
+          curr_nz++;
+          if (curr_nz>=outputv_[curr_oind].nnz()) {
+            curr_nz=0;
+            curr_oind++;
+            for (; curr_oind<outputv_.size(); ++curr_oind) {
+              if (outputv_[curr_oind].nnz()!=0) {
+                break;
+              }
             }
           }
+          break;
+        default:       // Unary or binary operation
+          ae.i0 = n->temp;
+          ae.i1 = n->dep(0).get()->temp;
+          ae.i2 = n->dep(1).get()->temp;
         }
-        break;
-      default:       // Unary or binary operation
-        ae.i0 = n->temp;
-        ae.i1 = n->dep(0).get()->temp;
-        ae.i2 = n->dep(1).get()->temp;
+
+        // Add to algorithm
+        algorithm_.push_back(ae);
       }
 
-      // Number of dependencies
-      int ndeps = casadi_math<double>::ndeps(ae.op);
+      // Reset the temporary variables
+      for (int i=0; i<nodes.size(); ++i) {
+        if (nodes[i]) {
+          nodes[i]->temp = 0;
+        }
+      }
+      for (vector<SXNode*>::iterator it=duplicates.begin(); it!=duplicates.end(); ++it) {
+        (*it)->temp = 0;
+      }
+    }
 
-      // Increase count of dependencies
+    // Optimize the algorithm
+    if (getOption("optimize_algorithm")) optimizeAlgorithm(nodes, symb_loc);
+
+    // Count the number of times each node is used
+    vector<int> refcount(nodes.size(), 0);
+    for (vector<AlgEl>::const_iterator it=algorithm_.begin(); it!=algorithm_.end(); ++it) {
+      int ndeps = casadi_math<double>::ndeps(it->op);
       for (int c=0; c<ndeps; ++c) {
-        refcount.at(c==0 ? ae.i1 : ae.i2)++;
+        refcount.at(c==0 ? it->i1 : it->i2)++;
       }
-      // Add to algorithm
-      algorithm_.push_back(ae);
     }
 
+    // Use live variables?
+    bool live_variables = getOption("live_variables");
+
     // Place in the work vector for each of the nodes in the tree (overwrites the reference counter)
-    vector<int> place(nodes.size());
+    vector<int> place(algorithm_.size());
 
     // Stack with unused elements in the work vector
     stack<int> unused;
@@ -440,7 +540,7 @@ namespace casadi {
     if (verbose()) {
       if (live_variables) {
         userOut() << "Using live variables: work array is "
-             <<  worksize << " instead of " << nodes.size() << endl;
+             <<  worksize << " instead of " << algorithm_.size() << endl;
       } else {
         userOut() << "Live variables disabled." << endl;
       }
@@ -451,50 +551,48 @@ namespace casadi {
     alloc();
     s_work_.resize(worksize);
 
-    // Reset the temporary variables
-    for (int i=0; i<nodes.size(); ++i) {
-      if (nodes[i]) {
-        nodes[i]->temp = 0;
-      }
-    }
-
-    // Now mark each input's place in the algorithm
-    for (vector<pair<int, SXNode*> >::const_iterator it=symb_loc.begin();
-         it!=symb_loc.end(); ++it) {
-      it->second->temp = it->first+1;
-    }
-
-    // Add input instructions
-    for (int ind=0; ind<inputv_.size(); ++ind) {
-      int nz=0;
-      for (vector<SXElement>::iterator itc = inputv_[ind].begin();
-          itc != inputv_[ind].end();
-          ++itc, ++nz) {
-        int i = itc->getTemp()-1;
-        if (i>=0) {
-          // Mark as input
-          algorithm_[i].op = OP_INPUT;
+    // Mark the inputs and locate the free variables, again using the temporary markers
+    {
+      SymbolicLock lock(casadi_temp_mutex());
 
-          // Location of the input
-          algorithm_[i].i1 = ind;
-          algorithm_[i].i2 = nz;
+      // Now mark each input's place in the algorithm
+      for (vector<pair<int, SXNode*> >::const_iterator it=symb_loc.begin();
+           it!=symb_loc.end(); ++it) {
+        it->second->temp = it->first+1;
+      }
 
-          // Mark input as read
-          itc->setTemp(0);
+      // Add input instructions
+      for (int ind=0; ind<inputv_.size(); ++ind) {
+        int nz=0;
+        for (vector<SXElement>::iterator itc = inputv_[ind].begin();
+            itc != inputv_[ind].end();
+            ++itc, ++nz) {
+          int i = itc->getTemp()-1;
+          if (i>=0) {
+            // Mark as input
+            algorithm_[i].op = OP_INPUT;
+
+            // Location of the input
+            algorithm_[i].i1 = ind;
+            algorithm_[i].i2 = nz;
+
+            // Mark input as read
+            itc->setTemp(0);
+          }
         }
       }
-    }
 
-    // Locate free variables
-    free_vars_.clear();
-    for (vector<pair<int, SXNode*> >::const_iterator it=symb_loc.begin();
-         it!=symb_loc.end(); ++it) {
-      if (it->second->temp!=0) {
-        // Save to list of free parameters
-        free_vars_.push_back(SXElement::create(it->second));
+      // Locate free variables
+      free_vars_.clear();
+      for (vector<pair<int, SXNode*> >::const_iterator it=symb_loc.begin();
+           it!=symb_loc.end(); ++it) {
+        if (it->second->temp!=0) {
+          // Save to list of free parameters
+          free_vars_.push_back(SXElement::create(it->second));
 
-        // Remove marker
-        it->second->temp=0;
+          // Remove marker
+          it->second->temp=0;
+        }
       }
     }
 
@@ -574,6 +672,164 @@ namespace casadi {
     }
   }
 
+  void SXFunctionInternal::optimizeAlgorithm(const vector<SXNode*>& nodes,
+                                             vector<pair<int, SXNode*> >& symb_loc) {
+    int n = algorithm_.size();
+
+    // Instruction which calculates the same value, initially the instruction itself
+    vector<int> same(n);
+
+    // Is the value known at compile time
+    vector<bool> is_const(n, false);
+
+    // Expression corresponding to each instruction
+    vector<SXElement> ex(n);
+
+    // Statistics
+    int n_folded=0, n_reduced=0;
+
+    // Forward pass: constant folding and strength reduction
+    for (int k=0; k<n; ++k) {
+      AlgEl& e = algorithm_[k];
+      same[k] = k;
+      int ndeps = casadi_math<double>::ndeps(e.op);
+      if (e.op==OP_CONST) is_const[k] = true;
+      if (e.op==OP_OUTPUT) e.i1 = same[e.i1];
+      if (e.op!=OP_OUTPUT) ex[k] = SXElement::create(nodes[k]);
+      if (ndeps==0 || e.op==OP_OUTPUT) continue;
+
+      // Refer to the instructions that actually calculate the dependencies
+      const AlgEl e0 = e;
+      e.i1 = same[e.i1];
+      e.i2 = ndeps==1 ? e.i1 : same[e.i2];
+
+      // Constant dependencies
+      bool c1 = is_const[e.i1], c2 = is_const[e.i2];
+      double v1 = c1 ? algorithm_[e.i1].d : 0, v2 = c2 ? algorithm_[e.i2].d : 0;
+
+      // Constant folding
+      if (c1 && c2 && e.op!=OP_PRINTME) {
+        double r;
+        casadi_math<double>::fun(e.op, v1, v2, r);
+        e.op = OP_CONST;
+        e.d = r;
+        ex[k] = r;
+        is_const[k] = true;
+        n_folded++;
+        continue;
+      }
+
+      // Strength reduction, only where the result is bitwise identical
+      int op = e.op;
+      switch (e.op) {
+      case OP_MUL:
+        if (c1) {
+          // Make sure that a constant is the second argument
+          std::swap(e.i1, e.i2);
+          std::swap(c1, c2);
+          std::swap(v1, v2);
+        }
+        if (e.i1==e.i2) {
+          e.op = OP_SQ;
+        } else if (c2 && v2==1) {
+          same[k] = e.i1;
+        } else if (c2 && v2==-1) {
+          e.op = OP_NEG;
+        } else if (c2 && v2==2) {
+          e.op = OP_TWICE;
+        }
+        break;
+      case OP_DIV:
+        if (c2 && v2==1) {
+          same[k] = e.i1;
+        } else if (c2 && v2==-1) {
+          e.op = OP_NEG;
+        }
+        break;
+      case OP_ADD:
+        if (e.i1==e.i2) {
+          e.op = OP_TWICE;
+        } else if (c2 && v2==0 && 1/v2<0) { // x + (-0) == x
+          same[k] = e.i1;
+        } else if (c1 && v1==0 && 1/v1<0) {
+          same[k] = e.i2;
+        }
+        break;
+      case OP_SUB:
+        if (c2 && v2==0 && 1/v2>0) same[k] = e.i1; // x - (+0) == x
+        break;
+      case OP_POW:
+      case OP_CONSTPOW:
+        if (c2 && v2==1) {
+          same[k] = e.i1;
+        } else if (c2 && v2==2) {
+          e.op = OP_SQ;
+        }
+        break;
+      case OP_NEG:
+        if (algorithm_[e.i1].op==OP_NEG) same[k] = algorithm_[e.i1].i1;
+        break;
+      }
+      if (same[k]!=k || e.op!=op) n_reduced++;
+
+      // Unary operations use the first argument twice
+      if (casadi_math<double>::ndeps(e.op)==1) e.i2 = e.i1;
+
+      // Derivatives are calculated from the expressions, which must match the instruction
+      if (same[k]==k && (e.op!=e0.op || e.i1!=e0.i1 || e.i2!=e0.i2)) {
+        if (casadi_math<double>::ndeps(e.op)==1) {
+          ex[k] = UnarySX::create(e.op, ex[e.i1]);
+        } else {
+          ex[k] = BinarySX::create(e.op, ex[e.i1], ex[e.i2]);
+        }
+      }
+    }
+
+    // Backward pass: mark the instructions whose result is used
+    vector<bool> live(n, false);
+    for (int k=n-1; k>=0; --k) {
+      const AlgEl& e = algorithm_[k];
+      if (e.op==OP_OUTPUT || e.op==OP_PARAMETER) live[k] = true;
+      if (!live[k] || same[k]!=k) continue;
+      int ndeps = casadi_math<double>::ndeps(e.op);
+      if (ndeps>=1) live[e.i1] = true;
+      if (ndeps==2) live[e.i2] = true;
+    }
+
+    // Remove the unused instructions
+    vector<int> new_ind(n, -1);
+    constants_.clear();
+    operations_.clear();
+    int m=0;
+    for (int k=0; k<n; ++k) {
+      if (!live[k]) continue;
+      AlgEl e = algorithm_[k];
+      new_ind[k] = m;
+      int ndeps = casadi_math<double>::ndeps(e.op);
+      if (e.op!=OP_OUTPUT) e.i0 = m;
+      if (ndeps>=1) e.i1 = new_ind[e.i1];
+      if (ndeps==2) e.i2 = new_ind[e.i2];
+      if (e.op==OP_CONST) {
+        constants_.push_back(ex[k]);
+      } else if (ndeps>=1 && e.op!=OP_OUTPUT) {
+        operations_.push_back(ex[k]);
+      }
+      algorithm_[m++] = e;
+    }
+    algorithm_.resize(m);
+
+    // Update the location of the symbolic primitives
+    for (vector<pair<int, SXNode*> >::iterator it=symb_loc.begin(); it!=symb_loc.end(); ++it) {
+      it->first = new_ind[it->first];
+    }
+
+    if (verbose()) {
+      userOut() << "SXFunctionInternal::optimizeAlgorithm: " << n << " instructions before, "
+                << m << " after (" << n_folded << " constants folded, "
+                << n_reduced << " operations reduced)" << endl;
+    }
+  }
+
   void SXFunctionInternal::evalSX(const SXElement** arg, SXElement** res,
                                   int* iw, SXElement* w) {
     if (verbose()) userOut() << "SXFunctionInternal::evalSXsparse begin" << endl;
@@ -837,6 +1093,129 @@ namespace casadi {
     s_work_.clear();
   }
 
+  void SXFunctionInternal::serialize(Serializer& s) const {
+    casadi_assert_message(inputv_.size()==nIn(),
+                          "SXFunction::serialize: Not possible after clearSymbolic()");
+    s.pack(string("SXFunction"));
+    if (!s.structureOnly()) {
+      s.pack(name_);
+      s.pack(ischeme_);
+      s.pack(oscheme_);
+    }
+
+    // Inputs: sparsity and names of the symbolic primitives
+    s.pack(nIn());
+    for (int i=0; i<nIn(); ++i) {
+      s.pack(inputv_[i].sparsity());
+      if (s.structureOnly()) continue;
+      vector<string> names(inputv_[i].nnz());
+      for (int k=0; k<names.size(); ++k) names[k] = inputv_[i].at(k).getName();
+      s.pack(names);
+    }
+
+    // Outputs: sparsity
+    s.pack(nOut());
+    for (int i=0; i<nOut(); ++i) s.pack(outputv_[i].sparsity());
+
+    // Free variables
+    if (s.structureOnly()) {
+      s.pack(static_cast<int>(free_vars_.size()));
+    } else {
+      vector<string> free_names(free_vars_.size());
+      for (int k=0; k<free_names.size(); ++k) free_names[k] = free_vars_[k].getName();
+      s.pack(free_names);
+    }
+
+    // The algorithm, constants are stored in place
+    s.pack(static_cast<int>(s_work_.size()));
+    if (s.structureOnly()) {
+      vector<AlgEl> alg = algorithm_;
+      for (vector<AlgEl>::iterator it=alg.begin(); it!=alg.end(); ++it) {
+        if (it->op==OP_CONST) it->d = 0;
+      }
+      s.packRaw(alg);
+    } else {
+      s.packRaw(algorithm_);
+    }
+  }
+
+  SXFunction SXFunctionInternal::deserialize(Deserializer& s) {
+    string name;
+    vector<string> ischeme, oscheme;
+    s.unpack(name);
+    s.unpack(ischeme);
+    s.unpack(oscheme);
+
+    // Create the symbolic inputs
+    int n_in;
+    s.unpack(n_in);
+    vector<SX> arg(n_in);
+    for (int i=0; i<n_in; ++i) {
+      Sparsity sp;
+      vector<string> names;
+      s.unpack(sp);
+      s.unpack(names);
+      casadi_assert_message(names.size()==sp.nnz(), "SXFunction::deserialize: Corrupt stream");
+      vector<SXElement> nz(names.size());
+      for (int k=0; k<nz.size(); ++k) nz[k] = SXElement::sym(names[k]);
+      arg[i] = SX(sp, nz, false);
+    }
+
+    // Allocate the outputs
+    int n_out;
+    s.unpack(n_out);
+    vector<SX> res(n_out);
+    for (int i=0; i<n_out; ++i) {
+      Sparsity sp;
+      s.unpack(sp);
+      res[i] = SX::zeros(sp);
+    }
+
+    // Create the free variables
+    vector<string> free_names;
+    s.unpack(free_names);
+    vector<SXElement> free_vars(free_names.size());
+    for (int k=0; k<free_vars.size(); ++k) free_vars[k] = SXElement::sym(free_names[k]);
+
+    // Read the algorithm
+    int worksize;
+    vector<AlgEl> algorithm;
+    s.unpack(worksize);
+    s.unpackRaw(algorithm);
+
+    // Replay the algorithm, creating the nodes directly (no simplifications)
+    vector<SXElement> w(worksize);
+    vector<SXElement>::const_iterator p_it = free_vars.begin();
+    for (vector<AlgEl>::const_iterator it=algorithm.begin(); it!=algorithm.end(); ++it) {
+      switch (it->op) {
+      case OP_INPUT:
+        w.at(it->i0) = arg.at(it->i1).at(it->i2);
+        break;
+      case OP_OUTPUT:
+        res.at(it->i0).at(it->i2) = w.at(it->i1);
+        break;
+      case OP_CONST:
+        w.at(it->i0) = it->d;
+        break;
+      case OP_PARAMETER:
+        casadi_assert_message(p_it!=free_vars.end(), "SXFunction::deserialize: Corrupt stream");
+        w.at(it->i0) = *p_it++;
+        break;
+      default:
+        if (casadi_math<double>::ndeps(it->op)==2) {
+          w.at(it->i0) = BinarySX::create(it->op, w.at(it->i1), w.at(it->i2));
+        } else {
+          w.at(it->i0) = UnarySX::create(it->op, w.at(it->i1));
+        }
+      }
+    }
+
+    Dict opts;
+    opts["input_scheme"] = ischeme;
+    opts["output_scheme"] = oscheme;
+    return SXFunction(name, arg, res, opts);
+  }
+
   void SXFunctionInternal::spInit(bool fwd) {
     // Quick return if just-in-time compilation for
     //  sparsity pattern propagation, no work vector needed
@@ -906,6 +1285,107 @@ namespace casadi {
     }
   }
 
+  template<int NW>
+  void SXFunctionInternal::spFwdBlock(const bvec_t** arg, bvec_t** res, bvec_t* w) {
+    // Propagate sparsity forward, NW words at a time
+    for (vector<AlgEl>::iterator it=algorithm_.begin(); it!=algorithm_.end(); ++it) {
+      bvec_t* w0 = w + NW*it->i0;
+      switch (it->op) {
+      case OP_CONST:
+      case OP_PARAMETER:
+        for (int k=0; k<NW; ++k) w0[k] = 0;
+        break;
+      case OP_INPUT:
+        if (arg[it->i1]==0) {
+          for (int k=0; k<NW; ++k) w0[k] = 0;
+        } else {
+          const bvec_t* a = arg[it->i1] + NW*it->i2;
+          for (int k=0; k<NW; ++k) w0[k] = a[k];
+        }
+        break;
+      case OP_OUTPUT:
+        if (res[it->i0]!=0) {
+          bvec_t* r = res[it->i0] + NW*it->i2;
+          const bvec_t* w1 = w + NW*it->i1;
+          for (int k=0; k<NW; ++k) r[k] = w1[k];
+        }
+        break;
+      default: // Unary or binary operation
+        {
+          const bvec_t* w1 = w + NW*it->i1;
+          const bvec_t* w2 = w + NW*it->i2;
+          for (int k=0; k<NW; ++k) w0[k] = w1[k] | w2[k];
+        }
+      }
+    }
+  }
+
+  template<int NW>
+  void SXFunctionInternal::spAdjBlock(bvec_t** arg, bvec_t** res, bvec_t* w) {
+    fill_n(w, NW*sz_w(), 0);
+
+    // Propagate sparsity backward, NW words at a time
+    for (vector<AlgEl>::reverse_iterator it=algorithm_.rbegin(); it!=algorithm_.rend(); ++it) {
+      bvec_t* w0 = w + NW*it->i0;
+      switch (it->op) {
+      case OP_CONST:
+      case OP_PARAMETER:
+        for (int k=0; k<NW; ++k) w0[k] = 0;
+        break;
+      case OP_INPUT:
+        if (arg[it->i1]!=0) {
+          bvec_t* a = arg[it->i1] + NW*it->i2;
+          for (int k=0; k<NW; ++k) a[k] |= w0[k];
+        }
+        for (int k=0; k<NW; ++k) w0[k] = 0;
+        break;
+      case OP_OUTPUT:
+        if (res[it->i0]!=0) {
+          bvec_t* r = res[it->i0] + NW*it->i2;
+          bvec_t* w1 = w + NW*it->i1;
+          for (int k=0; k<NW; ++k) {
+            w1[k] |= r[k];
+            r[k] = 0;
+          }
+        }
+        break;
+      default: // Unary or binary operation
+        {
+          bvec_t* w1 = w + NW*it->i1;
+          bvec_t* w2 = w + NW*it->i2;
+          for (int k=0; k<NW; ++k) {
+            bvec_t seed = w0[k];
+            w0[k] = 0;
+            w1[k] |= seed;
+            w2[k] |= seed;
+          }
+        }
+      }
+    }
+  }
+
+  void SXFunctionInternal::spFwdWide(const bvec_t** arg, bvec_t** res,
+                                     int* iw, bvec_t* w, int nw) {
+    switch (nw) {
+    case 1: spFwdBlock<1>(arg, res, w); break;
+    case 2: spFwdBlock<2>(arg, res, w); break;
+    case 4: spFwdBlock<4>(arg, res, w); break;
+    case 8: spFwdBlock<8>(arg, res, w); break;
+    default: casadi_error("SXFunctionInternal::spFwdWide: width " << nw << " not supported");
+    }
+  }
+
+  void SXFunctionInternal::spAdjWide(bvec_t** arg, bvec_t** res,
+                                     int* iw, bvec_t* w, int nw) {
+    switch (nw) {
+    case 1: spAdjBlock<1>(arg, res, w); break;
+    case 2: spAdjBlock<2>(arg, res, w); break;
+    case 4: spAdjBlock<4>(arg, res, w); break;
+    case 8: spAdjBlock<8>(arg, res, w); break;
+    default: casadi_error("SXFunctionInternal::spAdjWide: width " << nw << " not supported");
+    }
+  }
+
   Function SXFunctionInternal::getFullJacobian() {
     SX J = veccat(outputv_).zz_jacobian(veccat(inputv_));
     return SXFunction(name_ + "_jac", inputv_, make_vector(J));
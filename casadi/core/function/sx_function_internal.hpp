@@ -94,6 +94,13 @@ class CASADI_EXPORT SXFunctionInternal :
   /** \brief  Evaluate numerically, work vectors given */
   virtual void evalD(const double** arg, double** res, int* iw, double* w);
 
+  /** \brief  Evaluate numerically for K input sets in one sweep of the algorithm
+   *
+   * All vectors are stored lane-wise: nonzero j of the k-th set is found at j*K+k.
+   * The work vector must have length sz_w()*K.
+   */
+  void evalBatch(const double** arg, double** res, double* w, int K);
+
   /** \brief Quickfix to avoid segfault, #1552 */
   virtual bool canEvalSX() const {return true;}
 
@@ -158,6 +165,12 @@ class CASADI_EXPORT SXFunctionInternal :
   /** \brief  Initialize */
   virtual void init();
 
+  /** \brief Fold constants, reduce the strength of operations and remove dead instructions
+   * Works on the algorithm before the work vector has been assigned, when each instruction
+   * corresponds to one of the sorted nodes */
+  void optimizeAlgorithm(const std::vector<SXNode*>& nodes,
+                         std::vector<std::pair<int, SXNode*> >& symb_loc);
+
   /** \brief Generate code for the declarations of the C function */
   virtual void generateDeclarations(CodeGenerator& g) const;
 
@@ -168,12 +181,38 @@ class CASADI_EXPORT SXFunctionInternal :
    * no symbolic evaluations are possible after this */
   void clearSymbolic();
 
+  /** \brief Serialize the algorithm, constants, free variables and sparsities */
+  virtual void serialize(Serializer& s) const;
+
+  /** \brief Create a function by replaying a serialized algorithm */
+  static SXFunction deserialize(Deserializer& s);
+
   /** \brief  Propagate sparsity forward */
   virtual void spFwd(const bvec_t** arg, bvec_t** res, int* iw, bvec_t* w);
 
   /** \brief  Propagate sparsity backwards */
   virtual void spAdj(bvec_t** arg, bvec_t** res, int* iw, bvec_t* w);
 
+  /** \brief  Propagate sparsity forward, \a nw bit vectors per nonzero */
+  virtual void spFwdWide(const bvec_t** arg, bvec_t** res, int* iw, bvec_t* w, int nw);
+
+  /** \brief  Propagate sparsity backwards, \a nw bit vectors per nonzero */
+  virtual void spAdjWide(bvec_t** arg, bvec_t** res, int* iw, bvec_t* w, int nw);
+
+  /// Can eval be called from several threads at once, each with its own work vectors?
+  virtual bool isReentrant() const { return !just_in_time_opencl_;}
+
+  /// Maximum number of bit vectors per nonzero supported by spFwdWide/spAdjWide
+  virtual int spWidth() const { return just_in_time_sparsity_ ? 1 : 8;}
+
+  /// Forward sparsity propagation with a fixed number of bit vectors per nonzero
+  template<int NW>
+  void spFwdBlock(const bvec_t** arg, bvec_t** res, bvec_t* w);
+
+  /// Backward sparsity propagation with a fixed number of bit vectors per nonzero
+  template<int NW>
+  void spAdjBlock(bvec_t** arg, bvec_t** res, bvec_t* w);
+
   /// Is the class able to propagate seeds through the algorithm?
   virtual bool spCanEvaluate(bool fwd) { return true;}
 
@@ -76,9 +76,12 @@ namespace casadi {
     /** \brief Tangent via source code transformation */
     MatType tang(int iind=0, int oind=0);
 
-    /** \brief  Construct a complete Jacobian by compression */
+    /** \brief  Construct a complete Jacobian by compression
+     * The directions are spread over at least \a n_split derivative calls, if there are
+     * enough of them.
+     */
     MatType jac(int iind=0, int oind=0, bool compact=false, bool symmetric=false,
-                bool always_inline=true, bool never_inline=false);
+                bool always_inline=true, bool never_inline=false, int n_split=1);
 
     /** \brief Return gradient function  */
     virtual Function getGradient(const std::string& name, int iind, int oind, const Dict& opts);
@@ -163,17 +166,20 @@ namespace casadi {
     for (int i=0; i<outputv_.size(); ++i)
       output(i) = DMatrix::zeros(outputv_[i].sparsity());
 
-    // Check for duplicate entries among the input expressions
+    // Check for duplicate entries among the input expressions (marks the temporaries)
     bool has_duplicates = false;
-    for (typename std::vector<MatType>::iterator it = inputv_.begin();
-         it != inputv_.end(); ++it) {
-      has_duplicates = it->hasDuplicates() || has_duplicates;
-    }
+    {
+      SymbolicLock lock(casadi_temp_mutex());
+      for (typename std::vector<MatType>::iterator it = inputv_.begin();
+           it != inputv_.end(); ++it) {
+        has_duplicates = it->hasDuplicates() || has_duplicates;
+      }
 
-    // Reset temporaries
-    for (typename std::vector<MatType>::iterator it = inputv_.begin();
-         it != inputv_.end(); ++it) {
-      it->resetInput();
+      // Reset temporaries
+      for (typename std::vector<MatType>::iterator it = inputv_.begin();
+           it != inputv_.end(); ++it) {
+        it->resetInput();
+      }
     }
 
     if (has_duplicates) {
@@ -600,7 +606,8 @@ namespace casadi {
 
   template<typename PublicType, typename DerivedType, typename MatType, typename NodeType>
   MatType XFunctionInternal<PublicType, DerivedType, MatType, NodeType>
-  ::jac(int iind, int oind, bool compact, bool symmetric, bool always_inline, bool never_inline) {
+  ::jac(int iind, int oind, bool compact, bool symmetric, bool always_inline, bool never_inline,
+        int n_split) {
     using namespace std;
     if (verbose()) userOut() << "XFunctionInternal::jac begin" << std::endl;
 
@@ -638,6 +645,12 @@ namespace casadi {
     int max_nfdir = optimized_num_dir;
     int max_nadir = optimized_num_dir;
 
+    // Smaller batches, if the directions are to be spread over several calls
+    if (n_split>1) {
+      max_nfdir = std::max(1, std::min(max_nfdir, (nfdir+n_split-1)/n_split));
+      max_nadir = std::max(1, std::min(max_nadir, (nadir+n_split-1)/n_split));
+    }
+
     // Current forward and adjoint direction
     int offset_nfdir = 0, offset_nadir = 0;
 
@@ -364,8 +364,13 @@ namespace casadi {
   }
 
   vector<double> GenericType::toDoubleVector() const {
-    casadi_assert_message(isDoubleVector(), "type mismatch");
-    return asDoubleVector();
+    if (isIntVector()) {
+      const vector<int>& iv = asIntVector();
+      return vector<double>(iv.begin(), iv.end());
+    } else {
+      casadi_assert_message(isDoubleVector(), "type mismatch");
+      return asDoubleVector();
+    }
   }
 
   vector<string> GenericType::toStringVector() const {
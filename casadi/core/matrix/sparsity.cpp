@@ -469,6 +469,11 @@ namespace casadi {
     return ret;
   }
 
+  SymbolicMutex& Sparsity::getCacheMutex() {
+    static SymbolicMutex ret;
+    return ret;
+  }
+
   const Sparsity& Sparsity::getScalar() {
     static ScalarSparsity ret;
     return ret;
@@ -653,6 +658,7 @@ namespace casadi {
     std::size_t h = hash_sparsity(nrow, ncol, colind, row);
 
     // Get a reference to the cache
+    SymbolicLock lock(getCacheMutex());
     CachingMap& cache = getCache();
 
     // Record the current number of buckets (for garbage collection below)
@@ -674,11 +680,11 @@ namespace casadi {
         // Get a weak reference to the cached sparsity pattern
         WeakRef& wref = i->second;
 
-        // Check if the pattern still exists
-        if (wref.alive()) {
+        // Get an owning reference to the cached pattern, if it still exists
+        Sparsity ref = shared_cast<Sparsity>(wref.shared());
 
-          // Get an owning reference to the cached pattern
-          Sparsity ref = shared_cast<Sparsity>(wref.shared());
+        // Check if the pattern still exists
+        if (!ref.isNull()) {
 
           // Check if the pattern matches
           if (ref.isEqual(nrow, ncol, colind, row)) {
@@ -714,16 +720,13 @@ namespace casadi {
           CachingMap::iterator j=i;
           j++; // Start at the next matching key
           for (; j!=eq.second; ++j) {
-            if (j->second.alive()) {
-
-              // Recover cached sparsity
-              Sparsity ref = shared_cast<Sparsity>(j->second.shared());
+            // Recover cached sparsity
+            Sparsity ref = shared_cast<Sparsity>(j->second.shared());
 
-              // Match found if sparsity matches
-              if (ref.isEqual(nrow, ncol, colind, row)) {
-                assignNode(ref.get());
-                return;
-              }
+            // Match found if sparsity matches
+            if (!ref.isNull() && ref.isEqual(nrow, ncol, colind, row)) {
+              assignNode(ref.get());
+              return;
             }
           }
 
@@ -769,6 +772,7 @@ namespace casadi {
   }
 
   void Sparsity::clearCache() {
+    SymbolicLock lock(getCacheMutex());
     getCache().clear();
   }
 
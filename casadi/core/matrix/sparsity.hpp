@@ -624,6 +624,9 @@ namespace casadi {
     /// Cached sparsity patterns
     static CachingMap& getCache();
 
+    /// Mutex protecting the cache of sparsity patterns
+    static SymbolicMutex& getCacheMutex();
+
     /// (Dense) scalar
     static const Sparsity& getScalar();
 
@@ -2484,7 +2484,11 @@ namespace casadi {
 
   Sparsity SparsityInternal::patternCombine(const Sparsity& y, bool f0x_is_zero,
                                             bool function0_is_zero) const {
+#ifdef CASADI_WITH_THREADSAFE_SYMBOLICS
+    static thread_local vector<unsigned char> mapping;
+#else // CASADI_WITH_THREADSAFE_SYMBOLICS
     static vector<unsigned char> mapping;
+#endif // CASADI_WITH_THREADSAFE_SYMBOLICS
     return patternCombineGen1<false>(y, f0x_is_zero, function0_is_zero, mapping);
   }
 
@@ -30,6 +30,7 @@
 #include <sstream>
 #include <ctime>
 #include <cctype>
+#include <algorithm>
 
 #include "../std_vector_tools.hpp"
 #include "../casadi_exception.hpp"
@@ -58,10 +59,22 @@ namespace casadi {
     this->t = MX::sym("t");
   }
 
-  void DaeBuilder::parseFMI(const std::string& filename) {
+  void DaeBuilder::parseFMI(const std::string& filename, const std::string& parser) {
 
-    // Load
-    XmlFile xml_file("tinyxml");
+    // Load, falling back on TinyXml if the streaming parser is not available
+    string plugin = parser;
+    if (plugin=="stream" && !XmlFile::hasPlugin(plugin)) plugin = "tinyxml";
+    XmlFile xml_file(plugin);
+    if (plugin=="stream") {
+      // Only build the sections that are used below
+      vector<string> keep;
+      keep.push_back("ModelVariables");
+      keep.push_back("equ:BindingEquations");
+      keep.push_back("equ:DynamicEquations");
+      keep.push_back("equ:InitialEquations");
+      keep.push_back("opt:Optimization");
+      xml_file.setOption("keep", keep);
+    }
     XmlNode document = xml_file.parse(filename);
 
     // **** Add model variables ****
@@ -590,15 +603,178 @@ namespace casadi {
     }
   }
 
+  /// Structural dependencies of expressions (rows) on variables (columns), not cached
+  static Sparsity dependencySparsity(const vector<MX>& ex, const vector<MX>& v) {
+    if (ex.empty() || v.empty()) return Sparsity(ex.size(), v.size());
+
+    // Sparsity pattern of the Jacobian, nonzero by nonzero
+    MXFunction f("tmp", make_vector(vertcat(v)), make_vector(vertcat(ex)));
+    Sparsity sp = f.jacSparsity();
+
+    // Quick return if all scalar
+    if (sp.size1()==ex.size() && sp.size2()==v.size()) return sp;
+
+    // Map nonzeros to expressions and variables
+    vector<int> ex_ind, v_ind;
+    for (int i=0; i<ex.size(); ++i) ex_ind.insert(ex_ind.end(), ex[i].nnz(), i);
+    for (int j=0; j<v.size(); ++j) v_ind.insert(v_ind.end(), v[j].nnz(), j);
+    vector<int> row, col;
+    for (int cc=0; cc<sp.size2(); ++cc) {
+      for (int el=sp.colind(cc); el<sp.colind(cc+1); ++el) {
+        row.push_back(ex_ind[sp.row(el)]);
+        col.push_back(v_ind[cc]);
+      }
+    }
+    vector<int> mapping;
+    return Sparsity::triplet(ex.size(), v.size(), row, col, mapping);
+  }
+
+  int DaeBuilder::depVars(const vector<MX>& v) {
+    // Look for an existing entry
+    for (int k=0; k<dep_vars_.size(); ++k) {
+      const vector<MX>& vk = dep_vars_[k];
+      if (vk.size()!=v.size()) continue;
+      bool match = true;
+      for (int j=0; match && j<v.size(); ++j) match = vk[j].get()==v[j].get();
+      if (match) return k;
+    }
+
+    // New entry
+    dep_vars_.push_back(v);
+    return dep_vars_.size()-1;
+  }
+
+  void DaeBuilder::pruneDepCache() {
+    for (DepCache::iterator it=dep_cache_.begin(); it!=dep_cache_.end();) {
+      if (it->second.ex.alive()) {
+        ++it;
+      } else {
+        dep_cache_.erase(it++);
+      }
+    }
+  }
+
+  Sparsity DaeBuilder::dependencies(const vector<MX>& ex, const vector<MX>& v) {
+    // Remove entries for expressions that have been freed before adding new ones
+    pruneDepCache();
+
+    // Index of each variable
+    int v_id = depVars(v);
+    map<const void*, int> v_ind;
+    for (int j=0; j<v.size(); ++j) v_ind[v[j].get()] = j;
+
+    // Expressions that are not in the cache, expressions with missing variables
+    vector<MX> ex_new, ex_upd;
+    vector<int> stamp(v.size(), -1);
+    vector<bool> v_missing(v.size(), false);
+    for (int i=0; i<ex.size(); ++i) {
+      DepCache::iterator it=dep_cache_.find(ex[i].get());
+      if (it==dep_cache_.end()) {
+        ex_new.push_back(ex[i]);
+        dep_cache_[ex[i].get()].ex = WeakRef(ex[i]);
+      } else {
+        // Quick continue if the same set of variables has been checked before
+        const vector<int>& checked = it->second.checked;
+        if (find(checked.begin(), checked.end(), v_id)!=checked.end()) continue;
+
+        // Quick continue if the expression is repeated in ex and already in ex_new
+        if (checked.empty()) continue;
+
+        // Mark the variables that have been checked
+        for (vector<int>::const_iterator k=checked.begin(); k!=checked.end(); ++k) {
+          const vector<MX>& vk = dep_vars_[*k];
+          for (vector<MX>::const_iterator c=vk.begin(); c!=vk.end(); ++c) {
+            map<const void*, int>::const_iterator j=v_ind.find(c->get());
+            if (j!=v_ind.end()) stamp[j->second] = i;
+          }
+        }
+        ex_upd.push_back(ex[i]);
+        for (int j=0; j<v.size(); ++j) if (stamp[j]!=i) v_missing[j] = true;
+      }
+    }
+
+    // Calculate the dependencies for new expressions
+    if (!ex_new.empty()) {
+      Sparsity sp = dependencySparsity(ex_new, v);
+      for (int i=0; i<ex_new.size(); ++i) dep_cache_[ex_new[i].get()].checked.push_back(v_id);
+      for (int cc=0; cc<sp.size2(); ++cc) {
+        for (int el=sp.colind(cc); el<sp.colind(cc+1); ++el) {
+          dep_cache_[ex_new[sp.row(el)].get()].dep.push_back(v[cc]);
+        }
+      }
+    }
+
+    // Calculate the missing dependencies for the other expressions
+    if (!ex_upd.empty()) {
+      vector<MX> v_upd;
+      for (int j=0; j<v.size(); ++j) if (v_missing[j]) v_upd.push_back(v[j]);
+      Sparsity sp = dependencySparsity(ex_upd, v_upd);
+      for (int i=0; i<ex_upd.size(); ++i) dep_cache_[ex_upd[i].get()].checked.push_back(v_id);
+      for (int cc=0; cc<sp.size2(); ++cc) {
+        for (int el=sp.colind(cc); el<sp.colind(cc+1); ++el) {
+          dep_cache_[ex_upd[sp.row(el)].get()].dep.push_back(v_upd[cc]);
+        }
+      }
+    }
+
+    // Assemble the dependencies from the cache, without duplicates
+    vector<int> row, col;
+    fill(stamp.begin(), stamp.end(), -1);
+    for (int i=0; i<ex.size(); ++i) {
+      const vector<MX>& dep = dep_cache_[ex[i].get()].dep;
+      for (vector<MX>::const_iterator d=dep.begin(); d!=dep.end(); ++d) {
+        map<const void*, int>::const_iterator j=v_ind.find(d->get());
+        if (j!=v_ind.end() && stamp[j->second]!=i) {
+          stamp[j->second] = i;
+          row.push_back(i);
+          col.push_back(j->second);
+        }
+      }
+    }
+    vector<int> mapping;
+    return Sparsity::triplet(ex.size(), v.size(), row, col, mapping);
+  }
+
+  void DaeBuilder::setIndependent(const vector<MX>& ex, const vector<MX>& v) {
+    // Remove entries for expressions that have been freed before adding new ones
+    pruneDepCache();
+
+    int v_id = depVars(v);
+    for (int i=0; i<ex.size(); ++i) {
+      DepInfo& e = dep_cache_[ex[i].get()];
+      if (!e.ex.alive()) {
+        // New entry
+        e.ex = WeakRef(ex[i]);
+        e.checked = vector<int>(1, v_id);
+        e.dep.clear();
+      }
+    }
+  }
+
+  bool DaeBuilder::isSorted(vector<WeakRef>& sorted, const vector<MX>& ex, const vector<MX>& v) {
+    if (sorted.size()!=ex.size()+v.size()) return false;
+    for (int i=0; i<sorted.size(); ++i) {
+      const MX& e = i<ex.size() ? ex[i] : v[i-ex.size()];
+      if (!sorted[i].alive() || sorted[i].shared().get()!=e.get()) return false;
+    }
+    return true;
+  }
+
+  void DaeBuilder::setSorted(vector<WeakRef>& sorted, const vector<MX>& ex, const vector<MX>& v) {
+    sorted.clear();
+    sorted.insert(sorted.end(), ex.begin(), ex.end());
+    sorted.insert(sorted.end(), v.begin(), v.end());
+  }
+
   void DaeBuilder::sort_d() {
     // Quick return if no intermediates
     if (this->d.empty()) return;
 
+    // Quick return if unchanged since the last sorting
+    if (isSorted(sorted_d_, this->ddef, this->d)) return;
+
     // Find out which intermediates depends on which other
-    MXFunction f("tmp", make_vector(vertcat(this->d)),
-                 make_vector(vertcat(this->d) - vertcat(this->ddef)));
-    Sparsity sp = f.jacSparsity();
-    casadi_assert(sp.issquare());
+    Sparsity sp = dependencies(this->ddef, this->d).patternUnion(Sparsity::diag(this->d.size()));
 
     // BLT transformation
     vector<int> rowperm, colperm, rowblock, colblock, coarse_rowblock, coarse_colblock;
@@ -615,6 +791,7 @@ namespace casadi {
     }
     this->ddef = ddefnew;
     this->d = dnew;
+    setSorted(sorted_d_, this->ddef, this->d);
   }
 
   void DaeBuilder::split_d() {
@@ -624,12 +801,16 @@ namespace casadi {
     // Begin by sorting the dependent parameters
     sort_d();
 
+    // Quick return if there are no interdependencies
+    if (dependencies(this->ddef, this->d).nnz()==0) return;
+
     // Sort the equations by causality
     vector<MX> ex;
     substituteInPlace(this->d, this->ddef, ex);
 
     // Make sure that the interdependencies have been properly eliminated
     casadi_assert(!dependsOn(vertcat(this->ddef), vertcat(this->d)));
+    setIndependent(this->ddef, this->d);
   }
 
   void DaeBuilder::eliminate_d() {
@@ -640,26 +821,47 @@ namespace casadi {
     sort_d();
 
     // Collect all expressions to be replaced
-    vector<MX> ex;
-    ex.insert(ex.end(), this->ode.begin(), this->ode.end());
-    ex.insert(ex.end(), this->dae.begin(), this->dae.end());
-    ex.insert(ex.end(), this->alg.begin(), this->alg.end());
-    ex.insert(ex.end(), this->quad.begin(), this->quad.end());
-    ex.insert(ex.end(), this->ydef.begin(), this->ydef.end());
-    ex.insert(ex.end(), this->init.begin(), this->init.end());
-
-    // Substitute all at once (since they may have common subexpressions)
-    substituteInPlace(this->d, this->ddef, ex);
+    vector<MX*> ex_ptr;
+    for (int i=0; i<this->ode.size(); ++i) ex_ptr.push_back(&this->ode[i]);
+    for (int i=0; i<this->dae.size(); ++i) ex_ptr.push_back(&this->dae[i]);
+    for (int i=0; i<this->alg.size(); ++i) ex_ptr.push_back(&this->alg[i]);
+    for (int i=0; i<this->quad.size(); ++i) ex_ptr.push_back(&this->quad[i]);
+    for (int i=0; i<this->ydef.size(); ++i) ex_ptr.push_back(&this->ydef[i]);
+    for (int i=0; i<this->init.size(); ++i) ex_ptr.push_back(&this->init[i]);
+
+    // Only expressions that depend on the dependent parameters need to be modified
+    vector<MX> ex(ex_ptr.size());
+    for (int i=0; i<ex.size(); ++i) ex[i] = *ex_ptr[i];
+    vector<int> affected = dependencies(ex, this->d).getRow();
+    sort(affected.begin(), affected.end());
+    affected.erase(unique(affected.begin(), affected.end()), affected.end());
+    ex.resize(affected.size());
+    for (int i=0; i<affected.size(); ++i) ex[i] = *ex_ptr[affected[i]];
+
+    // Quick return if no dependencies, also amongst the dependent parameters
+    Sparsity sp_d = dependencies(this->ddef, this->d);
+    if (ex.empty() && sp_d.nnz()==0) return;
+
+    // Substitute all at once (since they may have common subexpressions), the
+    // definitions only need to be updated if they depend on each other
+    if (sp_d.nnz()==0) {
+      ex = substitute(ex, this->d, this->ddef);
+    } else {
+      substituteInPlace(this->d, this->ddef, ex);
+    }
 
     // Get the modified expressions
-    vector<MX>::const_iterator it=ex.begin();
-    for (int i=0; i<this->x.size(); ++i) this->ode[i] = *it++;
-    for (int i=0; i<this->s.size(); ++i) this->dae[i] = *it++;
-    for (int i=0; i<this->z.size(); ++i) this->alg[i] = *it++;
-    for (int i=0; i<this->q.size(); ++i) this->quad[i] = *it++;
-    for (int i=0; i<this->y.size(); ++i) this->ydef[i] = *it++;
-    for (int i=0; i<this->init.size(); ++i) this->init[i] = *it++;
-    casadi_assert(it==ex.end());
+    for (int i=0; i<affected.size(); ++i) *ex_ptr[affected[i]] = ex[i];
+
+    // If the definitions only depend on preceding dependent parameters,
+    // all dependent parameters have now been eliminated
+    vector<int> sp_row = sp_d.getRow(), sp_col = sp_d.getCol();
+    bool acyclic = true;
+    for (int k=0; acyclic && k<sp_row.size(); ++k) acyclic = sp_col[k]<sp_row[k];
+    if (acyclic) {
+      setIndependent(ex, this->d);
+      setIndependent(this->ddef, this->d);
+    }
   }
 
   void DaeBuilder::scaleEquations() {
@@ -734,9 +936,11 @@ namespace casadi {
     // Quick return if no differential states
     if (this->x.empty()) return;
 
+    // Quick return if unchanged since the last sorting
+    if (isSorted(sorted_dae_, this->dae, this->sdot)) return;
+
     // Find out which differential equation depends on which differential state
-    MXFunction f("tmp", make_vector(vertcat(this->sdot)), make_vector(vertcat(this->dae)));
-    Sparsity sp = f.jacSparsity();
+    Sparsity sp = dependencies(this->dae, this->sdot);
     casadi_assert(sp.issquare());
 
     // BLT transformation
@@ -756,15 +960,18 @@ namespace casadi {
     this->dae = daenew;
     this->s = snew;
     this->sdot = sdotnew;
+    setSorted(sorted_dae_, this->dae, this->sdot);
   }
 
   void DaeBuilder::sort_alg() {
     // Quick return if no algebraic states
     if (this->z.empty()) return;
 
+    // Quick return if unchanged since the last sorting
+    if (isSorted(sorted_alg_, this->alg, this->z)) return;
+
     // Find out which algebraic equation depends on which algebraic state
-    MXFunction f("tmp", make_vector(vertcat(this->z)), make_vector(vertcat(this->alg)));
-    Sparsity sp = f.jacSparsity();
+    Sparsity sp = dependencies(this->alg, this->z);
     casadi_assert(sp.issquare());
 
     // BLT transformation
@@ -782,6 +989,7 @@ namespace casadi {
     }
     this->alg = algnew;
     this->z = znew;
+    setSorted(sorted_alg_, this->alg, this->z);
   }
 
   void DaeBuilder::makeSemiExplicit() {
@@ -794,12 +1002,9 @@ namespace casadi {
     // Quick return if there are no implicitly defined states
     if (this->s.empty()) return;
 
-    // Write the ODE as a function of the state derivatives
-    MXFunction f("tmp", make_vector(vertcat(this->sdot)), make_vector(vertcat(this->dae)));
-
-    // Get the sparsity of the Jacobian which can be used to determine which
-    // variable can be calculated from which other
-    Sparsity sp = f.jacSparsity();
+    // Get the sparsity of the Jacobian of the ODE with respect to the state derivatives,
+    // which can be used to determine which variable can be calculated from which other
+    Sparsity sp = dependencies(this->dae, this->sdot);
     casadi_assert(sp.issquare());
 
     // BLT transformation
@@ -822,7 +1027,7 @@ namespace casadi {
     this->sdot = sdotnew;
 
     // Now write the sorted ODE as a function of the state derivatives
-    f = MXFunction("tmp", make_vector(vertcat(this->sdot)), make_vector(vertcat(this->dae)));
+    MXFunction f("tmp", make_vector(vertcat(this->sdot)), make_vector(vertcat(this->dae)));
 
     // Get the Jacobian
     MX J = f.jac();
@@ -878,12 +1083,10 @@ namespace casadi {
     // Quick return if there are no algebraic states
     if (this->z.empty()) return;
 
-    // Write the algebraic equations as a function of the algebraic states
-    MXFunction f("f", make_vector(vertcat(this->z)), make_vector(vertcat(this->alg)));
-
-    // Get the sparsity of the Jacobian which can be used to determine which
-    // variable can be calculated from which other
-    Sparsity sp = f.jacSparsity();
+    // Get the sparsity of the Jacobian of the algebraic equations with respect to the
+    // algebraic states, which can be used to determine which variable can be calculated
+    // from which other
+    Sparsity sp = dependencies(this->alg, this->z);
     casadi_assert(sp.issquare());
 
     // BLT transformation
@@ -903,9 +1106,6 @@ namespace casadi {
     this->alg = algnew;
     this->z = znew;
 
-    // Rewrite the sorted algebraic equations as a function of the algebraic states
-    f = MXFunction("f", make_vector(vertcat(this->z)), make_vector(vertcat(this->alg)));
-
     // Variables where we have found an explicit expression and where we haven't
     vector<MX> z_exp, z_imp;
 
@@ -1235,55 +1435,36 @@ namespace casadi {
     if (this->s.empty()) return;
 
     // We investigate the interdependencies in sdot -> dae
-    MXFunction f("f", make_vector(vertcat(this->sdot)), make_vector(vertcat(this->dae)));
-
-    // Number of s
-    int ns = f.input().nnz();
-    casadi_assert(f.output().nnz()==ns);
-
-    // Input/output arrays
-    bvec_t* f_sdot = reinterpret_cast<bvec_t*>(f.input().ptr());
-    bvec_t* f_dae = reinterpret_cast<bvec_t*>(f.output().ptr());
-
-    // First find out which equations depend on sdot
-    f.spInit(true);
-
-    // Seed all inputs
-    std::fill(f_sdot, f_sdot+ns, bvec_t(1));
-
-    // Propagate to f_dae
-    std::fill(f_dae, f_dae+ns, bvec_t(0));
-    f.spEvaluate(true);
+    Sparsity sp = dependencies(this->dae, this->sdot);
+    int ns = this->s.size();
+    casadi_assert(sp.issquare() && sp.size1()==ns);
+
+    // Equations that depend on sdot and sdot that enter in the equations
+    vector<bool> dae_dep(ns, false), sdot_dep(ns, false);
+    for (int cc=0; cc<ns; ++cc) {
+      for (int el=sp.colind(cc); el<sp.colind(cc+1); ++el) {
+        dae_dep[sp.row(el)] = true;
+        sdot_dep[cc] = true;
+      }
+    }
 
     // Get the new differential and algebraic equations
     vector<MX> new_dae, new_alg;
     for (int i=0; i<ns; ++i) {
-      if (f_dae[i]==bvec_t(1)) {
+      if (dae_dep[i]) {
         new_dae.push_back(this->dae[i]);
       } else {
-        casadi_assert(f_dae[i]==bvec_t(0));
         new_alg.push_back(this->dae[i]);
       }
     }
 
-    // Now find out what sdot enter in the equations
-    f.spInit(false);
-
-    // Seed all outputs
-    std::fill(f_dae, f_dae+ns, bvec_t(1));
-
-    // Propagate to f_sdot
-    std::fill(f_sdot, f_sdot+ns, bvec_t(0));
-    f.spEvaluate(false);
-
     // Get the new algebraic variables and new states
     vector<MX> new_s, new_sdot, new_z;
     for (int i=0; i<ns; ++i) {
-      if (f_sdot[i]==bvec_t(1)) {
+      if (sdot_dep[i]) {
         new_s.push_back(this->s[i]);
         new_sdot.push_back(this->sdot[i]);
       } else {
-        casadi_assert(f_sdot[i]==bvec_t(0));
         new_z.push_back(this->s[i]);
       }
     }
@@ -27,6 +27,7 @@
 #define CASADI_DAE_BUILDER_HPP
 
 #include "variable.hpp"
+#include "../weak_ref.hpp"
 
 namespace casadi {
 
@@ -232,8 +233,13 @@ namespace casadi {
     /** @name Import and export
      */
     ///@{
-    /// Import existing problem from FMI/XML
-    void parseFMI(const std::string& filename);
+    /** \brief Import existing problem from FMI/XML
+     *
+     * The file is read with the XmlFile plugin "parser": "stream" (default), which only
+     * builds the sections that are used, or "tinyxml". If "stream" is not available,
+     * "tinyxml" is used instead.
+     */
+    void parseFMI(const std::string& filename, const std::string& parser="stream");
 
 #ifndef SWIG
     // Input convension in codegen
@@ -462,6 +468,53 @@ namespace casadi {
     typedef void (DaeBuilder::*setAttS)(const std::string& name, const MX& val);
     void setAttribute(setAttS f, const MX& var, const MX& val);
 
+    /// Cached dependencies of an expression on variables
+    struct DepInfo {
+      /// The expression (non-owning, dead if the expression has been freed)
+      WeakRef ex;
+      /// Sets of variables that have been checked, indices into dep_vars_
+      std::vector<int> checked;
+      /// Variables, amongst the ones checked, that the expression depends on
+      std::vector<MX> dep;
+    };
+
+    /** \brief Dependency graph, kept between the transformations
+     * Indexed by the expression node. Since expressions are immutable, an entry
+     * remains valid for as long as the expression is alive.
+     */
+    typedef std::map<const void*, DepInfo> DepCache;
+    DepCache dep_cache_;
+
+    /// Sets of variables that dependencies have been calculated for
+    std::vector<std::vector<MX> > dep_vars_;
+
+    /// Remove the cache entries of expressions that have been freed
+    void pruneDepCache();
+
+    /// Get the index of a set of variables in dep_vars_, add if needed
+    int depVars(const std::vector<MX>& v);
+
+    /** \brief Structural dependencies of expressions (rows) on variables (columns)
+     * Only the dependencies that are not in the cache are calculated.
+     */
+    Sparsity dependencies(const std::vector<MX>& ex, const std::vector<MX>& v);
+
+    /// Record that expressions do not depend on a set of variables
+    void setIndependent(const std::vector<MX>& ex, const std::vector<MX>& v);
+
+    /** \brief Equations and variables after the last BLT sorting
+     * Sorting is skipped if they have not been modified since.
+     */
+    std::vector<WeakRef> sorted_d_, sorted_dae_, sorted_alg_;
+
+    /// Check if equations and variables are unchanged since they were sorted
+    static bool isSorted(std::vector<WeakRef>& sorted,
+                         const std::vector<MX>& ex, const std::vector<MX>& v);
+
+    /// Record equations and variables that have been sorted
+    static void setSorted(std::vector<WeakRef>& sorted,
+                          const std::vector<MX>& ex, const std::vector<MX>& v);
+
 #endif // SWIG
 
   };
@@ -50,6 +50,10 @@ namespace casadi {
     return (*this)->parse(filename);
   }
 
+  bool XmlFile::hasPlugin(const std::string& name) {
+    return XmlFileInternal::hasPlugin(name);
+  }
+
   void XmlFile::loadPlugin(const std::string& name) {
     XmlFileInternal::loadPlugin(name);
   }
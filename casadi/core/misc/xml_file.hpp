@@ -52,6 +52,9 @@ namespace casadi {
     // Destructor
     ~XmlFile();
 
+    /// Check if a particular plugin is available
+    static bool hasPlugin(const std::string& name);
+
     /// Load a plugin dynamically
     static void loadPlugin(const std::string& name);
 
@@ -24,6 +24,10 @@
 
 
 #include "profiling.hpp"
+#include <set>
+#ifdef USE_CXX11
+#include <mutex>
+#endif // USE_CXX11
 
 namespace casadi {
 
@@ -121,4 +125,88 @@ double getRealTime() {
 #endif
 }
 
+// Number of records buffered per thread
+static const int profiling_buffer_size = 1 << 14;
+
+// Buffers of all threads, and the number of threads seen
+static std::set<ProfilingBuffer*>& profilingBuffers() {
+  static std::set<ProfilingBuffer*> buffers;
+  return buffers;
+}
+static long profiling_thread_counter = 0;
+
+#ifdef USE_CXX11
+// Protects the set of buffers
+static std::mutex& profilingBuffersMutex() {
+  static std::mutex m;
+  return m;
+}
+
+// Protects the streams
+static std::mutex& profilingStreamMutex() {
+  static std::mutex m;
+  return m;
+}
+#endif // USE_CXX11
+
+ProfilingBuffer::ProfilingBuffer() : f_(0), slots_(profiling_buffer_size), n_(0) {
+#ifdef USE_CXX11
+  std::lock_guard<std::mutex> lock(profilingBuffersMutex());
+#endif // USE_CXX11
+  thread_ = profiling_thread_counter++;
+  profilingBuffers().insert(this);
+}
+
+ProfilingBuffer::ProfilingBuffer(std::ofstream &f, int size) :
+  f_(&f), slots_(size), n_(0), thread_(0) {
+}
+
+ProfilingBuffer::~ProfilingBuffer() {
+  flush();
+#ifdef USE_CXX11
+  std::lock_guard<std::mutex> lock(profilingBuffersMutex());
+#endif // USE_CXX11
+  profilingBuffers().erase(this);
+}
+
+#ifdef USE_CXX11
+ProfilingBuffer& ProfilingBuffer::local(std::ofstream &f) {
+  static thread_local ProfilingBuffer buf;
+  if (buf.f_!=&f) {
+    buf.flush();
+    buf.f_ = &f;
+  }
+  return buf;
+}
+#endif // USE_CXX11
+
+void ProfilingBuffer::flush() {
+  if (n_==0) return;
+  if (f_!=0) {
+    ProfilingSlot s;
+    ProfilingData_THREAD t;
+    t.thread = thread_;
+    t.nslots = n_;
+    s.header.type = ProfilingData_Type_THREAD;
+    s.header.size = sizeof(t);
+    std::memcpy(s.data, &t, sizeof(t));
+#ifdef USE_CXX11
+    std::lock_guard<std::mutex> lock(profilingStreamMutex());
+#endif // USE_CXX11
+    f_->write(reinterpret_cast<const char*>(&s), sizeof(s));
+    f_->write(reinterpret_cast<const char*>(&slots_.front()), sizeof(ProfilingSlot)*n_);
+  }
+  n_ = 0;
+}
+
+void ProfilingBuffer::flushAll() {
+#ifdef USE_CXX11
+  std::lock_guard<std::mutex> lock(profilingBuffersMutex());
+#endif // USE_CXX11
+  for (std::set<ProfilingBuffer*>::iterator it=profilingBuffers().begin();
+       it!=profilingBuffers().end(); ++it) {
+    (*it)->flush();
+  }
+}
+
 } // namespace casadi
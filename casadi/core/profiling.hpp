@@ -29,6 +29,8 @@
 #include <fstream>
 #include <cstring>
 #include <iostream>
+#include <vector>
+#include <algorithm>
 
 #include "casadi_common.hpp"
 
@@ -56,7 +58,9 @@ enum ProfilingData_Type { ProfilingData_Type_TIMELINE,
                           ProfilingData_Type_NAME,
                           ProfilingData_Type_ENTRY,
                           ProfilingData_Type_EXIT,
-                          ProfilingData_Type_IO };
+                          ProfilingData_Type_IO,
+                          ProfilingData_Type_STRING,
+                          ProfilingData_Type_THREAD };
 
 enum ProfilingData_FunctionType { ProfilingData_FunctionType_MXFunction,
                                   ProfilingData_FunctionType_SXFunction,
@@ -64,6 +68,24 @@ enum ProfilingData_FunctionType { ProfilingData_FunctionType_MXFunction,
 
 struct ProfilingHeader {
   ProfilingData_Type type;
+  int size; // Number of bytes of data used
+};
+
+/** \brief Record of the binary profiling log
+
+    All records in the log have the same size, such that a log can be read as an array.
+    Strings are split over consecutive STRING records.
+    The records of every thread are written in blocks, each preceded by a THREAD record.
+*/
+struct ProfilingSlot {
+  static const int data_size = 32;
+  ProfilingHeader header;
+  char data[data_size]; // NOLINT(runtime/arrays) - compile-time constant
+};
+
+struct ProfilingData_THREAD {
+  long thread;
+  long nslots; // Number of records in the block
 };
 
 struct ProfilingData_TIMELINE {
@@ -127,18 +149,106 @@ template<>
 inline ProfilingData_Type ProfilingType<ProfilingData_IO>()
 { return ProfilingData_Type_IO; }
 
+/** \brief Buffer for the binary profiling records of one thread
+
+    Records are collected in a fixed-size buffer per thread, which is written to the
+    log as one block when it is full, when the thread ends and when profiling stops.
+    Profiling should not be stopped while other threads are evaluating.
+*/
+class CASADI_EXPORT ProfilingBuffer {
+public:
+#ifdef USE_CXX11
+  /// Buffer of the calling thread, writing to a given stream
+  static ProfilingBuffer& local(std::ofstream &f);
+#endif // USE_CXX11
+
+  /// Buffer for a given number of records, written to a stream when destroyed
+  ProfilingBuffer(std::ofstream &f, int size);
+
+  /// Write the buffers of all threads to their streams
+  static void flushAll();
+
+  /// Destructor, writes the remaining records
+  ~ProfilingBuffer();
+
+  /// Append a record
+  void write(ProfilingData_Type type, const void* data, int size) {
+    ProfilingSlot& s = slots_[n_++];
+    s.header.type = type;
+    s.header.size = size;
+    std::memcpy(s.data, data, size);
+    if (n_==static_cast<int>(slots_.size())) flush();
+  }
 
-template<typename T>
-void profileWrite(std::ofstream &f, const T& s) {
-  ProfilingHeader hd;
-  hd.type   = ProfilingType<T>();
-  f.write(reinterpret_cast<const char*>(&hd), sizeof(hd));
-  f.write(reinterpret_cast<const char*>(&s), sizeof(s));
-}
+  /// Make sure that the next n records are written to the same block, if they fit
+  void reserve(int n) {
+    if (n_+n>static_cast<int>(slots_.size())) flush();
+  }
+
+  /// Write the buffered records to the stream
+  void flush();
+
+private:
+  ProfilingBuffer();
+
+  // Stream to write to
+  std::ofstream* f_;
+
+  // Buffered records, and the number in use
+  std::vector<ProfilingSlot> slots_;
+  int n_;
+
+  // Number identifying the thread
+  long thread_;
+};
+
+/** \brief Group of records, which end up in the same block of the log
+
+    The group is written to the buffer of the calling thread. Without C++11 there is no
+    thread-local storage, and the group is buffered locally instead.
+*/
+class ProfilingGroup {
+public:
+  /// Group of a given number of records
+  ProfilingGroup(std::ofstream &f, int nslots) :
+#ifdef USE_CXX11
+    buf_(ProfilingBuffer::local(f)) { buf_.reserve(nslots);}
+#else // USE_CXX11
+    local_(f, nslots), buf_(local_) {}
+#endif // USE_CXX11
+
+  /// Append a record
+  template<typename T>
+  void write(const T& s) {
+#ifdef USE_CXX11
+    static_assert(sizeof(T)<=ProfilingSlot::data_size, "Profiling record too large");
+#endif // USE_CXX11
+    buf_.write(ProfilingType<T>(), &s, sizeof(s));
+  }
+
+  /// Append a string, split over STRING records
+  void writeString(const std::string& s) {
+    for (int i=0; i<static_cast<int>(s.size()); i+=ProfilingSlot::data_size) {
+      buf_.write(ProfilingData_Type_STRING, s.data()+i,
+                 std::min(static_cast<int>(s.size())-i, ProfilingSlot::data_size));
+    }
+  }
+
+  /// Number of records needed for a string
+  static int nslots(const std::string& s) {
+    return (s.size()+ProfilingSlot::data_size-1)/ProfilingSlot::data_size;
+  }
+
+private:
+#ifndef USE_CXX11
+  ProfilingBuffer local_;
+#endif // USE_CXX11
+  ProfilingBuffer& buf_;
+};
 
 template<typename T>
-void profileWriteBare(std::ofstream &f, const T& s) {
-  f.write(reinterpret_cast<const char*>(&s), sizeof(s));
+void profileWrite(std::ofstream &f, const T& s) {
+  ProfilingGroup(f, 1).write(s);
 }
 
 template<typename T>
@@ -158,21 +268,22 @@ void profileWriteName(std::ofstream &f, T *a, const std::string &name,
   s.algorithm_size = algorithm_size;
   s.numin = a->nIn();
   s.numout = a->nOut();
-  profileWrite(f, s);
-  f << name;
+  ProfilingGroup g(f, 1 + ProfilingGroup::nslots(name) + s.numin + s.numout);
+  g.write(s);
+  g.writeString(name);
   for (int i=0;i<s.numin;++i) {
     ProfilingData_IO ss;
     ss.nrow = a->input(i).size1();
     ss.ncol = a->input(i).size2();
     ss.ndata = a->input(i).nnz();
-    profileWriteBare(f, ss);
+    g.write(ss);
   }
   for (int i=0;i<s.numout;++i) {
     ProfilingData_IO ss;
     ss.nrow = a->output(i).size1();
     ss.ncol = a->output(i).size2();
     ss.ndata = a->output(i).nnz();
-    profileWriteBare(f, ss);
+    g.write(ss);
   }
 }
 
@@ -221,8 +332,9 @@ void profileWriteSourceLineDep(std::ofstream &f, T *a, int line_number,
   s.length = sourceline.size();
   s.opcode = opcode;
   s.dependency = ptrToLong(dependency);
-  profileWrite(f, s);
-  f << sourceline;
+  ProfilingGroup g(f, 1 + ProfilingGroup::nslots(sourceline));
+  g.write(s);
+  g.writeString(sourceline);
 }
 
 template<typename T, typename T2>
@@ -234,8 +346,9 @@ void profileWriteSourceLineDep(std::ofstream &f, T *a, int line_number,
   s.length = sourceline.size();
   s.opcode = -1;
   s.dependency = ptrToLong(dependency);
-  profileWrite(f, s);
-  f << sourceline;
+  ProfilingGroup g(f, 1 + ProfilingGroup::nslots(sourceline));
+  g.write(s);
+  g.writeString(sourceline);
 }
 
 template<typename T>
@@ -247,8 +360,9 @@ void profileWriteSourceLine(std::ofstream &f, T *a, int line_number,
   s.length = sourceline.size();
   s.opcode = opcode;
   s.dependency = 0;
-  profileWrite(f, s);
-  f << sourceline;
+  ProfilingGroup g(f, 1 + ProfilingGroup::nslots(sourceline));
+  g.write(s);
+  g.writeString(sourceline);
 }
 
 template<typename T>
@@ -260,8 +374,9 @@ void profileWriteSourceLine(std::ofstream &f, T *a, int line_number,
   s.length = sourceline.size();
   s.opcode = -1;
   s.dependency = 0;
-  profileWrite(f, s);
-  f << sourceline;
+  ProfilingGroup g(f, 1 + ProfilingGroup::nslots(sourceline));
+  g.write(s);
+  g.writeString(sourceline);
 }
 
 /// \endcond
@@ -257,6 +257,7 @@ namespace casadi {
   }
 
   WeakRef* SharedObjectNode::weak() {
+    SymbolicLock lock(casadi_weak_ref_mutex());
     if (weak_ref_==0) {
       weak_ref_ = new WeakRef(this);
     }
@@ -28,6 +28,7 @@
 
 #include "printable_object.hpp"
 #include "casadi_exception.hpp"
+#include "casadi_mutex.hpp"
 #include <map>
 #include <vector>
 
@@ -200,6 +201,7 @@ namespace casadi {
   /// Internal class for the reference counting framework, see comments on the public class.
   class CASADI_EXPORT SharedObjectNode {
     friend class SharedObject;
+    friend class WeakRef;
   public:
 
     /// Default constructor
@@ -269,7 +271,7 @@ namespace casadi {
 
   private:
     /// Number of references pointing to the object
-    unsigned int count;
+    RefCount count;
 
     /// Weak pointer (non-owning) object for the object
     WeakRef* weak_ref_;
@@ -27,6 +27,7 @@
 #define CASADI_BINARY_SX_HPP
 
 #include "sx_node.hpp"
+#include "../casadi_options.hpp"
 #include <stack>
 
 
@@ -55,6 +56,22 @@ class CASADI_EXPORT BinarySX : public SXNode {
         double ret_val;
         casadi_math<double>::fun(op, dep0_val, dep1_val, ret_val);
         return ret_val;
+      } else if (CasadiOptions::hash_consing) {
+        // Look for an identical node
+        HashConsKey key(op, std::make_pair(dep0.get(), dep1.get()));
+        SymbolicLock lock(hash_cons_mutex_);
+        HashConsTable::iterator it = hash_cons_.find(key);
+        if (it==hash_cons_.end() && operation_checker<CommChecker>(op)) {
+          it = hash_cons_.find(HashConsKey(op, std::make_pair(dep1.get(), dep0.get())));
+        }
+        if (it!=hash_cons_.end() && it->second->countUpIfAlive()) {
+          return createCounted(it->second);
+        }
+
+        // Allocate a new node and add it to the table, replacing a dying node
+        BinarySX* n = new BinarySX(op, dep0, dep1);
+        hash_cons_[key] = n;
+        return SXElement::create(n);
       } else {
         // Expression containing free variables
         return SXElement::create(new BinarySX(op, dep0, dep1));
@@ -66,13 +83,16 @@ class CASADI_EXPORT BinarySX : public SXNode {
     can cause stack overflow due to recursive calling.
     */
     virtual ~BinarySX() {
+      // Remove from the hash-cons table
+      removeFromHashCons();
+
       // Start destruction method if any of the dependencies has dependencies
       for (int c1=0; c1<2; ++c1) {
         // Get the node of the dependency and remove it from the smart pointer
         SXNode* n1 = dep(c1).assignNoDelete(casadi_limits<SXElement>::nan);
 
         // Check if this was the last reference
-        if (n1->count==0) {
+        if (n1!=0) {
 
           // Check if binary
           if (!n1->hasDep()) { // n1 is not binary
@@ -85,6 +105,7 @@ class CASADI_EXPORT BinarySX : public SXNode {
             std::stack<SXNode*> deletion_stack;
 
             // Add the node to the deletion stack
+            n1->removeFromHashCons();
             deletion_stack.push(n1);
 
             // Process stack
@@ -102,7 +123,7 @@ class CASADI_EXPORT BinarySX : public SXNode {
                 SXNode *n2 = t->dep(c2).assignNoDelete(casadi_limits<SXElement>::nan);
 
                 // Check if this is the only reference to the element
-                if (n2->count == 0) {
+                if (n2!=0) {
 
                   // Check if binary
                   if (!n2->hasDep()) {
@@ -113,6 +134,7 @@ class CASADI_EXPORT BinarySX : public SXNode {
                   } else {
 
                     // Add to deletion stack
+                    n2->removeFromHashCons();
                     deletion_stack.push(n2);
                     added_to_stack = true;
                   }
@@ -95,29 +95,32 @@ class CASADI_EXPORT RealtypeSX : public ConstantSX {
 
     /// Destructor
     virtual ~RealtypeSX() {
-      size_t num_erased = cached_constants_.erase(value);
-      assert(num_erased==1);
-      (void)num_erased;
+      SymbolicLock lock(cache_mutex_);
+      CACHING_MAP<double, RealtypeSX*>::iterator it = cached_constants_.find(value);
+
+      // The entry has been replaced if the node was found dying by create
+      assert(it!=cached_constants_.end());
+      if (it->second==this) cached_constants_.erase(it);
     }
 
     /// Static creator function (use instead of constructor)
-    inline static RealtypeSX* create(double value) {
+    inline static SXElement create(double value) {
+      SymbolicLock lock(cache_mutex_);
+
       // Try to find the constant
       CACHING_MAP<double, RealtypeSX*>::iterator it = cached_constants_.find(value);
 
-      // If not found, add it,
-      if (it==cached_constants_.end()) {
-        // Allocate a new object
-        RealtypeSX* n = new RealtypeSX(value);
+      // If found, return the object, unless it is being destroyed
+      if (it!=cached_constants_.end() && it->second->countUpIfAlive()) {
+        return createCounted(it->second);
+      }
 
-        // Add to hash_table
-        cached_constants_.insert(it, std::make_pair(value, n));
+      // Allocate a new object
+      RealtypeSX* n = new RealtypeSX(value);
 
-        // Return it to caller
-        return n;
-      } else { // Else, returned the object
-        return it->second;
-      }
+      // Add to hash_table, replacing the entry of a dying object
+      cached_constants_[value] = n;
+      return SXElement::create(n);
     }
 
     ///@{
@@ -133,6 +136,9 @@ class CASADI_EXPORT RealtypeSX : public ConstantSX {
      * (storage is allocated for it in sx_element.cpp) */
     static CACHING_MAP<double, RealtypeSX*> cached_constants_;
 
+    /// Mutex protecting cached_constants_
+    static SymbolicMutex cache_mutex_;
+
     /** \brief  Data members */
     double value;
 };
@@ -151,29 +157,32 @@ class CASADI_EXPORT IntegerSX : public ConstantSX {
 
     /// Destructor
     virtual ~IntegerSX() {
-      size_t num_erased = cached_constants_.erase(value);
-      assert(num_erased==1);
-      (void)num_erased;
+      SymbolicLock lock(cache_mutex_);
+      CACHING_MAP<int, IntegerSX*>::iterator it = cached_constants_.find(value);
+
+      // The entry has been replaced if the node was found dying by create
+      assert(it!=cached_constants_.end());
+      if (it->second==this) cached_constants_.erase(it);
     }
 
     /// Static creator function (use instead of constructor)
-    inline static IntegerSX* create(int value) {
+    inline static SXElement create(int value) {
+      SymbolicLock lock(cache_mutex_);
+
       // Try to find the constant
       CACHING_MAP<int, IntegerSX*>::iterator it = cached_constants_.find(value);
 
-      // If not found, add it,
-      if (it==cached_constants_.end()) {
-        // Allocate a new object
-        IntegerSX* n = new IntegerSX(value);
+      // If found, return the object, unless it is being destroyed
+      if (it!=cached_constants_.end() && it->second->countUpIfAlive()) {
+        return createCounted(it->second);
+      }
 
-        // Add to hash_table
-        cached_constants_.insert(it, std::make_pair(value, n));
+      // Allocate a new object
+      IntegerSX* n = new IntegerSX(value);
 
-        // Return it to caller
-        return n;
-      } else { // Else, returned the object
-        return it->second;
-      }
+      // Add to hash_table, replacing the entry of a dying object
+      cached_constants_[value] = n;
+      return SXElement::create(n);
     }
 
     ///@{
@@ -191,6 +200,9 @@ class CASADI_EXPORT IntegerSX : public ConstantSX {
      * (storage is allocated for it in sx_element.cpp) */
     static CACHING_MAP<int, IntegerSX*> cached_constants_;
 
+    /// Mutex protecting cached_constants_
+    static SymbolicMutex cache_mutex_;
+
     /** \brief  Data members */
     int value;
 };
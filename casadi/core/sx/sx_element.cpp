@@ -42,6 +42,10 @@ namespace casadi {
   // Allocate storage for the caching
   CACHING_MAP<int, IntegerSX*> IntegerSX::cached_constants_;
   CACHING_MAP<double, RealtypeSX*> RealtypeSX::cached_constants_;
+  SXNode::HashConsTable SXNode::hash_cons_;
+  SymbolicMutex IntegerSX::cache_mutex_;
+  SymbolicMutex RealtypeSX::cache_mutex_;
+  SymbolicMutex SXNode::hash_cons_mutex_;
 
   SXElement::SXElement() {
     node = casadi_limits<SXElement>::nan.node;
@@ -68,13 +72,20 @@ namespace casadi {
       else if (intval == 1)        node = casadi_limits<SXElement>::one.node;
       else if (intval == 2)        node = casadi_limits<SXElement>::two.node;
       else if (intval == -1)       node = casadi_limits<SXElement>::minus_one.node;
-      else                        node = IntegerSX::create(intval);
-      node->count++;
+      else                        node = 0;
     } else {
       if (isnan(val))              node = casadi_limits<SXElement>::nan.node;
       else if (isinf(val))         node = val > 0 ? casadi_limits<SXElement>::inf.node :
                                       casadi_limits<SXElement>::minus_inf.node;
-      else                        node = RealtypeSX::create(val);
+      else                        node = 0;
+    }
+
+    if (node) {
+      node->count++;
+    } else {
+      // Cached constant: count the node before the temporary releases it
+      SXElement c = val-intval == 0 ? IntegerSX::create(intval) : RealtypeSX::create(val);
+      node = c.node;
       node->count++;
     }
   }
@@ -112,17 +123,17 @@ namespace casadi {
     SXNode* ret = node;
 
     // quick return if the old and new pointers point to the same object
-    if (node == scalar.node) return ret;
+    if (node == scalar.node) return 0;
 
     // decrease the counter but do not delete if this was the last pointer
-    --node->count;
+    bool last = --node->count == 0;
 
     // save the new pointer
     node = scalar.node;
     node->count++;
 
-    // Return a pointer to the old node
-    return ret;
+    // Return a pointer to the old node, if it is no longer referenced
+    return last ? ret : 0;
   }
 
   SXElement& SXElement::operator=(double scalar) {
@@ -552,7 +563,7 @@ namespace casadi {
   // node corresponding to a constant 1
   const SXElement casadi_limits<SXElement>::one(new OneSX(), false);
   // node corresponding to a constant 2
-  const SXElement casadi_limits<SXElement>::two(IntegerSX::create(2), false);
+  const SXElement casadi_limits<SXElement>::two(IntegerSX::create(2));
   // node corresponding to a constant -1
   const SXElement casadi_limits<SXElement>::minus_one(new MinusOneSX(), false);
   const SXElement casadi_limits<SXElement>::nan(new NanSX(), false);
@@ -1547,6 +1558,8 @@ namespace casadi {
                             std::vector<SX >& vdef_sx,
                             const std::string& v_prefix,
                             const std::string& v_suffix) {
+    // The algorithm uses the temporary markers of (possibly shared) nodes
+    SymbolicLock lock(casadi_temp_mutex());
 
     // Sort the expression
     SXFunction f("tmp", vector<SX>(), ex);
@@ -257,7 +257,10 @@ namespace casadi {
     void assignIfDuplicate(const SXElement& scalar, int depth=1);
 
     /** \brief Assign the node to something, without invoking the deletion of the node,
-     * if the count reaches 0 */
+     * if the count reaches 0
+     *
+     * Returns the old node if the count reached 0 (the caller is then responsible for
+     * deleting it), otherwise null */
     SXNode* assignNoDelete(const SXElement& scalar);
     /// \endcond
 
@@ -197,4 +197,20 @@ namespace casadi {
 
   int SXNode::eq_depth_ = 1;
 
+  void SXNode::removeFromHashCons() {
+    if (!hasDep()) return;
+    SymbolicLock lock(hash_cons_mutex_);
+    if (hash_cons_.empty()) return;
+    const SXNode* dep1 = ndep()>1 ? dep(1).get() : 0;
+    HashConsTable::iterator it =
+      hash_cons_.find(HashConsKey(getOp(), make_pair(dep(0).get(), dep1)));
+    if (it!=hash_cons_.end() && it->second==this) hash_cons_.erase(it);
+  }
+
+  SXElement SXNode::createCounted(SXNode* node) {
+    SXElement ret = SXElement::create(node);
+    node->count--;
+    return ret;
+  }
+
 } // namespace casadi
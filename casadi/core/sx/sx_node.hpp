@@ -30,9 +30,16 @@
 #include <string>
 #include <sstream>
 #include <math.h>
+#ifdef USE_CXX11
+#include <unordered_map>
+#else // USE_CXX11
+#include <map>
+#endif // USE_CXX11
 
 /** \brief  Scalar expression (which also works as a smart pointer class to this class) */
 #include "sx_element.hpp"
+#include "../casadi_mutex.hpp"
+#include "sx_node_pool.hpp"
 
 
 /// \cond INTERNAL
@@ -54,6 +61,12 @@ namespace casadi {
     /** \brief  destructor  */
     virtual ~SXNode();
 
+    /// Allocate the node from SXNodePool
+    static void* operator new(std::size_t sz) { return SXNodePool::allocate(sz);}
+
+    /// Return the node to SXNodePool
+    static void operator delete(void* ptr, std::size_t sz) { SXNodePool::deallocate(ptr, sz);}
+
     ///@{
     /** \brief  check properties of a node */
     virtual bool isConstant() const; // check if constant
@@ -120,6 +133,44 @@ namespace casadi {
     // Depth when checking equalities
     static int eq_depth_;
 
+    /// Operation nodes are identified by the operation and the dependencies
+    typedef std::pair<int, std::pair<const SXNode*, const SXNode*> > HashConsKey;
+
+#ifdef USE_CXX11
+    /// Hash function for HashConsKey
+    struct HashConsHash {
+      std::size_t operator()(const HashConsKey& k) const {
+        std::size_t h = std::hash<const SXNode*>()(k.second.first);
+        h ^= std::hash<const SXNode*>()(k.second.second) + 0x9e3779b9 + (h<<6) + (h>>2);
+        h ^= std::hash<int>()(k.first) + 0x9e3779b9 + (h<<6) + (h>>2);
+        return h;
+      }
+    };
+    typedef std::unordered_map<HashConsKey, SXNode*, HashConsHash> HashConsTable;
+#else // USE_CXX11
+    typedef std::map<HashConsKey, SXNode*> HashConsTable;
+#endif // USE_CXX11
+
+    /** \brief Hash-cons table of unary and binary operation nodes, only filled when
+     * CasadiOptions::hash_consing is set (storage is allocated for it in sx_element.cpp) */
+    static HashConsTable hash_cons_;
+
+    /// Mutex protecting hash_cons_
+    static SymbolicMutex hash_cons_mutex_;
+
+    /** \brief Count up a node found in a cache, unless it is being destroyed
+     *
+     * Must be called with the cache locked, the destructors of cached nodes
+     * remove them from the cache while holding the same lock. */
+    bool countUpIfAlive() { return casadi_count_up_if_alive(count);}
+
+    /// Create an expression from a node that has already been counted up
+    static SXElement createCounted(SXNode* node);
+
+    /** \brief Remove the node from the hash-cons table, if present
+     * Must be called before the dependencies are released */
+    void removeFromHashCons();
+
     /** Temporary variables to be used in user algorithms like sorting,
         the user is responsible of making sure that use is thread-safe
         The variable is initialized to zero
@@ -127,7 +178,7 @@ namespace casadi {
     int temp;
 
     // Reference counter -- counts the number of parents of the node
-    unsigned int count;
+    RefCount count;
 
   };
 
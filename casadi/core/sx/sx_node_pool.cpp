@@ -0,0 +1,335 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+
+#include "sx_node_pool.hpp"
+#include "../casadi_mutex.hpp"
+#include <algorithm>
+#include <cstdlib>
+#include <new>
+#ifdef _WIN32
+#include <malloc.h>
+#endif // _WIN32
+
+using namespace std;
+
+namespace casadi {
+
+  // Nodes are rounded up to a multiple of the granularity, larger nodes use the heap
+  static const size_t POOL_GRANULARITY = 16;
+  static const size_t POOL_NUM_CLASSES = 16;
+
+  // Chunks are aligned to their size, so that the chunk of a block can be found
+  static const size_t POOL_CHUNK_SIZE = 1<<18;
+
+  // Free block, the link is stored in the block itself
+  struct SXNodePoolBlock {
+    SXNodePoolBlock* next;
+  };
+
+  // Header at the start of each chunk, which holds blocks of one size
+  struct SXNodePoolChunk {
+    // Freed blocks
+    SXNodePoolBlock* free;
+
+    // Part that has not been handed out since the chunk was last empty
+    char *bump, *end;
+
+    // Number of blocks handed out and not yet freed
+    size_t num_used;
+
+    // Size class
+    size_t k;
+
+    // Chunks with free blocks, except the one in use
+    SXNodePoolChunk *prev, *next;
+    bool listed;
+
+    // Start of the blocks
+    char* begin() { return reinterpret_cast<char*>(this) + POOL_HEADER_SIZE;}
+    static const size_t POOL_HEADER_SIZE = 64;
+  };
+
+  // Blocks of one size
+  struct SXNodePoolClass {
+    // Chunk in use
+    SXNodePoolChunk* current;
+
+    // Other chunks with free blocks, partially used ones first
+    SXNodePoolChunk *first, *last;
+  };
+
+  struct SXNodePoolData {
+    SXNodePoolClass cl[POOL_NUM_CLASSES];
+
+    // Statistics
+    size_t num_nodes, peak_num_nodes, used_bytes, reserved_bytes, peak_reserved_bytes;
+
+    // Number of open arenas
+    int arena_depth;
+
+    // Nodes can be created and destroyed from different threads
+    SymbolicMutex mtx;
+
+    SXNodePoolData() : num_nodes(0), peak_num_nodes(0), used_bytes(0), reserved_bytes(0),
+                       peak_reserved_bytes(0), arena_depth(0) {
+      for (size_t k=0; k<POOL_NUM_CLASSES; ++k) {
+        cl[k].current = cl[k].first = cl[k].last = 0;
+      }
+    }
+
+    void reserve(size_t bytes) {
+      reserved_bytes += bytes;
+      peak_reserved_bytes = max(peak_reserved_bytes, reserved_bytes);
+    }
+
+    // Add a chunk to the list of a class, at the front or at the back
+    void link(SXNodePoolChunk* ch, bool front) {
+      SXNodePoolClass& c = cl[ch->k];
+      ch->listed = true;
+      if (front) {
+        ch->prev = 0;
+        ch->next = c.first;
+        if (c.first) {
+          c.first->prev = ch;
+        } else {
+          c.last = ch;
+        }
+        c.first = ch;
+      } else {
+        ch->next = 0;
+        ch->prev = c.last;
+        if (c.last) {
+          c.last->next = ch;
+        } else {
+          c.first = ch;
+        }
+        c.last = ch;
+      }
+    }
+
+    // Remove a chunk from the list of its class
+    void unlink(SXNodePoolChunk* ch) {
+      SXNodePoolClass& c = cl[ch->k];
+      ch->listed = false;
+      if (ch->prev) {
+        ch->prev->next = ch->next;
+      } else {
+        c.first = ch->next;
+      }
+      if (ch->next) {
+        ch->next->prev = ch->prev;
+      } else {
+        c.last = ch->prev;
+      }
+    }
+
+    // Mark all blocks of an empty chunk as never handed out
+    static void reset(SXNodePoolChunk* ch) {
+      size_t bsz = (ch->k+1)*POOL_GRANULARITY;
+      ch->free = 0;
+      ch->bump = ch->begin();
+      ch->end = ch->bump + ((POOL_CHUNK_SIZE-SXNodePoolChunk::POOL_HEADER_SIZE)/bsz)*bsz;
+    }
+  };
+
+  // Constructed on first use and never destroyed, since static expressions
+  // can be freed late during program exit
+  static SXNodePoolData& pool() {
+    static SXNodePoolData* p = new SXNodePoolData();
+    return *p;
+  }
+
+  static SXNodePoolChunk* alloc_chunk() {
+    void* ptr;
+#ifdef _WIN32
+    ptr = _aligned_malloc(POOL_CHUNK_SIZE, POOL_CHUNK_SIZE);
+#else // _WIN32
+    if (posix_memalign(&ptr, POOL_CHUNK_SIZE, POOL_CHUNK_SIZE)) ptr = 0;
+#endif // _WIN32
+    if (ptr==0) throw std::bad_alloc();
+    return static_cast<SXNodePoolChunk*>(ptr);
+  }
+
+  static void free_chunk(SXNodePoolChunk* ch) {
+#ifdef _WIN32
+    _aligned_free(ch);
+#else // _WIN32
+    free(ch);
+#endif // _WIN32
+  }
+
+  void* SXNodePool::allocate(std::size_t sz) {
+    size_t k = (max(sz, sizeof(SXNodePoolBlock)) + POOL_GRANULARITY - 1) / POOL_GRANULARITY;
+    size_t bsz = k*POOL_GRANULARITY;
+    SXNodePoolData& p = pool();
+    SymbolicLock lock(p.mtx);
+    void* ret;
+    if (k>POOL_NUM_CLASSES) {
+      // Too large for the pool
+      ret = ::operator new(sz);
+      p.reserve(bsz);
+    } else {
+      SXNodePoolClass& c = p.cl[k-1];
+      SXNodePoolChunk* ch = c.current;
+      if (ch==0 || (ch->free==0 && ch->bump==ch->end)) {
+        // The chunk in use is full, continue with another one
+        ch = c.first;
+        if (ch!=0) {
+          p.unlink(ch);
+        } else {
+          ch = alloc_chunk();
+          ch->k = k-1;
+          ch->num_used = 0;
+          ch->listed = false;
+          SXNodePoolData::reset(ch);
+          p.reserve(POOL_CHUNK_SIZE);
+        }
+        c.current = ch;
+      }
+      if (ch->free!=0) {
+        // Reuse a freed block
+        ret = ch->free;
+        ch->free = ch->free->next;
+      } else {
+        // Hand out blocks in the order of their addresses
+        ret = ch->bump;
+        ch->bump += bsz;
+      }
+      ch->num_used++;
+    }
+    p.num_nodes++;
+    p.peak_num_nodes = max(p.peak_num_nodes, p.num_nodes);
+    p.used_bytes += bsz;
+    return ret;
+  }
+
+  void SXNodePool::deallocate(void* ptr, std::size_t sz) {
+    size_t k = (max(sz, sizeof(SXNodePoolBlock)) + POOL_GRANULARITY - 1) / POOL_GRANULARITY;
+    size_t bsz = k*POOL_GRANULARITY;
+    SXNodePoolData& p = pool();
+    SymbolicLock lock(p.mtx);
+    p.num_nodes--;
+    p.used_bytes -= bsz;
+    if (k>POOL_NUM_CLASSES) {
+      ::operator delete(ptr);
+      p.reserved_bytes -= bsz;
+      return;
+    }
+
+    // Locate the chunk
+    SXNodePoolChunk* ch = reinterpret_cast<SXNodePoolChunk*>(
+      reinterpret_cast<size_t>(ptr) & ~(POOL_CHUNK_SIZE-1));
+    bool was_full = ch->free==0 && ch->bump==ch->end;
+    if (--ch->num_used==0) {
+      // Empty chunks are filled from the start again, keeping new nodes close together
+      SXNodePoolData::reset(ch);
+      if (ch!=p.cl[k-1].current) {
+        // Reuse after the partially used chunks
+        if (ch->listed) p.unlink(ch);
+        p.link(ch, false);
+      }
+    } else {
+      // Add to the free blocks of the chunk
+      SXNodePoolBlock* b = static_cast<SXNodePoolBlock*>(ptr);
+      b->next = ch->free;
+      ch->free = b;
+      if (was_full && ch!=p.cl[k-1].current) p.link(ch, true);
+    }
+  }
+
+  void SXNodePool::releaseMemory() {
+    SXNodePoolData& p = pool();
+    SymbolicLock lock(p.mtx);
+    for (size_t k=0; k<POOL_NUM_CLASSES; ++k) {
+      SXNodePoolClass& c = p.cl[k];
+
+      // Empty chunks are at the end of the list
+      while (c.last!=0 && c.last->num_used==0) {
+        SXNodePoolChunk* ch = c.last;
+        p.unlink(ch);
+        free_chunk(ch);
+        p.reserved_bytes -= POOL_CHUNK_SIZE;
+      }
+
+      // The chunk in use
+      if (c.current!=0 && c.current->num_used==0) {
+        free_chunk(c.current);
+        c.current = 0;
+        p.reserved_bytes -= POOL_CHUNK_SIZE;
+      }
+    }
+  }
+
+  void SXNodePool::resetPeak() {
+    SXNodePoolData& p = pool();
+    SymbolicLock lock(p.mtx);
+    p.peak_num_nodes = p.num_nodes;
+    p.peak_reserved_bytes = p.reserved_bytes;
+  }
+
+  int SXNodePool::getNumNodes() {
+    SXNodePoolData& p = pool();
+    SymbolicLock lock(p.mtx);
+    return p.num_nodes;
+  }
+
+  int SXNodePool::getPeakNumNodes() {
+    SXNodePoolData& p = pool();
+    SymbolicLock lock(p.mtx);
+    return p.peak_num_nodes;
+  }
+
+  double SXNodePool::getUsedMemory() {
+    SXNodePoolData& p = pool();
+    SymbolicLock lock(p.mtx);
+    return p.used_bytes/1e6;
+  }
+
+  double SXNodePool::getReservedMemory() {
+    SXNodePoolData& p = pool();
+    SymbolicLock lock(p.mtx);
+    return p.reserved_bytes/1e6;
+  }
+
+  double SXNodePool::getPeakReservedMemory() {
+    SXNodePoolData& p = pool();
+    SymbolicLock lock(p.mtx);
+    return p.peak_reserved_bytes/1e6;
+  }
+
+  SXNodeArena::SXNodeArena() {
+    SXNodePoolData& p = pool();
+    SymbolicLock lock(p.mtx);
+    p.arena_depth++;
+  }
+
+  SXNodeArena::~SXNodeArena() {
+    SXNodePoolData& p = pool();
+    SymbolicLock lock(p.mtx);
+    if (--p.arena_depth==0) SXNodePool::releaseMemory();
+  }
+
+} // namespace casadi
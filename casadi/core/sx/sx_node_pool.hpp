@@ -0,0 +1,106 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+#ifndef CASADI_SX_NODE_POOL_HPP
+#define CASADI_SX_NODE_POOL_HPP
+
+#include <casadi/core/casadi_export.h>
+#include <cstddef>
+
+namespace casadi {
+
+  /** \brief Memory pool for the nodes of SX expressions
+
+      Nodes of SX expressions are small and are created and destroyed in large numbers.
+      Instead of allocating each node individually on the heap, they are taken from
+      free lists with one list per size class (multiples of 16 bytes). The lists are
+      filled from chunks of 256 kB which are only returned to the system by releaseMemory,
+      or when the outermost SXNodeArena ends.
+
+      This class must never be instantiated. Access its static members directly.
+  */
+  class CASADI_EXPORT SXNodePool {
+  private:
+    /// No instances are allowed
+    SXNodePool();
+
+  public:
+    /// Number of nodes currently allocated
+    static int getNumNodes();
+
+    /// Largest number of nodes allocated at the same time since the last resetPeak
+    static int getPeakNumNodes();
+
+    /// Memory in MB used by the nodes currently allocated
+    static double getUsedMemory();
+
+    /// Memory in MB reserved from the system, including free blocks
+    static double getReservedMemory();
+
+    /// Largest reserved memory in MB since the last resetPeak
+    static double getPeakReservedMemory();
+
+    /// Reset the peak values to the current values
+    static void resetPeak();
+
+    /// Return the chunks without allocated nodes to the system
+    static void releaseMemory();
+
+#ifndef SWIG
+    /// \cond INTERNAL
+    /// Allocate memory for a node of a given size
+    static void* allocate(std::size_t sz);
+
+    /// Return the memory of a node to the pool
+    static void deallocate(void* ptr, std::size_t sz);
+    /// \endcond
+#endif // SWIG
+  };
+
+  /** \brief Scope for building and discarding large SX expressions
+
+      The memory of the nodes freed while the scope is active is returned to the system
+      in bulk, chunk by chunk, when the outermost SXNodeArena object is destroyed.
+      Nodes that are still referenced are not affected.
+  */
+  class CASADI_EXPORT SXNodeArena {
+  public:
+    /// Open a scope
+    SXNodeArena();
+
+    /// Close the scope, releasing unused memory if it is the outermost one
+    ~SXNodeArena();
+
+#ifndef SWIG
+  private:
+    // Not copyable
+    SXNodeArena(const SXNodeArena&);
+    SXNodeArena& operator=(const SXNodeArena&);
+#endif // SWIG
+  };
+
+} // namespace casadi
+
+#endif // CASADI_SX_NODE_POOL_HPP
@@ -27,6 +27,7 @@
 #define UNARY_SXElement_HPP
 
 #include "sx_node.hpp"
+#include "../casadi_options.hpp"
 #include <stack>
 
 /// \cond INTERNAL
@@ -53,6 +54,19 @@ class CASADI_EXPORT UnarySX : public SXNode {
         double ret_val;
         casadi_math<double>::fun(op, dep_val, dep_val, ret_val);
         return ret_val;
+      } else if (CasadiOptions::hash_consing) {
+        // Look for an identical node
+        HashConsKey key(op, std::make_pair(dep.get(), static_cast<const SXNode*>(0)));
+        SymbolicLock lock(hash_cons_mutex_);
+        HashConsTable::iterator it = hash_cons_.find(key);
+        if (it!=hash_cons_.end() && it->second->countUpIfAlive()) {
+          return createCounted(it->second);
+        }
+
+        // Allocate a new node and add it to the table, replacing a dying node
+        UnarySX* n = new UnarySX(op, dep);
+        hash_cons_[key] = n;
+        return SXElement::create(n);
       } else {
         // Expression containing free variables
         return SXElement::create(new UnarySX(op, dep));
@@ -60,7 +74,7 @@ class CASADI_EXPORT UnarySX : public SXNode {
     }
 
     /** \brief Destructor */
-    virtual ~UnarySX() {}
+    virtual ~UnarySX() { removeFromHashCons();}
 
     virtual bool isSmooth() const { return operation_checker<SmoothChecker>(op_);}
 
@@ -34,13 +34,21 @@ namespace casadi {
   }
 
   bool WeakRef::alive() const {
-    return !isNull() && (*this)->raw_ != 0;
+    if (isNull()) return false;
+    SymbolicLock lock(casadi_weak_ref_mutex());
+    return (*this)->raw_ != 0;
   }
 
   SharedObject WeakRef::shared() {
     SharedObject ret;
-    if (alive()) {
-      ret.assignNode((*this)->raw_);
+    if (!isNull()) {
+      SymbolicLock lock(casadi_weak_ref_mutex());
+      SharedObjectNode* raw = (*this)->raw_;
+
+      // The object may be in the process of being destroyed by another thread
+      if (raw!=0 && casadi_count_up_if_alive(raw->count)) {
+        ret.assignNodeNoCount(raw);
+      }
     }
     return ret;
   }
@@ -62,6 +70,7 @@ namespace casadi {
   }
 
   void WeakRef::kill() {
+    SymbolicLock lock(casadi_weak_ref_mutex());
     (*this)->raw_ = 0;
   }
 
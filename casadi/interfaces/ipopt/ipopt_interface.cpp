@@ -35,6 +35,7 @@
 #include <stdlib.h>
 #include <iostream>
 #include <iomanip>
+#include <exception>
 
 using namespace std;
 #include <IpIpoptApplication.hpp>
@@ -205,6 +206,8 @@ namespace casadi {
     // Set pointers to zero
     app_ = 0;
     userclass_ = 0;
+    n_iter_ = 0;
+    last_mu_ = 0;
 #ifdef WITH_SIPOPT
     app_sens_ = 0;
 #endif // WITH_SIPOPT
@@ -323,6 +326,7 @@ namespace casadi {
     if (exact_hessian_) {
       hessLag();
     }
+    compileCallbacks();
 
     // Start an IPOPT application
     Ipopt::SmartPtr<Ipopt::IpoptApplication> *app = new Ipopt::SmartPtr<Ipopt::IpoptApplication>();
@@ -464,11 +468,57 @@ namespace casadi {
     Ipopt::SmartPtr<Ipopt::IpoptApplication> *app =
         static_cast<Ipopt::SmartPtr<Ipopt::IpoptApplication>*>(app_);
 
+    // Warm start: use the multipliers and start with a small barrier parameter
+    std::vector<std::string> saved_str_names, saved_str_values;
+    std::vector<std::string> saved_num_names;
+    std::vector<double> saved_num_values;
+    if (!warm_start_.empty()) {
+      Ipopt::SmartPtr<Ipopt::OptionsList> ops = (*app)->Options();
+      const char* num_names[] = {"mu_init", "warm_start_bound_push", "warm_start_bound_frac",
+                                 "warm_start_slack_bound_push", "warm_start_slack_bound_frac",
+                                 "warm_start_mult_bound_push"};
+      std::string sval;
+      ops->GetStringValue("warm_start_init_point", sval, "");
+      saved_str_names.push_back("warm_start_init_point");
+      saved_str_values.push_back(sval);
+      double nval;
+      for (int i=0; i<sizeof(num_names)/sizeof(num_names[0]); ++i) {
+        ops->GetNumericValue(num_names[i], nval, "");
+        saved_num_names.push_back(num_names[i]);
+        saved_num_values.push_back(nval);
+      }
+      ops->SetStringValue("warm_start_init_point", "yes", true);
+      Dict::const_iterator it = warm_start_.find("mu");
+      if (it!=warm_start_.end()) {
+        double mu = it->second;
+        ops->SetNumericValue("mu_init", mu, true);
+        for (int i=1; i<saved_num_names.size(); ++i) {
+          ops->SetNumericValue(saved_num_names[i], mu, true);
+        }
+      }
+      warm_start_.clear();
+    }
+
     const timer time0 = getTimerTime();
     // Ask Ipopt to solve the problem
-    Ipopt::ApplicationReturnStatus status = (*app)->OptimizeTNLP(*userclass);
+    Ipopt::ApplicationReturnStatus status;
+    std::exception_ptr error;
+    try {
+      status = (*app)->OptimizeTNLP(*userclass);
+    } catch(...) {
+      error = std::current_exception();
+    }
     t_mainloop_ = diffTimers(getTimerTime(), time0);
 
+    // Restore the options changed by the warm start, also if the solver threw
+    for (int i=0; i<saved_str_names.size(); ++i) {
+      (*app)->Options()->SetStringValue(saved_str_names[i], saved_str_values[i], true);
+    }
+    for (int i=0; i<saved_num_names.size(); ++i) {
+      (*app)->Options()->SetNumericValue(saved_num_names[i], saved_num_values[i], true);
+    }
+    if (error) std::rethrow_exception(error);
+
 #ifdef WITH_SIPOPT
     if (run_sens_ || compute_red_hessian_) {
       // Calculate parametric sensitivities
@@ -604,6 +654,16 @@ namespace casadi {
 
   }
 
+  Dict IpoptInterface::getWarmStart() const {
+    Dict ret = NlpSolverInternal::getWarmStart();
+    if (n_iter_>0) ret["mu"] = last_mu_;
+    return ret;
+  }
+
+  std::vector<std::string> IpoptInterface::getWarmStartKeys() const {
+    return std::vector<std::string>(1, "mu");
+  }
+
   bool IpoptInterface::intermediate_callback(
       const double* x, const double* z_L, const double* z_U, const double* g,
       const double* lambda, double obj_value, int iter,
@@ -611,6 +671,7 @@ namespace casadi {
       double regularization_size, double alpha_du, double alpha_pr, int ls_trials,
       bool full_callback) {
     n_iter_ += 1;
+    last_mu_ = mu;
     try {
       log("intermediate_callback started");
       if (gather_stats_) {
@@ -97,6 +97,12 @@ public:
   // Get reduced Hessian
   virtual DMatrix getReducedHessian();
 
+  /// Get the solver state after the last solve, including the final barrier parameter
+  virtual Dict getWarmStart() const;
+
+  /// Warm start entries: the barrier parameter
+  virtual std::vector<std::string> getWarmStartKeys() const;
+
   /// Exact Hessian?
   bool exact_hessian_;
 
@@ -182,6 +188,7 @@ public:
   int n_eval_h_; // number of calls to eval_h
   int n_eval_callback_; // number of calls to callback
   int n_iter_; // number of iterations
+  double last_mu_; // barrier parameter in the last iteration
 
   // For parametric sensitivities with sIPOPT
   #ifdef WITH_SIPOPT
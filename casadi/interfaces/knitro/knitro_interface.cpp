@@ -168,6 +168,7 @@ namespace casadi {
     if (true) { // NOTE: should be only if HessOpt
       hessLag();
     }
+    compileCallbacks();
 
     // Commented out since I have not found out how to change the bounds
     // Allocate KNITRO memory block
@@ -262,7 +262,67 @@ namespace casadi {
     const double* ubA = getPtr(input(QP_SOLVER_UBA));
 
     int flag;
-    if (!called_once_) {
+    if (!warm_start_.empty()) {
+      // Primal guess and dual guess, with qpOASES' sign convention
+      const double* x0 = getPtr(input(QP_SOLVER_X0));
+      transform(input(QP_SOLVER_LAM_X0).begin(), input(QP_SOLVER_LAM_X0).end(),
+                dual_.begin(), negate<double>());
+      Dict::const_iterator it = warm_start_.find("lam_a");
+      if (it!=warm_start_.end()) {
+        vector<double> lam_a = it->second.toDoubleVector();
+        casadi_assert_message(lam_a.size()==nc_, "Warm start: \"lam_a\" has wrong dimension");
+        transform(lam_a.begin(), lam_a.end(), dual_.begin()+n_, negate<double>());
+      } else {
+        fill(dual_.begin()+n_, dual_.end(), 0);
+      }
+
+      // Guess for the working set: -1 lower, 0 inactive, 1 upper
+      vector<int> bounds_status, constraints_status;
+      it = warm_start_.find("bounds_status");
+      if (it!=warm_start_.end()) {
+        bounds_status = it->second.toIntVector();
+        casadi_assert_message(bounds_status.size()==n_,
+                              "Warm start: \"bounds_status\" has wrong dimension");
+      } else {
+        // Obtain from the sign of the multipliers
+        bounds_status.resize(n_);
+        for (int i=0; i<n_; ++i) bounds_status[i] = dual_[i]>0 ? -1 : dual_[i]<0 ? 1 : 0;
+      }
+      it = warm_start_.find("constraints_status");
+      if (it!=warm_start_.end()) {
+        constraints_status = it->second.toIntVector();
+        casadi_assert_message(constraints_status.size()==nc_,
+                              "Warm start: \"constraints_status\" has wrong dimension");
+      } else {
+        constraints_status.resize(nc_);
+        for (int i=0; i<nc_; ++i) {
+          constraints_status[i] = dual_[n_+i]>0 ? -1 : dual_[n_+i]<0 ? 1 : 0;
+        }
+      }
+      qpOASES::Bounds guessed_bounds(n_);
+      for (int i=0; i<n_; ++i) {
+        guessed_bounds.setupBound(i, int_to_SubjectToStatus(bounds_status[i]));
+      }
+      qpOASES::Constraints guessed_constraints(nc_);
+      for (int i=0; i<nc_; ++i) {
+        guessed_constraints.setupConstraint(i, int_to_SubjectToStatus(constraints_status[i]));
+      }
+      warm_start_.clear();
+
+      // Solve from scratch, starting from the guess
+      if (nc_==0) {
+        static_cast<qpOASES::QProblemB*>(qp_)->reset();
+        flag = static_cast<qpOASES::QProblemB*>(qp_)->init(h, g, lb, ub, nWSR, cputime_ptr,
+                                                           x0, getPtr(dual_), &guessed_bounds);
+      } else {
+        static_cast<qpOASES::SQProblem*>(qp_)->reset();
+        flag = static_cast<qpOASES::SQProblem*>(qp_)->init(h, g, a, lb, ub, lbA, ubA,
+                                                           nWSR, cputime_ptr,
+                                                           x0, getPtr(dual_),
+                                                           &guessed_bounds, &guessed_constraints);
+      }
+      called_once_ = true;
+    } else if (!called_once_) {
       if (nc_==0) {
         flag = static_cast<qpOASES::QProblemB*>(qp_)->init(h, g, lb, ub, nWSR, cputime_ptr);
       } else {
@@ -283,6 +343,7 @@ namespace casadi {
     if (flag!=qpOASES::SUCCESSFUL_RETURN && flag!=qpOASES::RET_MAX_NWSR_REACHED) {
       throw CasadiException("qpOASES failed: " + getErrorMessage(flag));
     }
+    stats_["iter_count"] = nWSR;
 
     // Get optimal cost
     output(QP_SOLVER_COST).set(qp_->getObjVal());
@@ -618,6 +679,52 @@ namespace casadi {
     }
   }
 
+  int QpoasesInterface::SubjectToStatus_to_int(qpOASES::SubjectToStatus b) {
+    switch (b) {
+    case qpOASES::ST_LOWER:             return -1;
+    case qpOASES::ST_UPPER:             return 1;
+    default:                            return 0;
+    }
+  }
+
+  qpOASES::SubjectToStatus QpoasesInterface::int_to_SubjectToStatus(int b) {
+    if (b<0) {
+      return qpOASES::ST_LOWER;
+    } else if (b>0) {
+      return qpOASES::ST_UPPER;
+    } else {
+      return qpOASES::ST_INACTIVE;
+    }
+  }
+
+  Dict QpoasesInterface::getWarmStart() const {
+    Dict ret = QpSolverInternal::getWarmStart();
+    if (called_once_) {
+      // Working set of the last solve
+      qpOASES::Bounds bounds;
+      qp_->getBounds(bounds);
+      vector<int> status(n_);
+      for (int i=0; i<n_; ++i) status[i] = SubjectToStatus_to_int(bounds.getStatus(i));
+      ret["bounds_status"] = status;
+      status.resize(nc_);
+      if (nc_>0) {
+        qpOASES::Constraints constraints;
+        static_cast<qpOASES::QProblem*>(qp_)->getConstraints(constraints);
+        for (int i=0; i<nc_; ++i) status[i] = SubjectToStatus_to_int(constraints.getStatus(i));
+      }
+      ret["constraints_status"] = status;
+    }
+    return ret;
+  }
+
+  std::vector<std::string> QpoasesInterface::getWarmStartKeys() const {
+    std::vector<std::string> ret;
+    ret.push_back("lam_a");
+    ret.push_back("bounds_status");
+    ret.push_back("constraints_status");
+    return ret;
+  }
+
   std::string QpoasesInterface::PrintLevel_to_string(qpOASES::PrintLevel b) {
     switch (b) {
     case qpOASES::PL_TABULAR:           return "tabular";
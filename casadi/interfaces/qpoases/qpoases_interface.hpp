@@ -73,6 +73,12 @@ public:
 
   virtual void evaluate();
 
+  /// Get the solver state after the last solve, including the working set
+  virtual Dict getWarmStart() const;
+
+  /// Warm start entries: the constraint multipliers and the working set
+  virtual std::vector<std::string> getWarmStartKeys() const;
+
   /// A documentation string
   static const std::string meta_doc;
 
@@ -89,6 +95,8 @@ public:
     static qpOASES::BooleanType bool_to_BooleanType(bool b);
     static std::string SubjectToStatus_to_string(qpOASES::SubjectToStatus b);
     static qpOASES::SubjectToStatus string_to_SubjectToStatus(std::string b);
+    static int SubjectToStatus_to_int(qpOASES::SubjectToStatus b);
+    static qpOASES::SubjectToStatus int_to_SubjectToStatus(int b);
     static std::string PrintLevel_to_string(qpOASES::PrintLevel b);
     static qpOASES::PrintLevel string_to_PrintLevel(std::string b);
     ///@}
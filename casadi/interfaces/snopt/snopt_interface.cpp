@@ -451,6 +451,9 @@ namespace casadi {
     // Reset the counters
     t_eval_grad_f_ = t_eval_jac_g_ = t_callback_fun_ = t_mainloop_ = 0;
     n_eval_grad_f_ = n_eval_jac_g_ = n_callback_fun_ = n_iter_ = 0;
+
+    // Compile the callbacks, after the dependency analysis above
+    compileCallbacks();
   }
 
   void SnoptInterface::passOptions(snoptProblemC &probC) {
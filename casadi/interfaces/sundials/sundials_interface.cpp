@@ -28,6 +28,8 @@
 #include "casadi/core/std_vector_tools.hpp"
 #include "casadi/core/function/mx_function.hpp"
 #include "casadi/core/function/sx_function.hpp"
+#include "casadi/core/function/parallel_internal.hpp"
+#include "casadi/core/casadi_thread_pool.hpp"
 
 INPUTSCHEME(IntegratorInput)
 OUTPUTSCHEME(IntegratorOutput)
@@ -70,6 +72,11 @@ SundialsInterface::SundialsInterface(const Function& f, const Function& g)
             "[default: equal to use_preconditioner]");
   addOption("stop_at_end",                 OT_BOOLEAN,          true,
             "Stop the integrator at the end of the interval");
+  addOption("sensitivity_groups",          OT_INTEGER,          1,
+            "Split the directions of the forward and adjoint sensitivity integrators "
+            "into this many groups, each integrated by its own integrator instance in a "
+            "separate thread (0: one per thread of the global thread pool). Each group "
+            "repeats the nondifferentiated integration.");
 
   // Quadratures
   addOption("quad_err_con",                OT_BOOLEAN,          false,
@@ -150,6 +157,9 @@ void SundialsInterface::init() {
   abstolB_ = hasSetOption("abstolB") ? static_cast<double>(getOption("abstolB")) : abstol_;
   reltolB_ = hasSetOption("reltolB") ? static_cast<double>(getOption("reltolB")) : reltol_;
   stop_at_end_ = getOption("stop_at_end");
+  sensitivity_groups_ = getOption("sensitivity_groups");
+  casadi_assert_message(sensitivity_groups_>=0,
+                        "Option \"sensitivity_groups\" must be nonnegative.");
   use_preconditioner_ = getOption("use_preconditioner");
   use_preconditionerB_ =  hasSetOption("use_preconditionerB") ?
       static_cast<bool>(getOption("use_preconditionerB")): use_preconditioner_;
@@ -362,6 +372,91 @@ void SundialsInterface::reset() {
     return bw;
   }
 
-} // namespace casadi
+int SundialsInterface::numSensitivityGroups(int ndir) const {
+  int n = sensitivity_groups_;
+#ifdef USE_CXX11
+  if (n==0) n = ThreadPool::global().size();
+#else // USE_CXX11
+  if (n>1) casadi_warning("CasADi was not compiled with C++11 support. "
+                          "Sensitivity groups are integrated one after the other.");
+#endif // USE_CXX11
+  return std::max(std::min(n, ndir), 1);
+}
+
+Function SundialsInterface::getDerForward(const std::string& name, int nfwd, Dict& opts) {
+  int ng = numSensitivityGroups(nfwd);
+  if (ng==1) return IntegratorInternal::getDerForward(name, nfwd, opts);
+  log("SundialsInterface::getDerForward", "begin");
+
+  // Symbolic inputs, outputs and forward seeds
+  vector<MX> arg = symbolicInput();
+  vector<MX> res = symbolicOutput();
+  vector<vector<MX> > seed = symbolicFwdSeed(nfwd, arg);
+  vector<MX> w_in = arg;
+  w_in.insert(w_in.end(), res.begin(), res.end());
+  for (int d=0; d<nfwd; ++d) w_in.insert(w_in.end(), seed[d].begin(), seed[d].end());
+
+  // One integrator for the augmented DAE per group of directions
+  vector<Function> der(ng);
+  vector<MX> v;
+  for (int g=0; g<ng; ++g) {
+    int d_begin = (nfwd*g)/ng, d_end = (nfwd*(g+1))/ng;
+    stringstream ss;
+    ss << name << "_" << g;
+    Dict der_opts;
+    Function der_g = IntegratorInternal::getDerForward(ss.str(), d_end-d_begin, der_opts);
+
+    // Deep copy, so that each group owns its DAE, linear solver and all other state
+    der[g] = deepcopy(der_g);
+    v.insert(v.end(), arg.begin(), arg.end());
+    v.insert(v.end(), res.begin(), res.end());
+    for (int d=d_begin; d<d_end; ++d) v.insert(v.end(), seed[d].begin(), seed[d].end());
+  }
+
+  // Integrate the groups concurrently, the sensitivities come out sorted by direction
+  Dict p_opts;
+  p_opts["independent"] = true;
+  Function p = ParallelInternal::create(name + "_groups", der, p_opts);
+  log("SundialsInterface::getDerForward", "end");
+  return MXFunction(name, w_in, p(v), opts);
+}
 
+Function SundialsInterface::getDerReverse(const std::string& name, int nadj, Dict& opts) {
+  int ng = numSensitivityGroups(nadj);
+  if (ng==1) return IntegratorInternal::getDerReverse(name, nadj, opts);
+  log("SundialsInterface::getDerReverse", "begin");
+
+  // Symbolic inputs, outputs and adjoint seeds
+  vector<MX> arg = symbolicInput();
+  vector<MX> res = symbolicOutput();
+  vector<vector<MX> > seed = symbolicAdjSeed(nadj, res);
+  vector<MX> w_in = arg;
+  w_in.insert(w_in.end(), res.begin(), res.end());
+  for (int d=0; d<nadj; ++d) w_in.insert(w_in.end(), seed[d].begin(), seed[d].end());
+
+  // One integrator for the augmented DAE per group of directions
+  vector<Function> der(ng);
+  vector<MX> v;
+  for (int g=0; g<ng; ++g) {
+    int d_begin = (nadj*g)/ng, d_end = (nadj*(g+1))/ng;
+    stringstream ss;
+    ss << name << "_" << g;
+    Dict der_opts;
+    Function der_g = IntegratorInternal::getDerReverse(ss.str(), d_end-d_begin, der_opts);
+
+    // Deep copy, so that each group owns its DAE, linear solver and all other state
+    der[g] = deepcopy(der_g);
+    v.insert(v.end(), arg.begin(), arg.end());
+    v.insert(v.end(), res.begin(), res.end());
+    for (int d=d_begin; d<d_end; ++d) v.insert(v.end(), seed[d].begin(), seed[d].end());
+  }
 
+  // Integrate the groups concurrently, the sensitivities come out sorted by direction
+  Dict p_opts;
+  p_opts["independent"] = true;
+  Function p = ParallelInternal::create(name + "_groups", der, p_opts);
+  log("SundialsInterface::getDerReverse", "end");
+  return MXFunction(name, w_in, p(v), opts);
+}
+
+} // namespace casadi
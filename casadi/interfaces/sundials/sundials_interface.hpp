@@ -57,6 +57,15 @@ public:
   /** \brief  Set stop time for the integration */
   virtual void setStopTime(double tf) = 0;
 
+  /** \brief Generate a function that calculates \a nfwd forward derivatives */
+  virtual Function getDerForward(const std::string& name, int nfwd, Dict& opts);
+
+  /** \brief Generate a function that calculates \a nadj adjoint derivatives */
+  virtual Function getDerReverse(const std::string& name, int nadj, Dict& opts);
+
+  /// Number of groups the sensitivity directions are split into
+  int numSensitivityGroups(int ndir) const;
+
   /// Linear solver forward, backward
   LinearSolver linsol_, linsolB_;
 
@@ -69,6 +78,7 @@ public:
   int max_num_steps_;
   bool finite_difference_fsens_;
   bool stop_at_end_;
+  int sensitivity_groups_;
   ///@}
 
   /// number of checkpoints stored so far
@@ -220,6 +220,7 @@ namespace casadi {
     if (exact_hessian_) { // does not appear to work
       hessLag();
     }
+    compileCallbacks();
 
     // Update status?
     status_[TerminateSuccess]="TerminateSuccess";
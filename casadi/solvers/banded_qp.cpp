@@ -0,0 +1,609 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+
+#include "banded_qp.hpp"
+
+#include <algorithm>
+#include <cmath>
+#include <limits>
+
+using namespace std;
+namespace casadi {
+
+  extern "C"
+  int CASADI_QPSOLVER_BANDED_EXPORT
+  casadi_register_qpsolver_banded(QpSolverInternal::Plugin* plugin) {
+    plugin->creator = BandedQp::creator;
+    plugin->name = "banded";
+    plugin->doc = BandedQp::meta_doc.c_str();
+    plugin->version = 23;
+    return 0;
+  }
+
+  extern "C"
+  void CASADI_QPSOLVER_BANDED_EXPORT casadi_load_qpsolver_banded() {
+    QpSolverInternal::registerPlugin(casadi_register_qpsolver_banded);
+  }
+
+  BandedQp::BandedQp(const std::map<std::string, Sparsity> &st) : QpSolverInternal(st) {
+    addOption("max_iter", OT_INTEGER, 100, "Maximum number of interior point iterations");
+    addOption("tol", OT_REAL, 1e-10,
+              "Tolerance on the scaled primal and dual residuals and on the complementarity");
+    addOption("ordering", OT_STRING, "auto",
+              "Ordering of the KKT matrix: stage-wise, reverse Cuthill-McKee or "
+              "whichever gives the smaller bandwidth", "stage|rcm|auto");
+  }
+
+  BandedQp::~BandedQp() {
+  }
+
+  /// Largest of the upper and lower bandwidth of a symmetrically permuted pattern
+  inline int permutedBandwidth(const Sparsity& sp, const std::vector<int>& perm) {
+    vector<int> iperm(perm.size());
+    for (int k=0; k<perm.size(); ++k) iperm[perm[k]] = k;
+    Sparsity sp_perm = sp.pmult(iperm);
+    return std::max(sp_perm.bandwidthU(), sp_perm.bandwidthL());
+  }
+
+  void BandedQp::init() {
+    // Initialize the base classes
+    QpSolverInternal::init();
+
+    // Read options
+    max_iter_ = getOption("max_iter");
+    tol_ = getOption("tol");
+
+    // Sparsity of the KKT matrix [H + D, A'; A, -D^-1], always including the diagonal
+    nk_ = n_ + nc_;
+    const Sparsity& H = input(QP_SOLVER_H).sparsity();
+    vector<int> kkt_row, kkt_col;
+    h_row_ = H.getRow();
+    vector<int> h_col = H.getCol();
+    kkt_row.insert(kkt_row.end(), h_row_.begin(), h_row_.end());
+    kkt_col.insert(kkt_col.end(), h_col.begin(), h_col.end());
+    a_row_.clear();
+    a_col_.clear();
+    if (nc_>0) {
+      const Sparsity& A = input(QP_SOLVER_A).sparsity();
+      a_row_ = A.getRow();
+      a_col_ = A.getCol();
+      for (int k=0; k<a_row_.size(); ++k) {
+        kkt_row.push_back(n_ + a_row_[k]);
+        kkt_col.push_back(a_col_[k]);
+        kkt_row.push_back(a_col_[k]);
+        kkt_col.push_back(n_ + a_row_[k]);
+      }
+    }
+    for (int j=0; j<nk_; ++j) {
+      kkt_row.push_back(j);
+      kkt_col.push_back(j);
+    }
+    Sparsity kkt = Sparsity::triplet(nk_, nk_, kkt_row, kkt_col);
+
+    // Permutation minimizing the bandwidth
+    string ordering = getOption("ordering");
+    if (ordering=="stage") {
+      perm_ = stageOrdering();
+    } else if (ordering=="rcm") {
+      perm_ = rcmOrdering(kkt);
+    } else {
+      perm_ = stageOrdering();
+      vector<int> perm_rcm = rcmOrdering(kkt);
+      if (permutedBandwidth(kkt, perm_rcm) < permutedBandwidth(kkt, perm_)) {
+        perm_ = perm_rcm;
+        ordering = "rcm";
+      } else {
+        ordering = "stage";
+      }
+    }
+    iperm_.resize(nk_);
+    for (int k=0; k<nk_; ++k) iperm_[perm_[k]] = k;
+
+    // Bandwidth of the permuted KKT matrix
+    Sparsity kkt_perm = kkt.pmult(iperm_);
+    kl_ = kkt_perm.bandwidthL();
+    ku_ = kkt_perm.bandwidthU();
+    ldab_ = 2*kl_ + ku_ + 1;
+    stats_["ordering"] = ordering;
+    stats_["bandwidth"] = std::max(kl_, ku_);
+
+    // Location of element (i, j) of the permuted matrix in LAPACK-style banded storage,
+    // with room for the kl_ extra superdiagonals created by the row interchanges
+    const int kv = kl_ + ku_;
+    h_loc_.resize(h_row_.size());
+    for (int k=0; k<h_row_.size(); ++k) {
+      int i = iperm_[h_row_[k]], j = iperm_[h_col[k]];
+      h_loc_[k] = kv + i - j + j*ldab_;
+    }
+    a_loc_.resize(a_row_.size());
+    at_loc_.resize(a_row_.size());
+    for (int k=0; k<a_row_.size(); ++k) {
+      int i = iperm_[n_ + a_row_[k]], j = iperm_[a_col_[k]];
+      a_loc_[k] = kv + i - j + j*ldab_;
+      at_loc_[k] = kv + j - i + i*ldab_;
+    }
+    diag_loc_.resize(nk_);
+    for (int k=0; k<nk_; ++k) {
+      int i = iperm_[k];
+      diag_loc_[k] = kv + i*ldab_;
+    }
+
+    // Allocate work vectors
+    ab_.resize(ldab_*nk_);
+    ipiv_.resize(nk_);
+    wk_.resize(nk_);
+    lb_.resize(nk_);
+    ub_.resize(nk_);
+    has_lb_.resize(nk_);
+    has_ub_.resize(nk_);
+    is_eq_.resize(nk_);
+    x_.resize(n_);
+    c_.resize(nk_);
+    sl_.resize(nk_);
+    su_.resize(nk_);
+    zl_.resize(nk_);
+    zu_.resize(nk_);
+    y_.resize(nk_);
+    d_.resize(nk_);
+    rd_.resize(n_);
+    rl_.resize(nk_);
+    ru_.resize(nk_);
+    rcl_.resize(nk_);
+    rcu_.resize(nk_);
+    dk_.resize(nk_);
+    dc_.resize(nk_);
+    dsl_.resize(nk_);
+    dsu_.resize(nk_);
+    dzl_.resize(nk_);
+    dzu_.resize(nk_);
+    dsl_aff_.resize(nk_);
+    dsu_aff_.resize(nk_);
+    dzl_aff_.resize(nk_);
+    dzu_aff_.resize(nk_);
+  }
+
+  std::vector<int> BandedQp::stageOrdering() const {
+    // Last variable that each constraint depends on, -1 if none
+    vector<int> last(nc_, -1);
+    for (int k=0; k<a_row_.size(); ++k) {
+      last[a_row_[k]] = std::max(last[a_row_[k]], a_col_[k]);
+    }
+
+    // Sort the constraints by the last variable (counting sort, stable)
+    vector<int> offset(n_+2, 0);
+    for (int i=0; i<nc_; ++i) offset[last[i]+2]++;
+    for (int k=0; k<=n_; ++k) offset[k+1] += offset[k];
+    vector<int> sorted(nc_);
+    for (int i=0; i<nc_; ++i) sorted[offset[last[i]+1]++] = i;
+
+    // Place each constraint directly after the last variable it depends on
+    vector<int> perm;
+    perm.reserve(nk_);
+    vector<int>::const_iterator it = sorted.begin();
+    while (it!=sorted.end() && last[*it]<0) perm.push_back(n_ + *it++);
+    for (int j=0; j<n_; ++j) {
+      perm.push_back(j);
+      while (it!=sorted.end() && last[*it]==j) perm.push_back(n_ + *it++);
+    }
+    return perm;
+  }
+
+  std::vector<int> BandedQp::rcmOrdering(const Sparsity& kkt) const {
+    const int* colind = kkt.colind();
+    const int* row = kkt.row();
+
+    // Degree of each node
+    vector<int> degree(nk_);
+    for (int j=0; j<nk_; ++j) degree[j] = colind[j+1] - colind[j];
+
+    vector<int> order, level(nk_, -1), queue, nb;
+    order.reserve(nk_);
+    vector<bool> visited(nk_, false);
+    while (order.size()<nk_) {
+      // Unvisited node of minimum degree
+      int start = -1;
+      for (int j=0; j<nk_; ++j) {
+        if (!visited[j] && (start<0 || degree[j]<degree[start])) start = j;
+      }
+
+      // Move to a pseudo-peripheral node of its connected component
+      for (int sweep=0; sweep<2; ++sweep) {
+        queue.clear();
+        queue.push_back(start);
+        level[start] = 0;
+        for (int q=0; q<queue.size(); ++q) {
+          int v = queue[q];
+          for (int k=colind[v]; k<colind[v+1]; ++k) {
+            int w = row[k];
+            if (level[w]<0) {
+              level[w] = level[v] + 1;
+              queue.push_back(w);
+            }
+          }
+        }
+        int last_level = level[queue.back()];
+        for (int q=0; q<queue.size(); ++q) {
+          int v = queue[q];
+          if (level[v]==last_level && (level[start]!=last_level || degree[v]<degree[start])) {
+            start = v;
+          }
+        }
+        for (int q=0; q<queue.size(); ++q) level[queue[q]] = -1;
+      }
+
+      // Breadth-first search, visiting neighbors in order of increasing degree
+      int first = order.size();
+      order.push_back(start);
+      visited[start] = true;
+      for (int q=first; q<order.size(); ++q) {
+        int v = order[q];
+        nb.clear();
+        for (int k=colind[v]; k<colind[v+1]; ++k) {
+          int w = row[k];
+          if (!visited[w]) {
+            visited[w] = true;
+            nb.push_back(w);
+          }
+        }
+        for (int i=1; i<nb.size(); ++i) {
+          int w = nb[i], ii;
+          for (ii=i; ii>0 && degree[nb[ii-1]]>degree[w]; --ii) nb[ii] = nb[ii-1];
+          nb[ii] = w;
+        }
+        order.insert(order.end(), nb.begin(), nb.end());
+      }
+    }
+    std::reverse(order.begin(), order.end());
+    return order;
+  }
+
+  void BandedQp::factorize() {
+    // Regularization, keeps the KKT matrix nonsingular for rank-deficient problems
+    const double reg = 1e-12;
+
+    // Assemble the KKT matrix, rows of A scaled by 1/(1+d)
+    std::fill(ab_.begin(), ab_.end(), 0);
+    const double* h = input(QP_SOLVER_H).ptr();
+    for (int k=0; k<h_row_.size(); ++k) {
+      if (!is_eq_[h_row_[k]]) ab_[h_loc_[k]] += h[k];
+    }
+    for (int j=0; j<n_; ++j) {
+      if (is_eq_[j]) {
+        ab_[diag_loc_[j]] = 1;
+      } else {
+        ab_[diag_loc_[j]] += d_[j] + reg;
+      }
+    }
+    const double* a = input(QP_SOLVER_A).ptr();
+    for (int k=0; k<a_row_.size(); ++k) {
+      int i = n_ + a_row_[k];
+      if (!is_eq_[a_col_[k]]) ab_[at_loc_[k]] += a[k];
+      ab_[a_loc_[k]] += is_eq_[i] ? a[k] : a[k]*d_[i]/(1+d_[i]);
+    }
+    for (int i=n_; i<nk_; ++i) {
+      ab_[diag_loc_[i]] = is_eq_[i] ? -reg : -1/(1+d_[i]);
+    }
+
+    // Banded LU factorization with partial pivoting, cf. LAPACK's DGBTF2
+    const int kv = kl_ + ku_;
+    int ju = 0;
+    for (int j=0; j<nk_; ++j) {
+      double* col = getPtr(ab_) + kv + j*ldab_;
+      int km = std::min(kl_, nk_-1-j);
+
+      // Find the pivot
+      int jp = 0;
+      for (int i=1; i<=km; ++i) {
+        if (std::fabs(col[i])>std::fabs(col[jp])) jp = i;
+      }
+      ipiv_[j] = j + jp;
+      if (col[jp]==0) col[jp] = std::numeric_limits<double>::epsilon();
+      ju = std::max(ju, std::min(j+ku_+jp, nk_-1));
+
+      // Interchange rows
+      if (jp!=0) {
+        for (int k=0; k<=ju-j; ++k) std::swap(col[jp + k*(ldab_-1)], col[k*(ldab_-1)]);
+      }
+
+      // Compute the multipliers and update the trailing submatrix
+      for (int i=1; i<=km; ++i) col[i] /= col[0];
+      for (int k=1; k<=ju-j; ++k) {
+        double* col_k = col + k*(ldab_-1);
+        double u = col_k[0];
+        if (u!=0) {
+          for (int i=1; i<=km; ++i) col_k[i] -= col[i]*u;
+        }
+      }
+    }
+  }
+
+  void BandedQp::solveKKT(double* x) {
+    // Permute the right-hand side
+    for (int k=0; k<nk_; ++k) wk_[k] = x[perm_[k]];
+
+    // Apply the row interchanges and solve with L
+    const int kv = kl_ + ku_;
+    for (int j=0; j<nk_-1; ++j) {
+      int lm = std::min(kl_, nk_-1-j);
+      int l = ipiv_[j];
+      if (l!=j) std::swap(wk_[l], wk_[j]);
+      const double* col = getPtr(ab_) + kv + j*ldab_;
+      for (int i=1; i<=lm; ++i) wk_[j+i] -= col[i]*wk_[j];
+    }
+
+    // Solve with U
+    for (int j=nk_-1; j>=0; --j) {
+      const double* col = getPtr(ab_) + kv + j*ldab_;
+      wk_[j] /= col[0];
+      for (int i=std::max(0, j-kv); i<j; ++i) wk_[i] -= col[i-j]*wk_[j];
+    }
+
+    // Permute back
+    for (int k=0; k<nk_; ++k) x[perm_[k]] = wk_[k];
+  }
+
+  void BandedQp::computeStep() {
+    // Eliminate the slacks and bound multipliers: dlam = d*dc + e
+    for (int j=0; j<nk_; ++j) {
+      double e = 0;
+      if (has_lb_[j]) e -= (rcl_[j] - zl_[j]*rl_[j])/sl_[j];
+      if (has_ub_[j]) e += (rcu_[j] + zu_[j]*ru_[j])/su_[j];
+      if (is_eq_[j]) {
+        dk_[j] = -rl_[j];
+      } else if (j<n_) {
+        dk_[j] = -rd_[j] - e;
+      } else {
+        dk_[j] = -e/(1+d_[j]);
+      }
+    }
+
+    // Solve the KKT system for the primal step and the step in the constraint multipliers
+    solveKKT(getPtr(dk_));
+
+    // Step in the stacked quantities [x; A*x]
+    std::copy(dk_.begin(), dk_.begin()+n_, dc_.begin());
+    std::fill(dc_.begin()+n_, dc_.end(), 0);
+    const double* a = input(QP_SOLVER_A).ptr();
+    for (int k=0; k<a_row_.size(); ++k) dc_[n_+a_row_[k]] += a[k]*dk_[a_col_[k]];
+
+    // Recover the step in the slacks and bound multipliers
+    for (int j=0; j<nk_; ++j) {
+      if (has_lb_[j]) {
+        dsl_[j] = dc_[j] + rl_[j];
+        dzl_[j] = (rcl_[j] - zl_[j]*dsl_[j])/sl_[j];
+      }
+      if (has_ub_[j]) {
+        dsu_[j] = -dc_[j] - ru_[j];
+        dzu_[j] = (rcu_[j] - zu_[j]*dsu_[j])/su_[j];
+      }
+    }
+  }
+
+  void BandedQp::maxStep(double tau, double& alpha_pr, double& alpha_du) const {
+    alpha_pr = alpha_du = 1;
+    for (int j=0; j<nk_; ++j) {
+      if (has_lb_[j]) {
+        if (dsl_[j]<0) alpha_pr = std::min(alpha_pr, -tau*sl_[j]/dsl_[j]);
+        if (dzl_[j]<0) alpha_du = std::min(alpha_du, -tau*zl_[j]/dzl_[j]);
+      }
+      if (has_ub_[j]) {
+        if (dsu_[j]<0) alpha_pr = std::min(alpha_pr, -tau*su_[j]/dsu_[j]);
+        if (dzu_[j]<0) alpha_du = std::min(alpha_du, -tau*zu_[j]/dzu_[j]);
+      }
+    }
+  }
+
+  void BandedQp::evaluate() {
+    if (inputs_check_) checkInputs();
+
+    const double* h = input(QP_SOLVER_H).ptr();
+    const int* h_colind = input(QP_SOLVER_H).colind();
+    const double* g = input(QP_SOLVER_G).ptr();
+    const double* a = input(QP_SOLVER_A).ptr();
+    const double inf = std::numeric_limits<double>::infinity();
+
+    // Classify the bounds of the stacked quantities [x; A*x]
+    const vector<double> &lbx = input(QP_SOLVER_LBX).data(), &ubx = input(QP_SOLVER_UBX).data();
+    const vector<double> &lba = input(QP_SOLVER_LBA).data(), &uba = input(QP_SOLVER_UBA).data();
+    std::copy(lbx.begin(), lbx.end(), lb_.begin());
+    std::copy(ubx.begin(), ubx.end(), ub_.begin());
+    std::copy(lba.begin(), lba.end(), lb_.begin()+n_);
+    std::copy(uba.begin(), uba.end(), ub_.begin()+n_);
+    int n_bounds = 0;
+    double bnorm = 0, gnorm = 0;
+    for (int j=0; j<nk_; ++j) {
+      is_eq_[j] = lb_[j]==ub_[j];
+      has_lb_[j] = !is_eq_[j] && lb_[j]!=-inf;
+      has_ub_[j] = !is_eq_[j] && ub_[j]!=inf;
+      if (has_lb_[j]) n_bounds++;
+      if (has_ub_[j]) n_bounds++;
+      if (lb_[j]!=-inf) bnorm = std::max(bnorm, std::fabs(lb_[j]));
+      if (ub_[j]!=inf) bnorm = std::max(bnorm, std::fabs(ub_[j]));
+    }
+    for (int j=0; j<n_; ++j) gnorm = std::max(gnorm, std::fabs(g[j]));
+
+    // Starting point: primal guess, slacks and bound multipliers at least one
+    std::copy(input(QP_SOLVER_X0).data().begin(), input(QP_SOLVER_X0).data().end(), x_.begin());
+    std::copy(x_.begin(), x_.end(), c_.begin());
+    std::fill(c_.begin()+n_, c_.end(), 0);
+    for (int k=0; k<a_row_.size(); ++k) c_[n_+a_row_[k]] += a[k]*x_[a_col_[k]];
+    for (int j=0; j<nk_; ++j) {
+      sl_[j] = has_lb_[j] ? std::max(c_[j] - lb_[j], 1.) : 0;
+      su_[j] = has_ub_[j] ? std::max(ub_[j] - c_[j], 1.) : 0;
+      zl_[j] = has_lb_[j] ? 1 : 0;
+      zu_[j] = has_ub_[j] ? 1 : 0;
+      y_[j] = 0;
+    }
+
+    int iter;
+    bool converged = false;
+    for (iter=0; ; ++iter) {
+      // Largest terms in the primal and dual residuals, for scaling the tolerances
+      double pscale = bnorm, dscale = gnorm;
+
+      // Stacked quantities [x; A*x]
+      std::copy(x_.begin(), x_.end(), c_.begin());
+      std::fill(c_.begin()+n_, c_.end(), 0);
+      for (int k=0; k<a_row_.size(); ++k) {
+        double t = a[k]*x_[a_col_[k]];
+        c_[n_+a_row_[k]] += t;
+        pscale = std::max(pscale, std::fabs(t));
+      }
+      for (int j=0; j<n_; ++j) pscale = std::max(pscale, std::fabs(x_[j]));
+
+      // Multipliers: y for equalities, zu - zl otherwise
+      for (int j=0; j<nk_; ++j) {
+        if (!is_eq_[j]) y_[j] = zu_[j] - zl_[j];
+      }
+
+      // Dual residual H*x + g + lam_x + A'*lam_a, not defined for fixed variables
+      std::copy(g, g+n_, rd_.begin());
+      for (int cc=0; cc<n_; ++cc) {
+        for (int k=h_colind[cc]; k<h_colind[cc+1]; ++k) {
+          double t = h[k]*x_[cc];
+          rd_[h_row_[k]] += t;
+          dscale = std::max(dscale, std::fabs(t));
+        }
+      }
+      for (int j=0; j<n_; ++j) {
+        rd_[j] += y_[j];
+        dscale = std::max(dscale, std::fabs(y_[j]));
+      }
+      for (int k=0; k<a_row_.size(); ++k) {
+        double t = a[k]*y_[n_+a_row_[k]];
+        rd_[a_col_[k]] += t;
+        dscale = std::max(dscale, std::fabs(t));
+      }
+
+      // Primal residuals and complementarity
+      double pr = 0, du = 0, mu = 0;
+      for (int j=0; j<nk_; ++j) {
+        if (is_eq_[j]) {
+          rl_[j] = c_[j] - lb_[j];
+          pr = std::max(pr, std::fabs(rl_[j]));
+        }
+        if (has_lb_[j]) {
+          rl_[j] = c_[j] - sl_[j] - lb_[j];
+          pr = std::max(pr, std::fabs(rl_[j]));
+          mu += sl_[j]*zl_[j];
+        }
+        if (has_ub_[j]) {
+          ru_[j] = c_[j] + su_[j] - ub_[j];
+          pr = std::max(pr, std::fabs(ru_[j]));
+          mu += su_[j]*zu_[j];
+        }
+      }
+      if (n_bounds>0) mu /= n_bounds;
+      for (int j=0; j<n_; ++j) {
+        if (!is_eq_[j]) du = std::max(du, std::fabs(rd_[j]));
+      }
+
+      // Check for convergence
+      if (pr<=tol_*(1+pscale) && du<=tol_*(1+dscale) && mu<=tol_) {
+        converged = true;
+        break;
+      }
+      if (iter==max_iter_) break;
+
+      // Barrier terms and KKT factorization
+      for (int j=0; j<nk_; ++j) {
+        d_[j] = 0;
+        if (has_lb_[j]) d_[j] += zl_[j]/sl_[j];
+        if (has_ub_[j]) d_[j] += zu_[j]/su_[j];
+      }
+      factorize();
+
+      // Affine scaling (predictor) step
+      for (int j=0; j<nk_; ++j) {
+        rcl_[j] = -sl_[j]*zl_[j];
+        rcu_[j] = -su_[j]*zu_[j];
+      }
+      computeStep();
+      double alpha_pr, alpha_du;
+      maxStep(1, alpha_pr, alpha_du);
+
+      // Centering parameter (Mehrotra's heuristic)
+      double sigma = 0;
+      if (n_bounds>0 && mu>0) {
+        double mu_aff = 0;
+        for (int j=0; j<nk_; ++j) {
+          if (has_lb_[j]) mu_aff += (sl_[j] + alpha_pr*dsl_[j])*(zl_[j] + alpha_du*dzl_[j]);
+          if (has_ub_[j]) mu_aff += (su_[j] + alpha_pr*dsu_[j])*(zu_[j] + alpha_du*dzu_[j]);
+        }
+        mu_aff /= n_bounds;
+        sigma = std::pow(mu_aff/mu, 3);
+      }
+
+      // Corrector step, reusing the factorization
+      std::copy(dsl_.begin(), dsl_.end(), dsl_aff_.begin());
+      std::copy(dsu_.begin(), dsu_.end(), dsu_aff_.begin());
+      std::copy(dzl_.begin(), dzl_.end(), dzl_aff_.begin());
+      std::copy(dzu_.begin(), dzu_.end(), dzu_aff_.begin());
+      for (int j=0; j<nk_; ++j) {
+        rcl_[j] = sigma*mu - sl_[j]*zl_[j] - dsl_aff_[j]*dzl_aff_[j];
+        rcu_[j] = sigma*mu - su_[j]*zu_[j] - dsu_aff_[j]*dzu_aff_[j];
+      }
+      computeStep();
+      maxStep(0.995, alpha_pr, alpha_du);
+
+      // Take the step
+      for (int j=0; j<n_; ++j) x_[j] += alpha_pr*dk_[j];
+      for (int j=0; j<nk_; ++j) {
+        if (has_lb_[j]) {
+          sl_[j] += alpha_pr*dsl_[j];
+          zl_[j] += alpha_du*dzl_[j];
+        }
+        if (has_ub_[j]) {
+          su_[j] += alpha_pr*dsu_[j];
+          zu_[j] += alpha_du*dzu_[j];
+        }
+        if (is_eq_[j] && j>=n_) y_[j] += alpha_du*dk_[j];
+      }
+    }
+
+    stats_["iter_count"] = iter;
+    stats_["return_status"] = converged ? "Solve_Succeeded" : "Maximum_Iterations_Exceeded";
+    casadi_assert_message(converged, "BandedQp::evaluate: No convergence after "
+                          << max_iter_ << " iterations.");
+
+    // Multipliers of fixed variables from the dual residual
+    for (int j=0; j<n_; ++j) {
+      if (is_eq_[j]) y_[j] -= rd_[j];
+    }
+
+    // Get the solution
+    std::copy(x_.begin(), x_.end(), output(QP_SOLVER_X).data().begin());
+    std::copy(y_.begin(), y_.begin()+n_, output(QP_SOLVER_LAM_X).data().begin());
+    std::copy(y_.begin()+n_, y_.end(), output(QP_SOLVER_LAM_A).data().begin());
+    double cost = 0;
+    for (int cc=0; cc<n_; ++cc) {
+      cost += g[cc]*x_[cc];
+      for (int k=h_colind[cc]; k<h_colind[cc+1]; ++k) cost += x_[h_row_[k]]*h[k]*x_[cc]/2;
+    }
+    output(QP_SOLVER_COST).set(cost);
+  }
+
+} // namespace casadi
@@ -0,0 +1,150 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+#ifndef CASADI_BANDED_QP_HPP
+#define CASADI_BANDED_QP_HPP
+
+#include "casadi/core/function/qp_solver_internal.hpp"
+
+#include <casadi/solvers/casadi_qpsolver_banded_export.h>
+
+
+/** \defgroup plugin_QpSolver_banded
+   Primal-dual interior point QP solver for block-banded problems, such as
+   the QPs arising from multiple shooting discretizations of optimal control
+   problems.
+
+   The rows and columns of the KKT matrix are permuted once, at initialization,
+   to minimize its bandwidth. Either the variables are kept in the given
+   (stage-wise) order and each constraint is placed right after the last
+   variable it depends on, or a reverse Cuthill-McKee ordering of the KKT graph
+   is used, whichever gives the smaller bandwidth. The KKT systems of the
+   interior point iterations are then solved with a banded LU factorization
+   with partial pivoting, whose cost is linear in the number of stages.
+*/
+
+/** \pluginsection{QpSolver,banded} */
+
+/// \cond INTERNAL
+namespace casadi {
+
+  /** \brief \pluginbrief{QpSolver,banded}
+
+   @copydoc QpSolver_doc
+   @copydoc plugin_QpSolver_banded
+  */
+  class CASADI_QPSOLVER_BANDED_EXPORT BandedQp : public QpSolverInternal {
+  public:
+    /** \brief  Create a new Solver */
+    explicit BandedQp(const std::map<std::string, Sparsity> &st);
+
+    /** \brief  Create a new QP Solver */
+    static QpSolverInternal* creator(const std::map<std::string, Sparsity>& st) {
+      return new BandedQp(st);
+    }
+
+    /** \brief  Destructor */
+    virtual ~BandedQp();
+
+    /** \brief  Clone */
+    virtual BandedQp* clone() const { return new BandedQp(*this);}
+
+    /** \brief  Initialize */
+    virtual void init();
+
+    /** \brief  Solve the QP */
+    virtual void evaluate();
+
+    /// A documentation string
+    static const std::string meta_doc;
+
+  protected:
+    /// Ordering that keeps the variables in place and interleaves the constraints
+    std::vector<int> stageOrdering() const;
+
+    /// Reverse Cuthill-McKee ordering of the KKT graph
+    std::vector<int> rcmOrdering(const Sparsity& kkt) const;
+
+    /// Assemble and factorize the KKT matrix in banded storage
+    void factorize();
+
+    /// Solve with the factorized KKT matrix, in-place
+    void solveKKT(double* x);
+
+    /// Calculate the search direction for the current complementarity residuals
+    void computeStep();
+
+    /// Largest step in (0, 1] keeping the slacks and bound multipliers positive
+    void maxStep(double tau, double& alpha_pr, double& alpha_du) const;
+
+    /// Number of KKT rows, n_ + nc_
+    int nk_;
+
+    /// Lower and upper bandwidth of the permuted KKT matrix
+    int kl_, ku_;
+
+    /// Leading dimension of the banded storage, 2*kl_ + ku_ + 1
+    int ldab_;
+
+    /// KKT permutation (new to old) and its inverse
+    std::vector<int> perm_, iperm_;
+
+    /// Banded storage locations of the nonzeros of H, A and A^T, and of the diagonal
+    std::vector<int> h_loc_, a_loc_, at_loc_, diag_loc_;
+
+    /// Row of each nonzero of H, row and column of each nonzero of A
+    std::vector<int> h_row_, a_row_, a_col_;
+
+    /// Banded factors and pivots
+    std::vector<double> ab_;
+    std::vector<int> ipiv_;
+
+    /// Bounds of the stacked quantities [x; A*x] and their classification
+    std::vector<double> lb_, ub_;
+    std::vector<bool> has_lb_, has_ub_, is_eq_;
+
+    /// Iterates: primal, stacked quantities, slacks, bound and equality multipliers
+    std::vector<double> x_, c_, sl_, su_, zl_, zu_, y_;
+
+    /// Barrier terms, dual residual, primal residuals and complementarity residuals
+    std::vector<double> d_, rd_, rl_, ru_, rcl_, rcu_;
+
+    /// Search direction
+    std::vector<double> dk_, dc_, dsl_, dsu_, dzl_, dzu_;
+
+    /// Affine scaling search direction
+    std::vector<double> dsl_aff_, dsu_aff_, dzl_aff_, dzu_aff_;
+
+    /// Work vector for the permuted right-hand side
+    std::vector<double> wk_;
+
+    /// Options
+    int max_iter_;
+    double tol_;
+  };
+
+} // namespace casadi
+/// \endcond
+#endif // CASADI_BANDED_QP_HPP
@@ -0,0 +1,78 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+
+      #include "banded_qp.hpp"
+      #include <string>
+
+      const std::string casadi::BandedQp::meta_doc=
+      "\n"
+"Primal-dual interior point QP solver for block-banded problems, such as\n"
+"the QPs arising from multiple shooting discretizations of optimal control\n"
+"problems.\n"
+"\n"
+"The rows and columns of the KKT matrix are permuted once, at\n"
+"initialization, to minimize its bandwidth. Either the variables are kept\n"
+"in the given (stage-wise) order and each constraint is placed right after\n"
+"the last variable it depends on, or a reverse Cuthill-McKee ordering of\n"
+"the KKT graph is used, whichever gives the smaller bandwidth. The KKT\n"
+"systems of the interior point iterations are then solved with a banded LU\n"
+"factorization with partial pivoting, whose cost is linear in the number of\n"
+"stages.\n"
+"\n"
+"\n"
+">List of available options\n"
+"\n"
+"+-----------------+-----------------+-----------------+-----------------+\n"
+"|       Id        |      Type       |     Default     |   Description   |\n"
+"+=================+=================+=================+=================+\n"
+"| max_iter        | OT_INTEGER      | 100             | Maximum number  |\n"
+"|                 |                 |                 | of interior     |\n"
+"|                 |                 |                 | point           |\n"
+"|                 |                 |                 | iterations      |\n"
+"+-----------------+-----------------+-----------------+-----------------+\n"
+"| ordering        | OT_STRING       | \"auto\"          | Ordering of the |\n"
+"|                 |                 |                 | KKT matrix:     |\n"
+"|                 |                 |                 | stage-wise,     |\n"
+"|                 |                 |                 | reverse         |\n"
+"|                 |                 |                 | Cuthill-McKee   |\n"
+"|                 |                 |                 | or whichever    |\n"
+"|                 |                 |                 | gives the       |\n"
+"|                 |                 |                 | smaller         |\n"
+"|                 |                 |                 | bandwidth (stag |\n"
+"|                 |                 |                 | e|rcm|auto)     |\n"
+"+-----------------+-----------------+-----------------+-----------------+\n"
+"| tol             | OT_REAL         | 1e-10           | Tolerance on    |\n"
+"|                 |                 |                 | the scaled      |\n"
+"|                 |                 |                 | primal and dual |\n"
+"|                 |                 |                 | residuals and   |\n"
+"|                 |                 |                 | on the          |\n"
+"|                 |                 |                 | complementarity |\n"
+"+-----------------+-----------------+-----------------+-----------------+\n"
+"\n"
+"\n"
+"\n"
+"\n"
+;
@@ -27,10 +27,19 @@
 #include "casadi/core/std_vector_tools.hpp"
 #include "casadi/core/casadi_meta.hpp"
 #include <fstream>
+#include <iomanip>
+#include <algorithm>
 #include <stdlib.h>
 #include <dlfcn.h>
 #include <cstdlib>
+#include <cstdio>
+#include <cerrno>
 #include <unistd.h>
+#include <dirent.h>
+#include <fcntl.h>
+#include <utime.h>
+#include <sys/file.h>
+#include <sys/stat.h>
 
 using namespace std;
 namespace casadi {
@@ -50,6 +59,57 @@ namespace casadi {
     CompilerInternal::registerPlugin(casadi_register_compiler_shell);
   }
 
+  /// Advisory lock on a cache directory, released when going out of scope
+  class CacheLock {
+  public:
+    CacheLock(const std::string& dir, int operation) {
+      fd_ = open((dir + "/lock").c_str(), O_RDWR | O_CREAT, 0666);
+      casadi_assert_message(fd_!=-1, "ShellCompiler: Cannot open lock file in cache "
+                            "directory \"" << dir << "\"");
+      flock(fd_, operation);
+    }
+    ~CacheLock() {
+      flock(fd_, LOCK_UN);
+      close(fd_);
+    }
+  private:
+    int fd_;
+  };
+
+  /// Remove least recently used cache entries until the total size is below max_size
+  static void cacheEvict(const std::string& dir, double max_size) {
+    DIR* d = opendir(dir.c_str());
+    if (d==0) return;
+
+    // Cache entries, identified by their key files
+    vector<pair<time_t, string> > entries;
+    map<string, double> entry_size;
+    double total = 0;
+    while (dirent* e = readdir(d)) {
+      string f = e->d_name;
+      if (f.size()<=4 || f.compare(f.size()-4, 4, ".key")!=0) continue;
+      string entry = dir + "/" + f.substr(0, f.size()-4);
+      struct stat s;
+      if (stat((entry + ".key").c_str(), &s)) continue;
+      double sz = s.st_size;
+      time_t last_used = s.st_mtime;
+      if (stat((entry + ".so").c_str(), &s)==0) sz += s.st_size;
+      entries.push_back(make_pair(last_used, entry));
+      entry_size[entry] = sz;
+      total += sz;
+    }
+    closedir(d);
+
+    // Oldest first
+    sort(entries.begin(), entries.end());
+    for (vector<pair<time_t, string> >::const_iterator it=entries.begin();
+         it!=entries.end() && total>max_size; ++it) {
+      remove((it->second + ".so").c_str());
+      remove((it->second + ".key").c_str());
+      total -= entry_size[it->second];
+    }
+  }
+
   ShellCompiler* ShellCompiler::clone() const {
     // Return a deep copy
     ShellCompiler* node = new ShellCompiler(name_);
@@ -64,16 +124,26 @@ namespace casadi {
     addOption("compiler_setup", OT_STRING, "-fPIC -shared", "Compiler setup command");
     addOption("flags", OT_STRINGVECTOR, GenericType(),
       "Compile flags for the JIT compiler. Default: None");
+    addOption("cache", OT_STRING, GenericType(),
+      "Directory of a persistent cache of compiled libraries, keyed by the source code "
+      "and the compiler command. The cache can be shared between processes. Default: None");
+    addOption("cache_size", OT_INTEGER, 1024,
+      "Maximum total size of the cache in MB. "
+      "The least recently used libraries are removed when it is exceeded.");
+    handle_ = 0;
+    cached_ = false;
   }
 
   ShellCompiler::~ShellCompiler() {
     // Unload
     if (handle_) dlclose(handle_);
 
-    // Delete the temporary file
-    std::string rmcmd = "rm " + bin_name_;
-    if (system(rmcmd.c_str())) {
-      casadi_warning("Failed to delete temporary file:" + bin_name_);
+    // Delete the temporary file, libraries in the cache are kept
+    if (!cached_ && !bin_name_.empty()) {
+      std::string rmcmd = "rm " + bin_name_;
+      if (system(rmcmd.c_str())) {
+        casadi_warning("Failed to delete temporary file:" + bin_name_);
+      }
     }
   }
 
@@ -94,20 +164,47 @@ namespace casadi {
       cmd << " " << *i;
     }
 
+    // Cache key and entry: compiler command and source code, and its hash
+    string key, entry;
+    if (hasSetOption("cache")) {
+      cache_ = getOption("cache").toString();
+      if (mkdir(cache_.c_str(), 0777) && errno!=EEXIST) {
+        casadi_error("ShellCompiler: Cannot create cache directory \"" << cache_ << "\"");
+      }
+      ifstream src(name_.c_str());
+      casadi_assert_message(src.good(), "ShellCompiler: Cannot read \"" << name_ << "\"");
+      stringstream ss;
+      ss << cmd.str() << endl << src.rdbuf();
+      key = ss.str();
+      size_t h = 0;
+      for (string::const_iterator c=key.begin(); c!=key.end(); ++c) hash_combine(h, *c);
+      ss.str("");
+      ss << cache_ << "/" << hex << setw(2*sizeof(size_t)) << setfill('0') << h;
+      entry = ss.str();
+
+      // Skip compilation if found
+      if (cacheLoad(key, entry)) return;
+    }
+
     // C/C++ source file
     cmd << " " << name_;
 
-    // Name of temporary file
+    // Name of temporary file, in the cache directory if any
+    string tmp_dir = cache_.empty() ? "" : cache_ + "/";
 #ifdef HAVE_MKSTEMPS
     // Preferred solution
-    char bin_name[] = "tmp_casadi_compiler_shell_XXXXXX.so";
-    if (mkstemps(bin_name, 3) == -1) {
+    string bin_template = tmp_dir + "tmp_casadi_compiler_shell_XXXXXX.so";
+    vector<char> bin_name(bin_template.begin(), bin_template.end());
+    bin_name.push_back('\0');
+    int bin_fd = mkstemps(getPtr(bin_name), 3);
+    if (bin_fd == -1) {
       casadi_error("Failed to create a temporary file name");
     }
-    bin_name_ = bin_name;
+    close(bin_fd);
+    bin_name_ = getPtr(bin_name);
 #else
     // Fallback, may result in deprecation warnings
-    char* bin_name = tempnam(0, "tmp_casadi_compiler_shell_");
+    char* bin_name = tempnam(cache_.empty() ? 0 : cache_.c_str(), "tmp_casadi_compiler_shell_");
     bin_name_ = bin_name;
     free(bin_name);
 #endif
@@ -125,6 +222,9 @@ namespace casadi {
       casadi_error("Compilation failed. Tried \"" + cmd.str() + "\"");
     }
 
+    // Move to the cache and load from there
+    if (!cache_.empty()) return cacheStore(key, entry);
+
     // Load shared library
     handle_ = dlopen(bin_name_.c_str(), RTLD_LAZY);
     casadi_assert_message(handle_!=0, "CommonExternal: Cannot open function: "
@@ -133,6 +233,66 @@ namespace casadi {
     dlerror();
   }
 
+  bool ShellCompiler::cacheLoad(const std::string& key, const std::string& entry) {
+    // Make sure that the entry is not evicted before it is loaded
+    CacheLock lock(cache_, LOCK_SH);
+
+    // Compare the full key to rule out hash collisions
+    ifstream key_file((entry + ".key").c_str());
+    if (!key_file.good()) return false;
+    stringstream ss;
+    ss << key_file.rdbuf();
+    if (ss.str()!=key) return false;
+
+    // Load shared library
+    string lib = entry + ".so";
+    handle_ = dlopen(lib.c_str(), RTLD_LAZY);
+    if (handle_==0) {
+      dlerror();
+      return false;
+    }
+
+    // Mark as recently used
+    utime(lib.c_str(), 0);
+    utime((entry + ".key").c_str(), 0);
+
+    bin_name_ = lib;
+    cached_ = true;
+    return true;
+  }
+
+  void ShellCompiler::cacheStore(const std::string& key, const std::string& entry) {
+    // Write the key next to the temporary library
+    string key_tmp = bin_name_ + ".tmp";
+    {
+      ofstream key_file(key_tmp.c_str());
+      key_file << key;
+    }
+
+    CacheLock lock(cache_, LOCK_EX);
+
+    // Atomically publish the entry, library first
+    string lib = entry + ".so";
+    if (rename(bin_name_.c_str(), lib.c_str())
+        || rename(key_tmp.c_str(), (entry + ".key").c_str())) {
+      remove(key_tmp.c_str());
+      casadi_error("ShellCompiler: Cannot add \"" << lib << "\" to the cache");
+    }
+    bin_name_ = lib;
+    cached_ = true;
+
+    // Load before any eviction takes place
+    handle_ = dlopen(lib.c_str(), RTLD_LAZY);
+    casadi_assert_message(handle_!=0, "CommonExternal: Cannot open function: "
+                          << lib << ". error code: "<< dlerror());
+    // reset error
+    dlerror();
+
+    // Respect the maximum size
+    int cache_size = getOption("cache_size");
+    cacheEvict(cache_, cache_size*1024.*1024.);
+  }
+
   void* ShellCompiler::getFunction(const std::string& symname) {
     void* ret;
     ret = reinterpret_cast<void*>(dlsym(handle_, symname.c_str()));
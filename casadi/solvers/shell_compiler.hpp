@@ -76,9 +76,21 @@ namespace casadi {
     virtual void* getFunction(const std::string& symname);
 
   protected:
+    /// Look up the library in the cache, returns true if found and loaded
+    bool cacheLoad(const std::string& key, const std::string& entry);
+
+    /// Add the compiled library to the cache and load it
+    void cacheStore(const std::string& key, const std::string& entry);
+
     /// Temporary file
     std::string bin_name_;
 
+    /// Is the library owned by the cache (i.e. not to be deleted)
+    bool cached_;
+
+    /// Cache directory
+    std::string cache_;
+
     // Shared library handle
     typedef void* handle_t;
     handle_t handle_;
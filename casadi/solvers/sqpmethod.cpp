@@ -118,6 +118,7 @@ namespace casadi {
     if (exact_hessian_) {
       hessLag();
     }
+    compileCallbacks();
 
     // Allocate a QP solver
     Sparsity H_sparsity = exact_hessian_ ? hessLag().output().sparsity()
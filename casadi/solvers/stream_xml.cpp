@@ -0,0 +1,355 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+#include "stream_xml.hpp"
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <cctype>
+#include <algorithm>
+
+using namespace std;
+namespace casadi {
+
+  extern "C"
+  int CASADI_XMLFILE_STREAM_EXPORT
+  casadi_register_xmlfile_stream(XmlFileInternal::Plugin* plugin) {
+    plugin->creator = StreamXml::creator;
+    plugin->name = "stream";
+    plugin->doc = StreamXml::meta_doc.c_str();
+    plugin->version = 23;
+    return 0;
+  }
+
+  extern "C"
+  void CASADI_XMLFILE_STREAM_EXPORT casadi_load_xmlfile_stream() {
+    XmlFileInternal::registerPlugin(casadi_register_xmlfile_stream);
+  }
+
+  StreamXml::StreamXml() : XmlFileInternal() {
+    addOption("keep", OT_STRINGVECTOR, GenericType(),
+              "Names of the children of the root element to be built. "
+              "All other children are parsed but not stored. Default: keep all");
+    addOption("buffer_size", OT_INTEGER, 65536,
+              "Size of the chunks in which the file is read");
+  }
+
+  StreamXml::~StreamXml() {
+  }
+
+  StreamXml* StreamXml::clone() const {
+    return new StreamXml();
+  }
+
+  bool StreamXml::fill() {
+    if (!file_.good()) return false;
+    file_.read(&buf_.front(), buf_.size());
+    pos_ = 0;
+    end_ = file_.gcount();
+    return end_>0;
+  }
+
+  int StreamXml::get() {
+    if (pos_==end_ && !fill()) return EOF;
+    char c = buf_[pos_++];
+    if (c=='\n') line_++;
+    return static_cast<unsigned char>(c);
+  }
+
+  int StreamXml::peek() {
+    if (pos_==end_ && !fill()) return EOF;
+    return static_cast<unsigned char>(buf_[pos_]);
+  }
+
+  void StreamXml::skipWhitespace() {
+    while (isspace(peek())) get();
+  }
+
+  bool StreamXml::match(const char* str) {
+    // Make sure that the whole string is in the buffer
+    size_t n = strlen(str);
+    if (end_-pos_ < n) {
+      copy(buf_.begin()+pos_, buf_.begin()+end_, buf_.begin());
+      end_ -= pos_;
+      pos_ = 0;
+      if (file_.good()) {
+        file_.read(&buf_.front()+end_, buf_.size()-end_);
+        end_ += file_.gcount();
+      }
+      if (end_ < n) return false;
+    }
+
+    // Compare
+    if (strncmp(&buf_.front()+pos_, str, n)!=0) return false;
+    for (size_t i=0; i<n; ++i) get();
+    return true;
+  }
+
+  string StreamXml::readUntil(const char* str) {
+    int line0 = line_;
+    string ret;
+    while (!match(str)) {
+      int c = get();
+      casadi_assert_message(c!=EOF, "StreamXml: Unexpected end of file in " << filename_
+                            << ", expected \"" << str << "\" for markup starting at line "
+                            << line0);
+      ret += static_cast<char>(c);
+    }
+    return ret;
+  }
+
+  string StreamXml::readName() {
+    string ret;
+    while (true) {
+      int c = peek();
+      if (c==EOF || isspace(c) || c=='/' || c=='>' || c=='=' || c=='<') break;
+      ret += static_cast<char>(get());
+    }
+    casadi_assert_message(!ret.empty(), "StreamXml: Expected a name in " << filename_
+                          << ", line " << line_);
+    return ret;
+  }
+
+  void StreamXml::readEntity(string& s) {
+    string e = readUntil(";");
+    if (e=="lt") {
+      s += '<';
+    } else if (e=="gt") {
+      s += '>';
+    } else if (e=="amp") {
+      s += '&';
+    } else if (e=="quot") {
+      s += '"';
+    } else if (e=="apos") {
+      s += '\'';
+    } else if (e.size()>1 && e[0]=='#') {
+      // Character reference, encode as UTF-8
+      unsigned long c = e[1]=='x' ? strtoul(e.c_str()+2, 0, 16) : strtoul(e.c_str()+1, 0, 10);
+      if (c<0x80) {
+        s += static_cast<char>(c);
+      } else if (c<0x800) {
+        s += static_cast<char>(0xC0 | (c >> 6));
+        s += static_cast<char>(0x80 | (c & 0x3F));
+      } else if (c<0x10000) {
+        s += static_cast<char>(0xE0 | (c >> 12));
+        s += static_cast<char>(0x80 | ((c >> 6) & 0x3F));
+        s += static_cast<char>(0x80 | (c & 0x3F));
+      } else {
+        s += static_cast<char>(0xF0 | (c >> 18));
+        s += static_cast<char>(0x80 | ((c >> 12) & 0x3F));
+        s += static_cast<char>(0x80 | ((c >> 6) & 0x3F));
+        s += static_cast<char>(0x80 | (c & 0x3F));
+      }
+    } else {
+      // Unknown entity, keep as is
+      s += "&" + e + ";";
+    }
+  }
+
+  string StreamXml::readValue() {
+    int q = get();
+    casadi_assert_message(q=='"' || q=='\'', "StreamXml: Expected a quoted attribute value in "
+                          << filename_ << ", line " << line_);
+    string ret;
+    while (true) {
+      int c = get();
+      casadi_assert_message(c!=EOF, "StreamXml: Unexpected end of file in " << filename_);
+      if (c==q) break;
+      if (c=='&') {
+        readEntity(ret);
+      } else {
+        ret += static_cast<char>(c);
+      }
+    }
+    return ret;
+  }
+
+  /// Condense whitespace like TinyXml: strip leading and trailing, single space in between
+  static string condenseWhitespace(const string& s) {
+    string ret;
+    bool space = false;
+    for (string::const_iterator c=s.begin(); c!=s.end(); ++c) {
+      if (isspace(static_cast<unsigned char>(*c))) {
+        space = true;
+      } else {
+        if (space && !ret.empty()) ret += ' ';
+        ret += *c;
+        space = false;
+      }
+    }
+    return ret;
+  }
+
+  XmlNode StreamXml::parse(const std::string& filename) {
+    // Sections to be kept
+    vector<string> keep;
+    if (hasSetOption("keep")) keep = getOption("keep").toStringVector();
+
+    // Open file
+    filename_ = filename;
+    file_.close();
+    file_.clear();
+    file_.open(filename.c_str(), ios::binary);
+    casadi_assert_message(file_.good(), "Cound not open " << filename);
+    buf_.resize(std::max(static_cast<int>(getOption("buffer_size")), 16));
+    pos_ = end_ = 0;
+    line_ = 1;
+
+    // The document node, with the same name as in TinyXml
+    XmlNode document;
+    document.setName(filename);
+
+    // Open elements, the last element of the stack is where new nodes are added
+    vector<XmlNode*> stack(1, &document);
+
+    // Depth inside a skipped element, 0 if not skipping
+    int skip = 0;
+
+    // Character data since the last markup
+    string text;
+
+    // Read one character or one piece of markup at a time
+    int c;
+    while ((c=get())!=EOF) {
+      // Character data
+      if (c!='<') {
+        if (!skip) {
+          if (c=='&') {
+            readEntity(text);
+          } else {
+            text += static_cast<char>(c);
+          }
+        }
+        continue;
+      }
+
+      // Save text, if any
+      if (!text.empty()) {
+        string t = condenseWhitespace(text);
+        if (!t.empty()) stack.back()->text_ = t;
+        text.clear();
+      }
+
+      // Markup
+      if (match("?")) {
+        // Declaration or processing instruction
+        readUntil("?>");
+      } else if (match("!--")) {
+        // Comment
+        string comment = readUntil("-->");
+        if (!skip) stack.back()->comment_ = comment;
+      } else if (match("![CDATA[")) {
+        // Character data, unparsed
+        string cdata = readUntil("]]>");
+        if (!skip) stack.back()->text_ = cdata;
+      } else if (match("!")) {
+        // Document type declaration, possibly with an internal subset
+        int depth = 0;
+        while (true) {
+          c = get();
+          casadi_assert_message(c!=EOF, "StreamXml: Unexpected end of file in " << filename_);
+          if (c=='[') {
+            depth++;
+          } else if (c==']') {
+            depth--;
+          } else if (c=='>' && depth==0) {
+            break;
+          }
+        }
+      } else if (match("/")) {
+        // End tag
+        string name = readName();
+        skipWhitespace();
+        casadi_assert_message(get()=='>', "StreamXml: Expected '>' in " << filename_
+                              << ", line " << line_);
+        if (skip) {
+          skip--;
+        } else {
+          casadi_assert_message(stack.size()>1 && stack.back()->getName()==name,
+                                "StreamXml: Mismatched end tag </" << name << "> in "
+                                << filename_ << ", line " << line_);
+          stack.pop_back();
+        }
+      } else {
+        // Start tag
+        string name = readName();
+
+        // Skip element if not in the list of sections to be kept
+        if (!skip && stack.size()==2 && !keep.empty()
+            && find(keep.begin(), keep.end(), name)==keep.end()) {
+          skip = 1;
+        } else if (skip) {
+          skip++;
+        }
+
+        // Read attributes
+        map<string, string> attributes;
+        bool empty = false;
+        while (true) {
+          skipWhitespace();
+          if (match("/>")) {
+            empty = true;
+            break;
+          } else if (match(">")) {
+            break;
+          }
+          string attr = readName();
+          skipWhitespace();
+          casadi_assert_message(get()=='=', "StreamXml: Expected '=' after attribute "
+                                << attr << " in " << filename_ << ", line " << line_);
+          skipWhitespace();
+          string value = readValue();
+          if (!skip) attributes[attr] = value;
+        }
+
+        if (skip) {
+          // Nothing to add
+          if (empty) skip--;
+        } else {
+          // Add node
+          XmlNode& parent = *stack.back();
+          parent.children_.push_back(XmlNode());
+          XmlNode& n = parent.children_.back();
+          n.setName(name);
+          n.attributes_.swap(attributes);
+          parent.child_indices_[name] = parent.children_.size()-1;
+
+          // Children are added to the new node until it is closed
+          if (!empty) stack.push_back(&n);
+        }
+      }
+    }
+    file_.close();
+
+    // Make sure that all elements have been closed
+    casadi_assert_message(stack.size()==1 && skip==0, "StreamXml: Unexpected end of file in "
+                          << filename_ << ", element <"
+                          << (skip ? string("...") : stack.back()->getName()) << "> not closed");
+
+    // Note: Return value optimization
+    return document;
+  }
+
+} // namespace casadi
@@ -0,0 +1,119 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+#ifndef CASADI_STREAM_XML_HPP
+#define CASADI_STREAM_XML_HPP
+
+#include "casadi/core/misc/xml_file_internal.hpp"
+#include <casadi/solvers/casadi_xmlfile_stream_export.h>
+#include <fstream>
+
+/** \defgroup plugin_XmlFile_stream
+    Single-pass, SAX-style XML parser without external dependencies.
+    The file is read in chunks and the XmlNode tree is built directly while
+    parsing, without first creating a document object model. Sections of the
+    document that are not needed can be skipped with the "keep" option, in which
+    case they are parsed but never stored.
+*/
+
+/** \pluginsection{XmlFile,stream} */
+
+/// \cond INTERNAL
+namespace casadi {
+
+  /** \brief \pluginbrief{XmlFile,stream}
+   * @copydoc XmlFile_doc
+   * @copydoc plugin_XmlFile_stream
+   */
+  class CASADI_XMLFILE_STREAM_EXPORT StreamXml : public XmlFileInternal {
+  public:
+
+    // Create an XML file
+    StreamXml();
+
+    /** \brief  Create a new XmlFile */
+    static XmlFileInternal* creator()
+    { return new StreamXml();}
+
+    // Clone
+    virtual StreamXml* clone() const;
+
+    // Parse an XML file
+    virtual XmlNode parse(const std::string& filename);
+
+    // Destructor
+    virtual ~StreamXml();
+
+    /// A documentation string
+    static const std::string meta_doc;
+
+  protected:
+    /// Get the next character, EOF if end of file
+    int get();
+
+    /// Get the next character without extracting it
+    int peek();
+
+    /// Read more data into the buffer, returns false if end of file
+    bool fill();
+
+    /// Skip whitespace
+    void skipWhitespace();
+
+    /// Extract a string if it comes next, returns false (and extracts nothing) if not
+    bool match(const char* str);
+
+    /// Read until (and including) a terminating string, returns the text before it
+    std::string readUntil(const char* str);
+
+    /// Read a tag or attribute name
+    std::string readName();
+
+    /// Read an entity reference, the '&' has already been extracted
+    void readEntity(std::string& s);
+
+    /// Read an attribute value
+    std::string readValue();
+
+    /// File being parsed
+    std::ifstream file_;
+
+    /// Input buffer
+    std::vector<char> buf_;
+
+    /// Position in and end of the input buffer
+    size_t pos_, end_;
+
+    /// Current line, for error messages
+    int line_;
+
+    /// Name of the file being parsed, for error messages
+    std::string filename_;
+  };
+
+} // namespace casadi
+/// \endcond
+
+#endif // CASADI_STREAM_XML_HPP
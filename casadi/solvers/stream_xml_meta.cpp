@@ -0,0 +1,61 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+      #include "stream_xml.hpp"
+      #include <string>
+
+      const std::string casadi::StreamXml::meta_doc=
+      "\n"
+"Single-pass, SAX-style XML parser without external dependencies. The file\n"
+"is read in chunks and the XmlNode tree is built directly while parsing,\n"
+"without first creating a document object model. Sections of the document\n"
+"that are not needed can be skipped with the \"keep\" option, in which case\n"
+"they are parsed but never stored.\n"
+"\n"
+">List of available options\n"
+"\n"
+"+-------------+-----------------+---------------+-----------------+\n"
+"|     Id      |      Type       |    Default    |   Description   |\n"
+"+=============+=================+===============+=================+\n"
+"| buffer_size | OT_INTEGER      | 65536         | Size of the     |\n"
+"|             |                 |               | chunks in which |\n"
+"|             |                 |               | the file is     |\n"
+"|             |                 |               | read            |\n"
+"+-------------+-----------------+---------------+-----------------+\n"
+"| keep        | OT_STRINGVECTOR | GenericType() | Names of the    |\n"
+"|             |                 |               | children of the |\n"
+"|             |                 |               | root element to |\n"
+"|             |                 |               | be built. All   |\n"
+"|             |                 |               | other children  |\n"
+"|             |                 |               | are parsed but  |\n"
+"|             |                 |               | not stored.     |\n"
+"|             |                 |               | Default: keep   |\n"
+"|             |                 |               | all             |\n"
+"+-------------+-----------------+---------------+-----------------+\n"
+"\n"
+"\n"
+"\n"
+"\n"
+;
@@ -0,0 +1,581 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+
+#include "supernodal_lu.hpp"
+#include "casadi/core/matrix/sparsity_internal.hpp"
+
+#include <algorithm>
+#include <cmath>
+#include <limits>
+
+using namespace std;
+namespace casadi {
+
+  extern "C"
+  int CASADI_LINEARSOLVER_SUPERNODAL_EXPORT
+  casadi_register_linearsolver_supernodal(LinearSolverInternal::Plugin* plugin) {
+    plugin->creator = SupernodalLu::creator;
+    plugin->name = "supernodal";
+    plugin->doc = SupernodalLu::meta_doc.c_str();
+    plugin->version = 23;
+    return 0;
+  }
+
+  extern "C"
+  void CASADI_LINEARSOLVER_SUPERNODAL_EXPORT casadi_load_linearsolver_supernodal() {
+    LinearSolverInternal::registerPlugin(casadi_register_linearsolver_supernodal);
+  }
+
+  SupernodalLu::SupernodalLu(const Sparsity& sparsity, int nrhs) :
+      LinearSolverInternal(sparsity, nrhs) {
+    addOption("relax",          OT_INTEGER,  8,
+              "Merge chains of the elimination tree into supernodes of up to this many "
+              "columns, also if this introduces zeros in the factors");
+    addOption("pivot_tol",      OT_REAL,     1e-13,
+              "Pivots smaller than pivot_tol times the largest entry of the matrix "
+              "are replaced (static pivoting)");
+    addOption("max_refinement", OT_INTEGER,  3,
+              "Maximum number of iterative refinement steps");
+    addOption("refinement_tol", OT_REAL,     1e-8,
+              "If pivots were replaced, the solve fails when the residual after "
+              "iterative refinement is larger than this, relative to the right-hand side");
+    analyzed_relax_ = -1;
+    n_perturbed_ = 0;
+  }
+
+  SupernodalLu::~SupernodalLu() {
+  }
+
+  void SupernodalLu::init() {
+    // Call the base class initializer
+    LinearSolverInternal::init();
+
+    // Read options
+    relax_ = getOption("relax");
+    pivot_tol_ = getOption("pivot_tol");
+    max_refinement_ = getOption("max_refinement");
+    refinement_tol_ = getOption("refinement_tol");
+    casadi_assert_message(relax_>=1, "Option \"relax\" must be positive");
+    casadi_assert_message(pivot_tol_>=0, "Option \"pivot_tol\" must be nonnegative");
+
+    // Symbolic analysis, unless copied from a solver for the same pattern
+    if (analyzed_sp_.isNull() || !analyzed_sp_.isEqual(input(LINSOL_A).sparsity())
+        || analyzed_relax_!=relax_) {
+      analyze();
+    }
+
+    stats_["n_supernodes"] = static_cast<int>(sn_col_.size())-1;
+    stats_["nnz_factors"] = static_cast<int>(lu_.size());
+  }
+
+  /// Pattern of A(pinv^-1, pinv^-1), given as row and column triplets
+  inline Sparsity permuteSymmetric(const vector<int>& row, const vector<int>& col,
+                                   const vector<int>& pinv, int n) {
+    vector<int> prow(row.size()), pcol(col.size());
+    for (int k=0; k<row.size(); ++k) {
+      prow[k] = pinv[row[k]];
+      pcol[k] = pinv[col[k]];
+    }
+    return Sparsity::triplet(n, n, prow, pcol);
+  }
+
+  void SupernodalLu::analyze() {
+    const Sparsity& sp = input(LINSOL_A).sparsity();
+    int n = sp.size2();
+    const int* colind = sp.colind();
+    const int* row = sp.row();
+
+    // The Dulmage-Mendelsohn permutation has a zero-free diagonal
+    vector<int> rowperm_inv = SparsityInternal::invertPermutation(rowperm_);
+    vector<int> colperm_inv = SparsityInternal::invertPermutation(colperm_);
+
+    // Symmetrized pattern, including the diagonal
+    vector<int> srow, scol;
+    srow.reserve(2*sp.nnz()+n);
+    scol.reserve(2*sp.nnz()+n);
+    for (int c=0; c<n; ++c) {
+      for (int k=colind[c]; k<colind[c+1]; ++k) {
+        int i = rowperm_inv[row[k]], j = colperm_inv[c];
+        srow.push_back(i);
+        scol.push_back(j);
+        srow.push_back(j);
+        scol.push_back(i);
+      }
+      srow.push_back(c);
+      scol.push_back(c);
+    }
+    Sparsity S = Sparsity::triplet(n, n, srow, scol);
+    srow = S.getRow();
+    scol = S.getCol();
+
+    // Approximate minimum degree ordering, followed by a postordering of the elimination tree
+    vector<int> p = S->approximateMinimumDegree(1);
+    p.resize(n);
+    vector<int> parent = permuteSymmetric(srow, scol, SparsityInternal::invertPermutation(p),
+                                          n).eliminationTree();
+    vector<int> post = SparsityInternal::postorder(parent, n);
+    perm_.resize(n);
+    for (int k=0; k<n; ++k) perm_[k] = p[post[k]];
+    vector<int> perm_inv = SparsityInternal::invertPermutation(perm_);
+    Sparsity C = permuteSymmetric(srow, scol, perm_inv, n);
+    parent = C.eliminationTree();
+    const int* C_colind = C.colind();
+    const int* C_row = C.row();
+
+    // Original rows and columns of the permuted matrix
+    perm_row_.resize(n);
+    perm_col_.resize(n);
+    for (int k=0; k<n; ++k) {
+      perm_row_[k] = rowperm_[perm_[k]];
+      perm_col_[k] = colperm_[perm_[k]];
+    }
+
+    // Children in the elimination tree
+    vector<int> head(n, -1), next(n, -1);
+    for (int j=n-1; j>=0; --j) {
+      if (parent[j]>=0) {
+        next[j] = head[parent[j]];
+        head[parent[j]] = j;
+      }
+    }
+
+    // Structure of the columns of L below the diagonal. Consecutive columns
+    // form a supernode if they are a chain in the elimination tree and
+    // either have the same structure or the supernode is small enough
+    vector<vector<int> > st(n);
+    vector<int> mark(n, -1);
+    sn_col_.clear();
+    sn_row_offset_.clear();
+    sn_row_.clear();
+    sn_col_.push_back(0);
+    sn_row_offset_.push_back(0);
+    for (int j=0; j<=n; ++j) {
+      vector<int> s;
+      if (j<n) {
+        mark[j] = j;
+        for (int k=C_colind[j]; k<C_colind[j+1]; ++k) {
+          int i = C_row[k];
+          if (i>j && mark[i]!=j) {
+            mark[i] = j;
+            s.push_back(i);
+          }
+        }
+        for (int c=head[j]; c>=0; c=next[c]) {
+          for (vector<int>::const_iterator i=st[c].begin(); i!=st[c].end(); ++i) {
+            if (mark[*i]!=j) {
+              mark[*i] = j;
+              s.push_back(*i);
+            }
+          }
+        }
+        sort(s.begin(), s.end());
+      }
+
+      // Close the current supernode?
+      if (j>0) {
+        int f = sn_col_.back();
+        bool join = j<n && parent[j-1]==j &&
+          (st[j-1].size()==s.size()+1 || j-f<relax_);
+        if (!join) {
+          for (int i=f; i<j; ++i) sn_row_.push_back(i);
+          sn_row_.insert(sn_row_.end(), st[j-1].begin(), st[j-1].end());
+          sn_col_.push_back(j);
+          sn_row_offset_.push_back(sn_row_.size());
+        }
+      }
+
+      // The structure of the children is no longer needed
+      if (j<n) {
+        for (int c=head[j]; c>=0; c=next[c]) vector<int>().swap(st[c]);
+        st[j].swap(s);
+      }
+    }
+    int nsn = sn_col_.size()-1;
+
+    // Supernode of each column and offsets of the factors
+    col_sn_.resize(n);
+    sn_offset_.resize(nsn+1);
+    sn_offset_[0] = 0;
+    for (int s=0; s<nsn; ++s) {
+      int w = sn_col_[s+1]-sn_col_[s], m = sn_row_offset_[s+1]-sn_row_offset_[s];
+      for (int j=sn_col_[s]; j<sn_col_[s+1]; ++j) col_sn_[j] = s;
+      sn_offset_[s+1] = sn_offset_[s] + m*w + w*(m-w);
+    }
+
+    // Updates from each supernode to its ancestors, grouped by target
+    vector<vector<int> > upd(nsn);
+    for (int d=0; d<nsn; ++d) {
+      int w = sn_col_[d+1]-sn_col_[d], m = sn_row_offset_[d+1]-sn_row_offset_[d];
+      const int* r = &sn_row_.front() + sn_row_offset_[d];
+      for (int a=w, b; a<m; a=b) {
+        int s = col_sn_[r[a]];
+        for (b=a+1; b<m && col_sn_[r[b]]==s; ++b) {}
+        upd[s].push_back(d);
+        upd[s].push_back(a);
+        upd[s].push_back(b);
+      }
+    }
+    upd_offset_.resize(nsn+1);
+    upd_source_.clear();
+    upd_begin_.clear();
+    upd_end_.clear();
+    upd_rel_offset_.clear();
+    upd_rel_.clear();
+    vector<int> pos(n, -1);
+    size_t sz_work = 0;
+    for (int s=0; s<nsn; ++s) {
+      upd_offset_[s] = upd_source_.size();
+      for (int k=sn_row_offset_[s]; k<sn_row_offset_[s+1]; ++k) {
+        pos[sn_row_[k]] = k-sn_row_offset_[s];
+      }
+      for (int k=0; k<upd[s].size(); k+=3) {
+        int d = upd[s][k], a = upd[s][k+1], b = upd[s][k+2];
+        int m = sn_row_offset_[d+1]-sn_row_offset_[d];
+        upd_source_.push_back(d);
+        upd_begin_.push_back(a);
+        upd_end_.push_back(b);
+        upd_rel_offset_.push_back(upd_rel_.size());
+        for (int i=a; i<m; ++i) {
+          int rel = pos[sn_row_[sn_row_offset_[d]+i]];
+          casadi_assert_message(rel>=0, "SupernodalLu::analyze: Inconsistent structure");
+          upd_rel_.push_back(rel);
+        }
+        sz_work = max(sz_work, static_cast<size_t>((m-a)*(b-a)));
+      }
+      for (int k=sn_row_offset_[s]; k<sn_row_offset_[s+1]; ++k) pos[sn_row_[k]] = -1;
+    }
+    upd_offset_[nsn] = upd_source_.size();
+
+    // Position of each nonzero of the matrix in the factors
+    nz_map_.resize(sp.nnz());
+    for (int c=0; c<n; ++c) {
+      for (int k=colind[c]; k<colind[c+1]; ++k) {
+        int i = perm_inv[rowperm_inv[row[k]]], j = perm_inv[colperm_inv[c]];
+        int s = col_sn_[i<j ? i : j];
+        int f = sn_col_[s], w = sn_col_[s+1]-f, m = sn_row_offset_[s+1]-sn_row_offset_[s];
+        const int* r = &sn_row_.front() + sn_row_offset_[s];
+        if (col_sn_[i]==col_sn_[j]) {
+          // Diagonal block
+          nz_map_[k] = sn_offset_[s] + (j-f)*m + (i-f);
+        } else if (i>j) {
+          // Below the diagonal block, L panel
+          int rel = lower_bound(r+w, r+m, i) - r;
+          nz_map_[k] = sn_offset_[s] + (j-f)*m + rel;
+        } else {
+          // Right of the diagonal block, U panel
+          int rel = lower_bound(r+w, r+m, j) - r;
+          nz_map_[k] = sn_offset_[s] + m*w + (rel-w)*w + (i-f);
+        }
+      }
+    }
+
+    // Allocate memory for the numeric factorization
+    lu_.resize(sn_offset_[nsn]);
+    ipiv_.resize(n);
+    work_.resize(sz_work);
+    analyzed_sp_ = sp;
+    analyzed_relax_ = relax_;
+
+    if (verbose()) {
+      userOut() << "SupernodalLu::analyze: " << nsn << " supernodes, "
+                << lu_.size() << " nonzeros in the factors, "
+                << upd_source_.size() << " supernode updates" << endl;
+    }
+  }
+
+  void SupernodalLu::prepare() {
+    prepared_ = false;
+
+    // Get the nonzeros of the linear system
+    const vector<double>& a = input(LINSOL_A).data();
+    a_ = a;
+
+    // Make sure that all entries of the linear system are valid
+    double amax = 0;
+    for (int k=0; k<a.size(); ++k) {
+      casadi_assert_message(!isnan(a[k]), "Nonzero " << k << " is not-a-number");
+      casadi_assert_message(!isinf(a[k]), "Nonzero " << k << " is infinite");
+      amax = max(amax, fabs(a[k]));
+    }
+    casadi_assert_message(amax>0 || a.empty(),
+                          "SupernodalLu::prepare: factorization failed, the matrix is zero");
+    double tau = pivot_tol_*amax;
+
+    // Scatter the matrix into the factors
+    fill(lu_.begin(), lu_.end(), 0);
+    for (int k=0; k<a.size(); ++k) lu_[nz_map_[k]] += a[k];
+
+    // Left-looking factorization, one supernode at a time
+    n_perturbed_ = 0;
+    int nsn = sn_col_.size()-1;
+    for (int s=0; s<nsn; ++s) {
+      int f = sn_col_[s], w = sn_col_[s+1]-f, m = sn_row_offset_[s+1]-sn_row_offset_[s];
+      double* L = &lu_.front() + sn_offset_[s];
+      double* U = L + m*w;
+
+      // Updates from the descendants
+      for (int u=upd_offset_[s]; u<upd_offset_[s+1]; ++u) {
+        int d = upd_source_[u], a0 = upd_begin_[u], b0 = upd_end_[u];
+        int wd = sn_col_[d+1]-sn_col_[d], md = sn_row_offset_[d+1]-sn_row_offset_[d];
+        const double* Ld = &lu_.front() + sn_offset_[d];
+        const double* Ud = Ld + md*wd;
+        const int* rel = &upd_rel_.front() + upd_rel_offset_[u];
+        int nI = b0-a0, nJ = md-a0, nK = md-b0;
+        double* T = &work_.front();
+
+        // T := Ld(a0:md, :) * Ud(:, a0:b0), subtract from the L panel
+        fill(T, T+nJ*nI, 0);
+        for (int c=0; c<nI; ++c) {
+          double* Tc = T + c*nJ;
+          for (int k=0; k<wd; ++k) {
+            double v = Ud[k + (a0-wd+c)*wd];
+            if (v==0) continue;
+            const double* Lk = Ld + k*md + a0;
+            for (int r=0; r<nJ; ++r) Tc[r] += Lk[r]*v;
+          }
+          double* Lc = L + rel[c]*m;
+          for (int r=0; r<nJ; ++r) Lc[rel[r]] -= Tc[r];
+        }
+
+        // T := Ld(a0:b0, :) * Ud(:, b0:md), subtract from the U panel
+        fill(T, T+nI*nK, 0);
+        for (int c=0; c<nK; ++c) {
+          double* Tc = T + c*nI;
+          for (int k=0; k<wd; ++k) {
+            double v = Ud[k + (b0-wd+c)*wd];
+            if (v==0) continue;
+            const double* Lk = Ld + k*md + a0;
+            for (int r=0; r<nI; ++r) Tc[r] += Lk[r]*v;
+          }
+          double* Uc = U + (rel[nI+c]-w)*w;
+          for (int r=0; r<nI; ++r) Uc[rel[r]] -= Tc[r];
+        }
+      }
+
+      // Dense LU of the panel, pivoting within the diagonal block
+      int* piv = &ipiv_.front() + f;
+      for (int k=0; k<w; ++k) {
+        int p = k;
+        for (int i=k+1; i<w; ++i) {
+          if (fabs(L[i + k*m]) > fabs(L[p + k*m])) p = i;
+        }
+        piv[k] = p;
+        if (p!=k) {
+          for (int j=0; j<w; ++j) swap(L[k + j*m], L[p + j*m]);
+          for (int j=0; j<m-w; ++j) swap(U[k + j*w], U[p + j*w]);
+        }
+        double& pivot = L[k + k*m];
+        if (!(fabs(pivot)>tau)) {
+          pivot = pivot<0 ? -tau : tau;
+          n_perturbed_++;
+        }
+        for (int i=k+1; i<m; ++i) L[i + k*m] /= pivot;
+        for (int j=k+1; j<w; ++j) {
+          double v = L[k + j*m];
+          if (v==0) continue;
+          for (int i=k+1; i<m; ++i) L[i + j*m] -= L[i + k*m]*v;
+        }
+      }
+
+      // U panel := inv(L11) * U panel
+      for (int c=0; c<m-w; ++c) {
+        double* Uc = U + c*w;
+        for (int k=0; k<w; ++k) {
+          double v = Uc[k];
+          if (v==0) continue;
+          for (int i=k+1; i<w; ++i) Uc[i] -= L[i + k*m]*v;
+        }
+      }
+    }
+
+    if (n_perturbed_>0 && verbose()) {
+      userOut() << "SupernodalLu::prepare: " << n_perturbed_ << " perturbed pivots" << endl;
+    }
+    stats_["n_perturbed"] = n_perturbed_;
+    prepared_ = true;
+  }
+
+  void SupernodalLu::solveFactors(double* x, int nrhs, bool transpose) {
+    int n = ncol(), nsn = sn_col_.size()-1;
+    t_.resize(n*nrhs);
+    const vector<int>& in_perm = transpose ? perm_col_ : perm_row_;
+    const vector<int>& out_perm = transpose ? perm_row_ : perm_col_;
+
+    // Permute the right-hand sides
+    for (int r=0; r<nrhs; ++r) {
+      for (int i=0; i<n; ++i) t_[i + r*n] = x[in_perm[i] + r*n];
+    }
+
+    for (int r=0; r<nrhs; ++r) {
+      double* t = &t_.front() + r*n;
+      if (!transpose) {
+        // Solve with L, forward
+        for (int s=0; s<nsn; ++s) {
+          int f = sn_col_[s], w = sn_col_[s+1]-f, m = sn_row_offset_[s+1]-sn_row_offset_[s];
+          const double* L = &lu_.front() + sn_offset_[s];
+          const int* row = &sn_row_.front() + sn_row_offset_[s];
+          const int* piv = &ipiv_.front() + f;
+          double* ts = t + f;
+          for (int k=0; k<w; ++k) if (piv[k]!=k) swap(ts[k], ts[piv[k]]);
+          for (int k=0; k<w; ++k) {
+            double v = ts[k];
+            if (v==0) continue;
+            const double* Lk = L + k*m;
+            for (int i=k+1; i<w; ++i) ts[i] -= Lk[i]*v;
+            for (int i=w; i<m; ++i) t[row[i]] -= Lk[i]*v;
+          }
+        }
+        // Solve with U, backward
+        for (int s=nsn-1; s>=0; --s) {
+          int f = sn_col_[s], w = sn_col_[s+1]-f, m = sn_row_offset_[s+1]-sn_row_offset_[s];
+          const double* L = &lu_.front() + sn_offset_[s];
+          const double* U = L + m*w;
+          const int* row = &sn_row_.front() + sn_row_offset_[s];
+          double* ts = t + f;
+          for (int c=0; c<m-w; ++c) {
+            double v = t[row[w+c]];
+            if (v==0) continue;
+            const double* Uc = U + c*w;
+            for (int i=0; i<w; ++i) ts[i] -= Uc[i]*v;
+          }
+          for (int k=w-1; k>=0; --k) {
+            const double* Lk = L + k*m;
+            double v = ts[k] /= Lk[k];
+            if (v==0) continue;
+            for (int i=0; i<k; ++i) ts[i] -= Lk[i]*v;
+          }
+        }
+      } else {
+        // Solve with U', forward
+        for (int s=0; s<nsn; ++s) {
+          int f = sn_col_[s], w = sn_col_[s+1]-f, m = sn_row_offset_[s+1]-sn_row_offset_[s];
+          const double* L = &lu_.front() + sn_offset_[s];
+          const double* U = L + m*w;
+          const int* row = &sn_row_.front() + sn_row_offset_[s];
+          double* ts = t + f;
+          for (int k=0; k<w; ++k) {
+            const double* Lk = L + k*m;
+            double v = ts[k];
+            for (int i=0; i<k; ++i) v -= Lk[i]*ts[i];
+            ts[k] = v/Lk[k];
+          }
+          for (int c=0; c<m-w; ++c) {
+            const double* Uc = U + c*w;
+            double v = 0;
+            for (int i=0; i<w; ++i) v += Uc[i]*ts[i];
+            t[row[w+c]] -= v;
+          }
+        }
+        // Solve with L', backward
+        for (int s=nsn-1; s>=0; --s) {
+          int f = sn_col_[s], w = sn_col_[s+1]-f, m = sn_row_offset_[s+1]-sn_row_offset_[s];
+          const double* L = &lu_.front() + sn_offset_[s];
+          const int* row = &sn_row_.front() + sn_row_offset_[s];
+          const int* piv = &ipiv_.front() + f;
+          double* ts = t + f;
+          for (int k=w-1; k>=0; --k) {
+            const double* Lk = L + k*m;
+            double v = ts[k];
+            for (int i=w; i<m; ++i) v -= Lk[i]*t[row[i]];
+            for (int i=k+1; i<w; ++i) v -= Lk[i]*ts[i];
+            ts[k] = v;
+          }
+          for (int k=w-1; k>=0; --k) if (piv[k]!=k) swap(ts[k], ts[piv[k]]);
+        }
+      }
+    }
+
+    // Permute the solution
+    for (int r=0; r<nrhs; ++r) {
+      for (int i=0; i<n; ++i) x[out_perm[i] + r*n] = t_[i + r*n];
+    }
+  }
+
+  void SupernodalLu::solve(double* x, int nrhs, bool transpose) {
+    casadi_assert(prepared_);
+
+    // Solve with the factors
+    if (max_refinement_==0) {
+      solveFactors(x, nrhs, transpose);
+      return;
+    }
+
+    // Iterative refinement, needed after static pivoting and for element growth
+    int n = ncol();
+    const int* colind = this->colind();
+    const int* row = this->row();
+    b_.assign(x, x+n*nrhs);
+    solveFactors(x, nrhs, transpose);
+    r_.resize(n*nrhs);
+    absax_.resize(n);
+    const double eps = numeric_limits<double>::epsilon();
+    for (int rhs=0; rhs<nrhs; ++rhs) {
+      double* xr = x + rhs*n;
+      double* rr = &r_.front() + rhs*n;
+      const double* br = &b_.front() + rhs*n;
+      double berr, berr_last = numeric_limits<double>::infinity();
+      for (int it=0; ; ++it) {
+        // Residual and componentwise backward error
+        copy(br, br+n, rr);
+        for (int i=0; i<n; ++i) absax_[i] = fabs(br[i]);
+        for (int c=0; c<n; ++c) {
+          for (int k=colind[c]; k<colind[c+1]; ++k) {
+            int i = transpose ? c : row[k], j = transpose ? row[k] : c;
+            rr[i] -= a_[k]*xr[j];
+            absax_[i] += fabs(a_[k]*xr[j]);
+          }
+        }
+        berr = 0;
+        for (int i=0; i<n; ++i) {
+          if (absax_[i]>0) berr = max(berr, fabs(rr[i])/absax_[i]);
+        }
+        if (berr<=eps || berr>0.5*berr_last || it==max_refinement_) break;
+        berr_last = berr;
+
+        // Correct the solution
+        solveFactors(rr, 1, transpose);
+        for (int i=0; i<n; ++i) xr[i] += rr[i];
+      }
+
+      // Replaced pivots which could not be compensated for. The backward error is not
+      // enough here: a replaced pivot of a singular matrix blows up the solution, and
+      // with it |A||x|, so the residual is compared with the right-hand side instead
+      if (n_perturbed_>0) {
+        double rnorm = 0, bnorm = 0;
+        for (int i=0; i<n; ++i) {
+          rnorm = max(rnorm, fabs(rr[i]));
+          bnorm = max(bnorm, fabs(br[i]));
+        }
+        if (rnorm>refinement_tol_*bnorm) {
+          casadi_error("SupernodalLu::solve: factorization failed, " << n_perturbed_
+                       << " pivots were replaced and the relative residual is " << rnorm/bnorm
+                       << ". Check if the Jacobian is singular.");
+        }
+      }
+    }
+  }
+
+} // namespace casadi
@@ -0,0 +1,156 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+#ifndef CASADI_SUPERNODAL_LU_HPP
+#define CASADI_SUPERNODAL_LU_HPP
+
+#include "casadi/core/function/linear_solver_internal.hpp"
+#include <casadi/solvers/casadi_linearsolver_supernodal_export.h>
+
+/** \defgroup plugin_LinearSolver_supernodal
+
+      Sparse LU factorization with dense supernodal blocks.
+
+      The ordering and the symbolic analysis are carried out once, when the
+      solver is initialized. The rows and columns are first permuted to block
+      triangular form (Dulmage-Mendelsohn), so that the diagonal is
+      structurally nonzero, and then ordered symmetrically with the approximate
+      minimum degree ordering of the symmetrized pattern. Columns of the
+      postordered elimination tree are grouped into supernodes, which are
+      factorized with dense kernels. Pivoting is restricted to the diagonal
+      block of each supernode, so the sparsity pattern of the factors does not
+      depend on the numerical values. Pivots that are too small are replaced
+      (static pivoting) and the solution is then improved with iterative
+      refinement. If the residual remains large compared to the right-hand side,
+      the matrix is considered singular and the solve fails.
+*/
+
+/** \pluginsection{LinearSolver,supernodal} */
+
+/// \cond INTERNAL
+
+namespace casadi {
+
+  /** \brief \pluginbrief{LinearSolver,supernodal}
+
+      @copydoc LinearSolver_doc
+      @copydoc plugin_LinearSolver_supernodal
+  */
+  class CASADI_LINEARSOLVER_SUPERNODAL_EXPORT SupernodalLu
+    : public LinearSolverInternal {
+  public:
+    // Constructor
+    SupernodalLu(const Sparsity& sparsity, int nrhs);
+
+    // Destructor
+    virtual ~SupernodalLu();
+
+    /** \brief  Clone, the symbolic analysis is copied */
+    virtual SupernodalLu* clone() const { return new SupernodalLu(*this);}
+
+    /** \brief  Create a new LinearSolver */
+    static LinearSolverInternal* creator(const Sparsity& sp, int nrhs)
+    { return new SupernodalLu(sp, nrhs);}
+
+    // Initialize
+    virtual void init();
+
+    // Factorize the matrix
+    virtual void prepare();
+
+    // Solve the system of equations
+    virtual void solve(double* x, int nrhs, bool transpose);
+
+    /// Ordering and symbolic analysis
+    void analyze();
+
+    /// Solve with the factors, without iterative refinement
+    void solveFactors(double* x, int nrhs, bool transpose);
+
+    ///@{
+    /// Options
+    int relax_;
+    double pivot_tol_;
+    int max_refinement_;
+    double refinement_tol_;
+    ///@}
+
+    /// Sparsity pattern and relaxation for which the symbolic analysis was made
+    Sparsity analyzed_sp_;
+    int analyzed_relax_;
+
+    /// Permutation of the symmetric ordering
+    std::vector<int> perm_;
+
+    /// Original row and column of each row and column of the permuted matrix
+    std::vector<int> perm_row_, perm_col_;
+
+    /// Supernode partition of the columns
+    std::vector<int> sn_col_;
+
+    /// Supernode of each column
+    std::vector<int> col_sn_;
+
+    /// Row structure of each supernode, diagonal block first
+    std::vector<int> sn_row_offset_, sn_row_;
+
+    /// Offsets of the factors of each supernode: L panel, then U panel
+    std::vector<int> sn_offset_;
+
+    /** \brief Updates from a descendant to a supernode, sorted by target
+
+        Rows [upd_begin_, upd_end_) of the descendant lie in the diagonal block
+        of the target. The positions in the row structure of the target of the
+        descendant rows from upd_begin_ onwards start at upd_rel_offset_.
+    */
+    std::vector<int> upd_offset_, upd_source_, upd_begin_, upd_end_, upd_rel_offset_;
+    std::vector<int> upd_rel_;
+
+    /// Position in the factors of each nonzero of the matrix
+    std::vector<int> nz_map_;
+
+    /// Numerical factors
+    std::vector<double> lu_;
+
+    /// Local pivoting in the diagonal block of each supernode
+    std::vector<int> ipiv_;
+
+    /// Values of the factorized matrix, for iterative refinement
+    std::vector<double> a_;
+
+    /// Number of perturbed pivots in the last factorization
+    int n_perturbed_;
+
+    /// Work vectors
+    std::vector<double> work_, t_, b_, r_, absax_;
+
+    /// A documentation string
+    static const std::string meta_doc;
+  };
+
+} // namespace casadi
+
+/// \endcond
+#endif // CASADI_SUPERNODAL_LU_HPP
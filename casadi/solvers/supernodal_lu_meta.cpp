@@ -0,0 +1,93 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+      #include "supernodal_lu.hpp"
+      #include <string>
+
+      const std::string casadi::SupernodalLu::meta_doc=
+      "\n"
+"Sparse LU factorization with dense supernodal blocks.\n"
+"\n"
+"The ordering and the symbolic analysis are carried out once, when the\n"
+"solver is initialized. The rows and columns are first permuted to block\n"
+"triangular form (Dulmage-Mendelsohn), so that the diagonal is\n"
+"structurally nonzero, and then ordered symmetrically with the approximate\n"
+"minimum degree ordering of the symmetrized pattern. Columns of the\n"
+"postordered elimination tree are grouped into supernodes, which are\n"
+"factorized with dense kernels. Pivoting is restricted to the diagonal\n"
+"block of each supernode, so the sparsity pattern of the factors does not\n"
+"depend on the numerical values. Pivots that are too small are replaced\n"
+"(static pivoting) and the solution is then improved with iterative\n"
+"refinement. If the residual remains large compared to the right-hand side,\n"
+"the matrix is considered singular and the solve fails.\n"
+"\n"
+"\n"
+">List of available options\n"
+"\n"
+"+-----------------+-----------------+-----------------+-----------------+\n"
+"|       Id        |      Type       |     Default     |   Description   |\n"
+"+=================+=================+=================+=================+\n"
+"| max_refinement  | OT_INTEGER      | 3               | Maximum number  |\n"
+"|                 |                 |                 | of iterative    |\n"
+"|                 |                 |                 | refinement      |\n"
+"|                 |                 |                 | steps           |\n"
+"+-----------------+-----------------+-----------------+-----------------+\n"
+"| pivot_tol       | OT_REAL         | 1e-13           | Pivots smaller  |\n"
+"|                 |                 |                 | than pivot_tol  |\n"
+"|                 |                 |                 | times the       |\n"
+"|                 |                 |                 | largest entry   |\n"
+"|                 |                 |                 | of the matrix   |\n"
+"|                 |                 |                 | are replaced    |\n"
+"|                 |                 |                 | (static         |\n"
+"|                 |                 |                 | pivoting)       |\n"
+"+-----------------+-----------------+-----------------+-----------------+\n"
+"| refinement_tol  | OT_REAL         | 1e-8            | If pivots were  |\n"
+"|                 |                 |                 | replaced, the   |\n"
+"|                 |                 |                 | solve fails     |\n"
+"|                 |                 |                 | when the        |\n"
+"|                 |                 |                 | residual after  |\n"
+"|                 |                 |                 | iterative       |\n"
+"|                 |                 |                 | refinement is   |\n"
+"|                 |                 |                 | larger than     |\n"
+"|                 |                 |                 | this, relative  |\n"
+"|                 |                 |                 | to the          |\n"
+"|                 |                 |                 | right-hand side |\n"
+"+-----------------+-----------------+-----------------+-----------------+\n"
+"| relax           | OT_INTEGER      | 8               | Merge chains of |\n"
+"|                 |                 |                 | the elimination |\n"
+"|                 |                 |                 | tree into       |\n"
+"|                 |                 |                 | supernodes of   |\n"
+"|                 |                 |                 | up to this many |\n"
+"|                 |                 |                 | columns, also   |\n"
+"|                 |                 |                 | if this         |\n"
+"|                 |                 |                 | introduces      |\n"
+"|                 |                 |                 | zeros in the    |\n"
+"|                 |                 |                 | factors         |\n"
+"+-----------------+-----------------+-----------------+-----------------+\n"
+"\n"
+"\n"
+"\n"
+"\n"
+;
@@ -0,0 +1,112 @@
+/*
+ *    This file is part of CasADi.
+ *
+ *    CasADi -- A symbolic framework for dynamic optimization.
+ *    Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+ *                            K.U. Leuven. All rights reserved.
+ *    Copyright (C) 2011-2014 Greg Horn
+ *
+ *    CasADi is free software; you can redistribute it and/or
+ *    modify it under the terms of the GNU Lesser General Public
+ *    License as published by the Free Software Foundation; either
+ *    version 3 of the License, or (at your option) any later version.
+ *
+ *    CasADi is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *    Lesser General Public License for more details.
+ *
+ *    You should have received a copy of the GNU Lesser General Public
+ *    License along with CasADi; if not, write to the Free Software
+ *    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ */
+
+
+/** \brief Stress test for the thread-safe symbolic core
+ * NOTE: Example is mainly intended for developers of CasADi.
+ * Several threads create, copy, differentiate and destroy SX and MX expressions at the same
+ * time. All threads share a few expressions (and, with hash consing, the cached nodes), so the
+ * reference counters, the caches and the weak references of the symbolic core are all
+ * contended. The results are compared between the threads.
+ *
+ * The threads only run concurrently if CasADi was built with WITH_THREADSAFE_SYMBOLICS=ON,
+ * otherwise the same work is done sequentially.
+ */
+
+#include "casadi/casadi.hpp"
+#ifdef CASADI_WITH_THREADSAFE_SYMBOLICS
+#include <thread>
+#endif // CASADI_WITH_THREADSAFE_SYMBOLICS
+
+using namespace casadi;
+using namespace std;
+
+// Number of threads
+const int n_threads = 8;
+
+// Expressions shared between all threads
+SX x_shared;
+SX f_shared;
+MX y_shared;
+
+// Work done by each thread
+void work(double* res) {
+  *res = 0;
+  for (int rep=0; rep<20; ++rep) {
+    // Copies of the shared expressions, destroyed at the end of the iteration
+    SX x = x_shared;
+    SX f = f_shared;
+    for (int i=0; i<x.nnz(); ++i) f += sin(x(i))*(i%7+0.5) + 2*x(i)*x(i) + (i%5);
+    SXFunction F("F", vector<SX>{x}, vector<SX>{f});
+
+    // Temporary expressions, partly sharing nodes with the other threads
+    SXFunction G("G", vector<SX>{x}, vector<SX>{jacobian(f, x)});
+    G.setInput(1.0);
+    G.evaluate();
+    *res += G.output().at(3);
+
+    // Embed in an MX graph
+    MX y = y_shared;
+    MX g = F(vector<MX>{y}).at(0)*2.5;
+    MXFunction H("H", vector<MX>{y}, vector<MX>{gradient(g, y)});
+    H.setInput(1.0);
+    H.evaluate();
+    *res += H.output().at(0);
+  }
+}
+
+int main() {
+  // Cached nodes are shared between the threads
+  CasadiOptions::hash_consing = true;
+
+  for (int k=0; k<10; ++k) {
+    x_shared = SX::sym("x", 20);
+    f_shared = sumRows(cos(x_shared));
+    y_shared = MX::sym("y", 20);
+
+    double res[n_threads];
+#ifdef CASADI_WITH_THREADSAFE_SYMBOLICS
+    vector<thread> threads;
+    for (int t=0; t<n_threads; ++t) threads.push_back(thread(work, res+t));
+    for (int t=0; t<n_threads; ++t) threads[t].join();
+#else // CASADI_WITH_THREADSAFE_SYMBOLICS
+    for (int t=0; t<n_threads; ++t) work(res+t);
+#endif // CASADI_WITH_THREADSAFE_SYMBOLICS
+
+    // All threads must agree
+    for (int t=1; t<n_threads; ++t) {
+      casadi_assert_message(res[t]==res[0], "Thread " << t << " calculated " << res[t]
+                            << " instead of " << res[0]);
+    }
+
+    // The shared expressions must have survived
+    SXFunction F("F", vector<SX>{x_shared}, vector<SX>{f_shared});
+    F.setInput(0.0);
+    F.evaluate();
+    casadi_assert(F.output().at(0)==20);
+    cout << "Iteration " << k << ": " << res[0] << endl;
+  }
+
+  return 0;
+}
@@ -0,0 +1,123 @@
+#
+#     This file is part of CasADi.
+#
+#     CasADi -- A symbolic framework for dynamic optimization.
+#     Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+#                             K.U. Leuven. All rights reserved.
+#     Copyright (C) 2011-2014 Greg Horn
+#
+#     CasADi is free software; you can redistribute it and/or
+#     modify it under the terms of the GNU Lesser General Public
+#     License as published by the Free Software Foundation; either
+#     version 3 of the License, or (at your option) any later version.
+#
+#     CasADi is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#     Lesser General Public License for more details.
+#
+#     You should have received a copy of the GNU Lesser General Public
+#     License along with CasADi; if not, write to the Free Software
+#     Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+#
+from casadi import *
+import numpy as np
+import time
+
+# Model predictive control of a linear system with a shifting horizon.
+#
+# The same QP is solved at every sampling time, with a new initial state.
+# We compare three ways of starting qpOASES:
+#   - cold: every QP is solved from scratch
+#   - hotstart: qpOASES continues from the working set of the previous QP
+#   - shifted: the previous solution and working set are shifted by one
+#     stage and passed to the solver with setWarmStart
+
+# Dimensions
+nx = 4
+nu = 2
+N = 30
+
+# Discrete-time dynamics (a chain of two double integrators)
+dt = 0.1
+A = np.array([[1, dt, 0, 0], [0, 1, 0, 0], [0, 0, 1, dt], [0, 0, 0, 1]])
+B = np.array([[0.5*dt**2, 0], [dt, 0], [0, 0.5*dt**2], [0, dt]])
+
+# Decision variables: w = [x_0, u_0, x_1, u_1, ..., x_N]
+X = [MX.sym("x_%d" % k, nx) for k in range(N+1)]
+U = [MX.sym("u_%d" % k, nu) for k in range(N)]
+w = []
+for k in range(N):
+  w += [X[k], U[k]]
+w.append(X[N])
+w = vertcat(w)
+nw = w.size1()
+
+# Objective and dynamic constraints
+f = sum([sumRows(X[k]**2) for k in range(N+1)]) + sum([0.1*sumRows(U[k]**2) for k in range(N)])
+g = vertcat([X[0]] + [X[k+1] - mul(A, X[k]) - mul(B, U[k]) for k in range(N)])
+ng = g.size1()
+
+# Get the QP matrices
+qp_data = MXFunction("qp_data", [w], [hessian(f, w)[0], jacobian(g, w)])
+qp_data.setInput(0)
+qp_data.evaluate()
+H = qp_data.getOutput(0)
+J = qp_data.getOutput(1)
+
+# Input bounds
+lbx = -inf*np.ones(nw)
+ubx = inf*np.ones(nw)
+for k in range(N):
+  i = k*(nx+nu)+nx
+  lbx[i:i+nu] = -1
+  ubx[i:i+nu] = 1
+
+def shift(v, offset, block):
+  """ Drop the first block after offset and repeat the last one """
+  v = list(v)
+  return v[:offset] + v[offset+block:] + v[len(v)-block:]
+
+def simulate(mode, n_steps=50):
+  solver = QpSolver("solver", "qpoases", {"h": H.sparsity(), "a": J.sparsity()},
+                    {"printLevel": "none"})
+  solver.setInput(H, "h")
+  solver.setInput(J, "a")
+  solver.setInput(lbx, "lbx")
+  solver.setInput(ubx, "ubx")
+  solver.setInput(0, "lba")
+  solver.setInput(0, "uba")
+
+  x = np.array([5., 0., -5., 0.])
+  iters = []
+  t0 = time.time()
+  for step in range(n_steps):
+    # Initial state constraint
+    lba = solver.getInput("lba")
+    lba[:nx] = x
+    solver.setInput(lba, "lba")
+    solver.setInput(lba, "uba")
+
+    if mode=="cold":
+      solver.setWarmStart({"x": [0]*nw, "lam_x": [0]*nw, "lam_a": [0]*ng})
+    elif mode=="shifted" and step>0:
+      ws = solver.getWarmStart()
+      ws["x"] = shift(ws["x"], 0, nx+nu)
+      ws["lam_x"] = shift(ws["lam_x"], 0, nx+nu)
+      ws["lam_a"] = shift(ws["lam_a"], nx, nx)
+      ws["bounds_status"] = shift(ws["bounds_status"], 0, nx+nu)
+      ws["constraints_status"] = shift(ws["constraints_status"], nx, nx)
+      solver.setWarmStart(ws)
+
+    solver.evaluate()
+    iters.append(solver.getStats()["iter_count"])
+
+    # Apply the first control, with a disturbance
+    u = np.array(solver.getOutput("x")[nx:nx+nu]).ravel()
+    x = A.dot(x) + B.dot(u) + 0.05*np.sin(step)
+  return iters, time.time()-t0
+
+for mode in ["cold", "hotstart", "shifted"]:
+  iters, t = simulate(mode)
+  print "%-10s total working set changes: %4d (max %3d), time: %.3f s" % (mode, sum(iters), max(iters), t)
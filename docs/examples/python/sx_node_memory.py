@@ -0,0 +1,106 @@
+#
+#     This file is part of CasADi.
+#
+#     CasADi -- A symbolic framework for dynamic optimization.
+#     Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+#                             K.U. Leuven. All rights reserved.
+#     Copyright (C) 2011-2014 Greg Horn
+#
+#     CasADi is free software; you can redistribute it and/or
+#     modify it under the terms of the GNU Lesser General Public
+#     License as published by the Free Software Foundation; either
+#     version 3 of the License, or (at your option) any later version.
+#
+#     CasADi is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#     Lesser General Public License for more details.
+#
+#     You should have received a copy of the GNU Lesser General Public
+#     License along with CasADi; if not, write to the Free Software
+#     Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+#
+from casadi import *
+import casadi as c
+import resource
+import time
+
+# Benchmark of building and discarding a large SX model.
+#
+# The nodes of SX expressions are allocated from SXNodePool, which reports how
+# many nodes exist and how much memory they use. The peak resident set size
+# (RSS) of the process is reported by the operating system.
+
+def peak_rss():
+  # Peak resident set size in MB (kB on Linux)
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1e3
+
+def build_model(n, N):
+  # Chain of n masses and springs, discretized with N explicit RK4 steps
+  x = SX.sym("x", 2*n)
+  u = SX.sym("u", N)
+  def ode(x, u):
+    p = x[:n]
+    v = x[n:]
+    dp = vertcat([p[0], p[1:]-p[:-1]])
+    F = -sin(dp) - 0.1*dp**3
+    a = F - vertcat([F[1:], 0]) - 0.05*v
+    a[n-1] += u
+    return vertcat([v, a])
+  h = 0.01
+  xk = x
+  for k in range(N):
+    k1 = ode(xk, u[k])
+    k2 = ode(xk + h/2*k1, u[k])
+    k3 = ode(xk + h/2*k2, u[k])
+    k4 = ode(xk + h*k3, u[k])
+    xk = xk + h/6*(k1 + 2*k2 + 2*k3 + k4)
+  return x, u, xk
+
+n = 50
+N = 400
+
+print "%-28s %10s %12s %12s %10s" % ("", "time [s]", "nodes", "Mnodes/s", "RSS [MB]")
+def report(label, t, nodes):
+  print "%-28s %10.3f %12d %12.3f %10.1f" % (label, t, nodes, nodes/t/1e6, peak_rss())
+
+# Build the model and the gradient of a least-squares objective
+SXNodePool.resetPeak()
+n0 = SXNodePool.getNumNodes()
+t0 = time.time()
+x, u, xf = build_model(n, N)
+t1 = time.time()
+report("build model", t1-t0, SXNodePool.getNumNodes()-n0)
+
+n0 = SXNodePool.getNumNodes()
+t0 = time.time()
+g = c.gradient(sum_square(xf), vertcat([x, u]))
+t1 = time.time()
+report("symbolic gradient", t1-t0, SXNodePool.getNumNodes()-n0)
+
+print "node memory in use: %.1f MB, reserved: %.1f MB (peak %.1f MB)" % (
+  SXNodePool.getUsedMemory(), SXNodePool.getReservedMemory(),
+  SXNodePool.getPeakReservedMemory())
+
+# Discard the model: the memory stays in the pool for reuse ...
+t0 = time.time()
+del x, u, xf, g
+t1 = time.time()
+print "discarded in %.3f s, reserved: %.1f MB" % (t1-t0, SXNodePool.getReservedMemory())
+
+# ... until it is returned to the system
+SXNodePool.releaseMemory()
+print "after releaseMemory, reserved: %.1f MB" % SXNodePool.getReservedMemory()
+
+# Build and discard the model within an arena. Memory is released in bulk when
+# the arena is destroyed
+arena = SXNodeArena()
+n0 = SXNodePool.getNumNodes()
+t0 = time.time()
+x, u, xf = build_model(n, N)
+t1 = time.time()
+report("build model (arena)", t1-t0, SXNodePool.getNumNodes()-n0)
+del x, u, xf
+del arena
+print "after the arena, reserved: %.1f MB" % SXNodePool.getReservedMemory()
@@ -68,6 +68,42 @@ struct functionstat {
 
 typedef std::map<long,functionstat> Stats;
 
+// Read a record of the binary log
+bool readSlot(std::ifstream& f, ProfilingSlot& s) {
+  f.read(reinterpret_cast<char*>(&s), sizeof(s));
+  return f.gcount()==sizeof(s);
+}
+
+// Copy the data of a record
+template<typename T>
+T slotData(const ProfilingSlot& s) {
+  T r;
+  std::memcpy(&r, s.data, sizeof(r));
+  return r;
+}
+
+// Read the next record of a given type, skipping the headers of blocks
+bool readSlot(std::ifstream& f, ProfilingSlot& s, ProfilingData_Type type) {
+  while (readSlot(f, s)) {
+    if (s.header.type==ProfilingData_Type_THREAD) continue;
+    if (s.header.type==type) return true;
+    // Leave any other record to the caller
+    f.seekg(-static_cast<std::streamoff>(sizeof(s)), std::ios::cur);
+    break;
+  }
+  return false;
+}
+
+// Read a string, which is split over STRING records
+std::string readString(std::ifstream& f, int length) {
+  std::string r;
+  ProfilingSlot s;
+  while (r.size()<length && readSlot(f, s, ProfilingData_Type_STRING)) {
+    r.append(s.data, s.header.size);
+  }
+  return r;
+}
+
 int main(int argc, char* argv[])
 {
     Stats data;
@@ -76,16 +112,14 @@ int main(int argc, char* argv[])
         return 1;
     }
     
-  std::ifstream myfile (argv[1]);
+  std::ifstream myfile (argv[1], std::ifstream::binary);
   if (myfile.is_open())
   {
-    while (!myfile.eof()) {
-    ProfilingHeader hd;
-    myfile.read(reinterpret_cast<char*>(&hd), sizeof(hd));
-    switch (hd.type) {
+    ProfilingSlot slot;
+    while (readSlot(myfile, slot)) {
+    switch (slot.header.type) {
      case (ProfilingData_Type_TIMELINE) : {
-      ProfilingData_TIMELINE s;
-      myfile.read(reinterpret_cast<char*>(&s), sizeof(s));
+      ProfilingData_TIMELINE s = slotData<ProfilingData_TIMELINE>(slot);
       Stats::iterator it = data.find(s.thisp);
       std::vector<linestat> & v = it->second.lines;
       v[s.line_number].count+=1;
@@ -93,10 +127,8 @@ int main(int argc, char* argv[])
       //std::cout << s.thisp << ":" << s.line_number << "|" << s.local << "," << s.total << std::endl;
      }; break;
      case (ProfilingData_Type_SOURCE) : {
-      ProfilingData_SOURCE s;
-      myfile.read(reinterpret_cast<char*>(&s), sizeof(s));
-      char sourceline[s.length+1];
-      myfile.read(reinterpret_cast<char*>(&sourceline), s.length);
+      ProfilingData_SOURCE s = slotData<ProfilingData_SOURCE>(slot);
+      std::string sourceline = readString(myfile, s.length);
       Stats::iterator it = data.find(s.thisp);
       std::vector<linestat> & v = it->second.lines;
       linestat L;
@@ -108,17 +140,14 @@ int main(int argc, char* argv[])
         v.insert(v.end(),s.line_number-int(v.size())+1,L);
       }
       //std::cout << v.size() << s.line_number << std::endl;
-      sourceline[s.length] = 0;
       v[s.line_number].code = sourceline;
       v[s.line_number].opcode = s.opcode;
       v[s.line_number].dependency = s.dependency;
       //std::cout << s.thisp << ":" << s.line_number << ": " << sourceline << std::endl;
      }; break;
      case (ProfilingData_Type_NAME) : {
-      ProfilingData_NAME s;
-      myfile.read(reinterpret_cast<char*>(&s), sizeof(s));
-      char name[s.length+1];
-      myfile.read(name, sizeof(char)*s.length);
+      ProfilingData_NAME s = slotData<ProfilingData_NAME>(slot);
+      std::string name = readString(myfile, s.length);
       Stats::iterator it = data.find(s.thisp);
       if (it==data.end()) {
         functionstat f;
@@ -129,7 +158,6 @@ int main(int argc, char* argv[])
         data[s.thisp] = f;
         it = data.find(s.thisp);
       }
-      name[s.length] = 0; // Null-terminated
       
       functionstat &f = it->second;
       f.name = name;
@@ -140,29 +168,28 @@ int main(int argc, char* argv[])
       //std::cout << name << std::endl;
       //std::cout << "n" << s.numin << "," << s.numout << std::endl;
       for (int i=0;i<s.numin;++i) {
-        myfile.read(reinterpret_cast<char*>(&f.inputs[i]), sizeof(iostat));
+        if (readSlot(myfile, slot, ProfilingData_Type_IO)) f.inputs[i] = slotData<iostat>(slot);
       }
       f.outputs.resize(s.numout);
       for (int i=0;i<s.numout;++i) {
-        myfile.read(reinterpret_cast<char*>(&f.outputs[i]), sizeof(iostat));
+        if (readSlot(myfile, slot, ProfilingData_Type_IO)) f.outputs[i] = slotData<iostat>(slot);
       }
      }; break;
      case (ProfilingData_Type_ENTRY) : {
-      ProfilingData_ENTRY s;
-      myfile.read(reinterpret_cast<char*>(&s), sizeof(s));
+      ProfilingData_ENTRY s = slotData<ProfilingData_ENTRY>(slot);
       Stats::iterator it = data.find(s.thisp);      
       it->second.count+=1;
       //std::cout << "Entry " << s.thisp << std::endl;
      }; break;
      case (ProfilingData_Type_EXIT) : {
-      ProfilingData_EXIT s;
-      myfile.read(reinterpret_cast<char*>(&s), sizeof(s));
+      ProfilingData_EXIT s = slotData<ProfilingData_EXIT>(slot);
       Stats::iterator it = data.find(s.thisp);
       it->second.total_time +=s.total;
       //std::cout << "Exit " << s.thisp << ": " << s.total << std::endl;
      }; break;
+     case (ProfilingData_Type_THREAD) : break;
      default:
-       std::cerr << "Unknown type in profile header: " << hd.type << std::endl;
+       std::cerr << "Unknown type in profile header: " << slot.header.type << std::endl;
     }
     }
   } else {
@@ -23,7 +23,13 @@
  */
 
 
+#ifdef SWIGPYTHON
+// Thread support: the GIL is only released by wrappers marked with %threadallow
+%module(package="casadi",directors=1,threads="1") casadi
+%nothreadallow;
+#else
 %module(package="casadi",directors=1) casadi
+#endif
 
  // Include all public CasADi C++
 %{
@@ -46,6 +52,7 @@
   namespace casadi {
     // Redirect printout
     static void pythonlogger(const char* s, std::streamsize num, bool error) {
+      SWIG_PYTHON_THREAD_BEGIN_BLOCK;
       if (error) {
         PySys_WriteStderr("%.*s", static_cast<int>(num), s);
       } else {
@@ -54,6 +61,7 @@
     }
 
     static bool pythoncheckinterrupted() {
+      SWIG_PYTHON_THREAD_BEGIN_BLOCK;
       return PyErr_CheckSignals();
     }
 
@@ -445,8 +453,8 @@ import_array();
   namespace casadi {
     class FunctorPythonInternal {
     public:
-    FunctorPythonInternal(PyObject *p) : p_(p) { Py_INCREF(p_); }
-      ~FunctorPythonInternal() { Py_DECREF(p_); }
+    FunctorPythonInternal(PyObject *p) : p_(p) { SWIG_PYTHON_THREAD_BEGIN_BLOCK; Py_INCREF(p_); }
+      ~FunctorPythonInternal() { SWIG_PYTHON_THREAD_BEGIN_BLOCK; Py_DECREF(p_); }
     protected:
       PyObject *p_;
     };
@@ -1106,6 +1114,8 @@ import_array();
 #ifdef SWIGPYTHON
     Function DerivativeGeneratorPythonInternal::call(Function& fcn, int ndir, void* user_data) {
       casadi_assert(p_!=0);
+      // Evaluation may have released the GIL
+      SWIG_PYTHON_THREAD_BEGIN_BLOCK;
       PyObject * ndir_py = PyInt_FromLong(ndir);
       PyObject * fcn_py = SWIG_NewPointerObj((new Function(static_cast< const Function& >(fcn))),
                                              $descriptor(casadi::Function *), SWIG_POINTER_OWN |  0 );
@@ -1171,6 +1181,8 @@ import_array();
 #ifdef SWIGPYTHON
     int CallbackPythonInternal::call(Function& fcn, void* user_data) {
       casadi_assert(p_!=0);
+      // Evaluation may have released the GIL
+      SWIG_PYTHON_THREAD_BEGIN_BLOCK;
       PyObject * fcn_py = SWIG_NewPointerObj((new Function(static_cast< const Function& >(fcn))),
                                              $descriptor(casadi::CustomFunction *), SWIG_POINTER_OWN |  0 );
       if(!fcn_py) throw CasadiException("CallbackPythonInternal: failed to convert CustomFunction to python");
@@ -1221,6 +1233,8 @@ import_array();
 #ifdef SWIGPYTHON
     void CustomEvaluatePythonInternal::call(CustomFunction& fcn, void* user_data) {
       casadi_assert(p_!=0);
+      // Evaluation may have released the GIL
+      SWIG_PYTHON_THREAD_BEGIN_BLOCK;
       PyObject * fcn_py = SWIG_NewPointerObj((new CustomFunction(static_cast< const CustomFunction& >(fcn))),
                                              $descriptor(casadi::CustomFunction *), SWIG_POINTER_OWN |  0 );
       if(!fcn_py) throw CasadiException("CustomEvaluatePythonInternal: failed to convert CustomFunction to python");
@@ -1393,8 +1407,7 @@ import_array();
 
 #ifdef SWIGPYTHON
       if (PyString_Check(p)) {
-        if (m) (*m)->clear();
-        if (m) (*m)->append(PyString_AsString(p));
+        if (m) (*m)->assign(PyString_AsString(p), PyString_Size(p));
         return true;
       }
 #endif // SWIGPYTHON
@@ -1416,7 +1429,7 @@ import_array();
 
     GUESTOBJECT* from_ptr(const std::string *a) {
 #ifdef SWIGPYTHON
-      return PyString_FromString(a->c_str());
+      return PyString_FromStringAndSize(a->data(), a->size());
 #elif defined(SWIGMATLAB)
       return mxCreateString(a->c_str());
 #else
@@ -3624,6 +3637,8 @@ PyObject* arrayView() {
 #endif // SWIGPYTHON
 
 %include <casadi/core/sx/sx_element.hpp>
+%feature("copyctor", "0") casadi::SXNodeArena;
+%include <casadi/core/sx/sx_node_pool.hpp>
 
 #ifdef SWIGPYTHON
 %extend casadi::Sparsity{
@@ -3876,9 +3891,82 @@ def PyFunction(name, obj, inputs, outputs, opts={}):
 }
 
 %include <casadi/core/function/io_scheme.hpp>
+
+#ifdef SWIGPYTHON
+// Release the GIL during numerical evaluation.
+// Python callbacks, directors and printing re-acquire it.
+%threadallow casadi::Function::evaluate();
+%threadallow casadi::Function::call(const std::vector<DMatrix>&, std::vector<DMatrix>&);
+%threadallow casadi::Function::call(const std::vector<DMatrix>&, std::vector<DMatrix>&, bool);
+%threadallow casadi::Function::call(const std::vector<DMatrix>&, std::vector<DMatrix>&, bool, bool);
+%threadallow casadi::Function::operator()(const std::vector<DMatrix>&);
+%threadallow casadi::Function::operator()(const std::vector<DMatrix>&, bool);
+%threadallow casadi::Function::operator()(const std::vector<DMatrix>&, bool, bool);
+%threadallow casadi::Function::operator()(const DMatrixDict&);
+%threadallow casadi::Function::operator()(const DMatrixDict&, bool);
+%threadallow casadi::Function::operator()(const DMatrixDict&, bool, bool);
+%threadallow casadi::EvaluationContext::operator()(const std::vector<DMatrix>&);
+%threadallow casadi::LinearSolver::prepare();
+%threadallow casadi::LinearSolver::solve();
+%threadallow casadi::LinearSolver::solve(bool);
+%threadallow casadi::Integrator::reset();
+%threadallow casadi::Integrator::integrate(double);
+%threadallow casadi::Integrator::integrateB(double);
+#endif // SWIGPYTHON
+
 %include <casadi/core/function/function.hpp>
+
+#ifdef SWIGPYTHON
+namespace casadi{
+%extend Function {
+  /// Evaluate with caller-owned, C-contiguous float64 numpy arrays holding the nonzeros (no copying)
+  void evalNZ(PyObject* arg, PyObject* res) {
+    if (!PySequence_Check(arg) || !PySequence_Check(res))
+      throw casadi::CasadiException("Function::evalNZ: Expected lists of numpy arrays.");
+    std::vector<const double*> argp(PySequence_Size(arg), 0);
+    std::vector<double*> resp(PySequence_Size(res), 0);
+    for (int k=0; k<argp.size()+resp.size(); ++k) {
+      bool is_arg = k<argp.size();
+      int i = is_arg ? k : k-argp.size();
+      PyObject* p = PySequence_GetItem(is_arg ? arg : res, i);
+      // The sequence keeps the array alive
+      Py_DECREF(p);
+      if (p==Py_None) continue;
+      int nnz = is_arg ? $self->input(i).nnz() : $self->output(i).nnz();
+      if (!is_array(p) || array_type(p)!=NPY_DOUBLE || !array_is_contiguous(p)
+          || !array_is_native(p) || PyArray_SIZE((PyArrayObject*)p)!=nnz
+          || (!is_arg && !PyArray_ISWRITEABLE((PyArrayObject*)p))) {
+        std::stringstream ss;
+        ss << "Function::evalNZ: " << (is_arg ? "Input " : "Output ") << i
+           << " must be None or a C-contiguous"  << (is_arg ? "" : ", writeable")
+           << " float64 numpy array with " << nnz << " elements.";
+        throw casadi::CasadiException(ss.str());
+      }
+      if (is_arg) {
+        argp[i] = static_cast<const double*>(array_data(p));
+      } else {
+        resp[i] = static_cast<double*>(array_data(p));
+      }
+    }
+    SWIG_PYTHON_THREAD_BEGIN_ALLOW;
+    $self->evalNZ(argp, resp);
+  }
+
+  %pythoncode %{
+    def __setstate__(self, state):
+        self.__init__(Function.deserialize(state["serialization"]))
+
+    def __getstate__(self):
+        return {"serialization": self.serialize()}
+  %}
+}
+} // namespace casadi
+#endif // SWIGPYTHON
+
 %feature("copyctor", "0") casadi::CodeGenerator;
 %include <casadi/core/function/code_generator.hpp>
+%include <casadi/core/function/evaluation_context.hpp>
+%include <casadi/core/function/sparsity_cache.hpp>
 
 %define RENAME_FUN(M)
 %apply M& OUTPUT { M& output_Q};
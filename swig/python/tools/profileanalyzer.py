@@ -0,0 +1,297 @@
+#
+#     This file is part of CasADi.
+#
+#     CasADi -- A symbolic framework for dynamic optimization.
+#     Copyright (C) 2010-2014 Joel Andersson, Joris Gillis, Moritz Diehl,
+#                             K.U. Leuven. All rights reserved.
+#     Copyright (C) 2011-2014 Greg Horn
+#
+#     CasADi is free software; you can redistribute it and/or
+#     modify it under the terms of the GNU Lesser General Public
+#     License as published by the Free Software Foundation; either
+#     version 3 of the License, or (at your option) any later version.
+#
+#     CasADi is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#     Lesser General Public License for more details.
+#
+#     You should have received a copy of the GNU Lesser General Public
+#     License along with CasADi; if not, write to the Free Software
+#     Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+#
+import sys
+
+import numpy as np
+
+descr = """
+This tool reads a binary profile_log (recorded in casadi with `CasadiOptions.startProfiling()`),
+reports the time spent per function and per algorithm line, and optionally writes
+the call stacks in the collapsed format that flame graph tools read.
+"""
+
+# Record types, see ProfilingData_Type in casadi/core/profiling.hpp
+TIMELINE, SOURCE, NAME, ENTRY, EXIT, IO, STRING, THREAD = range(8)
+
+# Every record takes the same number of bytes: an 8 byte header and 32 bytes of data
+SLOT_SIZE = 40
+DATA_OFFSET = 8
+
+# Number of records aggregated at once
+CHUNK_SIZE = 1 << 24
+
+def recordType(**fields):
+  """
+    Returns the numpy dtype of a record, given (format,offset) for every field
+  """
+  names = sorted(fields,key=lambda k: fields[k][1])
+  return np.dtype({"names": names, "formats": [fields[k][0] for k in names], "offsets": [fields[k][1] for k in names], "itemsize": SLOT_SIZE})
+
+header_t = recordType(type=("i4",0),size=("i4",4))
+timeline_t = recordType(local=("f8",8),total=("f8",16),thisp=("i8",24),line_number=("i4",32))
+source_t = recordType(thisp=("i8",8),line_number=("i4",16),length=("i4",20),opcode=("i4",24),dependency=("i8",32))
+name_t = recordType(thisp=("i8",8),length=("i4",16),type=("i4",20),algorithm_size=("i4",24),numin=("i4",28),numout=("i4",32))
+entry_t = recordType(thisp=("i8",8))
+exit_t = recordType(total=("f8",8),thisp=("i8",16))
+thread_t = recordType(thread=("i8",8),nslots=("i8",16))
+
+def aggregate(keys,weights):
+  """
+    Returns the distinct keys, the number of times they occur and the sum of their weights
+  """
+  u, inv = np.unique(keys,return_inverse=True)
+  return u, np.bincount(inv,minlength=len(u)), np.bincount(inv,weights=weights,minlength=len(u))
+
+class ProfileLog:
+  """
+    A binary profile log, memory-mapped
+
+    functions: thisp -> dict with name, type and algorithm_size
+    sources:   (thisp,line_number) -> source line
+  """
+  def __init__(self,filename):
+    raw = np.memmap(filename,dtype=np.uint8,mode="r")
+    self.n = len(raw)//SLOT_SIZE
+    self.raw = raw[:self.n*SLOT_SIZE]
+    self.records = self.raw.view(header_t)
+    self.types = np.asarray(self.records["type"])
+
+    # Blocks of records, each written by one thread
+    self.blocks = np.flatnonzero(self.types==THREAD)
+    info = self.raw.view(thread_t)[self.blocks]
+    self.block_thread = np.asarray(info["thread"])
+    self.block_end = np.minimum(self.blocks+np.asarray(info["nslots"]),self.n-1)
+
+    self.functions = {}
+    for p in np.flatnonzero(self.types==NAME):
+      r = self.raw.view(name_t)[p]
+      self.functions[int(r["thisp"])] = {"name": self.string(p,r["length"]), "type": int(r["type"]), "algorithm_size": int(r["algorithm_size"])}
+
+    self.sources = {}
+    for p in np.flatnonzero(self.types==SOURCE):
+      r = self.raw.view(source_t)[p]
+      self.sources[(int(r["thisp"]),int(r["line_number"]))] = self.string(p,r["length"]).rstrip("\n")
+
+  def thread(self,p):
+    """
+      Returns the threads that wrote the records at positions p
+    """
+    return self.block_thread[np.searchsorted(self.blocks,p,side="right")-1]
+
+  def following(self,p):
+    """
+      Iterates over the positions of the records after p, written by the same thread
+    """
+    b = np.searchsorted(self.blocks,p,side="right")-1
+    thread = self.block_thread[b]
+    q = p+1
+    while b<len(self.blocks):
+      if self.block_thread[b]==thread:
+        q = max(q,self.blocks[b]+1)
+        while q<=self.block_end[b]:
+          yield q
+          q+=1
+      b+=1
+
+  def string(self,p,length):
+    """
+      Returns the string of the STRING records after position p
+    """
+    chars = []
+    n = 0
+    for q in self.following(p):
+      if n>=length or self.types[q]!=STRING: break
+      size = int(self.records["size"][q])
+      chars.append(self.raw[q*SLOT_SIZE+DATA_OFFSET:q*SLOT_SIZE+DATA_OFFSET+size].tostring())
+      n+=size
+    return "".join(chars)
+
+  def name(self,thisp):
+    if thisp in self.functions:
+      return self.functions[thisp]["name"]
+    else:
+      return "0x%x" % thisp
+
+  def lineStats(self):
+    """
+      Returns thisp, line_number, number of evaluations and total local time of all algorithm lines
+    """
+    thisp = []
+    line_number = []
+    count = []
+    time = []
+    for start in range(0,self.n,CHUNK_SIZE):
+      types = self.types[start:start+CHUNK_SIZE]
+      r = self.raw.view(timeline_t)[start:start+CHUNK_SIZE][types==TIMELINE]
+      if len(r)==0: continue
+      # Combine thisp and line_number into one key
+      f, finv = np.unique(r["thisp"],return_inverse=True)
+      nline = int(r["line_number"].max())+1
+      u, c, t = aggregate(finv*nline+r["line_number"],r["local"])
+      thisp.append(f[u//nline])
+      line_number.append(u%nline)
+      count.append(c)
+      time.append(t)
+    if len(thisp)==0:
+      return tuple(np.zeros(0,dtype=d) for d in (np.int64,np.int64,np.int64,float))
+    thisp = np.concatenate(thisp)
+    line_number = np.concatenate(line_number)
+    # Merge the chunks
+    order = np.lexsort((line_number,thisp))
+    thisp, line_number = thisp[order], line_number[order]
+    first = np.r_[True,(thisp[1:]!=thisp[:-1]) | (line_number[1:]!=line_number[:-1])]
+    group = np.cumsum(first)-1
+    return thisp[first], line_number[first], np.bincount(group,weights=np.concatenate(count)[order]).astype(np.int64), np.bincount(group,weights=np.concatenate(time)[order])
+
+  def calls(self):
+    """
+      Reconstructs the calls from the ENTRY and EXIT records
+
+      Returns, for every call, the function (thisp), the parent call (-1 if none),
+      the nesting level, the total time and the time not spent in child calls.
+      The times are nan for calls that did not end.
+    """
+    p = np.flatnonzero((self.types==ENTRY) | (self.types==EXIT))
+    # Events of a thread after each other, in the order they were recorded
+    thread = self.thread(p)
+    order = np.argsort(thread,kind="mergesort")
+    p, thread = p[order], thread[order]
+    is_entry = self.types[p]==ENTRY
+
+    # Nesting level of the call an event belongs to, per thread
+    step = np.where(is_entry,1,-1)
+    depth = np.cumsum(step)
+    starts = np.flatnonzero(np.r_[True,thread[1:]!=thread[:-1]])
+    depth -= np.repeat((depth-step)[starts],np.diff(np.r_[starts,len(p)]))
+    level = np.where(is_entry,depth-1,depth)
+    level -= level.min() if len(level)>0 else 0
+
+    E = np.flatnonzero(is_entry)
+    X = np.flatnonzero(~is_entry)
+    N = len(p)
+    keys = level[E]*N+E
+    sorting = np.argsort(keys)
+    keys = keys[sorting]
+
+    def lastEntry(l,k):
+      # Last entry at level l before event k, in the same thread
+      j = np.searchsorted(keys,l*N+k)-1
+      e = E[sorting[np.maximum(j,0)]] if len(E)>0 else np.zeros(len(k),dtype=int)
+      return np.where((j>=0) & (level[e]==l) & (thread[e]==thread[k]),e,-1)
+
+    call = -np.ones(N,dtype=int)
+    call[E] = np.arange(len(E))
+
+    total = np.empty(len(E))
+    total.fill(np.nan)
+    e = lastEntry(level[X],X)
+    total[call[e[e>=0]]] = self.raw.view(exit_t)["total"][p[X[e>=0]]]
+
+    parent = lastEntry(level[E]-1,E)
+    parent = np.where(parent>=0,call[parent],-1)
+
+    child = (parent>=0) & ~np.isnan(total)
+    own = total-np.bincount(parent[child],weights=total[child],minlength=len(E))
+    thisp = np.asarray(self.raw.view(entry_t)["thisp"][p[E]])
+    return thisp, parent, level[E], total, own
+
+  def functionStats(self,calls=None):
+    """
+      Returns thisp, number of calls, total time and time not spent in child calls of all functions
+    """
+    thisp, parent, level, total, own = self.calls() if calls is None else calls
+    ended = ~np.isnan(total)
+    f, finv = np.unique(thisp,return_inverse=True)
+    return f, np.bincount(finv,minlength=len(f)), np.bincount(finv[ended],weights=total[ended],minlength=len(f)), np.bincount(finv[ended],weights=own[ended],minlength=len(f))
+
+  def stacks(self,calls=None):
+    """
+      Returns the call stacks with the time spent in them, outside of child calls
+
+      Every stack is a list of function names, outermost first.
+    """
+    thisp, parent, level, total, own = self.calls() if calls is None else calls
+    f, fid = np.unique(thisp,return_inverse=True)
+    nf = len(f)
+
+    # Number the distinct stacks level by level
+    stack = -np.ones(len(thisp),dtype=int)
+    table = []
+    for l in range(level.max()+1 if len(level)>0 else 0):
+      c = np.flatnonzero(level==l)
+      ps = np.where(parent[c]>=0,stack[np.maximum(parent[c],0)],-1)
+      u, inv = np.unique((ps+1)*nf+fid[c],return_inverse=True)
+      stack[c] = len(table)+inv
+      table.extend(u)
+
+    ended = ~np.isnan(total)
+    time = np.bincount(stack[ended],weights=own[ended],minlength=len(table))
+
+    names = [None]*len(table)
+    def frames(s):
+      if names[s] is None:
+        ps, k = divmod(int(table[s]),nf)
+        names[s] = (frames(ps-1) if ps>0 else [])+[self.name(int(f[k]))]
+      return names[s]
+    return [(frames(s),time[s]) for s in range(len(table))]
+
+def frameName(name):
+  return name.replace(";","_").replace(" ","_")
+
+def writeFlameGraph(log,out,calls=None):
+  """
+    Writes the call stacks in the collapsed format of flame graph tools, in microseconds
+  """
+  for frames, time in log.stacks(calls=calls):
+    t = int(round(time*1e6))
+    if t>0:
+      out.write("%s %d\n" % (";".join(map(frameName,frames)),t))
+
+def writeReport(log,out,nlines=20,calls=None):
+  thisp, ncalls, total, own = log.functionStats(calls=calls)
+  out.write("%-40s %10s %14s %14s\n" % ("Function","#calls","Total (s)","Self (s)"))
+  for k in np.argsort(-own):
+    out.write("%-40s %10d %14.6f %14.6f\n" % (log.name(int(thisp[k])),ncalls[k],total[k],own[k]))
+
+  thisp, line_number, count, time = log.lineStats()
+  if len(thisp)>0:
+    out.write("\n%-40s %10s %14s  %s\n" % ("Line","#evals","Total (s)","Source"))
+    for k in np.argsort(-time)[:nlines]:
+      key = (int(thisp[k]),int(line_number[k]))
+      out.write("%-40s %10d %14.6f  %s\n" % ("%s:%d" % (log.name(key[0]),key[1]),count[k],time[k],log.sources.get(key,"")))
+
+if __name__ == "__main__":
+  import argparse
+  parser = argparse.ArgumentParser(description=descr,usage='python -mcasadi.tools.profileanalyzer [-o OUTPUT] [--flamegraph FILE] profile_log')
+  parser.add_argument('profile_log',help='The filename of the binary profile_log as generated by casadi')
+  parser.add_argument("-o",dest="output",type=argparse.FileType('w'),help='file to write the report to')
+  parser.add_argument("--flamegraph",type=argparse.FileType('w'),help='file to write collapsed stacks to')
+  parser.add_argument("--lines",type=int,default=20,help='number of algorithm lines to report')
+  args = parser.parse_args()
+
+  log = ProfileLog(args.profile_log)
+  calls = log.calls()
+  writeReport(log,sys.stdout if args.output is None else args.output,nlines=args.lines,calls=calls)
+  if args.flamegraph is not None:
+    writeFlameGraph(log,args.flamegraph,calls=calls)
@@ -625,14 +625,122 @@ class SetterDispatcher(Dispatcher):
       new_exc = Exception("Error in powerIndex slicing for canonicalIndex %s:\n %s" % (str(canonicalIndex),str(e)))
       raise new_exc.__class__, new_exc, tb
       
+def planKey(powerIndex):
+  """
+    Returns a hashable key for a powerIndex, or None if the powerIndex cannot be planned.
+    
+    Only strings, integers, slices, ellipses and lists of strings and integers can be planned.
+  """
+  key = []
+  for p in powerIndex:
+    if isString(p) or isinstance(p,type(Ellipsis)):
+      key.append(p)
+    elif isInteger(p):
+      key.append(int(p))
+    elif isinstance(p,slice):
+      if not all(e is None or isInteger(e) for e in (p.start,p.stop,p.step)):
+        return None
+      key.append((slice,p.start,p.stop,p.step))
+    elif isinstance(p,list):
+      if not all(isString(e) or isInteger(e) for e in p):
+        return None
+      key.append((list,)+tuple(p))
+    else:
+      return None
+  return tuple(key)
+
+class PayloadPath(list):
+  """
+    Stands in for the payload while an IndexPlan is compiled, records how the payload is unpacked
+  """
+  def __init__(self,path=()):
+    self.path = path
+    
+  def __len__(self):
+    return sys.maxint
+    
+  def __getitem__(self,i):
+    return PayloadPath(self.path+(i,))
+
+class IndexPlan:
+  """
+    The result of traversing a structure with a particular powerIndex, compiled once.
+    
+    leaves:   IMatrix of flat indices, for every matrix in the result
+    skeleton: nested lists of positions in leaves, mirroring the result
+    paths:    for every leaf, how to unpack the corresponding part of a payload
+    nz:       flat indices of all leaves, concatenated
+  """
+  def __init__(self,skeleton,leaves,paths):
+    self.skeleton = skeleton
+    self.leaves = leaves
+    self.paths = paths
+    self.sparsity = [i.sparsity() for i in leaves]
+    self.iscolumn = [sp.isdense() and sp.size2()==1 for sp in self.sparsity]
+    self.offsets = list(np.cumsum([0]+[i.nnz() for i in leaves]))
+    self.nz = np.array([k for i in leaves for k in i.nonzeros()],dtype=int)
+    self.inz = IMatrix(list(self.nz))
+    
+  def build(self,skeleton,results):
+    if isinstance(skeleton,list):
+      return [self.build(s,results) for s in skeleton]
+    else:
+      return results[skeleton]
+      
+  def isdense(self,master,types):
+    return isinstance(master,types) and master.isdense() and master.nnz()>0 and len(self.nz)>0
+    
+  def get(self,master):
+    if self.isdense(master,(DMatrix,SX)):
+      # One gather for all leaves
+      columns = vertsplit(master.nz[self.inz],self.offsets)
+      mtype = type(master)
+      results = [c if iscolumn else mtype(sp,c) for c,sp,iscolumn in zip(columns,self.sparsity,self.iscolumn)]
+    else:
+      results = [master[i] for i in self.leaves]
+    return self.build(self.skeleton,results)
+    
+  def set(self,master,mtype,payload):
+    payloads = []
+    for path in self.paths:
+      p = payload
+      for k in path:
+        p = payloadUnpack(p,k)
+      payloads.append(mtype(p))
+      
+    if self.isdense(master,DMatrix):
+      v = np.empty(len(self.nz))
+      o = self.offsets
+      for k,(sp,p) in enumerate(zip(self.sparsity,payloads)):
+        if p.isscalar() and p.isdense():
+          v[o[k]:o[k+1]] = float(p)
+        elif p.sparsity()==sp:
+          v[o[k]:o[k+1]] = p.nonzeros()
+        else:
+          break
+      else:
+        # One scatter for all leaves
+        master.toArray(shared=True)[self.nz,0] = v
+        return
+        
+    for i,p in zip(self.leaves,payloads):
+      master[i] = p
+
 class MasterGettable:
   @properGetitem
   def __getitem__(self,powerIndex):
+    if not self.priority_object_map:
+      plan = self.struct.getPlan(powerIndex)
+      if plan is not None:
+        return plan.get(self.master)
     return self.struct.traverseByPowerIndex(powerIndex,dispatcher=GetterDispatcher(struct=self.struct,master=self.master,priority_object_map=self.priority_object_map))
 
 class MasterSettable:
   @properGetitem
   def __setitem__(self,powerIndex,value):
+    plan = self.struct.getPlan(powerIndex)
+    if plan is not None:
+      return plan.set(self.master,self.mtype,value)
     return self.struct.traverseByPowerIndex(powerIndex,dispatcher=
     SetterDispatcher(struct=self.struct,master=self.master,mtype=self.mtype),payload=value)
     
@@ -762,6 +870,47 @@ class CasadiStructure(Structure,CasadiStructureDerivable):
       else:
         raise Exception("Canonical index %s not found." % str(canonicalIndex))
 
+  class PlanDispatcher(Dispatcher):
+    def __call__(self,payload,canonicalIndex,extraIndex=None,entry=None):
+      if entry is not None and entry.type is not None:
+        self.plannable = False
+        return None
+      if canonicalIndex in self.struct.map:
+        self.leaves.append(performExtraIndex(self.struct.map[canonicalIndex],extraIndex=extraIndex,entry=entry))
+        self.paths.append(payload.path)
+        return len(self.leaves)-1
+      else:
+        raise Exception("Canonical index %s not found." % str(canonicalIndex))
+        
+    def callableInner(self):
+      self.plannable = False
+      return self
+      
+  def getPlan(self,powerIndex):
+    """
+      Returns the IndexPlan for a powerIndex, or None if it cannot be planned.
+      
+      Plans are compiled on first use and cached.
+    """
+    key = planKey(powerIndex)
+    if key is None:
+      return None
+    if key in self.plans:
+      return self.plans[key]
+    dispatcher = CasadiStructure.PlanDispatcher(struct=self,leaves=[],paths=[],plannable=True)
+    try:
+      skeleton = self.traverseByPowerIndex(powerIndex,dispatcher=dispatcher,payload=PayloadPath())
+    except Exception:
+      # Leave the error reporting to the traversal with the actual dispatcher
+      return None
+    plan = IndexPlan(skeleton,dispatcher.leaves,dispatcher.paths) if dispatcher.plannable else None
+    if len(self.plans)>=self.plan_cache_size:
+      self.plans.clear()
+    self.plans[key] = plan
+    return plan
+    
+  plan_cache_size = 1000
+        
   def __setstate__(self,state):
     self.__init__(*state["args"],**state["kwargs"])
         
@@ -773,6 +922,7 @@ class CasadiStructure(Structure,CasadiStructureDerivable):
     Structure.__init__(self,*args,**kwargs)
     
     self.map = {}
+    self.plans = {}
     self.lookuptable = []
     
     hmap = {}
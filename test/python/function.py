@@ -1422,7 +1422,7 @@ class Functiontests(casadiTestCase):
         ]:
       print "args", Z_alt
 
-      for parallelization in ["serial","openmp"] if args.run_slow else ["serial"]:
+      for parallelization in ["serial","openmp","thread"] if args.run_slow else ["serial","thread"]:
         print parallelization
         res = fun.map(map(horzcat,[X,Y,Z_alt,V]),parallelization)
 
@@ -1472,7 +1472,7 @@ class Functiontests(casadiTestCase):
 
     for Z_alt in [Z,[MX()]*3]:
 
-      for parallelization in ["serial","openmp"]:
+      for parallelization in ["serial","openmp","thread"]:
         res = fun.map(zip(X,Y,Z_alt,V),parallelization)
 
 
@@ -1522,7 +1522,7 @@ class Functiontests(casadiTestCase):
     zi = 0
     for Z_alt in [Z,[MX()]*3]:
       zi+= 1
-      for parallelization in ["serial","openmp"]:
+      for parallelization in ["serial","openmp","thread"]:
         res = fun.mapsum(map(horzcat,[X,Y,Z_alt,V]),parallelization)
 
 
@@ -1581,9 +1581,9 @@ class Functiontests(casadiTestCase):
 
     for Z_alt in [Z]:
 
-      for parallelization in ["serial","openmp"]:
+      for parallelization in ["serial","openmp","thread"]:
 
-        F = Map("map",fun,n,[True,True,False,False],[False,True,True])
+        F = Map("map",fun,n,[True,True,False,False],[False,True,True],{"parallelization": parallelization})
 
         resref = [0 for i in range(fun.nOut())]
         acc = 0
@@ -1625,6 +1625,308 @@ class Functiontests(casadiTestCase):
 
           self.checkfunction(f,Fref,sparsity_mod=args.run_slow)
 
+  def test_map_thread(self):
+    x = SX.sym("x")
+    y = SX.sym("y",2)
+
+    fun = SXFunction("f",[x,y],[sin(y*x),x*y])
+
+    n = 7
+
+    for n_threads in [0,1,3,10]:
+      F = Map("map",fun,n,[True,False],[True,False],{"parallelization": "thread", "n_threads": n_threads})
+      Fref = Map("map",fun,n,[True,False],[True,False],{"parallelization": "serial"})
+
+      for f in [F,Fref]:
+        np.random.seed(0)
+        f.setInput(np.random.random(n),0)
+        f.setInput(np.random.random(2),1)
+
+      self.checkfunction(F,Fref,sparsity_mod=args.run_slow)
+
+  @requiresPlugin(Integrator,"rk")
+  def test_map_thread_nonreentrant(self):
+    self.message("Map of a function that is not reentrant")
+    x = SX.sym("x")
+    p = SX.sym("p")
+    dae = SXFunction("dae",daeIn(x=x,p=p),daeOut(ode=-p*x))
+    intg = Integrator("intg","rk",dae,{"number_of_finite_elements": 200})
+
+    n = 7
+    repeat = [i in [0,1] for i in range(intg.nIn())]
+    F = Map("map",intg,n,repeat,[True]*intg.nOut(),{"parallelization": "thread", "n_threads": 3})
+    Fref = Map("map",intg,n,repeat,[True]*intg.nOut(),{"parallelization": "serial"})
+
+    np.random.seed(0)
+    for k in range(10):
+      x0 = np.random.random(n)
+      p0 = np.random.random(n)
+      for f in [F,Fref]:
+        f.setInput(x0,0)
+        f.setInput(p0,1)
+        f.evaluate()
+      self.checkarray(F.getOutput(0),Fref.getOutput(0))
+
+  @requiresPlugin(LinearSolver,"csparse")
+  def test_mxfunction_thread(self):
+    x = MX.sym("x",2)
+    y = MX.sym("y")
+
+    funs = [MXFunction("f%d" % i,[x,y],[sin(x*y+i),x*(y+i)]) for i in range(3)]
+    A = MX.sym("A",2,2)
+    b = MX.sym("b",2)
+    sol = solve(A+2*MX.eye(2),b,"csparse")
+
+    # Independent calls of different functions, repeated calls of the same function
+    inp = [A,b,y]
+    r = []
+    for i,f in enumerate(funs):
+      [r1,r2] = f([b+i,y])
+      [r3,_] = f([r1,y*i])
+      r += [r1,r3,funs[(i+1)%3]([r2,y])[0]]
+    r.append(sol)
+    r.append(mul(A,sol)+r[0])
+
+    # More threads than cores, so that the calls also overlap on a single core machine
+    Fref = MXFunction("F",inp,[vertcat(r)],{"parallelization": "serial"})
+    F = MXFunction("F",inp,[vertcat(r)],{"parallelization": "thread", "n_threads": 4})
+    for f in [F,Fref]:
+      np.random.seed(0)
+      f.setInput(np.random.random((2,2)),0)
+      f.setInput(np.random.random(2),1)
+      f.setInput(0.3,2)
+
+    self.checkfunction(F,Fref,sparsity_mod=args.run_slow)
+
+  @requiresPlugin(Integrator,"rk")
+  def test_mxfunction_thread_shared(self):
+    self.message("Different wrappers of the same integrator are not evaluated concurrently")
+    x = SX.sym("x")
+    p = SX.sym("p")
+    dae = SXFunction("dae",daeIn(x=x,p=p),daeOut(ode=-p*x))
+    intg = Integrator("intg","rk",dae,{"number_of_finite_elements": 200})
+
+    x0 = MX.sym("x0")
+    p0 = MX.sym("p0")
+    w = [MXFunction("w%d" % i,[x0,p0],[intg({"x0":x0+i,"p":p0})["xf"]]) for i in range(4)]
+
+    x = MX.sym("x",4)
+    r = [wi([x[i],x[3-i]])[0] for i,wi in enumerate(w)]
+    Fref = MXFunction("F",[x],[vertcat(r)],{"parallelization": "serial"})
+    F = MXFunction("F",[x],[vertcat(r)],{"parallelization": "thread", "n_threads": 4})
+
+    np.random.seed(0)
+    for k in range(20):
+      v = np.random.random(4)
+      for f in [F,Fref]:
+        f.setInput(v)
+        f.evaluate()
+      self.checkarray(F.getOutput(),Fref.getOutput())
+
+  def test_jacobian_thread(self):
+    n = 100
+    x = SX.sym("x",n)
+    y = SX.sym("y")
+    e = sin(x)*sumRows(x*y)
+    g = c.gradient(sumRows(e*e),x)
+
+    np.random.seed(0)
+    x0 = np.random.random(n)
+    for Fun, xs, ys in [(SXFunction, x, y), (MXFunction, MX.sym("x",n), MX.sym("y"))]:
+      for out, symmetric in [(e, False), (g, True)]:
+        f = [SXFunction("f",[x,y],[out],opts) for opts in [{}, {"jac_parallelization": "thread"}]]
+        if Fun is MXFunction:
+          f = [MXFunction("f",[xs,ys],f[0]([xs,ys]),opts) for opts in [{}, {"jac_parallelization": "thread"}]]
+        Jref = f[0].jacobian(0,0,False,symmetric)
+        J = f[1].jacobian(0,0,False,symmetric)
+
+        for j in [J,Jref]:
+          j.setInput(x0,0)
+          j.setInput(0.3,1)
+          j.evaluate()
+        self.checkarray(J.getOutput(),Jref.getOutput())
+        self.assertTrue(J.getOutput().sparsity()==Jref.getOutput().sparsity())
+
+  def test_evalNZ(self):
+    x = SX.sym("x",2)
+    y = SX.sym("y",Sparsity.lower(2))
+    f = SXFunction("f",[x,y],[sin(x)*x[0],mul(y,x)])
+
+    x0 = np.array([1.1,2.3])
+    y0 = np.array([0.7,1.3,2.9])
+    r0 = np.zeros(2)
+    r1 = np.zeros(2)
+    for i in range(3):
+      f.evalNZ([x0,y0],[r0,r1])
+      ref = f([x0,DMatrix(y.sparsity(),y0)])
+      self.checkarray(r0,ref[0].nonzeros())
+      self.checkarray(r1,ref[1].nonzeros())
+      x0 += 1
+
+    # Outputs can be skipped
+    r0[:] = 0
+    f.evalNZ([x0,y0],[r0,None])
+    self.checkarray(r0,f([x0,DMatrix(y.sparsity(),y0)])[0].nonzeros())
+
+    with self.assertRaises(Exception):
+      f.evalNZ([x0,y0[:2]],[r0,r1])
+    with self.assertRaises(Exception):
+      f.evalNZ([x0,y0],[r0,np.zeros(4)[::2]])
+    with self.assertRaises(Exception):
+      f.evalNZ([x0.astype(int),y0],[r0,r1])
+
+  def test_EvaluationContext(self):
+    x = SX.sym("x",2)
+    y = SX.sym("y",Sparsity.lower(2))
+    f = SXFunction("f",[x,y],[sin(x)*x[0],mul(y,x)])
+
+    ctx = [EvaluationContext(f) for i in range(2)]
+    for i,c in enumerate(ctx):
+      x0 = DMatrix([1.1,2.3+i])
+      y0 = DMatrix(y.sparsity(),[0.7,1.3,2.9])
+      res = c([x0,y0])
+      ref = f([x0,y0])
+      for r, e in zip(res,ref):
+        self.checkarray(r,e)
+        self.assertTrue(r.sparsity()==e.sparsity())
+
+    # Dense input is projected
+    res = ctx[0]([DMatrix([1,2]),DMatrix([[1,0],[3,4]])])
+    self.checkarray(res[1],f([DMatrix([1,2]),DMatrix([[1,0],[3,4]])])[1])
+
+    with self.assertRaises(Exception):
+      ctx[0]([DMatrix([1,2,3]),y0])
+
+  @requiresPlugin(Integrator,"rk")
+  def test_EvaluationContext_nonreentrant(self):
+    x = SX.sym("x")
+    p = SX.sym("p")
+    intg = Integrator("intg","rk",SXFunction("dae",daeIn(x=x,p=p),daeOut(ode=-p*x)))
+
+    # Evaluates through its own input and output buffers
+    with self.assertRaises(Exception):
+      EvaluationContext(intg)
+
+    # A map of a reentrant function is reentrant
+    f = SXFunction("f",[x,p],[sin(x)*p])
+    fm = Map("map",f,3,[True,False],[True])
+    res = EvaluationContext(fm)([DMatrix([1,2,3]).T,2])
+    self.checkarray(res[0],fm([DMatrix([1,2,3]).T,2])[0])
+
+  def test_threads(self):
+    self.message("Evaluation from concurrent Python threads")
+    import threading
+
+    class mycallback(Callback2):
+      def __call__(self,argin):
+        return [argin[0]**2]
+
+    n = 4
+    fs = []
+    cs = []
+    for i in range(n):
+      c = mycallback()
+      cs.append(c)
+      x = MX.sym("x")
+      fs.append(MXFunction("f",[x],[sin(x)*c.create()([x])[0]+i]))
+
+    res = [None]*n
+    def work(i):
+      for k in range(20):
+        res[i] = fs[i]([DMatrix(0.5)])[0]
+    threads = [threading.Thread(target=work,args=(i,)) for i in range(n)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    for i in range(n):
+      self.checkarray(res[i],DMatrix(sin(0.5)*0.25+i))
+
+  def test_sparsity_cache(self):
+    self.message("Jacobian sparsity and coloring shared between functions")
+    SparsityCache.clear()
+
+    def build(p, MatType=SX):
+      x = MatType.sym("x",20)
+      y = MatType.sym("y",2)
+      f = MXFunction if MatType is MX else SXFunction
+      return f("f",[x,y],[sin(x[1:]*x[:-1])*p+y[0]])
+
+    x0 = [DMatrix(range(20)),DMatrix([1,2])]
+    for MatType in [SX,MX]:
+      SparsityCache.clear()
+      J3 = build(3,MatType).jacobian()
+      self.assertEqual(SparsityCache.getHits(),0)
+      misses = SparsityCache.getMisses()
+      self.assertTrue(misses>0)
+      self.assertTrue(SparsityCache.getNumEntries()>0)
+
+      # Same structure, different data
+      J4 = build(4,MatType).jacobian()
+      self.assertEqual(SparsityCache.getMisses(),misses)
+      self.assertTrue(SparsityCache.getHits()>0)
+      self.checkarray(J3(x0)[0]*4/3.0,J4(x0)[0])
+      self.assertTrue(J4.outputSparsity(0)==J3.outputSparsity(0))
+
+      # Different structure
+      x = MatType.sym("x",20)
+      y = MatType.sym("y",2)
+      f = (MXFunction if MatType is MX else SXFunction)("f",[x,y],[x*y[1]])
+      J = f.jacobian()
+      self.assertTrue(SparsityCache.getMisses()>misses)
+      self.assertTrue(J.outputSparsity(0)==Sparsity.diag(20))
+
+    # Disabled cache
+    SparsityCache.setMaxSize(0)
+    try:
+      self.assertEqual(SparsityCache.getNumEntries(),0)
+      hits = SparsityCache.getHits()
+      build(3).jacobian()
+      self.assertEqual(SparsityCache.getHits(),hits)
+    finally:
+      SparsityCache.setMaxSize(100)
+
+  def test_call_stats(self):
+    self.message("Call counters and timing histograms")
+    x = SX.sym("x",3)
+    f = SXFunction("f",[x],[sin(x)*x])
+    X = MX.sym("x",3)
+    g = MXFunction("g",[X],[f([X])[0]*2+f([X*3])[0]])
+
+    for i in range(5):
+      g.evaluate()
+    g.jacobian()
+
+    s = g.getStats()["evalD"]
+    self.assertEqual(s["n_call"],5)
+    self.assertTrue(s["t_min"]<=s["t_max"])
+    self.assertTrue(s["t_max"]<=s["t_total"])
+    self.assertEqual(sum(s["histogram"]),5)
+    self.assertEqual(f.getStat("evalD")["n_call"],10)
+    self.assertTrue(f.getStats()["evalD"]["t_total"]<=s["t_total"])
+    self.assertEqual(g.getStats()["derivative"]["n_call"],1)
+    self.assertTrue(f.getStats()["spFwd"]["n_call"]+f.getStats()["spAdj"]["n_call"]>0)
+
+    g.resetStats()
+    self.assertEqual(g.getStats()["evalD"]["n_call"],0)
+    self.assertEqual(sum(g.getStats()["evalD"]["histogram"]),0)
+
+    # The evaluations by Map are recorded together
+    for parallelization in ["serial","thread"]:
+      f.resetStats()
+      F = Map("map",f,7,[True],[True],{"parallelization":parallelization})
+      F([DMatrix.ones(3,7)])
+      s = f.getStats()["evalD"]
+      self.assertEqual(s["n_call"],7)
+      self.assertEqual(sum(s["histogram"]),7)
+      self.assertTrue(s["t_max"]<=s["t_total"])
+
+    CasadiOptions.setCallStats(False)
+    try:
+      g.evaluate()
+      self.assertEqual(g.getStats()["evalD"]["n_call"],0)
+    finally:
+      CasadiOptions.setCallStats(True)
+
   def test_issue1522(self):
     V = MX.sym("X",2)
 
@@ -1816,7 +2118,41 @@ class Functiontests(casadiTestCase):
   #   f = ExternalFunction("helloworld_cxx", compiler)
   #   [v] = f([])
   #   self.checkarray(2.37683, v, digits=4)
-    
+
+  @requiresPlugin(Compiler,"shell")
+  def test_jitfunction_shell_cache(self):
+    import tempfile, shutil, os
+    cache = tempfile.mkdtemp()
+    bindir = tempfile.mkdtemp()
+    try:
+      # Compiler wrapper which counts its invocations
+      calls = os.path.join(bindir,"calls")
+      wrapper = os.path.join(bindir,"cc.sh")
+      with open(wrapper,"w") as w:
+        w.write('echo >> "%s"\nexec gcc "$@"\n' % calls)
+      ncalls = lambda : len(open(calls).readlines()) if os.path.exists(calls) else 0
+
+      x = MX.sym("x")
+      opts = {'jit':True, 'compiler':'shell', 'jit_options': {'cache': cache, 'compiler': 'sh ' + wrapper}}
+      for i in range(2):
+        F = MXFunction("f",[x],[x**2],opts)
+        out = F([5])
+        self.checkarray(out[0],25)
+        # Only the first function is compiled, the second one is a cache hit
+        self.assertEqual(ncalls(),1)
+      libs = [f for f in os.listdir(cache) if f.endswith(".so")]
+      self.assertEqual(len(libs),1)
+
+      # A zero cache size evicts every entry, including the one just added
+      opts['jit_options']['cache_size'] = 0
+      F = MXFunction("f",[x],[x**3],opts)
+      self.checkarray(F([2])[0],8)
+      self.assertEqual(ncalls(),2)
+      self.assertEqual(len([f for f in os.listdir(cache) if f.endswith(".so")]),0)
+    finally:
+      shutil.rmtree(cache)
+      shutil.rmtree(bindir)
+
   @memory_heavy()
   def test_KernelSum2D(self):
     n = 20
@@ -1121,6 +1121,32 @@ class Integrationtests(casadiTestCase):
     for k in range(1,10):
       r = collocationPoints(k,"legendre")
       self.assertEqual(len(r),k+1) 
+
+  def test_sensitivity_groups(self):
+    self.message("Sensitivity directions split over parallel integrators")
+    x = SX.sym("x",4)
+    p = SX.sym("p",3)
+    ode = vertcat([x[1]*p[0], -x[0]+p[1]*x[2], sin(x[3])*p[2], 0.1*x[0]*x[1]])
+    f = SXFunction("f", daeIn(x=x,p=p), daeOut(ode=ode, quad=x[0]**2))
+    for Integrator, features, options in integrators:
+      if Integrator not in ["cvodes","idas"]: continue
+      opts = {"abstol":1e-10,"reltol":1e-10,"tf":2.0}
+      ref = c.Integrator("ref", Integrator, f, opts)
+      opts["sensitivity_groups"] = 3
+      integrator = c.Integrator("integrator", Integrator, f, opts)
+      for Fr, F in [(ref.derForward(5), integrator.derForward(5)),
+                    (ref.derReverse(4), integrator.derReverse(4))]:
+        self.assertEqual(F.nIn(),Fr.nIn())
+        self.assertEqual(F.nOut(),Fr.nOut())
+        n.random.seed(1)
+        for i in range(F.nIn()):
+          v = DMatrix(Fr.getInput(i).sparsity(),n.random.rand(Fr.getInput(i).nnz()))
+          Fr.setInput(v,i)
+          F.setInput(v,i)
+        Fr.evaluate()
+        F.evaluate()
+        for i in range(F.nOut()):
+          self.checkarray(F.getOutput(i),Fr.getOutput(i),digits=6)
       
 if __name__ == '__main__':
     unittest.main()
@@ -56,6 +56,12 @@ try:
 except:
   pass
 
+try:
+  LinearSolver.loadPlugin("supernodal")
+  lsolvers.append(("supernodal",{}))
+except:
+  pass
+
 nsolvers = []
   
 def nullspacewrapper(name, sp, options):
@@ -480,6 +486,59 @@ class LinearSolverTests(casadiTestCase):
         f.evaluate()
 
         self.checkarray(mul(A_,f.getOutput()),b)
-      
+
+  @requiresPlugin(LinearSolver,"supernodal")
+  def test_supernodal(self):
+    numpy.random.seed(1)
+    n = 60
+    H = self.randDMatrix(n,n,sparsity=0.05)
+    H = H + H.T + 10*DMatrix.eye(n)
+    J = self.randDMatrix(20,n,sparsity=0.1)
+    K = blockcat([[H,J.T],[J,DMatrix.zeros(20,20)]])
+    B = self.randDMatrix(K.size1(),4)
+
+    for options in [{}, {"relax": 1}, {"relax": 32}]:
+      S = LinearSolver("S", "supernodal", K.sparsity(), 4, options)
+      S.setInput(K, "A")
+      S.setInput(B, "B")
+      S.prepare()
+      for tr in [False, True]:
+        S.solve(tr)
+        X = S.getOutput("X")
+        self.checkarray(mul(K.T if tr else K, X), B, digits=8)
+
+      # Refactorize with new numerical values, same pattern
+      K2 = K + sparsify(1e-3*DMatrix(K.sparsity(), numpy.random.rand(K.nnz())))
+      S.setInput(K2, "A")
+      S.prepare()
+      S.solve(False)
+      X = S.getOutput("X")
+      self.checkarray(mul(K2, X), B, digits=8)
+
+    # No pivots are perturbed, so no refinement is needed
+    S = LinearSolver("S", "supernodal", H.sparsity(), 4, {"max_refinement": 0})
+    S.setInput(H, "A")
+    S.setInput(B[:n,:], "B")
+    S.prepare()
+    S.solve(False)
+    self.checkarray(mul(H, S.getOutput("X")), B[:n,:], digits=10)
+
+  @requiresPlugin(LinearSolver,"supernodal")
+  def test_supernodal_singular(self):
+    A = DMatrix([[1,2,0],[2,4,0],[0,0,1]])
+    S = LinearSolver("S", "supernodal", A.sparsity(), 1)
+    S.setInput(A, "A")
+    S.prepare()
+    self.assertTrue(S.getStats()["n_perturbed"]>0)
+
+    # Inconsistent right-hand side
+    S.setInput([1,1,1], "B")
+    self.assertRaises(Exception, lambda : S.solve(False))
+
+    # Consistent right-hand side, a solution is found
+    S.setInput([1,2,1], "B")
+    S.solve(False)
+    self.checkarray(mul(A, S.getOutput("X")), DMatrix([1,2,1]), digits=8)
+
 if __name__ == '__main__':
     unittest.main()
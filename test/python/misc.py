@@ -272,7 +272,51 @@ class Misctests(casadiTestCase):
     s = pickle.dumps(a)
     b = pickle.loads(s)
     self.checkarray(a,b)
-    
+
+  def test_pickling_function(self):
+    x = SX.sym("x",2)
+    y = SX.sym("y",Sparsity.lower(2))
+    p = SX.sym("p")
+    f = SXFunction("f",[x,y],[sin(x)*x[0]+3,mul(y,x),fmax(x[1],2)**2],
+                   {"input_scheme":["x","y"],"output_scheme":["a","b","c"]})
+
+    X = MX.sym("X",2)
+    Z = MX.sym("Z")
+    Y = MX.sym("Y",Sparsity.lower(2))
+    [a,b,c] = f([X,Y])
+    q1,q2 = vertsplit(b,[0,1,2])
+    g = MXFunction("g",[vertcat([X,Z]),Y],[a[::-1]*Z,mul(Y.T,b)+q2,c,vertcat([q1,DMatrix([1,2])])])
+
+    for fun in [f,g]:
+      fun2 = pickle.loads(pickle.dumps(fun))
+      self.assertEqual(fun2.getOption("name"),fun.getOption("name"))
+      self.assertEqual(fun2.inputScheme(),fun.inputScheme())
+      self.assertEqual(fun2.outputScheme(),fun.outputScheme())
+      self.assertEqual(fun2.nIn(),fun.nIn())
+      self.assertEqual(fun2.nOut(),fun.nOut())
+      for i in range(fun.nIn()):
+        fun.setInput(DMatrix(fun.inputSparsity(i),range(1,fun.input(i).nnz()+1)),i)
+        fun2.setInput(fun.getInput(i),i)
+      fun.evaluate()
+      fun2.evaluate()
+      for i in range(fun.nOut()):
+        self.checkarray(fun2.getOutput(i),fun.getOutput(i))
+        self.assertTrue(fun2.outputSparsity(i)==fun.outputSparsity(i))
+
+    # The loaded function is symbolic
+    self.assertEqual(pickle.loads(pickle.dumps(f)).getFree().size(),0)
+    g2 = Function.deserialize(g.serialize())
+    self.checkarray(g2.jacobian(0,0)([DMatrix([1,2,3]),DMatrix(Y.sparsity(),[4,5,6])])[0],
+                    g.jacobian(0,0)([DMatrix([1,2,3]),DMatrix(Y.sparsity(),[4,5,6])])[0])
+
+    # Free variables
+    h = SXFunction("h",[x],[x*p])
+    h2 = SXFunction(Function.deserialize(h.serialize()))
+    self.assertEqual(str(h2.getFree()),str(h.getFree()))
+
+    with self.assertRaises(Exception):
+      Function.deserialize("foo")
+
   def test_exceptions(self):
     try:
       MXFunction('tmp', nlpIn(x=SX.sym("x")))
@@ -479,6 +523,40 @@ class Misctests(casadiTestCase):
       msg = str(e)
     print msg
     assert("'x', 'p'" in msg)
+
+  def test_profiling(self):
+    from casadi.tools.profileanalyzer import ProfileLog
+    import tempfile, os
+
+    fd, filename = tempfile.mkstemp()
+    os.close(fd)
+    try:
+      CasadiOptions.startProfiling(filename)
+      x = SX.sym("x")
+      f = SXFunction("f",[x],[sin(x)*x])
+      X = MX.sym("x")
+      g = MXFunction("g",[X],[f([X])[0]*2])
+      for i in range(3):
+        g.evaluate()
+      CasadiOptions.stopProfiling()
+
+      log = ProfileLog(filename)
+      names = dict((log.name(int(t)),(n,total,own)) for t,n,total,own in zip(*log.functionStats()))
+      self.assertEqual(names["g"][0],3)
+      self.assertEqual(names["f"][0],3)
+      self.assertTrue(names["g"][1]>=names["f"][1])
+      self.assertTrue(names["g"][2]<=names["g"][1])
+
+      stacks = dict((tuple(s),t) for s,t in log.stacks())
+      self.assertTrue(("g","f") in stacks)
+      self.assertTrue(("g",) in stacks)
+
+      thisp, line_number, count, time = log.lineStats()
+      self.assertTrue(len(thisp)>0)
+      self.assertTrue(all(count==3))
+    finally:
+      CasadiOptions.stopProfiling()
+      os.remove(filename)
     
 
 pickle.dump(Sparsity(),file("temp.txt","w"))
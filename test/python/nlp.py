@@ -112,6 +112,122 @@ class NLPtests(casadiTestCase):
       self.assertAlmostEqual(solver.getOutput("lam_x")[0],0,9,str(Solver))
       self.assertAlmostEqual(solver.getOutput("lam_g")[0],0,9,str(Solver))
       
+  def test_warm_start(self):
+    x=SX.sym("x",2)
+    nlp=SXFunction("nlp", nlpIn(x=x),nlpOut(f=(x[0]-1)**2+(x[1]-2)**2,g=x[0]+x[1]))
+
+    for Solver, solver_options in solvers:
+      self.message("warm start " + str(Solver))
+      solver = NlpSolver("mysolver", Solver, nlp, solver_options)
+      solver.setInput([-10,-10],"lbx")
+      solver.setInput([10,1],"ubx")
+      solver.setInput([-10],"lbg")
+      solver.setInput([2],"ubg")
+      solver.evaluate()
+      state = solver.getWarmStart()
+      self.checkarray(DMatrix(state["x"]),solver.getOutput("x"),str(Solver))
+      self.checkarray(DMatrix(state["lam_x"]),solver.getOutput("lam_x"),str(Solver))
+      self.checkarray(DMatrix(state["lam_g"]),solver.getOutput("lam_g"),str(Solver))
+
+      # Restart from the previous solution
+      solver.setWarmStart(state)
+      self.checkarray(solver.getInput("x0"),solver.getOutput("x"),str(Solver))
+      self.checkarray(solver.getInput("lam_g0"),solver.getOutput("lam_g"),str(Solver))
+      solver.evaluate()
+      self.checkarray(solver.getOutput("x"),DMatrix([1,1]),str(Solver),digits=8)
+
+      # Entries which are not supported are rejected
+      self.assertRaises(Exception, lambda : solver.setWarmStart({"no_such_entry": 1}))
+
+  @requiresPlugin(NlpSolver,"ipopt")
+  def test_warm_start_ipopt(self):
+    x=SX.sym("x",2)
+    nlp=SXFunction("nlp", nlpIn(x=x),nlpOut(f=(x[0]-1)**2+(x[1]-2)**2,g=x[0]+x[1]))
+
+    interrupt = [False]
+    @pycallback
+    def callback(f):
+      if interrupt[0]: raise Exception("Interrupted")
+      return 0
+
+    solver = NlpSolver("mysolver", "ipopt", nlp, {"tol": 1e-10, "iteration_callback": callback})
+    solver.setInput([-10,-10],"lbx")
+    solver.setInput([10,1],"ubx")
+    solver.setInput([-10],"lbg")
+    solver.setInput([2],"ubg")
+    solver.evaluate()
+    x_cold = solver.getOutput("x")
+    n_cold = solver.getStats()["iter_count"]
+    state = solver.getWarmStart()
+    self.assertTrue("mu" in state)
+
+    # Round trip: restarting from the solution converges faster
+    solver.setWarmStart(state)
+    solver.evaluate()
+    self.checkarray(solver.getOutput("x"),x_cold,digits=8)
+    self.assertTrue(solver.getStats()["iter_count"]<=n_cold)
+
+    # A warm started solve that throws
+    solver.setWarmStart(state)
+    interrupt[0] = True
+    try:
+      self.assertRaises(Exception, lambda : solver.evaluate())
+    finally:
+      interrupt[0] = False
+
+    # The options changed for the warm start have been restored
+    solver.setInput([0,0],"x0")
+    solver.setInput([0,0],"lam_x0")
+    solver.setInput([0],"lam_g0")
+    solver.evaluate()
+    self.checkarray(solver.getOutput("x"),x_cold,digits=8)
+    self.assertEqual(solver.getStats()["iter_count"],n_cold)
+
+  @requiresPlugin(Compiler,"shell")
+  @requiresPlugin(QpSolver,"qpoases")
+  @requiresPlugin(NlpSolver,"sqpmethod")
+  def test_compile(self):
+    x=SX.sym("x",3)
+    f=(x[0]-1)**2+sin(x[1])**2+exp(x[2])
+    g=vertcat([x[0]*x[1]+x[2],x[0]**2+x[2]**2])
+    X=MX.sym("x",3)
+    nlp=MXFunction("nlp",nlpIn(x=X),nlpOut(f=SXFunction("f",[x],[f])([X])[0],
+                                            g=SXFunction("g",[x],[g])([X])[0]))
+
+    sol = []
+    for compile in [False, True]:
+      for expand in [False, True]:
+        opts = {"qp_solver":"qpoases","qp_solver_options":{"printLevel":"none"},
+                "expand":expand,"compile":compile,"compiler":"shell"}
+        solver = NlpSolver("mysolver","sqpmethod",nlp,opts)
+        solver.setInput([1,1,1],"x0")
+        solver.setInput([-1,-1,-1],"lbx")
+        solver.setInput([1,1,1],"ubx")
+        solver.setInput([0.5,0],"lbg")
+        solver.setInput([inf,1],"ubg")
+        solver.evaluate()
+        sol.append((solver.getOutput("x"),solver.getOutput("lam_g"),solver.getStats()["iter_count"]))
+
+    for x_opt, lam_g, iter_count in sol[1:]:
+      self.checkarray(x_opt,sol[0][0],digits=10)
+      self.checkarray(lam_g,sol[0][1],digits=10)
+      self.assertEqual(iter_count,sol[0][2])
+
+    # The temporary source files are removed
+    import os, tempfile, shutil
+    self.assertEqual([f for f in os.listdir(".") if f.startswith("nlp_jit_tmp")],[])
+
+    # The generated code does not depend on the name of the temporary file
+    cache = tempfile.mkdtemp()
+    try:
+      opts = {"qp_solver":"qpoases","qp_solver_options":{"printLevel":"none"},
+              "compile":True,"compiler":"shell","jit_options":{"cache":cache}}
+      for i in range(2):
+        NlpSolver("mysolver","sqpmethod",nlp,opts)
+      self.assertEqual(len([f for f in os.listdir(cache) if f.endswith(".so")]),1)
+    finally:
+      shutil.rmtree(cache)
+
   def testIPOPT_par(self):
     x=SX.sym("x")
     p=SX.sym("p")
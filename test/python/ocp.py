@@ -184,7 +184,7 @@ class OCPtests(casadiTestCase):
     self.assertAlmostEqual(fmax(-solver.getOutput("lam_x"),0)[0],0,8,"Constraint is supposed to be unactive")
     self.assertAlmostEqual(fmax(-solver.getOutput("lam_x"),0)[1],0,8,"Constraint is supposed to be unactive") 
     
-  @requiresPlugin(XmlFile,"tinyxml")
+  @requiresPlugin(XmlFile,"stream")
   def test_XML(self):
     self.message("JModelica XML parsing")
     ivp = DaeBuilder()
@@ -236,6 +236,86 @@ class OCPtests(casadiTestCase):
     
     mystates = []
 
+  @requiresPlugin(XmlFile,"stream")
+  @requiresPlugin(XmlFile,"tinyxml")
+  def test_XML_parsers(self):
+    self.message("JModelica XML parsing with both XML plugins")
+    ivp = []
+    for parser in ["stream","tinyxml"]:
+      d = DaeBuilder()
+      d.parseFMI('data/cstr.xml',parser)
+      d.split_dae()
+      ivp.append(d)
+
+    for d in ivp:
+      self.assertEquals(len(d.s),3)
+      self.assertEquals(len(d.dae),3)
+      self.assertEquals(d.nominal("cstr.c"),1000)
+    for attr in ["s","sdot","p","u","q","y","ydef","dae","init"]:
+      self.assertEquals(str(getattr(ivp[0],attr)),str(getattr(ivp[1],attr)),attr)
+
+  def test_daebuilder_transformations(self):
+    self.message("DaeBuilder repeated transformations")
+    def build():
+      dae = DaeBuilder()
+      p = dae.add_p("p")
+      dae.add_s("s1")
+      s1, s1dot = dae.s[-1], dae.sdot[-1]
+      dae.add_s("s2")
+      s2, s2dot = dae.s[-1], dae.sdot[-1]
+      dae.add_s("s3")
+      s3, s3dot = dae.s[-1], dae.sdot[-1]
+      d1 = dae.add_d(2*p, "d1")
+      d2 = dae.add_d(d1+s1, "d2")
+      dae.add_dae(s2dot - d2*s2, "eq1")
+      dae.add_dae(s3 - d1*sin(s1), "eq2")
+      dae.add_dae(s1dot + s1 - p, "eq3")
+      return dae, p, s1, s2, s3
+
+    for repeat in [False, True]:
+      dae, p, s1, s2, s3 = build()
+      if repeat:
+        # Transformations are expected to be idempotent
+        dae.sort_d()
+        dae.sort_d()
+        dae.split_dae()
+        dae.split_dae()
+        dae.eliminate_d()
+        dae.eliminate_d()
+      else:
+        dae.split_dae()
+        dae.eliminate_d()
+      self.assertEqual(len(dae.s), 2)
+      self.assertEqual(len(dae.z), 1)
+      self.assertEqual(len(dae.alg), 1)
+      x = vertcat([p] + dae.s + dae.sdot + dae.z)
+      f = MXFunction("f", [x], [vertcat(dae.dae + dae.alg)])
+      f.setInput([2, 0.3, 0.5, 0.11, 0.13, 0.7])
+      f.evaluate()
+      ref = DMatrix([0.13-4.3*0.5, 0.11+0.3-2, 0.7-4*sin(0.3)])
+      self.checkarray(f.getOutput(), ref)
+
+      # Extend the model after the transformations and transform again
+      d3 = dae.add_d(3*p, "d3")
+      z2 = dae.add_z("z2")
+      dae.add_alg(z2 - d3*s1, "eq4")
+      dae.eliminate_d()
+      x = vertcat([p] + dae.s + dae.sdot + dae.z)
+      f = MXFunction("f", [x], [vertcat(dae.dae + dae.alg)])
+      f.setInput([2, 0.3, 0.5, 0.11, 0.13, 0.7, 1.9])
+      f.evaluate()
+      self.checkarray(f.getOutput(), vertcat([ref, 1.9-6*0.3]))
+
+    # Sorting is redone after the model has been extended
+    dae, p, s1, s2, s3 = build()
+    dae.sort_d()
+    self.assertEqual([str(i) for i in dae.d],["d1","d2"])
+    dae.add_d(dae.d[1]*p, "d3")
+    dae.sort_d()
+    self.assertEqual([str(i) for i in dae.d],["d1","d2","d3"])
+    dae.sort_d()
+    self.assertEqual([str(i) for i in dae.d],["d1","d2","d3"])
+
   # @requiresPlugin(NlpSolver,"ipopt")
   # def testMSclass_prim(self):
   #   self.message("CasADi multiple shooting class")
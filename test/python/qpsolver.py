@@ -41,6 +41,9 @@ if NlpSolver.hasPlugin("ipopt"):
 # if NlpSolver.hasPlugin("worhp") and not args.ignore_memory_heavy:
 #   qpsolvers.append(("nlp.worhp",{"nlp_solver_options": {"TolOpti": 1e-12}},{}))
 
+if QpSolver.hasPlugin("banded"):
+  qpsolvers.append(("banded",{},{}))
+
 # if QpSolver.hasPlugin("ooqp"):
 #   qpsolvers.append(("ooqp",{},{}))
 
@@ -748,6 +751,154 @@ class QpSolverTests(casadiTestCase):
       self.checkarray(solver.getOutput("lam_a"),DMatrix([2,0,0]),str(qpsolver),digits=max(1,5-less_digits))
       
       self.assertAlmostEqual(solver.getOutput("cost")[0],7,max(1,5-less_digits),str(qpsolver))
-      
+
+  @requiresPlugin(QpSolver,"banded")
+  def test_banded_ocp(self):
+    # Multiple shooting QP: w = [x0,u0,x1,u1,...,xN], x_{k+1} = Ad*x_k + Bd*u_k
+    numpy.random.seed(1)
+    nx = 3
+    nu = 2
+    Ad = DMatrix(0.9*numpy.eye(nx) + 0.05*numpy.random.rand(nx,nx))
+    Bd = DMatrix(numpy.random.rand(nx,nu))
+
+    bandwidth = []
+    for N in [10, 40]:
+      nw = N*(nx+nu)+nx
+      ix = [k*(nx+nu) for k in range(N+1)]
+      A = DMatrix(nx*(N+1), nw)
+      A[:nx, :nx] = DMatrix.eye(nx)
+      for k in range(N):
+        A[nx*(k+1):nx*(k+2), ix[k]:ix[k]+nx] = Ad
+        A[nx*(k+1):nx*(k+2), ix[k]+nx:ix[k+1]] = Bd
+        A[nx*(k+1):nx*(k+2), ix[k+1]:ix[k+1]+nx] = -DMatrix.eye(nx)
+      A = sparsify(A)
+      H = sparsify(c.diag(DMatrix(numpy.random.rand(nw)+0.5)))
+      G = DMatrix(numpy.random.rand(nw))
+      LBA = DMatrix.zeros(A.size1())
+      LBA[:nx] = 1
+      LBX = -inf*DMatrix.ones(nw)
+      UBX = inf*DMatrix.ones(nw)
+      for k in range(N):
+        LBX[ix[k]+nx:ix[k+1]] = -0.1
+        UBX[ix[k]+nx:ix[k+1]] = 0.1
+
+      sols = []
+      for ordering in ["stage", "rcm"]:
+        solver = QpSolver("mysolver","banded",{'h':H.sparsity(),'a':A.sparsity()},{"ordering": ordering})
+        solver.setInput(H,"h")
+        solver.setInput(G,"g")
+        solver.setInput(A,"a")
+        solver.setInput(LBX,"lbx")
+        solver.setInput(UBX,"ubx")
+        solver.setInput(LBA,"lba")
+        solver.setInput(LBA,"uba")
+        solver.evaluate()
+        x = solver.getOutput("x")
+        lam_x = solver.getOutput("lam_x")
+        lam_a = solver.getOutput("lam_a")
+
+        # KKT conditions
+        self.checkarray(mul(H,x)+G+lam_x+mul(A.T,lam_a),DMatrix.zeros(nw),digits=8)
+        self.checkarray(mul(A,x),LBA,digits=8)
+        self.assertTrue(all(numpy.array(x)>=numpy.array(LBX)-1e-8))
+        self.assertTrue(all(numpy.array(x)<=numpy.array(UBX)+1e-8))
+        # Complementarity: negative multipliers at the lower bound, positive ones at the upper
+        lam = numpy.array(lam_x).ravel()
+        xv = numpy.array(x).ravel()
+        neg = lam<-1e-12
+        pos = lam>1e-12
+        self.checkarray(lam[neg]*(xv[neg]-numpy.array(LBX).ravel()[neg]),numpy.zeros(sum(neg)),digits=8)
+        self.checkarray(lam[pos]*(xv[pos]-numpy.array(UBX).ravel()[pos]),numpy.zeros(sum(pos)),digits=8)
+        self.assertTrue(any(neg) or any(pos))
+        sols.append(x)
+        bandwidth.append(solver.getStats()["bandwidth"])
+      self.checkarray(sols[0],sols[1],digits=8)
+
+    # The bandwidth does not grow with the horizon length
+    self.assertEqual(bandwidth[0:2],bandwidth[2:4])
+
+  def test_warm_start(self):
+    self.message("Warm start")
+    H = DMatrix([[1,-1],[-1,2]])
+    G = DMatrix([-2,-6])
+    A =  DMatrix([[1, 1],[-1, 2],[2, 1]])
+
+    LBA = DMatrix([-inf]*3)
+    UBA = DMatrix([2, 2, 3])
+
+    LBX = DMatrix([0]*2)
+    UBX = DMatrix([inf]*2)
+
+    for qpsolver, qp_options, aux_options in qpsolvers:
+      solver = QpSolver("mysolver",qpsolver,{'h':H.sparsity(),'a':A.sparsity()},qp_options)
+      try:
+        less_digits=aux_options["less_digits"]
+      except:
+        less_digits=0
+
+      solver.setInput(H,"h")
+      solver.setInput(G,"g")
+      solver.setInput(A,"a")
+      solver.setInput(LBX,"lbx")
+      solver.setInput(UBX,"ubx")
+      solver.setInput(LBA,"lba")
+      solver.setInput(UBA,"uba")
+      solver.evaluate()
+      x = DMatrix(solver.getOutput("x"))
+
+      state = solver.getWarmStart()
+      self.checkarray(DMatrix(state["x"]),x,str(qpsolver))
+      self.checkarray(DMatrix(state["lam_a"]),solver.getOutput("lam_a"),str(qpsolver))
+
+      # Restarting from the solution gives the solution
+      solver.setWarmStart(state)
+      self.checkarray(solver.getInput("x0"),x,str(qpsolver))
+      self.checkarray(solver.getInput("lam_x0"),solver.getOutput("lam_x"),str(qpsolver))
+      solver.evaluate()
+      self.checkarray(solver.getOutput("x"),DMatrix([2.0/3,4.0/3]),str(qpsolver),digits=max(1,6-less_digits))
+
+      # Entries which are not supported are rejected
+      self.assertRaises(Exception, lambda : solver.setWarmStart({"no_such_entry": 1}))
+
+  @requiresPlugin(QpSolver,"qpoases")
+  def test_qpoases_warm_start(self):
+    self.message("qpOASES warm start with working set")
+    H = DMatrix([[1,-1],[-1,2]])
+    G = DMatrix([-2,-6])
+    A =  DMatrix([[1, 1],[-1, 2],[2, 1]])
+
+    UBA = DMatrix([2, 2, 3])
+
+    solver = QpSolver("mysolver","qpoases",{'h':H.sparsity(),'a':A.sparsity()})
+    solver.setInput(H,"h")
+    solver.setInput(G,"g")
+    solver.setInput(A,"a")
+    solver.setInput(0,"lbx")
+    solver.setInput(inf,"ubx")
+    solver.setInput(-inf,"lba")
+    solver.setInput(UBA,"uba")
+    solver.evaluate()
+    self.assertTrue(solver.getStats()["iter_count"]>0)
+
+    # The first two constraints are active at their upper bounds
+    state = solver.getWarmStart()
+    self.assertEqual(list(state["bounds_status"]),[0,0])
+    self.assertEqual(list(state["constraints_status"]),[1,1,0])
+
+    # A fresh solver that is given the optimal working set needs no working set changes
+    solver2 = QpSolver("mysolver2","qpoases",{'h':H.sparsity(),'a':A.sparsity()})
+    for i in ["h","g","a","lbx","ubx","lba","uba"]:
+      solver2.setInput(solver.getInput(i),i)
+    solver2.setWarmStart(state)
+    solver2.evaluate()
+    self.assertEqual(solver2.getStats()["iter_count"],0)
+    self.checkarray(solver2.getOutput("x"),solver.getOutput("x"))
+    self.checkarray(solver2.getOutput("lam_a"),solver.getOutput("lam_a"))
+
+    # Without a working set, the guess is obtained from the multipliers
+    solver2.setWarmStart({"x": state["x"], "lam_x": state["lam_x"], "lam_a": state["lam_a"]})
+    solver2.evaluate()
+    self.checkarray(solver2.getOutput("x"),solver.getOutput("x"))
+
 if __name__ == '__main__':
     unittest.main()
@@ -504,6 +504,27 @@ class Sparsitytests(casadiTestCase):
     
     self.assertTrue(J.getOutput()[:X.nnz(),:].sparsity()==Sparsity.diag(100))
     
+  def test_jacsparsityHierarchicalWide(self):
+    numpy.random.seed(0)
+    n = 3000
+    x = SX.sym("x",n)
+
+    # Banded dependencies with a few random long-range couplings
+    j = numpy.random.randint(0,n,n)
+    e = vertcat([x[k]*x[(k+1)%n]+sin(x[int(j[k])]) for k in range(n)])
+    f = SXFunction('f', [x],[e])
+
+    # Reference: MXFunction propagates one bit vector per nonzero
+    xm = MX.sym("x",n)
+    fm = MXFunction('fm', [xm],f([xm]))
+
+    self.assertTrue(f.jacSparsity()==fm.jacSparsity())
+
+    # Symmetric sparsity of a Hessian
+    g = SXFunction('g', [x],[c.gradient(sumRows(e*e),x)])
+    gm = MXFunction('gm', [xm],g([xm]))
+    self.assertTrue(g.jacSparsity(0,0,False,True)==gm.jacSparsity(0,0,False,True))
+
   def test_rowcol(self):
     n = 3
     
@@ -1234,7 +1234,147 @@ class SXtests(casadiTestCase):
         isSmooth(x)
       warnings.simplefilter("ignore")
       isSmooth(x)
-    
+
+  def test_evalBatch(self):
+    x = SX.sym("x",2)
+    y = SX.sym("y",Sparsity.lower(2))
+    f = SXFunction("f",[x,y],[sin(x)*x[0]+3,mul(y,x),x[1]**2])
+
+    K = 5
+    numpy.random.seed(0)
+    X = numpy.random.random((2,K))
+    Y = numpy.random.random((3,K))
+
+    res = f.evalBatch([X,Y])
+    self.assertEqual(len(res),3)
+    for k in range(K):
+      f.setInput(X[:,k],0)
+      f.setInput(Y[:,k],1)
+      f.evaluate()
+      for i in range(3):
+        self.checkarray(res[i][:,k],f.getOutput(i).nz[:],"evalBatch")
+
+    with self.assertRaises(Exception):
+      f.evalBatch([X,Y[:,:2]])
+
+  def test_cse(self):
+    x = SX.sym("x")
+    y = SX.sym("y")
+    e = [sin(x*y)+cos(y*x), sin(x*y)*exp(x+y)+exp(y+x)]
+
+    f = SXFunction("f",[x,y],e)
+    g = SXFunction("g",[x,y],e,{"cse": True})
+    self.assertTrue(g.getAlgorithmSize()<f.getAlgorithmSize())
+    self.assertEqual(g.getAlgorithmSize(),12)
+
+    for i in [f,g]:
+      i.setInput(0.3,0)
+      i.setInput(0.7,1)
+      i.evaluate()
+    for i in range(2):
+      self.checkarray(f.getOutput(i),g.getOutput(i),"cse")
+
+    self.checkarray(f.jacobian(0,1)([0.3,0.7])[0],g.jacobian(0,1)([0.3,0.7])[0],"cse jacobian")
+
+  def test_hash_consing(self):
+    x = SX.sym("x")
+    y = SX.sym("y")
+    self.assertFalse(CasadiOptions.getHashConsing())
+    self.assertFalse(isEqual(sin(x*y),sin(x*y),0))
+
+    CasadiOptions.setHashConsing(True)
+    try:
+      self.assertTrue(isEqual(sin(x*y),sin(x*y),0))
+      self.assertTrue(isEqual(x*y,y*x,0))
+      self.assertFalse(isEqual(x-y,y-x,0))
+      f = SXFunction("f",[x,y],[sin(x*y)+cos(y*x)])
+      self.assertEqual(f.getAlgorithmSize(),7)
+    finally:
+      CasadiOptions.setHashConsing(False)
+
+    self.assertFalse(isEqual(cos(x*y),cos(x*y),0))
+
+  def test_optimize_algorithm(self):
+    x = SX.sym("x",2)
+    CasadiOptions.setSimplificationOnTheFly(False)
+    try:
+      e = [constpow(x[0],2)+x[1]*x[1], x[0]*x[1]-0, fabs(-(-x[1]))]
+    finally:
+      CasadiOptions.setSimplificationOnTheFly(True)
+
+    f = SXFunction("f",[x],e)
+    g = SXFunction("g",[x],e,{"optimize_algorithm": True})
+    self.assertEqual(f.getAlgorithmSize(),14)
+    self.assertEqual(g.getAlgorithmSize(),10)
+
+    for i in [f,g]:
+      i.setInput([0.3,-1.7])
+      i.evaluate()
+    for i in range(3):
+      self.checkarray(f.getOutput(i),g.getOutput(i),"optimize_algorithm")
+      self.checkarray(f.jacobian(0,i)([[0.3,-1.7]])[0],g.jacobian(0,i)([[0.3,-1.7]])[0],"optimize_algorithm jacobian")
+
+  def test_optimize_algorithm_rules(self):
+    x = SX.sym("x")
+    CasadiOptions.setSimplificationOnTheFly(False)
+    try:
+      cases = [(x*x,[OP_SQ]),(x+x,[OP_TWICE]),(x*2,[OP_TWICE]),(x*(-1),[OP_NEG]),(x/(-1),[OP_NEG]),
+               (x*1,[]),(x/1,[]),(x-0,[]),(constpow(x,1),[]),(constpow(x,2),[OP_SQ]),
+               ((x*1)*(x/1),[OP_SQ]),(sin(x*1)+cos(x-0),[OP_SIN,OP_COS,OP_ADD])]
+    finally:
+      CasadiOptions.setSimplificationOnTheFly(True)
+
+    for e, ops in cases:
+      f = SXFunction("f",[x],[e],{"optimize_algorithm": True})
+      alg = [f.getAtomicOperation(k) for k in range(f.getAlgorithmSize())]
+
+      # Only the expected operations remain, constants have been folded away
+      self.assertEqual(alg,[OP_INPUT]+ops+[OP_OUTPUT],str(e))
+      self.assertFalse(f.outputExpr(0).isConstant())
+
+      f.setInput(0.7)
+      f.evaluate()
+      self.checkarray(f.getOutput(),SXFunction("f",[x],[e])([0.7])[0],str(e))
+
+    # Operations on constants only are evaluated, the result is a single constant
+    f = SXFunction("f",[x],[sin(SX(1))*cos(SX(0))+x],{"optimize_algorithm": True})
+    alg = [f.getAtomicOperation(k) for k in range(f.getAlgorithmSize())]
+    self.assertEqual(sorted(alg),sorted([OP_INPUT,OP_CONST,OP_ADD,OP_OUTPUT]))
+    self.checkarray(f.getAtomicInputReal(alg.index(OP_CONST)),sin(1))
+
+  def test_node_pool(self):
+    n0 = SXNodePool.getNumNodes()
+    x = SX.sym("x",100)
+    self.assertEqual(SXNodePool.getNumNodes(),n0+100)
+
+    arena = SXNodeArena()
+    y = x
+    for i in range(10):
+      y = sin(y)*x
+    self.assertEqual(SXNodePool.getNumNodes(),n0+2100)
+    self.assertTrue(SXNodePool.getPeakNumNodes()>=n0+2100)
+    self.assertTrue(SXNodePool.getUsedMemory()>0)
+    self.assertTrue(SXNodePool.getReservedMemory()>=SXNodePool.getUsedMemory())
+    f = SXFunction("f",[x],[y])
+    f.setInput(0.5)
+    f.evaluate()
+    y = None
+    self.assertEqual(SXNodePool.getNumNodes(),n0+2100)
+    f = None
+    self.assertEqual(SXNodePool.getNumNodes(),n0+100)
+
+    # Unused memory is returned when the arena ends, the remaining nodes are intact
+    reserved = SXNodePool.getReservedMemory()
+    arena = None
+    self.assertTrue(SXNodePool.getReservedMemory()<=reserved)
+    f = SXFunction("f",[x],[sin(x)*x])
+    f.setInput(0.5)
+    f.evaluate()
+    self.checkarray(f.getOutput(),DMatrix.ones(100)*sin(0.5)*0.5,"node pool")
+    SXNodePool.releaseMemory()
+    SXNodePool.resetPeak()
+    self.assertEqual(SXNodePool.getPeakNumNodes(),SXNodePool.getNumNodes())
+
 if __name__ == '__main__':
     unittest.main()
 
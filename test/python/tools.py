@@ -806,6 +806,42 @@ class Toolstests(casadiTestCase):
     self.checkarray(g.shape,(1,1))
     
     self.assertTrue(len(g["inequality"])==0)
+
+  def test_index_plan(self):
+    s = struct_symSX([entry("q",shape=3),entry("v",shape=(2,2))])
+    opt = struct_symSX([entry("X",struct=s,repeat=4),entry("U",repeat=3,shape=2),entry("A",shape=(3,3),type="symm")])
+
+    from casadi.tools.structure import GetterDispatcher
+
+    v = opt(range(opt.size))
+    for powerIndex in [("X",slice(None),"q"),("X",-1,"v"),("X",2,"v",1,0),("U",[1,2]),("X",[0,1],"q",slice(0,2)),("X",slice(None)),(Ellipsis,)]:
+      ref = opt.struct.traverseByPowerIndex(powerIndex,dispatcher=GetterDispatcher(struct=opt.struct,master=v.master,priority_object_map={}))
+      self.assertEqual(str(v[powerIndex]),str(ref))
+      self.assertEqual(str(v[powerIndex]),str(ref))
+
+    # Plans are compiled once per distinct index
+    self.assertTrue(opt.struct.getPlan(("X",slice(None),"q")) is opt.struct.getPlan(("X",slice(None),"q")))
+    self.assertTrue(opt.struct.getPlan(("X",lambda x: x)) is None)
+    self.assertTrue(opt.struct.getPlan(("A",)) is None)
+
+    v["X",:,"q"] = 7
+    self.checkarray(v["X",2,"q"],DMatrix([7,7,7]))
+    v["X",:,"q"] = [DMatrix([i,i,i]) for i in range(4)]
+    self.checkarray(v["X",2,"q"],DMatrix([2,2,2]))
+    v["X",:,"v"] = repeated(DMatrix([[1,2],[3,4]]))
+    self.checkarray(v["X",3,"v"],DMatrix([[1,2],[3,4]]))
+    v["U",0:2] = [[1,2],[3,4]]
+    self.checkarray(v["U",1],DMatrix([3,4]))
+    v["A"] = DMatrix([[1,2,3],[2,4,5],[3,5,6]])
+    self.checkarray(v["A"],DMatrix([[1,2,3],[2,4,5],[3,5,6]]))
+
+    x = struct_SX([entry("a",expr=SX.sym("a",2)),entry("b",expr=SX.sym("b",2,2))])
+    f = SXFunction("f",[x["a"],x["b"]],[x["b",0,1],x["a"]])
+    f.setInput([1,2],0)
+    f.setInput(DMatrix([[3,4],[5,6]]),1)
+    f.evaluate()
+    self.checkarray(f.getOutput(0),DMatrix([4]))
+    self.checkarray(f.getOutput(1),DMatrix([1,2]))
     
 if __name__ == '__main__':
     unittest.main()